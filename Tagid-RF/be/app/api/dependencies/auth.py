@@ -8,6 +8,7 @@ from fastapi.security import (  # Using standard security classes
 )
 from prisma.models import User  # Import User model for type hint
 
+from app.core.auth_cache import principal_cache, token_cache
 from app.core.security import verify_access_token
 from app.crud.user import get_user_by_id
 from app.db.dependencies import get_db
@@ -27,8 +28,9 @@ async def get_current_user(
     Dependency to get the current authenticated user.
 
     1. Extracts token from Authorization header.
-    2. Verifies the JWT token.
-    3. Retrieves the user from the database based on the token's payload.
+    2. Verifies the JWT token (decoded payloads are cached until the token expires).
+    3. Retrieves the user based on the token's payload, from the principal
+       cache when possible and from the database otherwise.
     4. Returns the User object or raises HTTPException.
     """
     credentials_exception = HTTPException(
@@ -43,15 +45,18 @@ async def get_current_user(
         raise credentials_exception
 
     token = authorization.credentials
-    logger.info(f"Verifying token. Length: {len(token)}")
 
     # Verify token
-    payload = verify_access_token(token)
+    payload = token_cache.get(token)
     if payload is None:
-        logger.warning("Token verification FAILED (returned None)")
-        raise credentials_exception
+        logger.debug("Verifying token. Length: %d", len(token))
+        payload = verify_access_token(token)
+        if payload is None:
+            logger.warning("Token verification FAILED (returned None)")
+            raise credentials_exception
+        token_cache.put(token, payload)
 
-    logger.debug(f"Token payload: {payload}")
+    logger.debug("Token payload: %s", payload)
 
     # Extract user_id from payload
     user_id = payload.get("user_id")
@@ -59,8 +64,12 @@ async def get_current_user(
         logger.warning("'user_id' not found in token payload")
         raise credentials_exception
 
+    user = principal_cache.get(user_id)
+    if user is not None:
+        return user
+
     # Get user from database
-    logger.debug(f"Attempting to fetch user from DB with ID: {user_id}")
+    logger.debug("Attempting to fetch user from DB with ID: %s", user_id)
     try:
         user = await get_user_by_id(db, user_id=user_id)
     except Exception as db_err:
@@ -74,5 +83,6 @@ async def get_current_user(
         logger.warning(f"User with ID {user_id} from token NOT FOUND in database")
         raise credentials_exception
 
-    logger.info(f"Authenticated user: {user.id} ({user.email})")
+    principal_cache.put(user_id, user)
+    logger.debug("Authenticated user: %s (%s)", user.id, user.email)
     return user
@@ -15,6 +15,15 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 
 from app.db.dependencies import get_db
+from app.services.bath_cart import (
+    bath_reader_cache,
+    cart_summary,
+    cart_totals,
+    materialize_cart,
+    summarize_lines,
+)
+from app.services.cart_store import CartStore, get_cart_store
+from app.services.tag_repository import tag_repository
 from prisma import Prisma
 
 logger = logging.getLogger(__name__)
@@ -70,29 +79,35 @@ class CheckoutResponse(BaseModel):
     message: str
 
 
-# ============ In-Memory Cart Storage ============
-# For POC - in production, use Redis or database
+class CartSummary(BaseModel):
+    """Cart totals without item details"""
 
-_bath_carts: dict[str, list[str]] = {}  # bath_id -> list of tag_ids
+    bath_id: str
+    total_items: int
+    total_price: float
 
 
-def get_bath_cart(bath_id: str) -> list[str]:
-    """Get or create cart for bath"""
-    if bath_id not in _bath_carts:
-        _bath_carts[bath_id] = []
-    return _bath_carts[bath_id]
+# ============ Helpers ============
 
 
-def clear_bath_cart(bath_id: str):
-    """Clear cart after checkout"""
-    _bath_carts[bath_id] = []
+async def _get_bath_reader(db: Prisma, bath_id: str, require_bath: bool = True):
+    """Resolve a bath reader by id or QR code (cached), or raise 404."""
+    reader = await bath_reader_cache.resolve(db, bath_id)
+    if not reader or (require_bath and reader.type != "BATH"):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bath reader not found")
+    return reader
 
 
 # ============ API Endpoints ============
 
 
 @router.post("/{bath_id}/scan", response_model=CartItem)
-async def scan_tag_to_cart(bath_id: str, request: ScanTagRequest, db: Prisma = Depends(get_db)):
+async def scan_tag_to_cart(
+    bath_id: str,
+    request: ScanTagRequest,
+    db: Prisma = Depends(get_db),
+    cart_store: CartStore = Depends(get_cart_store),
+):
     """
     Add a tag to the cart when scanned by bath reader.
 
@@ -105,14 +120,7 @@ async def scan_tag_to_cart(bath_id: str, request: ScanTagRequest, db: Prisma = D
     """
     logger.info(f"Bath {bath_id} scanned tag: {request.epc}")
 
-    # Verify bath reader
-    reader = await db.rfidreader.find_unique(where={"id": bath_id})
-    if not reader:
-        # Try by QR code
-        reader = await db.rfidreader.find_first(where={"qrCode": bath_id})
-
-    if not reader or reader.type != "BATH":
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bath reader not found")
+    reader = await _get_bath_reader(db, bath_id)
 
     # Find tag by EPC
     tag = await db.rfidtag.find_unique(where={"epc": request.epc})
@@ -127,23 +135,21 @@ async def scan_tag_to_cart(bath_id: str, request: ScanTagRequest, db: Prisma = D
     if tag.isPaid:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Tag is already paid")
 
-    # Check if already in cart
-    cart = get_bath_cart(reader.id)
-    if tag.id in cart:
+    # Get product info if linked
+    product = None
+    if tag.productId:
+        product = await db.product.find_unique(where={"id": tag.productId})
+
+    # Add to cart (no-op if already there)
+    if not await cart_store.add(reader.id, tag.id):
         logger.info(f"Tag {tag.id} already in cart")
     else:
-        # Add to cart
-        cart.append(tag.id)
+        cart_totals.add(reader.id, tag.id, product.price if product else None)
 
         # Update tag status to IN_CART
         await db.rfidtag.update(where={"id": tag.id}, data={"status": "IN_CART"})
         logger.info(f"Added tag {tag.id} to cart")
 
-    # Get product info if linked
-    product = None
-    if tag.productId:
-        product = await db.product.find_unique(where={"id": tag.productId})
-
     return CartItem(
         tag_id=tag.id,
         epc=tag.epc,
@@ -155,20 +161,17 @@ async def scan_tag_to_cart(bath_id: str, request: ScanTagRequest, db: Prisma = D
 
 
 @router.delete("/{bath_id}/cart/{tag_id}")
-async def remove_from_cart(bath_id: str, tag_id: str, db: Prisma = Depends(get_db)):
+async def remove_from_cart(
+    bath_id: str,
+    tag_id: str,
+    db: Prisma = Depends(get_db),
+    cart_store: CartStore = Depends(get_cart_store),
+):
     """Remove a tag from the cart"""
-    # Verify bath reader
-    reader = await db.rfidreader.find_unique(where={"id": bath_id})
-    if not reader:
-        reader = await db.rfidreader.find_first(where={"qrCode": bath_id})
+    reader = await _get_bath_reader(db, bath_id, require_bath=False)
 
-    if not reader:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bath reader not found")
-
-    cart = get_bath_cart(reader.id)
-
-    if tag_id in cart:
-        cart.remove(tag_id)
+    if await cart_store.remove(reader.id, tag_id):
+        cart_totals.remove(reader.id, tag_id)
 
         # Update tag status back to REGISTERED
         await db.rfidtag.update(where={"id": tag_id}, data={"status": "REGISTERED"})
@@ -179,110 +182,99 @@ async def remove_from_cart(bath_id: str, tag_id: str, db: Prisma = Depends(get_d
 
 
 @router.get("/{bath_id}/cart", response_model=CartResponse)
-async def get_cart(bath_id: str, db: Prisma = Depends(get_db)):
+async def get_cart(
+    bath_id: str,
+    db: Prisma = Depends(get_db),
+    cart_store: CartStore = Depends(get_cart_store),
+):
     """Get current cart contents for a bath reader"""
-    # Verify bath reader
-    reader = await db.rfidreader.find_unique(where={"id": bath_id})
-    if not reader:
-        reader = await db.rfidreader.find_first(where={"qrCode": bath_id})
-
-    if not reader or reader.type != "BATH":
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bath reader not found")
-
-    cart_tag_ids = get_bath_cart(reader.id)
+    reader = await _get_bath_reader(db, bath_id)
 
-    items = []
-    total_price = 0.0
+    cart_contents = await cart_store.items(reader.id)
+    lines = await materialize_cart(db, cart_contents)
+    if not cart_store.shared:
+        cart_totals.seed(reader.id, lines)
+    totals = summarize_lines(lines)
 
-    for tag_id in cart_tag_ids:
-        tag = await db.rfidtag.find_unique(where={"id": tag_id})
-        if not tag:
-            continue
-
-        product = None
-        if tag.productId:
-            product = await db.product.find_unique(where={"id": tag.productId})
-
-        price = product.price if product else 0
-        total_price += price
-
-        items.append(
-            CartItem(
-                tag_id=tag.id,
-                epc=tag.epc,
-                product_id=tag.productId,
-                product_name=product.name if product else tag.productDescription,
-                product_price=price,
-                added_at="",  # Not tracked in simple POC
-            )
-        )
+    items = [CartItem(**line, added_at=cart_contents[line["tag_id"]].isoformat()) for line in lines]
 
     return CartResponse(
         bath_id=reader.id,
         bath_name=reader.name,
         items=items,
-        total_items=len(items),
-        total_price=total_price,
+        total_items=totals["total_items"],
+        total_price=totals["total_price"],
     )
 
 
+@router.get("/{bath_id}/cart/summary", response_model=CartSummary)
+async def get_cart_summary(
+    bath_id: str,
+    db: Prisma = Depends(get_db),
+    cart_store: CartStore = Depends(get_cart_store),
+):
+    """Get cart totals, served from the running totals when available"""
+    reader = await _get_bath_reader(db, bath_id)
+
+    totals = await cart_summary(db, cart_store, reader.id)
+
+    return CartSummary(bath_id=reader.id, **totals)
+
+
 @router.post("/{bath_id}/checkout", response_model=CheckoutResponse)
-async def checkout(bath_id: str, request: CheckoutRequest, db: Prisma = Depends(get_db)):
+async def checkout(
+    bath_id: str,
+    request: CheckoutRequest,
+    db: Prisma = Depends(get_db),
+    cart_store: CartStore = Depends(get_cart_store),
+):
     """
     Process checkout for bath cart.
 
     Flow:
-    1. Get all items in cart
+    1. Atomically take all items out of the cart
     2. Calculate total
     3. Mark all tags as PAID (isPaid=True, status=SOLD)
-    4. Clear cart
-    5. Return confirmation
+    4. Return confirmation
+
+    If marking fails, the items are put back so the cart is not lost.
     """
     logger.info(f"Checkout for bath {bath_id}")
 
-    # Verify bath reader
-    reader = await db.rfidreader.find_unique(where={"id": bath_id})
-    if not reader:
-        reader = await db.rfidreader.find_first(where={"qrCode": bath_id})
+    reader = await _get_bath_reader(db, bath_id, require_bath=False)
 
-    if not reader:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bath reader not found")
-
-    cart_tag_ids = get_bath_cart(reader.id)
+    cart_tag_ids = list(await cart_store.drain(reader.id))
 
     if not cart_tag_ids:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cart is empty")
 
-    total_price = 0.0
-    items_count = 0
-
-    # Process each item
-    for tag_id in cart_tag_ids:
-        tag = await db.rfidtag.find_unique(where={"id": tag_id})
-        if not tag:
-            continue
-
-        # Get price
-        if tag.productId:
-            product = await db.product.find_unique(where={"id": tag.productId})
-            if product:
-                total_price += product.price
-
-        # Mark as paid
-        await db.rfidtag.update(
-            where={"id": tag_id},
-            data={"isPaid": True, "paidAt": datetime.now(), "status": "SOLD"},
-        )
-        items_count += 1
+    try:
+        lines = await materialize_cart(db, cart_tag_ids)
+        total_price = sum(line["product_price"] for line in lines)
+        items_count = len(lines)
+
+        # Mark all as paid in one statement
+        paid_at = datetime.now()
+        if lines:
+            await db.rfidtag.update_many(
+                where={"id": {"in": [line["tag_id"] for line in lines]}},
+                data={"isPaid": True, "paidAt": paid_at, "status": "SOLD"},
+            )
+    except Exception:
+        logger.error(f"Checkout failed for bath {reader.id}, restoring cart", exc_info=True)
+        for tag_id in cart_tag_ids:
+            await cart_store.add(reader.id, tag_id)
+        raise
+
+    cart_totals.reset(reader.id)
+    # Prisma holds the sale; bring the rfid_tags copy in step
+    await tag_repository.mirror_paid([line["epc"] for line in lines], True, paid_at)
 
     # Generate order ID
     import uuid
 
     order_id = f"ORD-{uuid.uuid4().hex[:8].upper()}"
 
-    # Clear cart
-    clear_bath_cart(reader.id)
-
     logger.info(f"Checkout complete: {order_id}, {items_count} items, ${total_price}")
 
     return CheckoutResponse(
@@ -295,22 +287,21 @@ async def checkout(bath_id: str, request: CheckoutRequest, db: Prisma = Depends(
 
 
 @router.post("/{bath_id}/clear")
-async def clear_cart(bath_id: str, db: Prisma = Depends(get_db)):
+async def clear_cart(
+    bath_id: str,
+    db: Prisma = Depends(get_db),
+    cart_store: CartStore = Depends(get_cart_store),
+):
     """Clear the cart without checkout"""
-    # Verify bath reader
-    reader = await db.rfidreader.find_unique(where={"id": bath_id})
-    if not reader:
-        reader = await db.rfidreader.find_first(where={"qrCode": bath_id})
+    reader = await _get_bath_reader(db, bath_id, require_bath=False)
 
-    if not reader:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bath reader not found")
-
-    cart_tag_ids = get_bath_cart(reader.id)
+    cart_tag_ids = list(await cart_store.drain(reader.id))
+    cart_totals.reset(reader.id)
 
     # Reset tag statuses
-    for tag_id in cart_tag_ids:
-        await db.rfidtag.update(where={"id": tag_id}, data={"status": "REGISTERED"})
-
-    clear_bath_cart(reader.id)
+    if cart_tag_ids:
+        await db.rfidtag.update_many(
+            where={"id": {"in": cart_tag_ids}}, data={"status": "REGISTERED"}
+        )
 
     return {"message": "Cart cleared"}
@@ -11,6 +11,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from app.api import deps
 from app.db.prisma import prisma_client
 from app.schemas.cart import AddToCartRequest, CartItem, CartSummary
+from app.services.tag_repository import tag_repository
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -102,21 +103,23 @@ async def sync_bath_cart(
     new_cart: List[CartItem] = []
 
     async with prisma_client.client as db:
-        for epc in epcs:
-            tag = await db.rfidtag.find_unique(where={"epc": epc})
-            if tag and not tag.isPaid:
-                new_cart.append(
-                    CartItem(
-                        epc=tag.epc,
-                        product_name=tag.productDescription or "Unknown Product",
-                        product_sku=tag.productId or "UNKNOWN",
-                        price_cents=0,
-                    )
+        tags = await tag_repository.get_many(epcs, db=db)
+
+    for epc in epcs:
+        tag = tags.get(epc)
+        if tag and not tag.isPaid:
+            new_cart.append(
+                CartItem(
+                    epc=tag.epc,
+                    product_name=tag.productDescription or "Unknown Product",
+                    product_sku=tag.productId or "UNKNOWN",
+                    price_cents=0,
                 )
-            elif tag and tag.isPaid:
-                logger.warning(f"Scanned paid tag in bath: {epc}")
-            else:
-                logger.warning(f"Unknown tag in bath: {epc}")
+            )
+        elif tag and tag.isPaid:
+            logger.warning(f"Scanned paid tag in bath: {epc}")
+        else:
+            logger.warning(f"Unknown tag in bath: {epc}")
 
     USER_CARTS[user_id] = new_cart
     return _calculate_summary(new_cart)
@@ -1,6 +1,6 @@
 """API endpoints for inventory management."""
 
-from typing import Any, List, Optional
+from typing import Any, List, Literal, Optional
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
@@ -38,6 +38,7 @@ class StockSummary(BaseModel):
     totalItems: int
     readerCount: int
     readers: List[dict]
+    groups: Optional[List[dict]] = None
 
 
 @router.post("/snapshot", response_model=SnapshotResponse)
@@ -67,15 +68,33 @@ async def create_inventory_snapshot(
 @router.get("/stock", response_model=StockSummary)
 async def get_current_stock(
     store_id: Optional[str] = None,
+    group_by: Optional[Literal["store", "product"]] = None,
+    include_items: bool = False,
     current_user: Any = Depends(deps.get_current_active_user),
 ) -> StockSummary:
     """
     Get current stock levels across all readers.
+
+    Optionally broken down by store or product; snapshot items are only
+    returned when ``include_items`` is set.
     """
-    stock = await inventory_service.get_current_stock(store_id=store_id)
+    stock = await inventory_service.get_current_stock(
+        store_id=store_id, group_by=group_by, include_items=include_items
+    )
     return StockSummary(**stock)
 
 
+@router.get("/stock/stores")
+async def get_store_stock(
+    store_id: Optional[str] = None,
+    current_user: Any = Depends(deps.get_current_active_user),
+) -> List[dict]:
+    """
+    Get per-store stock totals from the materialized stock table.
+    """
+    return await inventory_service.get_store_stock(store_id=store_id)
+
+
 @router.get("/snapshot/{reader_id}")
 async def get_latest_snapshot(
     reader_id: str,
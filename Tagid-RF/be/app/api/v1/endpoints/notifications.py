@@ -6,6 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
 from app.api.dependencies.auth import get_current_user
+from app.core.auth_cache import invalidate_user
 from app.db.dependencies import get_db
 from prisma import Prisma
 
@@ -98,6 +99,7 @@ async def update_notification_settings(
                 await db.user.update(
                     where={"id": current_user.id}, data={"darkMode": settings.darkMode}
                 )
+                invalidate_user(current_user.id)
             except Exception as e:
                 # Log error but don't fail the whole request
                 # This happens if migration hasn't run yet
@@ -5,19 +5,24 @@ Provides endpoints for:
 - Listing RFID readers
 - Configuring readers as bath/gate type
 - Generating QR codes for bath identification
+- Auto-tuning reader settings and reading back the stored profile
+- Live reader health (connection, traffic, heartbeats) from memory
 """
 
-import base64
 import hashlib
-import io
 import logging
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional
 
-import qrcode
 from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
+from app.core.config import settings
 from app.db.dependencies import get_db
+from app.services.bath_cart import bath_reader_cache
+from app.services.reader_health import reader_health_monitor
+from app.services.reader_tuning import TuningSpace, profile_from_record, reader_tuning_service
+from app.utils.qr import generate_qr_code
 from prisma import Prisma
 
 logger = logging.getLogger(__name__)
@@ -56,28 +61,35 @@ class BathQrResponse(BaseModel):
     qr_data: str
 
 
-# === Helper Functions ===
+class ReaderHealthItem(BaseModel):
+    """Connection health of one reader"""
 
+    address: str
+    source: str
+    status: str
+    connected: bool
+    connected_at: Optional[datetime] = None
+    last_seen: Optional[datetime] = None
+    frames: int
+    frames_per_second: float
+    tag_reads: int
+    crc_errors: int
+    errors: int
+    reconnects: int
+    missed_heartbeats: int
+    last_error: Optional[str] = None
 
-def generate_qr_code(data: str) -> str:
-    """Generate a QR code as base64-encoded PNG"""
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
-    qr.add_data(data)
-    qr.make(fit=True)
 
-    img = qr.make_image(fill_color="black", back_color="white")
+class ReaderHealthResponse(BaseModel):
+    """Health of every reader seen since startup"""
 
-    buffer = io.BytesIO()
-    img.save(buffer, format="PNG")
-    buffer.seek(0)
+    readers: List[ReaderHealthItem]
+    online: int
+    offline: int
+    error: int
 
-    base64_img = base64.b64encode(buffer.getvalue()).decode("utf-8")
-    return f"data:image/png;base64,{base64_img}"
+
+# === Helper Functions ===
 
 
 def generate_bath_qr_data(reader_id: str) -> str:
@@ -115,6 +127,26 @@ async def list_readers(store_id: Optional[str] = None, db: Prisma = Depends(get_
     ]
 
 
+@router.get("/health", response_model=ReaderHealthResponse)
+async def get_readers_health():
+    """
+    Connection state, traffic and heartbeats per reader address.
+
+    Served from memory; the database only gets batched status updates.
+    """
+    readers = reader_health_monitor.snapshot()
+    counts = {status: 0 for status in ("ONLINE", "OFFLINE", "ERROR")}
+    for reader in readers:
+        counts[reader["status"]] += 1
+
+    return ReaderHealthResponse(
+        readers=readers,
+        online=counts["ONLINE"],
+        offline=counts["OFFLINE"],
+        error=counts["ERROR"],
+    )
+
+
 @router.get("/{reader_id}", response_model=ReaderResponse)
 async def get_reader(reader_id: str, db: Prisma = Depends(get_db)):
     """Get reader details by ID"""
@@ -157,6 +189,8 @@ async def set_reader_as_bath(reader_id: str, request: SetBathRequest, db: Prisma
         update_data["name"] = request.name
 
     updated_reader = await db.rfidreader.update(where={"id": reader_id}, data=update_data)
+    # Cached lookups may still hold the old type or QR code
+    bath_reader_cache.invalidate()
 
     logger.info(f"Reader {reader_id} configured as BATH with QR: {qr_data}")
 
@@ -180,6 +214,7 @@ async def set_reader_as_gate(reader_id: str, db: Prisma = Depends(get_db)):
         where={"id": reader_id},
         data={"type": "GATE", "qrCode": None},  # Gates don't need QR
     )
+    bath_reader_cache.invalidate()
 
     logger.info(f"Reader {reader_id} configured as GATE")
 
@@ -207,6 +242,7 @@ async def get_reader_qr(reader_id: str, db: Prisma = Depends(get_db)):
         # Generate if missing
         qr_data = generate_bath_qr_data(reader_id)
         await db.rfidreader.update(where={"id": reader_id}, data={"qrCode": qr_data})
+        bath_reader_cache.invalidate()
     else:
         qr_data = reader.qrCode
 
@@ -235,3 +271,130 @@ async def list_bath_readers(db: Prisma = Depends(get_db)):
         )
         for r in readers
     ]
+
+
+# === Auto-tuning ===
+
+
+class TuneRequest(BaseModel):
+    """Optional overrides for a tuning run; unset fields use the settings defaults."""
+
+    window_seconds: Optional[float] = Field(None, gt=0, le=60)
+    settle_seconds: Optional[float] = Field(None, ge=0, le=60)
+    duplicate_weight: Optional[float] = Field(None, ge=0, le=1)
+    powers: Optional[List[int]] = None
+    q_values: Optional[List[int]] = None
+    sessions: Optional[List[int]] = None
+    targets: Optional[List[int]] = None
+    rssi_thresholds: Optional[List[int]] = None
+    antennas: Optional[List[int]] = None
+
+
+class TuningProfileResponse(BaseModel):
+    """Best settings stored for a reader"""
+
+    reader_id: str
+    power_dbm: int
+    q_value: int
+    session: int
+    target: int
+    rssi_filters: List[int]
+    unique_per_second: float
+    duplicate_ratio: float
+    score: float
+    window_seconds: float
+    tuned_at: datetime
+
+
+@router.post("/{reader_id}/tune", status_code=status.HTTP_202_ACCEPTED)
+async def start_tuning(
+    reader_id: str, request: Optional[TuneRequest] = None, db: Prisma = Depends(get_db)
+):
+    """
+    Start auto-tuning a reader in the background.
+
+    Power, Query Q/session/target and per-antenna RSSI filters are searched
+    one dimension at a time, starting from the stored profile if there is
+    one. Poll GET /{reader_id}/tune for progress.
+    """
+    reader = await db.rfidreader.find_unique(where={"id": reader_id})
+    if not reader:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reader not found")
+
+    request = request or TuneRequest()
+    space = TuningSpace(
+        **request.model_dump(
+            include={"powers", "q_values", "sessions", "targets", "rssi_thresholds", "antennas"},
+            exclude_none=True,
+        )
+    )
+    stored = await db.readertuningprofile.find_unique(where={"readerId": reader_id})
+
+    try:
+        job = reader_tuning_service.start(
+            reader_id,
+            reader.ipAddress,
+            space=space,
+            window_seconds=request.window_seconds or settings.READER_TUNING_WINDOW_SECONDS,
+            duplicate_weight=(
+                request.duplicate_weight
+                if request.duplicate_weight is not None
+                else settings.READER_TUNING_DUPLICATE_WEIGHT
+            ),
+            settle_seconds=(
+                request.settle_seconds
+                if request.settle_seconds is not None
+                else settings.READER_TUNING_SETTLE_SECONDS
+            ),
+            start_profile=profile_from_record(stored) if stored else None,
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+    logger.info(f"Tuning started for reader {reader_id} ({job.total_steps} steps)")
+    return job.to_dict()
+
+
+@router.get("/{reader_id}/tune")
+async def get_tuning_progress(reader_id: str):
+    """Progress of the reader's current or last tuning run."""
+    job = reader_tuning_service.get_job(reader_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Reader has not been tuned"
+        )
+    return job.to_dict()
+
+
+@router.delete("/{reader_id}/tune")
+async def cancel_tuning(reader_id: str):
+    """Cancel a running tuning job. The reader keeps whatever settings it had last."""
+    if not reader_tuning_service.cancel(reader_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="No tuning job is running"
+        )
+    return {"message": "Tuning cancelled", "reader_id": reader_id}
+
+
+@router.get("/{reader_id}/tuning-profile", response_model=TuningProfileResponse)
+async def get_tuning_profile(reader_id: str, db: Prisma = Depends(get_db)):
+    """Best settings found by the last completed tuning run."""
+    profile = await db.readertuningprofile.find_unique(where={"readerId": reader_id})
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Reader has no tuning profile"
+        )
+
+    return TuningProfileResponse(
+        reader_id=profile.readerId,
+        power_dbm=profile.powerDbm,
+        q_value=profile.qValue,
+        session=profile.session,
+        target=profile.target,
+        rssi_filters=profile.rssiFilters,
+        unique_per_second=profile.uniquePerSecond,
+        duplicate_ratio=profile.duplicateRatio,
+        score=profile.score,
+        window_seconds=profile.windowSeconds,
+        tuned_at=profile.tunedAt,
+    )
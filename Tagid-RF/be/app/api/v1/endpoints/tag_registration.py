@@ -7,17 +7,15 @@ Provides endpoints for:
 - Linking tags to products
 """
 
-import base64
 import hashlib
-import io
 import logging
 from typing import Optional
 
-import qrcode
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 
 from app.db.dependencies import get_db
+from app.utils.qr import generate_qr_code
 from prisma import Prisma
 
 logger = logging.getLogger(__name__)
@@ -87,27 +85,6 @@ class ProductResponse(BaseModel):
 # === Helper Functions ===
 
 
-def generate_qr_code(data: str) -> str:
-    """Generate a QR code as base64-encoded PNG"""
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
-    qr.add_data(data)
-    qr.make(fit=True)
-
-    img = qr.make_image(fill_color="black", back_color="white")
-
-    buffer = io.BytesIO()
-    img.save(buffer, format="PNG")
-    buffer.seek(0)
-
-    base64_img = base64.b64encode(buffer.getvalue()).decode("utf-8")
-    return f"data:image/png;base64,{base64_img}"
-
-
 def generate_encrypted_qr_data(epc: str, tag_id: str) -> str:
     """Generate encrypted QR data for a tag"""
     # Simple hash-based approach for POC
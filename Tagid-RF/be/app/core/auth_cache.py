@@ -0,0 +1,101 @@
+"""Caches for the authentication hot path.
+
+Every authenticated request used to decode its JWT and load the user from
+the database. Dashboards poll and readers post scans often enough that this
+dominated request latency, so ``get_current_user`` now goes through two
+process-local caches:
+
+- ``TokenCache``: decoded JWT payloads, kept until the token expires.
+- ``PrincipalCache``: the authenticated ``User`` (role, businessId,
+  deletedAt) per user id, kept for a short TTL.
+
+Anything that changes a user must call ``invalidate_user`` so the next
+request reloads it; the TTL bounds staleness for writers in other workers.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _ExpiringCache:
+    """Bounded key -> value map with a per-entry expiry (monotonic seconds)."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Any, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: Any) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= now:
+                del self._entries[key]
+                return None
+            return entry[0]
+
+    def _put(self, key: Any, value: Any, ttl_seconds: float) -> None:
+        if ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (value, time.monotonic() + ttl_seconds)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Any) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TokenCache(_ExpiringCache):
+    """Decoded JWT payloads keyed by the raw token, valid until the token's ``exp``."""
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        return self._get(token)
+
+    def put(self, token: str, payload: Dict[str, Any]) -> None:
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)):
+            return
+        self._put(token, payload, exp - time.time())
+
+
+class PrincipalCache(_ExpiringCache):
+    """Authenticated users keyed by user id."""
+
+    def __init__(self, ttl_seconds: float = 30.0, max_entries: int = 10000):
+        super().__init__(max_entries)
+        self.ttl_seconds = ttl_seconds
+
+    def get(self, user_id: str) -> Optional[Any]:
+        return self._get(user_id)
+
+    def put(self, user_id: str, user: Any) -> None:
+        self._put(user_id, user, self.ttl_seconds)
+
+
+token_cache = TokenCache()
+principal_cache = PrincipalCache(ttl_seconds=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+def invalidate_user(user_id: str) -> None:
+    """Drop a cached principal after the user was updated, deleted or re-roled."""
+    principal_cache.invalidate(user_id)
+    logger.debug(f"Invalidated cached principal for user {user_id}")
@@ -17,6 +17,8 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     DATABASE_POOL_SIZE: int = 5
     DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: int = 10  # Seconds to wait for a pooled Prisma connection
+    DATABASE_HEALTHCHECK_INTERVAL_SECONDS: int = 30
 
     # Security Settings
     SECRET_KEY: str
@@ -24,6 +26,10 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     GOOGLE_CLIENT_ID: Optional[str] = None  # Optional for deployments without Google OAuth
     GOOGLE_TOKEN_TIMEOUT: int = 300  # 5 minutes timeout for Google token verification
+    GOOGLE_CERTS_URL: Optional[str] = None  # Mirror for Google's signing keys (default: Google)
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: int = 30  # Authenticated users are re-read this often
+    CPU_EXECUTOR_WORKERS: Optional[int] = None  # Threads for bcrypt/PBKDF2; None = half the CPUs
+    CPU_EXECUTOR_MAX_IN_FLIGHT: Optional[int] = None  # Queued + running calls; None = 4x workers
 
     # Security Headers
     SECURITY_HEADERS: bool = True  # Enable security headers by default
@@ -47,12 +53,29 @@ class Settings(BaseSettings):
     RFID_READER_PORT: int = 4001  # Default RFID reader port
     RFID_CONNECTION_TYPE: str = "tcp"  # tcp or serial
     RFID_SERIAL_DEVICE: Optional[str] = None  # Serial device path (e.g., /dev/ttyUSB0 or COM3)
+    RFID_SERIAL_BAUDRATE: int = 115200
     RFID_READER_ID: str = "M-200"  # Unique identifier for this reader
+    RFID_CAPTURE_PATH: Optional[str] = None  # Record tag listener traffic to this capture file
     LOG_LEVEL: str = "INFO"  # Logging level: DEBUG, INFO, WARNING, ERROR
+    TAG_STATS_RECONCILE_SECONDS: int = 300  # Dashboard stats are re-read from the DB this often
+    INVENTORY_RECONCILE_SECONDS: int = 600  # Inventory counters are re-read from the DB this often
+
+    # Scan history: partitioned by scanned_at (Postgres), rolled up hourly, pruned by age
+    SCAN_HISTORY_PARTITION_INTERVAL: str = "day"  # "day" or "week"
+    SCAN_HISTORY_RETENTION_DAYS: int = 30  # Raw scans are dropped after this (once rolled up)
+    SCAN_ROLLUP_RETENTION_DAYS: int = 365  # Hourly rollups are dropped after this
+    SCAN_HISTORY_RAW_QUERY_HOURS: int = 48  # Longer activity ranges are served from rollups
+    SCAN_HISTORY_MAINTENANCE_SECONDS: int = 3600  # Partition/rollup/retention job interval
+    EXPORT_BATCH_SIZE: int = 5000  # Rows fetched and encoded per batch in bulk exports
+    EXPORT_MAX_CONNECTIONS: int = 2  # Concurrent exports; more queue for a connection
 
     # Payment Settings
     DEFAULT_CURRENCY: str = "ILS"
     DEFAULT_PAYMENT_PROVIDER: str = "TRANZILA"
+    PAYMENT_HTTP_TIMEOUT_SECONDS: float = 30.0
+    PAYMENT_HTTP_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    PAYMENT_HTTP_MAX_CONNECTIONS: int = 20  # Pooled keep-alive connections per provider
+    PAYMENT_HTTP_RETRIES: int = 2  # Retries on connection failure (never after a request is sent)
 
     # Stripe
     STRIPE_SECRET_KEY: Optional[str] = None
@@ -79,6 +102,32 @@ class Settings(BaseSettings):
     VAPID_PUBLIC_KEY: Optional[str] = None
     VAPID_CLAIMS_SUB: str = "mailto:admin@example.com"
 
+    # Bath Carts
+    BATH_CART_BACKEND: str = "memory"  # memory or database
+    BATH_CART_TTL_SECONDS: int = 1800  # Abandoned carts are released after this idle time
+    BATH_CART_SWEEP_INTERVAL_SECONDS: int = 60
+    BATH_AUTO_CART: bool = False  # Feed bath carts directly from BATH reader push streams
+    BATH_ENTER_DWELL_SECONDS: float = 1.0  # A tag must be read for this long to enter a cart
+    BATH_ENTER_MIN_READS: int = 2
+    BATH_LEAVE_AFTER_SECONDS: float = 5.0  # Tags unread for this long are removed
+
+    # Exit gates: reads are folded into one traversal per pass
+    GATE_INSIDE_ANTENNAS: List[int] = [1]  # Antenna ports facing the shop floor
+    GATE_OUTSIDE_ANTENNAS: List[int] = [2]  # Antenna ports facing the street
+    GATE_PASS_TIMEOUT_SECONDS: float = 2.0  # A pass ends after this long without reads
+    GATE_MAX_PASS_SECONDS: float = 30.0  # Longer stays at the gate are split into passes
+
+    # Reader auto-tuning (POST /readers/{id}/tune)
+    READER_TUNING_WINDOW_SECONDS: float = 2.0  # Inventory time per candidate setting
+    READER_TUNING_SETTLE_SECONDS: float = 2.0  # Pause between candidates (session persistence)
+    READER_TUNING_DUPLICATE_WEIGHT: float = 0.2  # Score discount for a 100% duplicate ratio
+
+    # Reader health: heartbeats and batched RfidReader status/lastSeen updates
+    READER_HEARTBEAT_SECONDS: float = 10.0  # Idle readers are polled after this long
+    READER_MAX_MISSED_HEARTBEATS: int = 3  # Connected readers go to ERROR after this many
+    READER_HEALTH_FLUSH_SECONDS: float = 5.0  # How often status changes are written
+    READER_LAST_SEEN_WRITE_SECONDS: float = 60.0  # lastSeen is rewritten at most this often
+
     # Theft Alerts
     ENABLE_THEFT_DETECTION: bool = True
     ALERT_STAKEHOLDER_ROLES: List[str] = [
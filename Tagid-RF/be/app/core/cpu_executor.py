@@ -0,0 +1,79 @@
+"""Bounded executor for CPU-heavy work called from async handlers.
+
+bcrypt hashing/verification and PBKDF2 key derivation take tens to hundreds
+of milliseconds each. Run inline in a coroutine they stall the event loop,
+and with it reader broadcasts and WebSocket traffic, for every login.
+
+``CPUBoundExecutor`` runs such calls on a small dedicated thread pool (both
+bcrypt and OpenSSL's PBKDF2 release the GIL while hashing) and caps how many
+may be in flight at once, so a burst of logins queues up instead of piling
+threads onto the CPU.
+"""
+
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional, TypeVar
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CPUBoundExecutor:
+    """Thread pool plus an in-flight limit for blocking CPU-bound calls."""
+
+    def __init__(self, max_workers: Optional[int] = None, max_in_flight: Optional[int] = None):
+        self.max_workers = max_workers or max(2, (os.cpu_count() or 2) // 2)
+        self.max_in_flight = max_in_flight or self.max_workers * 4
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="cpu-bound"
+            )
+            logger.info(
+                f"CPU executor started: {self.max_workers} workers, "
+                f"{self.max_in_flight} calls in flight"
+            )
+        return self._pool
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run ``func(*args, **kwargs)`` off the event loop and await its result."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_pool(), partial(func, *args, **kwargs))
+
+    def shutdown(self) -> None:
+        """Stop the worker threads; a later ``run`` starts a fresh pool."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self._semaphore = None
+
+
+_cpu_executor: Optional[CPUBoundExecutor] = None
+
+
+def get_cpu_executor() -> CPUBoundExecutor:
+    """Get the process-wide CPU executor, sized from settings."""
+    global _cpu_executor
+    if _cpu_executor is None:
+        _cpu_executor = CPUBoundExecutor(
+            max_workers=settings.CPU_EXECUTOR_WORKERS,
+            max_in_flight=settings.CPU_EXECUTOR_MAX_IN_FLIGHT,
+        )
+    return _cpu_executor
+
+
+async def run_cpu_bound(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking CPU-bound call on the shared executor."""
+    return await get_cpu_executor().run(func, *args, **kwargs)
@@ -1,12 +1,131 @@
+import atexit
 import logging
 import logging.config
+import queue
 import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+
+# Background listeners, by the queue handler that feeds them
+_listeners: Dict[QueueHandler, QueueListener] = {}
+
+
+def queue_handler(*handlers: logging.Handler) -> QueueHandler:
+    """
+    Put ``handlers`` behind a queue drained by a listener thread.
+
+    The returned handler only enqueues the record, so a logging call never
+    waits on console or file I/O. Handler levels are still honoured.
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    handler = QueueHandler(log_queue)
+    _listeners[handler] = listener
+    listener.start()
+    return handler
+
+
+def stop_queue_handler(handler: logging.Handler) -> None:
+    """Write out what ``handler`` has queued and stop its listener."""
+    listener = _listeners.pop(handler, None)
+    if listener is not None:
+        listener.stop()
+
+
+def stop_queue_logging() -> None:
+    """Flush and stop every queue listener (runs at exit as well)."""
+    for handler in list(_listeners):
+        stop_queue_handler(handler)
+
+
+atexit.register(stop_queue_logging)
+
+
+class RateLimitedLogger(logging.LoggerAdapter):
+    """
+    Logger that lets through at most ``rate`` records per ``per`` seconds.
+
+    The check runs before a record is built, so a dropped call costs a level
+    check and a lock. Dropped calls are counted; the first record let through
+    in the next window notes how many were suppressed. Meant for per-tag and
+    per-frame messages, where one line per event would swamp the log.
+    """
+
+    def __init__(self, logger: logging.Logger, rate: int = 20, per: float = 1.0):
+        super().__init__(logger, {})
+        self.rate = rate
+        self.per = per
+        self.suppressed = 0
+        self._lock = threading.Lock()
+        self._window_start = float("-inf")
+        self._passed = 0
+        self._pending = 0
+
+    def log(self, level: int, msg: Any, *args: Any, **kwargs: Any) -> None:
+        if not self.isEnabledFor(level):
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._window_start >= self.per:
+                self._window_start, self._passed = now, 0
+            if self._passed >= self.rate:
+                self._pending += 1
+                self.suppressed += 1
+                return
+            self._passed += 1
+            dropped, self._pending = self._pending, 0
+        if dropped:
+            msg = f"{msg} [{dropped} similar messages suppressed]"
+        # Report the caller, not this method
+        kwargs["stacklevel"] = kwargs.get("stacklevel", 1) + 1
+        self.logger.log(level, msg, *args, **kwargs)
+
+
+_rate_limited: Dict[str, RateLimitedLogger] = {}
+
+
+def rate_limited_logger(name: str, rate: int = 20, per: float = 1.0) -> RateLimitedLogger:
+    """Get the ``RateLimitedLogger`` for logger ``name`` (created on first use)."""
+    if name not in _rate_limited:
+        _rate_limited[name] = RateLimitedLogger(logging.getLogger(name), rate, per)
+    return _rate_limited[name]
+
+
+class LazyHex:
+    """
+    Upper-case hex of ``data`` (first ``limit`` bytes), built when formatted.
+
+    Pass as a ``%s`` argument so the hex string is only made for records that
+    pass the level check and filters::
+
+        logger.debug("RX: %s", LazyHex(frame))
+    """
+
+    __slots__ = ("data", "limit")
+
+    def __init__(self, data: bytes, limit: Optional[int] = None):
+        self.data = data
+        self.limit = limit
+
+    def __str__(self) -> str:
+        if self.limit is None or len(self.data) <= self.limit:
+            return self.data.hex().upper()
+        return self.data[: self.limit].hex().upper() + "..."
 
 
 def setup_logging() -> None:
-    """Configure logging for the application."""
+    """
+    Configure logging for the application.
+
+    Console and file output run on a ``QueueListener`` thread; loggers only
+    get a ``QueueHandler``.
+    """
+    for handler in logging.getLogger().handlers:
+        stop_queue_handler(handler)
+
     log_config: Dict[str, Any] = {
         "version": 1,
         "disable_existing_loggers": False,
@@ -56,3 +175,12 @@ def setup_logging() -> None:
     Path("logs").mkdir(exist_ok=True)
 
     logging.config.dictConfig(log_config)
+
+    # dictConfig shares one console and one file handler between these loggers
+    root = logging.getLogger()
+    handler = queue_handler(*root.handlers)
+    for name in (None, "app", "prisma"):
+        logger = logging.getLogger(name)
+        for direct in list(logger.handlers):
+            logger.removeHandler(direct)
+        logger.addHandler(handler)
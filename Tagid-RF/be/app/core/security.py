@@ -6,6 +6,7 @@ import bcrypt
 from jose import JWTError, jwt
 
 from app.core.config import get_settings
+from app.core.cpu_executor import run_cpu_bound
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -49,10 +50,20 @@ def get_password_hash(password: str) -> str:
     return hashed.decode("utf-8")
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Like ``verify_password``, but runs bcrypt on the CPU executor."""
+    return await run_cpu_bound(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Like ``get_password_hash``, but runs bcrypt on the CPU executor."""
+    return await run_cpu_bound(get_password_hash, password)
+
+
 def verify_access_token(token: str) -> Optional[Dict[str, Any]]:
     """Verifies a JWT access token and returns its payload if valid."""
     try:
-        logger.debug(f"Decoding token with algorithm {ALGORITHM}")
+        logger.debug("Decoding token with algorithm %s", ALGORITHM)
         # Use simple decode for debugging
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         logger.debug("Token decoded successfully.")
@@ -3,6 +3,7 @@ from typing import Optional
 
 from prisma.models import User
 
+from app.core.auth_cache import invalidate_user
 from prisma import Prisma
 
 logger = logging.getLogger(__name__)
@@ -34,6 +35,7 @@ async def update_user_google_info(db: Prisma, user_id: str, google_sub_id: str)
             },
             data={"subId": google_sub_id, "verifiedBy": "google"},
         )
+        invalidate_user(user_id)
         if updated_user:
             logger.info(f"Successfully updated subId for user {user_id}.")
         else:
@@ -51,12 +53,12 @@ async def update_user_google_info(db: Prisma, user_id: str, google_sub_id: str)
 async def get_user_by_id(db: Prisma, user_id: str) -> Optional[User]:
     """Fetches a user from the database by their unique ID."""
     try:
-        logger.debug(f"Attempting to find user by ID: {user_id}")
+        logger.debug("Attempting to find user by ID: %s", user_id)
         user = await db.user.find_unique(where={"id": user_id})
         if user:
-            logger.debug(f"User found with ID {user_id}")
+            logger.debug("User found with ID %s", user_id)
         else:
-            logger.debug(f"No user found with ID: {user_id}")
+            logger.debug("No user found with ID: %s", user_id)
         return user
     except Exception as e:
         logger.error(f"Database error while fetching user by ID {user_id}: {e}", exc_info=True)
@@ -74,11 +76,11 @@ async def create_user(
     role: str = "CUSTOMER",
 ) -> User:
     """Creates a new user with hashed password."""
-    from app.core.security import get_password_hash
+    from app.core.security import get_password_hash_async
 
     try:
         logger.debug(f"Creating new user with email: {email}")
-        hashed_password = get_password_hash(password)
+        hashed_password = await get_password_hash_async(password)
 
         new_user = await db.user.create(
             data={
@@ -101,7 +103,7 @@ async def create_user(
 
 async def authenticate_user(db: Prisma, email: str, password: str) -> Optional[User]:
     """Authenticates a user by email and password."""
-    from app.core.security import verify_password
+    from app.core.security import verify_password_async
 
     try:
         logger.debug(f"Attempting to authenticate user: {email}")
@@ -115,7 +117,7 @@ async def authenticate_user(db: Prisma, email: str, password: str) -> Optional[U
             logger.debug(f"Authentication failed: user {email} has no password (OAuth only)")
             return None
 
-        if not verify_password(password, user.password):
+        if not await verify_password_async(password, user.password):
             logger.debug(f"Authentication failed: invalid password for {email}")
             return None
 
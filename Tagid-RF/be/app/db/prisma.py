@@ -1,18 +1,55 @@
+import asyncio
 import logging
+import time
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
 from fastapi import FastAPI
 from prisma.errors import PrismaError, TableNotFoundError
 
+from app.core.config import get_settings
 from prisma import Prisma, register
 
 logger = logging.getLogger(__name__)
 
 
+def build_datasource_url(url: str, pool_size: int, pool_timeout: int) -> str:
+    """
+    Add Prisma connection pool parameters to a database URL.
+
+    Parameters already present in the URL are left untouched.
+    """
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    query.setdefault("connection_limit", str(pool_size))
+    query.setdefault("pool_timeout", str(pool_timeout))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class SharedPrisma(Prisma):
+    """
+    Prisma client whose ``async with`` borrows the shared connection.
+
+    The stock Prisma context manager connects on enter and disconnects on
+    exit, which tears down the query engine under every other in-flight
+    request. Entering this client only makes sure it is connected.
+    """
+
+    async def __aenter__(self) -> "SharedPrisma":
+        await prisma_client.ensure_connected()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        return None
+
+
 class PrismaClient:
     _instance = None
     _client = None
+    _connect_lock: Optional[asyncio.Lock] = None
+    _registered = False
+    last_health: Optional[Dict[str, Any]] = None
 
     def __new__(cls):
         if cls._instance is None:
@@ -22,9 +59,28 @@ class PrismaClient:
     @property
     def client(self) -> Prisma:
         if self._client is None:
-            self._client = Prisma()
+            settings = get_settings()
+            self._client = SharedPrisma(
+                datasource={
+                    "url": build_datasource_url(
+                        settings.DATABASE_URL,
+                        settings.DATABASE_POOL_SIZE,
+                        settings.DATABASE_POOL_TIMEOUT,
+                    )
+                }
+            )
         return self._client
 
+    async def ensure_connected(self) -> None:
+        """Connect the shared client once; concurrent callers wait for the same attempt."""
+        if self.client.is_connected():
+            return
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if not self.client.is_connected():
+                await self.connect()
+
     async def connect(self) -> None:
         """Connect to the database."""
         logger.info("PrismaClient.connect() called")
@@ -32,7 +88,11 @@ class PrismaClient:
             if not self.client.is_connected():
                 logger.info("Attempting to connect Prisma client...")
                 await self.client.connect()
-                register(self.client)
+                # Model.prisma() callers hold the registered instance; reconnects
+                # reuse it, and registering twice raises
+                if not self._registered:
+                    register(self.client)
+                    self._registered = True
                 logger.info("Successfully connected to the database")
             else:
                 logger.info("Prisma client already connected")
@@ -44,8 +104,8 @@ class PrismaClient:
         """Disconnect from the database."""
         try:
             if self._client:
+                # Keep the registered instance; connect() reuses it
                 await self._client.disconnect()
-                self._client = None
                 logger.info("Successfully disconnected from the database")
         except PrismaError as e:
             logger.error(f"Error disconnecting from the database: {e}")
@@ -53,12 +113,53 @@ class PrismaClient:
 
     @asynccontextmanager
     async def get_db(self) -> AsyncGenerator[Prisma, None]:
-        """Get a database connection with context management."""
+        """
+        Borrow the shared database connection.
+
+        The client stays connected on exit; it is only disconnected on shutdown.
+        """
+        await self.ensure_connected()
+        yield self.client
+
+    async def health_check(self, timeout: float = 5.0) -> Dict[str, Any]:
+        """
+        Ping the database.
+
+        A failed ping is reported, never answered by tearing the shared client
+        down: that would kill every in-flight query borrowing it. Only a
+        client whose engine is gone is reconnected, in place.
+
+        Returns:
+            Dict with ``healthy`` and ``latency_ms`` (plus ``error`` on failure).
+        """
+        started = time.perf_counter()
         try:
-            await self.connect()
-            yield self.client
-        finally:
-            await self.disconnect()
+            await self.ensure_connected()
+            await asyncio.wait_for(self.client.query_raw("SELECT 1"), timeout=timeout)
+            result = {
+                "healthy": True,
+                "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+            }
+        except Exception as e:
+            logger.warning(f"Database health check failed: {e}")
+            result = {
+                "healthy": False,
+                "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+                "error": str(e),
+            }
+            try:
+                # No-op while the client is still connected, e.g. on a timeout
+                await self.ensure_connected()
+            except Exception as reconnect_error:
+                logger.error(f"Database reconnect failed: {reconnect_error}")
+        self.last_health = result
+        return result
+
+    async def run_health_checks(self, interval: float) -> None:
+        """Health-check the shared connection until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            await self.health_check()
 
 
 prisma_client = PrismaClient()
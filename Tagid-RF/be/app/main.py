@@ -11,12 +11,33 @@ from starlette.requests import Request
 
 from app.api.v1.api import api_router
 from app.core.config import get_settings
+from app.core.cpu_executor import get_cpu_executor
 from app.core.logging import setup_logging
-from app.db.prisma import init_db, shutdown_db
-from app.routers import cart, exit_scan, inventory, products, stores, tags, users, websocket, web_push
+from app.db.prisma import init_db, prisma_client, shutdown_db
+from app.routers import (
+    cart,
+    exit_scan,
+    exports,
+    inventory,
+    products,
+    stores,
+    tags,
+    users,
+    web_push,
+    websocket,
+)
+from app.services.bath_presence import bath_cart_feeder
+from app.services.cart_store import run_cart_expiry_loop
 from app.services.database import init_db as init_rfid_db
+from app.services.gate_traversal import gate_traversal_monitor
+from app.services.http_clients import close_http_clients
+from app.services.inventory_counters import run_inventory_reconcile_loop
+from app.services.reader_health import reader_health_monitor
 from app.services.rfid_reader import rfid_reader_service
+from app.services.scan_history import run_scan_history_maintenance_loop
+from app.services.tag_encryption import get_encryption_service_async
 from app.services.tag_listener_service import tag_listener_service
+from app.services.tag_stats import run_stats_reconcile_loop
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -64,19 +85,28 @@ async def lifespan(app: FastAPI):
             
     asyncio.create_task(init_db_background())
 
-    # Initialize RFID database tables (SQLAlchemy)
-    try:
-        logger.info("Initializing RFID database...")
-        init_rfid_db()
-    except Exception as e:
-        logger.error(f"WARNING: RFID DB initialization failed: {e}. Running without RFID DB.")
+    # Keep the shared Prisma connection healthy (reconnects on failure)
+    db_health_task = asyncio.create_task(
+        prisma_client.run_health_checks(settings.DATABASE_HEALTHCHECK_INTERVAL_SECONDS)
+    )
 
-    # Initialize RFID database tables (SQLAlchemy)
-    try:
-        logger.info("Initializing RFID database...")
-        init_rfid_db()
-    except Exception as e:
-        logger.error(f"WARNING: RFID DB initialization failed: {e}. Running without RFID DB.")
+    # Derive the tag encryption key off the event loop before requests need it
+    async def init_encryption():
+        try:
+            await get_encryption_service_async()
+        except Exception as e:
+            logger.error(f"Failed to initialize tag encryption: {e}")
+
+    # Initialize RFID database tables (SQLAlchemy) in a worker thread
+    async def init_rfid_tables():
+        try:
+            logger.info("Initializing RFID database...")
+            await asyncio.to_thread(init_rfid_db)
+        except Exception as e:
+            logger.error(f"WARNING: RFID DB initialization failed: {e}. Running without RFID DB.")
+
+    # Neither depends on the other, so run them side by side
+    await asyncio.gather(init_encryption(), init_rfid_tables())
 
     # Optional: Auto-connect to RFID reader on startup
     # Uncomment if you want automatic connection
@@ -107,6 +137,55 @@ async def lifespan(app: FastAPI):
     # Fire and forget the connection attempt
     asyncio.create_task(connect_rfid_background())
 
+    # Keep dashboard stats in line with the database
+    stats_reconcile_task = asyncio.create_task(
+        run_stats_reconcile_loop(settings.TAG_STATS_RECONCILE_SECONDS)
+    )
+
+    # Keep inventory counters in line with the database
+    inventory_reconcile_task = asyncio.create_task(
+        run_inventory_reconcile_loop(settings.INVENTORY_RECONCILE_SECONDS)
+    )
+
+    # Partition, roll up and prune scan history
+    scan_history_task = asyncio.create_task(
+        run_scan_history_maintenance_loop(settings.SCAN_HISTORY_MAINTENANCE_SECONDS)
+    )
+
+    # Release tags from abandoned bath carts
+    cart_expiry_task = asyncio.create_task(
+        run_cart_expiry_loop(settings.BATH_CART_SWEEP_INTERVAL_SECONDS)
+    )
+
+    # Live bath carts fed by BATH reader streams
+    bath_presence_task = None
+    if settings.BATH_AUTO_CART:
+        bath_cart_feeder.configure(
+            enter_dwell_seconds=settings.BATH_ENTER_DWELL_SECONDS,
+            enter_min_reads=settings.BATH_ENTER_MIN_READS,
+            leave_after_seconds=settings.BATH_LEAVE_AFTER_SECONDS,
+        )
+        bath_presence_task = asyncio.create_task(bath_cart_feeder.run())
+
+    # Exit gate traversals from GATE reader streams
+    gate_traversal_monitor.configure(
+        inside_antennas=settings.GATE_INSIDE_ANTENNAS,
+        outside_antennas=settings.GATE_OUTSIDE_ANTENNAS,
+        pass_timeout_seconds=settings.GATE_PASS_TIMEOUT_SECONDS,
+        max_pass_seconds=settings.GATE_MAX_PASS_SECONDS,
+    )
+    gate_traversal_task = asyncio.create_task(gate_traversal_monitor.run())
+
+    # Reader heartbeats and batched RfidReader status updates
+    reader_health_monitor.configure(
+        heartbeat_seconds=settings.READER_HEARTBEAT_SECONDS,
+        max_missed_heartbeats=settings.READER_MAX_MISSED_HEARTBEATS,
+        last_seen_write_seconds=settings.READER_LAST_SEEN_WRITE_SECONDS,
+    )
+    reader_health_task = asyncio.create_task(
+        reader_health_monitor.run(settings.READER_HEALTH_FLUSH_SECONDS)
+    )
+
     # Start tag listener service
     try:
         tag_listener_service.start()
@@ -115,6 +194,17 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to start tag listener: {e}")
     yield
     # Shutdown
+    cart_expiry_task.cancel()
+    stats_reconcile_task.cancel()
+    inventory_reconcile_task.cancel()
+    scan_history_task.cancel()
+    db_health_task.cancel()
+    gate_traversal_task.cancel()
+    reader_health_task.cancel()
+    if bath_presence_task:
+        bath_presence_task.cancel()
+    get_cpu_executor().shutdown()
+    await close_http_clients()
     logger.info("Shutting down application...")
 
     # Stop tag listener
@@ -154,6 +244,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
     allow_headers=["Authorization", "Content-Type", "Accept"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Total-Count-Estimated"],
 )
 
 # Uncomment to add rate limiting
@@ -184,6 +275,7 @@ app.include_router(websocket.router, prefix="/ws", tags=["WebSocket"])
 app.include_router(stores.router, prefix=f"{settings.API_V1_STR}", tags=["Stores"])
 app.include_router(users.router, prefix=f"{settings.API_V1_STR}", tags=["Users"])
 app.include_router(exit_scan.router, prefix=f"{settings.API_V1_STR}", tags=["Exit Scan"])
+app.include_router(exports.router, prefix=f"{settings.API_V1_STR}", tags=["Exports"])
 
 app.include_router(inventory.router, prefix=f"{settings.API_V1_STR}/inventory", tags=["Inventory"])
 
@@ -202,3 +294,9 @@ async def health_check():
 async def healthz_check():
     """Health check endpoint for internal communication."""
     return {"status": "ok"}
+
+
+@app.get("/health/db")
+async def db_health_check():
+    """Ping the main database over the shared Prisma connection."""
+    return await prisma_client.health_check()
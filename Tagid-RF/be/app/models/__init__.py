@@ -1,9 +1,10 @@
-from app.models.rfid_tag import RFIDScanHistory, RFIDTag
+from app.models.rfid_tag import RFIDScanHistory, RFIDScanRollup, RFIDTag
 from app.models.store import Notification, NotificationPreference, Store, User
 
 __all__ = [
     "RFIDTag",
     "RFIDScanHistory",
+    "RFIDScanRollup",
     "Store",
     "User",
     "NotificationPreference",
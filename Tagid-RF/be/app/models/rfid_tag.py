@@ -79,8 +79,19 @@ class RFIDTag(Base):
         Index("idx_rfid_tags_last_seen", "last_seen"),
         Index("idx_rfid_tags_is_paid", "is_paid"),
         Index("idx_rfid_tags_store_id", "store_id"),
+        # Keyset pagination for GET /tags/ (ORDER BY last_seen DESC, id DESC)
+        Index("idx_rfid_tags_last_seen_id", "last_seen", "id"),
     )
 
+    # Substring search ("ILIKE '%fragment%'") on EPC/TID: index name -> column.
+    # These GIN indexes need pg_trgm, so they are not declared on the table
+    # (create_all would fail without the extension); init_db creates them
+    # once the extension is in place.
+    trigram_indexes = {
+        "idx_rfid_tags_epc_trgm": "epc",
+        "idx_rfid_tags_tid_trgm": "tid",
+    }
+
 
 class RFIDScanHistory(Base):
     __tablename__ = "rfid_scan_history"
@@ -115,3 +126,26 @@ class RFIDScanHistory(Base):
         Index("idx_rfid_scan_history_scanned_at", "scanned_at"),
         Index("idx_rfid_scan_history_reader_id", "reader_id"),
     )
+
+
+class RFIDScanRollup(Base):
+    """Hourly per-EPC, per-reader aggregate of ``rfid_scan_history`` rows."""
+
+    __tablename__ = "rfid_scan_rollups"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    bucket_start = Column(DateTime(timezone=True), nullable=False, comment="Start of the hour")
+    epc = Column(String(128), nullable=False, comment="Tag EPC")
+    reader_id = Column(String(100), nullable=True, comment="Identifier of the reader device")
+    scan_count = Column(Integer, nullable=False, comment="Raw scans in the hour")
+    rssi_min = Column(Float, nullable=True, comment="Weakest signal in the hour")
+    rssi_max = Column(Float, nullable=True, comment="Strongest signal in the hour")
+    # Sum and count rather than an average, so buckets can be merged exactly
+    rssi_sum = Column(Float, nullable=True, comment="Sum of non-null RSSI values")
+    rssi_count = Column(Integer, nullable=False, default=0, comment="Scans with an RSSI")
+
+    __table_args__ = (
+        Index("idx_rfid_scan_rollups_bucket_start", "bucket_start"),
+        Index("idx_rfid_scan_rollups_epc_bucket", "epc", "bucket_start"),
+        Index("idx_rfid_scan_rollups_reader_bucket", "reader_id", "bucket_start"),
+    )
@@ -16,6 +16,7 @@ from app.schemas.cart import (
 from app.services.database import get_db
 from app.services.payment.base import PaymentRequest, PaymentStatus
 from app.services.payment.factory import get_gateway
+from app.services.tag_repository import tag_repository
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -185,14 +186,13 @@ async def checkout(request: CheckoutRequest, db: Session = Depends(get_db)):
             if final_status == PaymentStatus.FAILED:
                 raise HTTPException(status_code=400, detail="Payment failed")
 
-        # 3. Success! Mark items as PAID
-        for item in cart:
-            tag = db.query(RFIDTag).filter(RFIDTag.epc == item.epc).first()
-            if tag:
-                tag.is_paid = True
-                # Optional: tag.sold_at = datetime.now()
-
-        db.commit()
+        # 3. Success! Mark items as PAID. The charge is already captured, so a
+        # failure here must not fail the checkout; sync_stores repairs the flags
+        epcs = [item.epc for item in cart]
+        try:
+            await tag_repository.set_paid(epcs, True, session=db)
+        except Exception as e:
+            logger.error(f"Payment {external_id} captured but marking {epcs} paid failed: {e}")
 
         # 4. Clear Cart
         cart.clear()
@@ -12,6 +12,7 @@ from sqlalchemy.orm import Session
 from app.models.rfid_tag import RFIDTag
 from app.models.store import Notification, NotificationPreference, Store, User
 from app.services.database import get_db
+from app.services.tag_repository import tag_repository
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/exit-scan", tags=["exit-scan"])
@@ -63,7 +64,8 @@ async def check_exit_scan(request: ExitScanRequest, db: Session = Depends(get_db
 
     Flow:
     1. Receive list of EPCs from exit gate reader
-    2. Check each tag's payment status
+    2. Check the payment status of all tags at once (Prisma decides; product
+       name and price come from rfid_tags)
     3. If unpaid items found:
        a. Get all store stakeholders (managers, sellers)
        b. Send notification to each based on their preferences
@@ -74,10 +76,14 @@ async def check_exit_scan(request: ExitScanRequest, db: Session = Depends(get_db
     unpaid_items: List[UnpaidItemAlert] = []
     paid_count = 0
 
+    registered = await tag_repository.get_many(request.epcs)
+    rows = {row.epc: row for row in db.query(RFIDTag).filter(RFIDTag.epc.in_(request.epcs)).all()}
+
     for epc in request.epcs:
-        tag = db.query(RFIDTag).filter(RFIDTag.epc == epc).first()
+        tag = rows.get(epc)
+        registered_tag = registered.get(epc)
 
-        if not tag:
+        if tag is None and registered_tag is None:
             # Unknown tag - treat as suspicious
             unpaid_items.append(
                 UnpaidItemAlert(
@@ -90,17 +96,20 @@ async def check_exit_scan(request: ExitScanRequest, db: Session = Depends(get_db
             )
             continue
 
-        if tag.is_paid:
+        if tag_repository.paid_state(registered_tag, tag):
             paid_count += 1
         else:
             # Unpaid item!
-            price_display = f"₪{tag.price_cents / 100:.2f}" if tag.price_cents else "לא ידוע"
+            price_cents = tag.price_cents if tag else None
+            price_display = f"₪{price_cents / 100:.2f}" if price_cents else "לא ידוע"
             unpaid_items.append(
                 UnpaidItemAlert(
                     epc=epc,
-                    product_name=tag.product_name or "ללא שם",
-                    product_sku=tag.product_sku,
-                    price_cents=tag.price_cents,
+                    product_name=(
+                        (tag.product_name if tag else registered_tag.productDescription) or "ללא שם"
+                    ),
+                    product_sku=tag.product_sku if tag else registered_tag.productId,
+                    price_cents=price_cents,
                     price_display=price_display,
                 )
             )
@@ -208,17 +217,7 @@ async def mark_tags_as_paid(epcs: List[str], db: Session = Depends(get_db)):
 
     Called after successful payment to update tag status.
     """
-    from datetime import datetime, timezone
-
-    updated = 0
-    for epc in epcs:
-        tag = db.query(RFIDTag).filter(RFIDTag.epc == epc).first()
-        if tag:
-            tag.is_paid = True
-            tag.paid_at = datetime.now(timezone.utc)
-            updated += 1
-
-    db.commit()
+    updated = await tag_repository.set_paid(epcs, True, session=db)
 
     return {
         "message": f"Marked {updated} tags as paid",
@@ -232,14 +231,6 @@ async def mark_tags_as_unpaid(epcs: List[str], db: Session = Depends(get_db)):
     """
     Mark tags as unpaid (for returns or restocking).
     """
-    updated = 0
-    for epc in epcs:
-        tag = db.query(RFIDTag).filter(RFIDTag.epc == epc).first()
-        if tag:
-            tag.is_paid = False
-            tag.paid_at = None
-            updated += 1
-
-    db.commit()
+    updated = await tag_repository.set_paid(epcs, False, session=db)
 
     return {"message": f"Marked {updated} tags as unpaid", "updated_count": updated}
@@ -0,0 +1,92 @@
+"""
+Bulk export API - streams scan history and tags as NDJSON, CSV or Parquet.
+"""
+
+import logging
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.services.exports import (
+    FORMATS,
+    PARQUET_AVAILABLE,
+    get_export_sessionmaker,
+    scan_export_query,
+    stream_export,
+    tag_export_query,
+)
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+FORMAT_PATTERN = "^(ndjson|csv|parquet)$"
+
+
+def _export_response(
+    sessions: sessionmaker, query: Select, fmt: str, name: str
+) -> StreamingResponse:
+    if fmt == "parquet" and not PARQUET_AVAILABLE:
+        raise HTTPException(status_code=501, detail="Parquet export needs pyarrow installed")
+
+    return StreamingResponse(
+        stream_export(sessions, query, fmt, batch_size=settings.EXPORT_BATCH_SIZE),
+        media_type=FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
+
+
+@router.get("/scans")
+def export_scans(
+    format: str = Query("ndjson", pattern=FORMAT_PATTERN, description="ndjson, csv or parquet"),
+    since: Optional[datetime] = Query(None, description="Scans at or after this time"),
+    until: Optional[datetime] = Query(None, description="Scans before this time"),
+    reader_id: Optional[str] = Query(None, description="Only scans from this reader"),
+    store_id: Optional[int] = Query(None, description="Only scans of this store's tags"),
+    epc: Optional[str] = Query(None, description="Only scans of this EPC"),
+    after_id: Optional[int] = Query(None, description="Resume after this scan id"),
+    limit: Optional[int] = Query(None, ge=1, description="Stop after this many rows"),
+    sessions: sessionmaker = Depends(get_export_sessionmaker),
+):
+    """
+    Stream scan history rows.
+
+    Rows are ordered by id. To resume an interrupted export, repeat the request
+    with after_id set to the last id received; limit splits a large pull into
+    several requests the same way.
+
+    Example:
+        ```python
+        GET /api/v1/exports/scans?since=2026-01-01T00:00:00Z&reader_id=gate-1&format=csv
+        ```
+    """
+    query = scan_export_query(since, until, reader_id, store_id, epc, after_id, limit)
+    return _export_response(sessions, query, format, "scan_history")
+
+
+@router.get("/tags")
+def export_tags(
+    format: str = Query("ndjson", pattern=FORMAT_PATTERN, description="ndjson, csv or parquet"),
+    seen_since: Optional[datetime] = Query(None, description="Tags last seen at or after this"),
+    seen_until: Optional[datetime] = Query(None, description="Tags last seen before this"),
+    store_id: Optional[int] = Query(None, description="Only this store's tags"),
+    epc: Optional[str] = Query(None, description="Only this EPC"),
+    is_active: Optional[bool] = Query(None, description="Filter by active status"),
+    is_paid: Optional[bool] = Query(None, description="Filter by payment status"),
+    after_id: Optional[int] = Query(None, description="Resume after this tag id"),
+    limit: Optional[int] = Query(None, ge=1, description="Stop after this many rows"),
+    sessions: sessionmaker = Depends(get_export_sessionmaker),
+):
+    """
+    Stream tags.
+
+    Rows are ordered by id and resume with after_id, as for scan exports.
+    """
+    query = tag_export_query(
+        seen_since, seen_until, store_id, epc, is_active, is_paid, after_id, limit
+    )
+    return _export_response(sessions, query, format, "rfid_tags")
@@ -1,78 +1,48 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy import case, func
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
-from app.models.rfid_tag import RFIDTag
-from app.schemas.inventory import InventoryResponse, ProductSummary
+from app.schemas.inventory import InventoryDriftResponse, InventoryResponse
 from app.services.database import get_db
+from app.services.inventory_counters import inventory_counters
 
 router = APIRouter()
 
 
 @router.get("/summary", response_model=InventoryResponse)
-def get_inventory_summary(db: Session = Depends(get_db)):
+def get_inventory_summary(
+    refresh: bool = Query(False, description="Reconcile with the database before answering"),
+    db: Session = Depends(get_db),
+):
     """
     Get aggregated inventory summary based on RFID tags.
-    Groups tags by product SKU/Name and calculates:
+    Groups active tags by product SKU/Name/price and calculates:
     - Total items
     - Available (unpaid)
     - Sold (paid)
-    """
-    # Group by product_sku and product_name
-    # We use product_sku as the primary grouper, but fallback to name if sku is missing
-    # To ensure consistent grouping, we might filter out tags with neither
-
-    # Query to aggregate data
-    # SELECT product_sku, product_name, price_cents,
-    #        COUNT(*) as total,
-    #        SUM(CASE WHEN is_paid = FALSE THEN 1 ELSE 0 END) as available,
-    #        SUM(CASE WHEN is_paid = TRUE THEN 1 ELSE 0 END) as sold
-    # FROM rfid_tags
-    # WHERE product_sku IS NOT NULL OR product_name IS NOT NULL
-    # GROUP BY product_sku, product_name, price_cents
-
-    results = (
-        db.query(
-            RFIDTag.product_sku,
-            RFIDTag.product_name,
-            RFIDTag.price_cents,
-            func.count(RFIDTag.id).label("total"),
-            func.sum(case((RFIDTag.is_paid.is_(False), 1), else_=0)).label("available"),
-            func.sum(case((RFIDTag.is_paid.is_(True), 1), else_=0)).label("sold"),
-        )
-        .filter((RFIDTag.product_sku.isnot(None)) | (RFIDTag.product_name.isnot(None)))
-        .group_by(RFIDTag.product_sku, RFIDTag.product_name, RFIDTag.price_cents)
-        .all()
-    )
 
-    product_summaries = []
-    total_value = 0
+    Served from in-memory counters kept up to date as tags are created, paid,
+    unpaid and deactivated. They are reconciled with the database on first use,
+    every INVENTORY_RECONCILE_SECONDS, and when refresh=true.
+    """
+    if refresh or not inventory_counters.is_reconciled:
+        inventory_counters.reconcile(db)
 
-    for row in results:
-        # row is a keyed tuple
-        sku = row.product_sku
-        name = row.product_name
-        price = row.price_cents or 0
-        total = row.total
-        available = row.available or 0
-        sold = row.sold or 0
+    return InventoryResponse(**inventory_counters.snapshot())
 
-        # Calculate value of AVAILABLE items only (usually inventory value refers to asset value)
-        total_value += available * price
 
-        product_summaries.append(
-            ProductSummary(
-                product_sku=sku,
-                product_name=name,
-                total_items=total,
-                available_items=available,
-                sold_items=sold,
-                price_cents=row.price_cents,
-            )
-        )
+@router.get("/drift", response_model=InventoryDriftResponse)
+def get_inventory_drift(
+    refresh: bool = Query(False, description="Reconcile now instead of reporting the last run"),
+    db: Session = Depends(get_db),
+):
+    """
+    Report how far the counters had drifted from the database at the last
+    reconciliation: products whose counts were corrected, and by how much
+    (positive means the counters were ahead of the database).
 
-    return InventoryResponse(
-        products=product_summaries,
-        total_products=len(product_summaries),
-        total_value_cents=total_value,
-    )
+    Drift comes from writers that do not update the counters, such as other
+    processes or direct SQL.
+    """
+    if refresh or not inventory_counters.is_reconciled:
+        return InventoryDriftResponse(**inventory_counters.reconcile(db))
+    return InventoryDriftResponse(**inventory_counters.drift_report())
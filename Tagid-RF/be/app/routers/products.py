@@ -1,10 +1,8 @@
-from io import BytesIO
-
-import qrcode
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 
 from app.core.config import get_settings
+from app.utils.qr import render_qr_png
 
 router = APIRouter()
 settings = get_settings()
@@ -27,21 +25,7 @@ def generate_product_qr(sku: str):
 
     # Generate QR Code
     try:
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(qr_data)
-        qr.make(fit=True)
-
-        img = qr.make_image(fill_color="black", back_color="white")
-
-        # Save to BytesIO to return as response
-        img_buffer = BytesIO()
-        img.save(img_buffer, format="PNG")
-        img_buffer.seek(0)
+        img_buffer = render_qr_png(qr_data)
 
         return StreamingResponse(img_buffer, media_type="image/png")
 
@@ -2,14 +2,16 @@
 REST API endpoints for RFID tag management.
 """
 
+import base64
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import desc, func
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import desc, tuple_
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.models.rfid_tag import RFIDScanHistory, RFIDTag
 from app.schemas.rfid_tag import (
     RFIDScanHistoryResponse,
@@ -17,8 +19,13 @@ from app.schemas.rfid_tag import (
     RFIDTagResponse,
     RFIDTagStatsResponse,
     RFIDTagUpdate,
+    ScanActivityResponse,
 )
 from app.services.database import get_db
+from app.services.inventory_counters import record_tag_change, tag_state
+from app.services.scan_history import scan_activity
+from app.services.tag_repository import tag_repository
+from app.services.tag_stats import tag_stats
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -127,6 +134,10 @@ async def create_or_update_tag(tag: RFIDTagCreate, db: Session = Depends(get_db)
     existing = db.query(RFIDTag).filter(RFIDTag.epc == tag.epc).first()
 
     if existing:
+        previous_rssi = existing.rssi
+        previous_location = existing.location
+        previous_state = tag_state(existing)
+
         # Update existing tag
         existing.read_count += 1
         existing.last_seen = datetime.now(timezone.utc)
@@ -158,7 +169,8 @@ async def create_or_update_tag(tag: RFIDTagCreate, db: Session = Depends(get_db)
             existing.price_cents = tag.price_cents
         if tag.store_id is not None:
             existing.store_id = tag.store_id
-        if tag.is_paid is not None:
+        # Only an explicit is_paid; a re-posted scan must not unpay the tag
+        if "is_paid" in tag.model_fields_set:
             existing.is_paid = tag.is_paid
 
         db.commit()
@@ -178,6 +190,10 @@ async def create_or_update_tag(tag: RFIDTagCreate, db: Session = Depends(get_db)
         db.add(history)
         db.commit()
 
+        _record_stats(existing, False, previous_rssi, previous_location)
+        record_tag_change(previous_state, tag_state(existing))
+        if "is_paid" in tag.model_fields_set:
+            await _publish_paid(db, existing.epc, tag.is_paid)
         return existing
     else:
         # Create new tag
@@ -218,15 +234,100 @@ async def create_or_update_tag(tag: RFIDTagCreate, db: Session = Depends(get_db)
         db.add(history)
         db.commit()
 
+        _record_stats(new_tag, True)
+        record_tag_change(None, tag_state(new_tag))
+        if "is_paid" in tag.model_fields_set:
+            await _publish_paid(db, new_tag.epc, tag.is_paid)
         return new_tag
 
 
+async def _publish_paid(db: Session, epc: str, is_paid: bool) -> None:
+    """Write an explicitly set paid state through to Prisma, the source of truth."""
+    try:
+        await tag_repository.set_paid([epc], is_paid, session=db)
+    except Exception as e:
+        logger.warning(f"Failed to write paid state of {epc} to Prisma: {e}")
+
+
+def _record_stats(
+    tag: RFIDTag,
+    is_new: bool,
+    previous_rssi: Optional[int] = None,
+    previous_location: Optional[str] = None,
+) -> None:
+    """Feed an ingested scan to the dashboard stats; never fails the request."""
+    try:
+        tag_stats.record_scan(
+            tag_id=tag.id,
+            epc=tag.epc,
+            read_count=tag.read_count,
+            is_new=is_new,
+            rssi=tag.rssi,
+            previous_rssi=previous_rssi,
+            location=tag.location,
+            previous_location=previous_location,
+        )
+    except Exception as e:
+        logger.warning(f"Failed to record tag stats for {tag.epc}: {e}")
+
+
+def encode_cursor(tag: RFIDTag) -> str:
+    """Opaque keyset cursor for the position after ``tag``."""
+    raw = f"{tag.last_seen.isoformat()}|{tag.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor from ``encode_cursor``.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    last_seen, tag_id = base64.urlsafe_b64decode(padded.encode()).decode().rsplit("|", 1)
+    return datetime.fromisoformat(last_seen), int(tag_id)
+
+
+def estimate_count(db: Session, query, search: Optional[str], is_active: Optional[bool]) -> int:
+    """
+    Approximate row count for a tag listing without scanning the table.
+
+    Unfiltered counts come from the dashboard's in-memory counters; filtered
+    ones from the Postgres planner's row estimate. Other databases fall back
+    to an exact count.
+    """
+    if not search and tag_stats.is_reconciled:
+        if is_active is None:
+            return tag_stats.total_tags
+        if is_active:
+            return tag_stats.active_tags
+        return tag_stats.total_tags - tag_stats.active_tags
+
+    bind = db.get_bind()
+    if bind.dialect.name == "postgresql":
+        # Request input stays in bound parameters, never in the SQL text
+        compiled = query.statement.compile(dialect=bind.dialect)
+        plan = (
+            db.connection()
+            .exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params)
+            .scalar()
+        )
+        return int(plan[0]["Plan"]["Plan Rows"])
+    return query.count()
+
+
 @router.get("/", response_model=List[RFIDTagResponse])
 async def list_tags(
-    page: int = Query(1, ge=1, description="Page number"),
+    response: Response,
+    page: int = Query(1, ge=1, description="Page number (ignored when cursor is given)"),
     page_size: int = Query(50, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
     search: Optional[str] = Query(None, description="Search by EPC or TID"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
+    total: Optional[str] = Query(
+        None, pattern="^(exact|estimate)$", description="Return X-Total-Count (exact|estimate)"
+    ),
     db: Session = Depends(get_db),
 ):
     """
@@ -238,31 +339,40 @@ async def list_tags(
     Args:
         page (int): Page number (1-indexed). Default: 1
         page_size (int): Number of items per page (1-100). Default: 50
+        cursor (str, optional): Continue after the previous page (keyset pagination)
         search (str, optional): Search term to filter by EPC or TID (case-insensitive)
         is_active (bool, optional): Filter by active status. None returns all tags
+        total (str, optional): "exact" or "estimate" to get X-Total-Count
         db (Session): Database session (injected by FastAPI)
 
     Returns:
         List[RFIDTagResponse]: List of tags matching the criteria, ordered by last_seen desc
 
+    Response headers:
+        X-Next-Cursor: Pass as ?cursor= to fetch the next page (absent on the last page)
+        X-Total-Count: Matching tags, when requested with ?total=
+        X-Total-Count-Estimated: "true" when X-Total-Count is an estimate
+
     Example:
         ```python
         # Get first page of all tags
         GET /api/v1/tags/?page=1&page_size=50
 
+        # Next page (from the X-Next-Cursor header)
+        GET /api/v1/tags/?cursor=MjAyNi0xMC0xOFQxMjowMDowMCswMDowMHwxMjM
+
         # Search for specific EPC
         GET /api/v1/tags/?search=E28068
 
-        # Get only active tags
-        GET /api/v1/tags/?is_active=true
-
-        # Combine filters
-        GET /api/v1/tags/?search=warehouse&is_active=true&page_size=20
+        # Get only active tags, with an approximate total
+        GET /api/v1/tags/?is_active=true&total=estimate
         ```
 
     Notes:
-        - Results are always ordered by last_seen (most recent first)
-        - Search is case-insensitive and matches partial EPC or TID
+        - Results are always ordered by last_seen (most recent first), then id
+        - Cursor pages cost the same at any depth; page=N skips N-1 pages of rows
+        - Search is case-insensitive and matches partial EPC or TID; on Postgres
+          it is served by trigram indexes
         - Maximum page_size is 100 to prevent performance issues
         - Empty results return [] (not an error)
     """
@@ -278,14 +388,27 @@ async def list_tags(
             (RFIDTag.epc.ilike(f"%{search}%")) | (RFIDTag.tid.ilike(f"%{search}%"))
         )
 
-    # Pagination (query.count() executed but total not currently used in response)
-    _ = query.count()  # noqa: F841 - Total available for future pagination headers
-    tags = (
-        query.order_by(desc(RFIDTag.last_seen))
-        .offset((page - 1) * page_size)
-        .limit(page_size)
-        .all()
-    )
+    if total == "exact":
+        response.headers["X-Total-Count"] = str(query.count())
+    elif total == "estimate":
+        response.headers["X-Total-Count"] = str(estimate_count(db, query, search, is_active))
+        response.headers["X-Total-Count-Estimated"] = "true"
+
+    ordered = query.order_by(desc(RFIDTag.last_seen), desc(RFIDTag.id))
+    if cursor:
+        try:
+            last_seen, tag_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        ordered = ordered.filter(tuple_(RFIDTag.last_seen, RFIDTag.id) < tuple_(last_seen, tag_id))
+    else:
+        ordered = ordered.offset((page - 1) * page_size)
+
+    # One extra row tells us whether there is a next page
+    tags = ordered.limit(page_size + 1).all()
+    if len(tags) > page_size:
+        tags = tags[:page_size]
+        response.headers["X-Next-Cursor"] = encode_cursor(tags[-1])
 
     return tags
 
@@ -391,6 +514,7 @@ async def update_tag(tag_id: int, tag_update: RFIDTagUpdate, db: Session = Depen
     tag = db.query(RFIDTag).filter(RFIDTag.id == tag_id).first()
     if not tag:
         raise HTTPException(status_code=404, detail="Tag not found")
+    previous_state = tag_state(tag)
 
     # Update fields if provided
     if tag_update.location is not None:
@@ -420,6 +544,9 @@ async def update_tag(tag_id: int, tag_update: RFIDTagUpdate, db: Session = Depen
 
     db.commit()
     db.refresh(tag)
+    record_tag_change(previous_state, tag_state(tag))
+    if tag_update.is_paid is not None:
+        await _publish_paid(db, tag.epc, tag_update.is_paid)
     return tag
 
 
@@ -457,8 +584,10 @@ async def delete_tag(tag_id: int, db: Session = Depends(get_db)):
     if not tag:
         raise HTTPException(status_code=404, detail="Tag not found")
 
+    previous_state = tag_state(tag)
     tag.is_active = False
     db.commit()
+    record_tag_change(previous_state, None)
     return None
 
 
@@ -508,8 +637,55 @@ async def get_recent_scans(
     return scans
 
 
+@router.get("/history/activity", response_model=ScanActivityResponse)
+async def get_scan_activity(
+    hours: int = Query(24, ge=1, le=24 * 365, description="Hours to look back"),
+    epc: Optional[str] = Query(None, description="Only scans of this EPC"),
+    reader_id: Optional[str] = Query(None, description="Only scans from this reader"),
+    db: Session = Depends(get_db),
+):
+    """
+    Get hourly scan activity.
+
+    Returns scan counts and signal strength per hour, optionally for a single
+    tag or reader. Suited to activity charts over days to months.
+
+    Args:
+        hours (int): Number of hours to look back (1-8760). Default: 24
+        epc (str, optional): Restrict to one tag
+        reader_id (str, optional): Restrict to one reader
+        db (Session): Database session (injected by FastAPI)
+
+    Returns:
+        ScanActivityResponse: Hourly buckets (hours without scans are omitted)
+
+    Example:
+        ```python
+        # Last 30 days for one tag
+        GET /api/v1/tags/history/activity?hours=720&epc=E2806810000000001234ABCD
+        ```
+
+    Notes:
+        - Ranges up to SCAN_HISTORY_RAW_QUERY_HOURS are aggregated from raw scans
+        - Longer ranges read hourly rollups, plus raw scans newer than the last
+          rolled-up hour, so they remain cheap and outlive raw scan retention
+    """
+    until = datetime.now(timezone.utc)
+    return scan_activity(
+        db.connection(),
+        since=until - timedelta(hours=hours),
+        until=until,
+        epc=epc,
+        reader_id=reader_id,
+        raw_query_hours=settings.SCAN_HISTORY_RAW_QUERY_HOURS,
+    )
+
+
 @router.get("/stats/summary", response_model=RFIDTagStatsResponse)
-async def get_tag_stats(db: Session = Depends(get_db)):
+async def get_tag_stats(
+    refresh: bool = Query(False, description="Reconcile with the database before answering"),
+    db: Session = Depends(get_db),
+):
     """
     Get comprehensive RFID tag statistics.
 
@@ -517,6 +693,7 @@ async def get_tag_stats(db: Session = Depends(get_db)):
     totals, activity metrics, and location distribution.
 
     Args:
+        refresh (bool): Reconcile with the database before answering
         db (Session): Database session (injected by FastAPI)
 
     Returns:
@@ -556,60 +733,18 @@ async def get_tag_stats(db: Session = Depends(get_db)):
         ```
 
     Notes:
-        - Statistics are calculated in real-time (not cached)
+        - Statistics are served from in-memory counters updated as scans are
+          ingested; they are reconciled with the database on first use, every
+          TAG_STATS_RECONCILE_SECONDS, and when refresh=true
         - "Today" is based on UTC timezone
         - Tags without location are excluded from tags_by_location
         - Average RSSI only includes tags with non-null RSSI values
         - Useful for dashboard displays and monitoring
     """
-    # Total and active tags
-    total_tags = db.query(RFIDTag).count()
-    active_tags = db.query(RFIDTag).filter(RFIDTag.is_active.is_(True)).count()
-
-    # Scans today
-    today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
-    scans_today = (
-        db.query(RFIDScanHistory).filter(RFIDScanHistory.scanned_at >= today_start).count()
-    )
+    if refresh or not tag_stats.is_reconciled:
+        tag_stats.reconcile(db)
 
-    # Scans last hour
-    hour_ago = datetime.now(timezone.utc) - timedelta(hours=1)
-    scans_last_hour = (
-        db.query(RFIDScanHistory).filter(RFIDScanHistory.scanned_at >= hour_ago).count()
-    )
-
-    # Most scanned tag
-    most_scanned = db.query(RFIDTag).order_by(desc(RFIDTag.read_count)).first()
-    most_scanned_data = None
-    if most_scanned:
-        most_scanned_data = {
-            "id": most_scanned.id,
-            "epc": most_scanned.epc,
-            "read_count": most_scanned.read_count,
-        }
-
-    # Average RSSI
-    avg_rssi_result = db.query(func.avg(RFIDTag.rssi)).filter(RFIDTag.rssi.isnot(None)).scalar()
-    average_rssi = float(avg_rssi_result) if avg_rssi_result else None
-
-    # Tags by location
-    location_counts = (
-        db.query(RFIDTag.location, func.count(RFIDTag.id))
-        .filter(RFIDTag.location.isnot(None))
-        .group_by(RFIDTag.location)
-        .all()
-    )
-    tags_by_location = {loc: count for loc, count in location_counts if loc}
-
-    return RFIDTagStatsResponse(
-        total_tags=total_tags,
-        active_tags=active_tags,
-        scans_today=scans_today,
-        scans_last_hour=scans_last_hour,
-        most_scanned_tag=most_scanned_data,
-        average_rssi=average_rssi,
-        tags_by_location=tags_by_location,
-    )
+    return RFIDTagStatsResponse(**tag_stats.snapshot())
 
 
 @router.post("/reader/connect")
@@ -4,7 +4,7 @@ WebSocket endpoint for real-time RFID tag scan notifications.
 
 import json
 import logging
-from typing import List
+from typing import Dict, List, Set
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
@@ -46,6 +46,7 @@ class ConnectionManager:
 
     def __init__(self):
         self.active_connections: List[WebSocket] = []
+        self.bath_subscriptions: Dict[str, Set[WebSocket]] = {}
 
     async def connect(self, websocket: WebSocket):
         """
@@ -71,12 +72,43 @@ class ConnectionManager:
         Note:
             Safe to call even if websocket is not in active_connections
         """
+        for subscribers in self.bath_subscriptions.values():
+            subscribers.discard(websocket)
+
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
             logger.info(
                 f"WebSocket disconnected. Total connections: {len(self.active_connections)}"
             )
 
+    def subscribe_bath(self, websocket: WebSocket, bath_id: str):
+        """
+        Subscribe a connection (typically a bath kiosk) to one bath's cart deltas.
+
+        Args:
+            websocket (WebSocket): The subscribing connection
+            bath_id (str): The BATH reader id
+        """
+        self.bath_subscriptions.setdefault(bath_id, set()).add(websocket)
+
+    async def broadcast_to_bath(self, bath_id: str, message: dict):
+        """
+        Send a message to the connections subscribed to a bath.
+
+        Args:
+            bath_id (str): The BATH reader id
+            message (dict): Dictionary to send as JSON
+
+        Note:
+            Failed connections are disconnected, as in ``broadcast``.
+        """
+        for connection in list(self.bath_subscriptions.get(bath_id, ())):
+            try:
+                await connection.send_json(message)
+            except Exception as e:
+                logger.warning(f"Error sending bath update to client: {e}")
+                self.disconnect(connection)
+
     async def broadcast(self, message: dict):
         """
         Broadcast a message to all connected WebSocket clients.
@@ -176,6 +208,9 @@ async def websocket_endpoint(websocket: WebSocket):
 
         // Subscribe - explicitly subscribe (already subscribed by default)
         {"command": "subscribe"}
+
+        // Subscribe a bath kiosk to its cart deltas
+        {"command": "subscribe", "bath_id": "<reader id>"}
         ```
 
     Server-to-Client Messages (Events):
@@ -215,6 +250,17 @@ async def websocket_endpoint(websocket: WebSocket):
             "message": "Subscribed to tag scan events"
         }
 
+        // Bath cart delta (sent to kiosks subscribed to the bath)
+        {
+            "type": "bath_cart_delta",
+            "data": {
+                "bath_id": "<reader id>",
+                "action": "added",  // or "removed"
+                "item": {"tag_id": "...", "epc": "...", "product_name": "..."},
+                "totals": {"total_items": 3, "total_price": 120.0}
+            }
+        }
+
         // Error message
         {
             "type": "error",
@@ -340,6 +386,19 @@ async def websocket_endpoint(websocket: WebSocket):
                         websocket,
                     )
                 elif command == "subscribe":
+                    bath_id = message.get("bath_id")
+                    if bath_id:
+                        # Bath kiosk subscribes to its cart deltas
+                        manager.subscribe_bath(websocket, bath_id)
+                        await manager.send_personal_message(
+                            {
+                                "type": "subscribed",
+                                "message": f"Subscribed to bath {bath_id} cart updates",
+                            },
+                            websocket,
+                        )
+                        continue
+
                     # Client subscribes to tag scans (already subscribed by default)
                     await manager.send_personal_message(
                         {
@@ -5,6 +5,8 @@ from app.schemas.rfid_tag import (
     RFIDTagResponse,
     RFIDTagStatsResponse,
     RFIDTagUpdate,
+    ScanActivityBucket,
+    ScanActivityResponse,
 )
 
 __all__ = [
@@ -14,4 +16,6 @@ __all__ = [
     "RFIDTagResponse",
     "RFIDScanHistoryResponse",
     "RFIDTagStatsResponse",
+    "ScanActivityBucket",
+    "ScanActivityResponse",
 ]
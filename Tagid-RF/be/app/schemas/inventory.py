@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import List, Optional
 
 from pydantic import BaseModel
@@ -16,3 +17,19 @@ class InventoryResponse(BaseModel):
     products: List[ProductSummary]
     total_products: int
     total_value_cents: int
+
+
+class ProductDrift(BaseModel):
+    product_sku: Optional[str] = None
+    product_name: Optional[str] = None
+    price_cents: Optional[int] = None
+    total_drift: int = 0
+    sold_drift: int = 0
+
+
+class InventoryDriftResponse(BaseModel):
+    reconciled_at: Optional[datetime] = None
+    drifted_products: int
+    total_items: int
+    sold_items: int
+    products: List[ProductDrift]
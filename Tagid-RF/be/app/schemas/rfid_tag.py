@@ -3,7 +3,7 @@ Pydantic schemas for RFID tag validation and serialization.
 """
 
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -350,3 +350,46 @@ class RFIDTagStatsResponse(BaseModel):
     tags_by_location: Dict[str, int] = Field(
         description="Count of tags per location. Key=location, Value=count"
     )
+
+
+class ScanActivityBucket(BaseModel):
+    """One hour of scan activity."""
+
+    hour: datetime = Field(description="Start of the hour (UTC)")
+    scans: int = Field(description="Scans in the hour")
+    rssi_min: Optional[float] = Field(description="Weakest signal in the hour")
+    rssi_max: Optional[float] = Field(description="Strongest signal in the hour")
+    rssi_avg: Optional[float] = Field(description="Average signal in the hour")
+
+
+class ScanActivityResponse(BaseModel):
+    """
+    Schema for hourly scan activity.
+
+    Returned by: GET /api/v1/tags/history/activity
+
+    Example Response:
+        ```json
+        {
+            "since": "2026-01-05T12:00:00Z",
+            "until": "2026-01-06T12:00:00Z",
+            "source": "raw",
+            "total_scans": 1250,
+            "buckets": [
+                {
+                    "hour": "2026-01-06T11:00:00Z",
+                    "scans": 45,
+                    "rssi_min": -71.0,
+                    "rssi_max": -38.5,
+                    "rssi_avg": -52.3
+                }
+            ]
+        }
+        ```
+    """
+
+    since: datetime = Field(description="Start of the range")
+    until: datetime = Field(description="End of the range")
+    source: str = Field(description="raw, rollup or mixed (rollups, then recent raw scans)")
+    total_scans: int = Field(description="Scans in the range")
+    buckets: List[ScanActivityBucket] = Field(description="Hours with scans, oldest first")
@@ -0,0 +1,184 @@
+"""Bath cart helpers.
+
+Provides:
+- A short-lived cache resolving bath readers by id or QR code
+- Batched materialization of cart contents (tags and products)
+- Running cart totals, updated as items are scanned in and out
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class BathReaderCache:
+    """TTL cache for reader lookups by id or QR code."""
+
+    def __init__(self, ttl_seconds: float = 60.0):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Tuple[Any, float]] = {}
+        self._lock = threading.Lock()
+
+    async def resolve(self, db: Any, bath_id: str) -> Optional[Any]:
+        """
+        Get a reader by id or QR code, hitting the database at most once per TTL.
+
+        Misses are not cached so newly registered readers show up immediately.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(bath_id)
+            if entry and entry[1] > now:
+                return entry[0]
+
+        reader = await db.rfidreader.find_first(
+            where={"OR": [{"id": bath_id}, {"qrCode": bath_id}]}
+        )
+        if reader:
+            expires = now + self.ttl_seconds
+            with self._lock:
+                # Cache under both keys so either form hits next time
+                self._entries[reader.id] = (reader, expires)
+                if reader.qrCode:
+                    self._entries[reader.qrCode] = (reader, expires)
+                self._entries[bath_id] = (reader, expires)
+        return reader
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Drop one key, or everything when no key is given."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+async def materialize_cart(db: Any, tag_ids: Iterable[str]) -> List[dict]:
+    """
+    Load cart lines for the given tag ids in two queries (tags, then products).
+
+    ``RfidTag.productId`` is a plain string rather than a Prisma relation
+    (it can also carry a SKU), so products are fetched in a single batched
+    ``find_many`` instead of via ``include``.
+
+    Returns:
+        Lines in cart order with ``tag_id``, ``epc``, ``product_id``,
+        ``product_name`` and ``product_price``. Unknown tags are skipped.
+    """
+    tag_ids = list(tag_ids)
+    if not tag_ids:
+        return []
+
+    tags = await db.rfidtag.find_many(where={"id": {"in": tag_ids}})
+    tags_by_id = {tag.id: tag for tag in tags}
+
+    product_ids = list({tag.productId for tag in tags if tag.productId})
+    products_by_id = {}
+    if product_ids:
+        products = await db.product.find_many(where={"id": {"in": product_ids}})
+        products_by_id = {product.id: product for product in products}
+
+    lines = []
+    for tag_id in tag_ids:
+        tag = tags_by_id.get(tag_id)
+        if not tag:
+            continue
+        product = products_by_id.get(tag.productId) if tag.productId else None
+        lines.append(
+            {
+                "tag_id": tag.id,
+                "epc": tag.epc,
+                "product_id": tag.productId,
+                "product_name": product.name if product else tag.productDescription,
+                "product_price": product.price if product else 0.0,
+            }
+        )
+    return lines
+
+
+class CartTotals:
+    """
+    Running item count and price per cart.
+
+    Totals are per worker process. A cart that this worker has not seen yet
+    is reported as untracked (``None``) so callers fall back to materializing.
+    """
+
+    def __init__(self):
+        self._prices: Dict[str, Dict[str, float]] = {}
+        self._totals: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def seed(self, cart_id: str, lines: List[dict]) -> None:
+        """Replace a cart's totals with freshly materialized lines."""
+        with self._lock:
+            prices = {line["tag_id"]: line["product_price"] or 0.0 for line in lines}
+            self._prices[cart_id] = prices
+            self._totals[cart_id] = sum(prices.values())
+
+    def add(self, cart_id: str, tag_id: str, price: Optional[float]) -> None:
+        with self._lock:
+            prices = self._prices.get(cart_id)
+            if prices is None or tag_id in prices:
+                return
+            prices[tag_id] = price or 0.0
+            self._totals[cart_id] += prices[tag_id]
+
+    def remove(self, cart_id: str, tag_id: str) -> None:
+        with self._lock:
+            prices = self._prices.get(cart_id)
+            if prices is None or tag_id not in prices:
+                return
+            self._totals[cart_id] -= prices.pop(tag_id)
+
+    def reset(self, cart_id: str) -> None:
+        """Mark a cart as empty (after checkout or clear)."""
+        with self._lock:
+            self._prices[cart_id] = {}
+            self._totals[cart_id] = 0.0
+
+    def get(self, cart_id: str) -> Optional[dict]:
+        """Get ``{"total_items", "total_price"}`` or None if untracked."""
+        with self._lock:
+            prices = self._prices.get(cart_id)
+            if prices is None:
+                return None
+            return {"total_items": len(prices), "total_price": self._totals[cart_id]}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._prices.clear()
+            self._totals.clear()
+
+
+def summarize_lines(lines: List[dict]) -> dict:
+    """``{"total_items", "total_price"}`` for materialized cart lines."""
+    return {
+        "total_items": len(lines),
+        "total_price": sum(line["product_price"] or 0.0 for line in lines),
+    }
+
+
+async def cart_summary(db: Any, cart_store: Any, cart_id: str) -> dict:
+    """
+    Get ``{"total_items", "total_price"}`` for a cart.
+
+    Running totals only see this worker's changes, so they serve process-local
+    stores. A shared store (the database backend) is summed from its contents.
+    """
+    if not cart_store.shared:
+        totals = cart_totals.get(cart_id)
+        if totals is not None:
+            return totals
+
+    lines = await materialize_cart(db, await cart_store.items(cart_id))
+    if not cart_store.shared:
+        cart_totals.seed(cart_id, lines)
+    return summarize_lines(lines)
+
+
+bath_reader_cache = BathReaderCache()
+cart_totals = CartTotals()
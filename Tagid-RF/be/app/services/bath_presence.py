@@ -0,0 +1,221 @@
+"""Live bath cart population from reader push streams.
+
+BATH readers push every tag read through the tag listener. Instead of the
+kiosk POSTing each EPC to ``/bath/{bath_id}/scan``, reads are fed here:
+
+- ``BathPresenceTracker`` turns raw reads into enter/leave events. A tag
+  enters once it has been read ``enter_min_reads`` times over at least
+  ``enter_dwell_seconds``; it leaves after ``leave_after_seconds`` without
+  reads.
+- ``BathCartFeeder`` applies those events to the bath cart store and pushes
+  cart deltas to kiosks subscribed to the bath over WebSocket.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.db.prisma import prisma_client
+from app.routers.websocket import manager
+from app.services.bath_cart import cart_summary, cart_totals
+from app.services.cart_store import get_cart_store
+from app.services.tag_repository import tag_repository
+
+logger = logging.getLogger(__name__)
+
+ENTER = "enter"
+LEAVE = "leave"
+
+
+@dataclass
+class _Presence:
+    first_seen: float
+    last_seen: float
+    reads: int = 1
+    present: bool = False
+    tag_id: Optional[str] = None
+
+
+class BathPresenceTracker:
+    """Enter/leave detection per (bath, EPC) using a dwell-time window."""
+
+    def __init__(
+        self,
+        enter_dwell_seconds: float = 1.0,
+        enter_min_reads: int = 2,
+        leave_after_seconds: float = 5.0,
+    ):
+        self.enter_dwell_seconds = enter_dwell_seconds
+        self.enter_min_reads = enter_min_reads
+        self.leave_after_seconds = leave_after_seconds
+        self._presence: Dict[Tuple[str, str], _Presence] = {}
+
+    def on_read(self, bath_id: str, epc: str, now: Optional[float] = None) -> Optional[str]:
+        """
+        Record a read. Returns ``ENTER`` when the tag has just settled in the bath.
+        """
+        now = time.monotonic() if now is None else now
+        key = (bath_id, epc)
+        presence = self._presence.get(key)
+
+        if presence is None or (
+            not presence.present and now - presence.last_seen > self.leave_after_seconds
+        ):
+            # First read, or a candidate that went quiet before settling
+            presence = self._presence[key] = _Presence(first_seen=now, last_seen=now)
+        else:
+            presence.reads += 1
+            presence.last_seen = now
+
+        if (
+            not presence.present
+            and presence.reads >= self.enter_min_reads
+            and now - presence.first_seen >= self.enter_dwell_seconds
+        ):
+            presence.present = True
+            return ENTER
+        return None
+
+    def sweep(self, now: Optional[float] = None) -> List[Tuple[str, str, Optional[str]]]:
+        """
+        Drop tags that stopped being read.
+
+        Returns:
+            ``(bath_id, epc, tag_id)`` for each tag that had entered and now left.
+        """
+        now = time.monotonic() if now is None else now
+        left = []
+        for key, presence in list(self._presence.items()):
+            if now - presence.last_seen > self.leave_after_seconds:
+                del self._presence[key]
+                if presence.present:
+                    left.append((key[0], key[1], presence.tag_id))
+        return left
+
+    def set_tag_id(self, bath_id: str, epc: str, tag_id: str) -> None:
+        """Remember which tag an EPC resolved to, for the leave event."""
+        presence = self._presence.get((bath_id, epc))
+        if presence:
+            presence.tag_id = tag_id
+
+    def forget(self, bath_id: str, epc: str) -> None:
+        """Stop tracking a tag (e.g. unknown or already paid)."""
+        self._presence.pop((bath_id, epc), None)
+
+    def present_count(self, bath_id: str) -> int:
+        return sum(1 for (b, _), p in self._presence.items() if b == bath_id and p.present)
+
+
+class BathCartFeeder:
+    """Applies presence events from BATH reader streams to bath carts."""
+
+    def __init__(self, tracker: Optional[BathPresenceTracker] = None):
+        self.tracker = tracker or BathPresenceTracker()
+
+    def configure(
+        self, enter_dwell_seconds: float, enter_min_reads: int, leave_after_seconds: float
+    ) -> None:
+        """Replace the tracker with one using the given thresholds."""
+        self.tracker = BathPresenceTracker(
+            enter_dwell_seconds=enter_dwell_seconds,
+            enter_min_reads=enter_min_reads,
+            leave_after_seconds=leave_after_seconds,
+        )
+
+    async def on_read(self, bath_id: str, epc: str, tag: Optional[Any] = None) -> None:
+        """
+        Handle one pushed read from a BATH reader.
+
+        Args:
+            bath_id: The BATH reader id.
+            epc: EPC that was read.
+            tag: The ``RfidTag`` if the caller already loaded it.
+        """
+        if self.tracker.on_read(bath_id, epc) != ENTER:
+            return
+
+        async with prisma_client.client as db:
+            if tag is None:
+                tag = await tag_repository.get(epc, db=db)
+            if not tag or tag.isPaid:
+                # Nothing to sell; keep it out of the cart and stop tracking it
+                self.tracker.forget(bath_id, epc)
+                return
+
+            self.tracker.set_tag_id(bath_id, epc, tag.id)
+            if not await get_cart_store().add(bath_id, tag.id):
+                return
+
+            await db.rfidtag.update(where={"id": tag.id}, data={"status": "IN_CART"})
+            product = None
+            if tag.productId:
+                product = await db.product.find_unique(where={"id": tag.productId})
+
+        price = product.price if product else None
+        cart_totals.add(bath_id, tag.id, price)
+        logger.info(f"Bath {bath_id}: tag {tag.id} entered cart")
+
+        await self._push_delta(
+            bath_id,
+            "added",
+            {
+                "tag_id": tag.id,
+                "epc": tag.epc,
+                "product_id": tag.productId,
+                "product_name": product.name if product else tag.productDescription,
+                "product_price": price,
+            },
+        )
+
+    async def sweep(self) -> int:
+        """Remove tags that left their bath. Returns the number removed."""
+        removed = 0
+        for bath_id, epc, tag_id in self.tracker.sweep():
+            if not tag_id or not await get_cart_store().remove(bath_id, tag_id):
+                continue
+
+            async with prisma_client.client as db:
+                await db.rfidtag.update(where={"id": tag_id}, data={"status": "REGISTERED"})
+
+            cart_totals.remove(bath_id, tag_id)
+            removed += 1
+            logger.info(f"Bath {bath_id}: tag {tag_id} left cart")
+            await self._push_delta(bath_id, "removed", {"tag_id": tag_id, "epc": epc})
+        return removed
+
+    async def _push_delta(self, bath_id: str, action: str, item: dict) -> None:
+        store = get_cart_store()
+        if store.shared:
+            # Other workers change this cart too; the local running totals don't know
+            async with prisma_client.client as db:
+                totals = await cart_summary(db, store, bath_id)
+        else:
+            totals = cart_totals.get(bath_id)
+
+        await manager.broadcast_to_bath(
+            bath_id,
+            {
+                "type": "bath_cart_delta",
+                "data": {
+                    "bath_id": bath_id,
+                    "action": action,
+                    "item": item,
+                    "totals": totals,
+                },
+            },
+        )
+
+    async def run(self, interval: float = 1.0) -> None:
+        """Sweep for departed tags until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Bath presence sweep failed: {e}", exc_info=True)
+
+
+# Singleton instance
+bath_cart_feeder = BathCartFeeder()
@@ -0,0 +1,239 @@
+"""Bath cart storage.
+
+Bath carts map a bath (BATH-type reader) to the set of tags currently in it.
+Two backends share the ``CartStore`` interface:
+
+- ``InMemoryCartStore``: ordered sets per cart, for single-worker deployments
+  and tests.
+- ``DatabaseCartStore``: rows in the ``BathCartItem`` table, so carts survive
+  restarts and are shared across workers.
+
+Both offer O(1) add/remove/contains, an atomic ``drain`` used by checkout and
+clear, and expiry of abandoned carts after a period of inactivity.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.db.prisma import prisma_client
+from app.services.bath_cart import cart_totals
+
+logger = logging.getLogger(__name__)
+
+
+class CartStore(ABC):
+    """Abstract storage for bath carts."""
+
+    # Whether other worker processes see (and change) the same carts
+    shared = False
+
+    def __init__(self, ttl_seconds: int = 1800):
+        self.ttl_seconds = ttl_seconds
+
+    @abstractmethod
+    async def add(self, cart_id: str, tag_id: str) -> bool:
+        """Add a tag to a cart. Returns True if it was not already there."""
+        pass
+
+    @abstractmethod
+    async def remove(self, cart_id: str, tag_id: str) -> bool:
+        """Remove a tag from a cart. Returns True if it was in the cart."""
+        pass
+
+    @abstractmethod
+    async def contains(self, cart_id: str, tag_id: str) -> bool:
+        """Check whether a tag is in a cart."""
+        pass
+
+    @abstractmethod
+    async def items(self, cart_id: str) -> Dict[str, datetime]:
+        """Get the cart contents as an ordered tag_id -> added_at mapping, oldest first."""
+        pass
+
+    @abstractmethod
+    async def drain(self, cart_id: str) -> Dict[str, datetime]:
+        """Atomically empty a cart and return what it contained."""
+        pass
+
+    @abstractmethod
+    async def expire(self) -> Dict[str, List[str]]:
+        """Drop carts idle for longer than the TTL. Returns cart_id -> tag_ids."""
+        pass
+
+
+class InMemoryCartStore(CartStore):
+    """Process-local cart store backed by ordered dicts."""
+
+    def __init__(self, ttl_seconds: int = 1800):
+        super().__init__(ttl_seconds)
+        self._carts: Dict[str, OrderedDict] = {}
+        self._touched: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _touch(self, cart_id: str) -> None:
+        self._touched[cart_id] = time.monotonic()
+
+    async def add(self, cart_id: str, tag_id: str) -> bool:
+        with self._lock:
+            cart = self._carts.setdefault(cart_id, OrderedDict())
+            self._touch(cart_id)
+            if tag_id in cart:
+                return False
+            cart[tag_id] = datetime.now()
+            return True
+
+    async def remove(self, cart_id: str, tag_id: str) -> bool:
+        with self._lock:
+            cart = self._carts.get(cart_id)
+            if cart is None or tag_id not in cart:
+                return False
+            del cart[tag_id]
+            self._touch(cart_id)
+            return True
+
+    async def contains(self, cart_id: str, tag_id: str) -> bool:
+        with self._lock:
+            return tag_id in self._carts.get(cart_id, ())
+
+    async def items(self, cart_id: str) -> Dict[str, datetime]:
+        with self._lock:
+            return OrderedDict(self._carts.get(cart_id, ()))
+
+    async def drain(self, cart_id: str) -> Dict[str, datetime]:
+        with self._lock:
+            self._touched.pop(cart_id, None)
+            return self._carts.pop(cart_id, OrderedDict())
+
+    async def expire(self) -> Dict[str, List[str]]:
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = {}
+        with self._lock:
+            for cart_id, touched in list(self._touched.items()):
+                if touched < cutoff:
+                    del self._touched[cart_id]
+                    expired[cart_id] = list(self._carts.pop(cart_id, ()))
+        return expired
+
+
+class DatabaseCartStore(CartStore):
+    """Cart store persisted in the ``BathCartItem`` table."""
+
+    shared = True
+
+    async def add(self, cart_id: str, tag_id: str) -> bool:
+        # Only this item's row is touched; expiry goes by the newest
+        # "touchedAt" in the cart. xmax is 0 for a freshly inserted row.
+        async with prisma_client.client as db:
+            rows = await db.query_raw(
+                'INSERT INTO "BathCartItem" ("id", "bathId", "tagId", "addedAt", "touchedAt") '
+                "VALUES ($1, $2, $3, NOW(), NOW()) "
+                'ON CONFLICT ("bathId", "tagId") DO UPDATE SET "touchedAt" = NOW() '
+                'RETURNING (xmax = 0) AS "inserted"',
+                str(uuid.uuid4()),
+                cart_id,
+                tag_id,
+            )
+            return bool(rows and rows[0]["inserted"])
+
+    async def remove(self, cart_id: str, tag_id: str) -> bool:
+        async with prisma_client.client as db:
+            removed = await db.bathcartitem.delete_many(where={"bathId": cart_id, "tagId": tag_id})
+            return removed > 0
+
+    async def contains(self, cart_id: str, tag_id: str) -> bool:
+        async with prisma_client.client as db:
+            row = await db.bathcartitem.find_unique(
+                where={"bathId_tagId": {"bathId": cart_id, "tagId": tag_id}}
+            )
+            return row is not None
+
+    async def items(self, cart_id: str) -> Dict[str, datetime]:
+        async with prisma_client.client as db:
+            rows = await db.bathcartitem.find_many(
+                where={"bathId": cart_id}, order={"addedAt": "asc"}
+            )
+            return OrderedDict((row.tagId, row.addedAt) for row in rows)
+
+    async def drain(self, cart_id: str) -> Dict[str, datetime]:
+        # A single DELETE ... RETURNING so concurrent checkouts cannot both
+        # claim the same items.
+        async with prisma_client.client as db:
+            rows = await db.query_raw(
+                'DELETE FROM "BathCartItem" WHERE "bathId" = $1 RETURNING "tagId", "addedAt"',
+                cart_id,
+            )
+            rows.sort(key=lambda row: str(row["addedAt"]))
+            return OrderedDict((row["tagId"], row["addedAt"]) for row in rows)
+
+    async def expire(self) -> Dict[str, List[str]]:
+        # The cutoff is taken from the database clock that wrote "touchedAt"
+        async with prisma_client.client as db:
+            rows = await db.query_raw(
+                'DELETE FROM "BathCartItem" WHERE "bathId" IN ('
+                '  SELECT "bathId" FROM "BathCartItem" GROUP BY "bathId"'
+                '  HAVING MAX("touchedAt") < NOW() - make_interval(secs => $1)'
+                ') RETURNING "bathId", "tagId"',
+                self.ttl_seconds,
+            )
+        expired: Dict[str, List[str]] = {}
+        for row in rows:
+            expired.setdefault(row["bathId"], []).append(row["tagId"])
+        return expired
+
+
+_cart_store: Optional[CartStore] = None
+
+
+def get_cart_store() -> CartStore:
+    """Get the configured cart store (FastAPI dependency)."""
+    global _cart_store
+    if _cart_store is None:
+        backend = settings.BATH_CART_BACKEND
+        ttl = settings.BATH_CART_TTL_SECONDS
+        if backend == "database":
+            _cart_store = DatabaseCartStore(ttl_seconds=ttl)
+        elif backend == "memory":
+            _cart_store = InMemoryCartStore(ttl_seconds=ttl)
+        else:
+            raise ValueError(f"Unknown bath cart backend: {backend}")
+        logger.info(f"Bath cart store: {backend} (ttl={ttl}s)")
+    return _cart_store
+
+
+async def expire_abandoned_carts(store: CartStore) -> int:
+    """
+    Expire idle carts and release their tags back to REGISTERED.
+
+    Returns:
+        Number of tags released.
+    """
+    expired = await store.expire()
+    for cart_id in expired:
+        cart_totals.reset(cart_id)
+    tag_ids = [tag_id for ids in expired.values() for tag_id in ids]
+    if tag_ids:
+        async with prisma_client.client as db:
+            await db.rfidtag.update_many(
+                where={"id": {"in": tag_ids}, "status": "IN_CART"},
+                data={"status": "REGISTERED"},
+            )
+        logger.info(f"Expired {len(expired)} abandoned bath carts ({len(tag_ids)} tags)")
+    return len(tag_ids)
+
+
+async def run_cart_expiry_loop(interval: float) -> None:
+    """Periodically expire abandoned carts until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await expire_abandoned_carts(get_cart_store())
+        except Exception as e:
+            logger.error(f"Bath cart expiry failed: {e}", exc_info=True)
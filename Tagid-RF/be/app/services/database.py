@@ -2,16 +2,20 @@
 SQLAlchemy database setup for RFID tracking system.
 """
 
-from typing import Generator
+import logging
+from typing import Generator, Optional
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 from app.core.config import get_settings
 
+logger = logging.getLogger(__name__)
+
 settings = get_settings()
 
-# Create SQLAlchemy engine
+# SQLAlchemy engine settings (the engine itself is created by get_engine)
 # Note: For RFID system, we'll use a separate database URL if provided
 # Otherwise, we'll use the same database with a different schema or connection
 # Otherwise, we'll use the same database with a different schema or connection
@@ -21,15 +25,44 @@ RFID_DATABASE_URL = settings.RFID_DATABASE_URL or settings.DATABASE_URL
 if RFID_DATABASE_URL and RFID_DATABASE_URL.startswith("postgresql://"):
     RFID_DATABASE_URL = RFID_DATABASE_URL.replace("postgresql://", "postgresql+psycopg://", 1)
 
-engine = create_engine(
-    RFID_DATABASE_URL,
-    pool_pre_ping=True,
-    echo=getattr(settings, "DEBUG", False),
-    pool_size=getattr(settings, "DATABASE_POOL_SIZE", 5),
-    max_overflow=getattr(settings, "DATABASE_MAX_OVERFLOW", 10),
-)
+_engine: Optional[Engine] = None
+
+
+def get_engine() -> Engine:
+    """
+    Get the SQLAlchemy engine, creating it on first use.
+
+    Creating it loads the database driver, so it is kept out of import time.
+    """
+    global _engine
+    if _engine is None:
+        _engine = create_engine(
+            RFID_DATABASE_URL,
+            pool_pre_ping=True,
+            echo=getattr(settings, "DEBUG", False),
+            pool_size=getattr(settings, "DATABASE_POOL_SIZE", 5),
+            max_overflow=getattr(settings, "DATABASE_MAX_OVERFLOW", 10),
+        )
+    return _engine
+
+
+def __getattr__(name: str):
+    # ``from app.services.database import engine`` keeps working
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+class _LazySessionMaker(sessionmaker):
+    """A sessionmaker that binds to the engine when the first session is made."""
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
+
+SessionLocal = _LazySessionMaker(autocommit=False, autoflush=False)
 
 # Base class for declarative models
 Base = declarative_base()
@@ -52,4 +85,43 @@ def init_db():
     Initialize database by creating all tables.
     Call this on application startup.
     """
+    engine = get_engine()
+    has_trigram = False
+    if engine.dialect.name == "postgresql":
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            has_trigram = True
+        except Exception as e:
+            logger.warning(f"pg_trgm unavailable, tag search will not be indexed: {e}")
+
     Base.metadata.create_all(bind=engine)
+
+    # create_all skips existing tables, so add indexes introduced since they were created
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=engine, checkfirst=True)
+            except Exception as e:
+                logger.warning(f"Could not create index {index.name}: {e}")
+
+    if has_trigram:
+        _create_trigram_indexes()
+
+
+def _create_trigram_indexes():
+    """Create the pg_trgm GIN indexes kept out of create_all."""
+    from app.models.rfid_tag import RFIDTag
+
+    table = RFIDTag.__tablename__
+    for name, column in RFIDTag.trigram_indexes.items():
+        try:
+            with get_engine().begin() as conn:
+                conn.execute(
+                    text(
+                        f"CREATE INDEX IF NOT EXISTS {name} "
+                        f"ON {table} USING gin ({column} gin_trgm_ops)"
+                    )
+                )
+        except Exception as e:
+            logger.warning(f"Could not create index {name}: {e}")
@@ -0,0 +1,266 @@
+"""Streaming bulk export of scan history and tags.
+
+Rows are read with a server-side cursor (``yield_per``) in batches and
+encoded batch by batch, so memory stays flat however many rows are
+exported. Output formats:
+
+- ``ndjson``: one JSON object per line
+- ``csv``: header row, then one line per row
+- ``parquet``: one row group per batch (needs ``pyarrow``)
+
+Exports are ordered by ``id``; a client that is cut off resumes by passing
+the last ``id`` it received as ``after_id``.
+
+Exports run on their own small connection pool (``EXPORT_MAX_CONNECTIONS``)
+so long-running pulls queue against each other instead of taking
+connections from API requests.
+"""
+
+import csv
+import importlib.util
+import io
+import json
+import logging
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Any, Iterator, List, Optional, Sequence
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql import Select
+
+from app.models.rfid_tag import RFIDScanHistory, RFIDTag
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+# pyarrow is only imported when a Parquet export runs; it is heavy to load
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+SCAN_COLUMNS = [
+    RFIDScanHistory.id,
+    RFIDScanHistory.epc,
+    RFIDScanHistory.tid,
+    RFIDScanHistory.rssi,
+    RFIDScanHistory.antenna_port,
+    RFIDScanHistory.frequency,
+    RFIDScanHistory.location,
+    RFIDScanHistory.reader_id,
+    RFIDScanHistory.scanned_at,
+]
+
+TAG_COLUMNS = [
+    RFIDTag.id,
+    RFIDTag.epc,
+    RFIDTag.tid,
+    RFIDTag.rssi,
+    RFIDTag.antenna_port,
+    RFIDTag.read_count,
+    RFIDTag.location,
+    RFIDTag.is_paid,
+    RFIDTag.product_name,
+    RFIDTag.product_sku,
+    RFIDTag.price_cents,
+    RFIDTag.store_id,
+    RFIDTag.is_active,
+    RFIDTag.first_seen,
+    RFIDTag.last_seen,
+    RFIDTag.paid_at,
+]
+
+
+def scan_export_query(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    reader_id: Optional[str] = None,
+    store_id: Optional[int] = None,
+    epc: Optional[str] = None,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> Select:
+    """Scan history rows matching the filters, in id order."""
+    query = select(*SCAN_COLUMNS)
+    if since:
+        query = query.where(RFIDScanHistory.scanned_at >= since)
+    if until:
+        query = query.where(RFIDScanHistory.scanned_at < until)
+    if reader_id:
+        query = query.where(RFIDScanHistory.reader_id == reader_id)
+    if epc:
+        query = query.where(RFIDScanHistory.epc == epc)
+    if store_id is not None:
+        # Scans carry no store; use the store of the scanned tag
+        query = query.where(
+            RFIDScanHistory.epc.in_(select(RFIDTag.epc).where(RFIDTag.store_id == store_id))
+        )
+    if after_id is not None:
+        query = query.where(RFIDScanHistory.id > after_id)
+    query = query.order_by(RFIDScanHistory.id)
+    return query.limit(limit) if limit else query
+
+
+def tag_export_query(
+    seen_since: Optional[datetime] = None,
+    seen_until: Optional[datetime] = None,
+    store_id: Optional[int] = None,
+    epc: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    is_paid: Optional[bool] = None,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> Select:
+    """Tags matching the filters, in id order."""
+    query = select(*TAG_COLUMNS)
+    if seen_since:
+        query = query.where(RFIDTag.last_seen >= seen_since)
+    if seen_until:
+        query = query.where(RFIDTag.last_seen < seen_until)
+    if store_id is not None:
+        query = query.where(RFIDTag.store_id == store_id)
+    if epc:
+        query = query.where(RFIDTag.epc == epc)
+    if is_active is not None:
+        query = query.where(RFIDTag.is_active == is_active)
+    if is_paid is not None:
+        query = query.where(RFIDTag.is_paid == is_paid)
+    if after_id is not None:
+        query = query.where(RFIDTag.id > after_id)
+    query = query.order_by(RFIDTag.id)
+    return query.limit(limit) if limit else query
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def encode_ndjson(columns: Sequence, batches: Iterator[List[Sequence]]) -> Iterator[bytes]:
+    names = [column.key for column in columns]
+    for batch in batches:
+        yield "".join(
+            json.dumps(dict(zip(names, row)), default=_json_default) + "\n" for row in batch
+        ).encode()
+
+
+def encode_csv(columns: Sequence, batches: Iterator[List[Sequence]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.key for column in columns])
+    for batch in batches:
+        writer.writerows(
+            [value.isoformat() if isinstance(value, datetime) else value for value in row]
+            for row in batch
+        )
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object collecting bytes until they are taken."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _arrow_type(column) -> "pa.DataType":
+    import pyarrow as pa
+
+    python_type = column.type.python_type
+    if python_type is bool:
+        return pa.bool_()
+    if python_type is int:
+        return pa.int64()
+    if python_type is float:
+        return pa.float64()
+    if python_type is datetime:
+        return pa.timestamp("us", tz="UTC")
+    return pa.string()
+
+
+def encode_parquet(columns: Sequence, batches: Iterator[List[Sequence]]) -> Iterator[bytes]:
+    if not PARQUET_AVAILABLE:
+        raise RuntimeError("pyarrow is not installed. Run: pip install pyarrow")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(column.key, _arrow_type(column)) for column in columns])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    for batch in batches:
+        data = {name: [row[i] for row in batch] for i, name in enumerate(schema.names)}
+        writer.write_table(pa.Table.from_pydict(data, schema=schema))
+        yield sink.take()
+    writer.close()
+    yield sink.take()
+
+
+ENCODERS = {"ndjson": encode_ndjson, "csv": encode_csv, "parquet": encode_parquet}
+
+
+def stream_export(
+    session_factory: sessionmaker, query: Select, fmt: str, batch_size: int = 5000
+) -> Iterator[bytes]:
+    """
+    Run ``query`` on a fresh session and yield the encoded export.
+
+    The session lives for the duration of the stream, independent of the
+    request's own session.
+    """
+    session: Session = session_factory()
+    rows = 0
+    try:
+        result = session.execute(query.execution_options(yield_per=batch_size))
+
+        def batches():
+            nonlocal rows
+            for partition in result.partitions():
+                rows += len(partition)
+                yield partition
+
+        yield from ENCODERS[fmt](list(query.selected_columns), batches())
+    finally:
+        session.close()
+        logger.info(f"Export finished: {rows} rows as {fmt}")
+
+
+_export_sessions: Optional[sessionmaker] = None
+
+
+def get_export_sessionmaker() -> sessionmaker:
+    """Sessions on the dedicated export pool (FastAPI dependency)."""
+    global _export_sessions
+    if _export_sessions is None:
+        from app.core.config import settings
+        from app.services.database import RFID_DATABASE_URL
+
+        engine = create_engine(
+            RFID_DATABASE_URL,
+            pool_pre_ping=True,
+            pool_size=settings.EXPORT_MAX_CONNECTIONS,
+            max_overflow=0,
+        )
+        _export_sessions = sessionmaker(bind=engine, autoflush=False)
+    return _export_sessions
@@ -0,0 +1,278 @@
+"""Gate traversal detection from reader push streams.
+
+GATE readers report every read of a tag as it is carried through. Instead of
+treating each read as an exit, reads are folded into one pass per
+(gate, EPC):
+
+- ``GateTraversalTracker`` keeps O(1) state per tag in front of a gate: read
+  count, first/last read time and, per side of the gate, the strongest RSSI
+  and when it was seen. A pass ends once the tag has not been read for
+  ``pass_timeout_seconds`` (or has been in front of the gate for
+  ``max_pass_seconds``), and yields exactly one ``Traversal``.
+- Direction comes from the order in which the tag peaked on the two sides:
+  closest to an inside antenna first, then to an outside one, is an exit.
+  Passes seen on one side only (e.g. single-antenna gates) have an unknown
+  direction.
+- ``GateTraversalMonitor`` broadcasts a ``traversal`` event per pass and
+  runs the payment check and theft alert once for passes that may be exits.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.routers.websocket import manager
+
+logger = logging.getLogger(__name__)
+
+ENTRY = "entry"
+EXIT = "exit"
+UNKNOWN = "unknown"
+
+INSIDE = "inside"
+OUTSIDE = "outside"
+
+
+@dataclass
+class Traversal:
+    """One pass of a tag through a gate."""
+
+    gate_id: str
+    epc: str
+    direction: str
+    dwell_seconds: float
+    reads: int
+    sides: List[str]
+    peak_rssi: Optional[float]
+    context: Any = None
+
+    def as_event(self) -> Dict[str, Any]:
+        return {
+            "gate_id": self.gate_id,
+            "epc": self.epc,
+            "direction": self.direction,
+            "dwell_seconds": round(self.dwell_seconds, 3),
+            "reads": self.reads,
+            "sides": self.sides,
+            "peak_rssi": self.peak_rssi,
+        }
+
+
+@dataclass
+class _Pass:
+    first_seen: float
+    last_seen: float
+    reads: int = 0
+    # side -> (peak rssi, when, first read)
+    peaks: Dict[str, Tuple[Optional[float], float, float]] = field(default_factory=dict)
+    context: Any = None
+
+
+class GateTraversalTracker:
+    """Per (gate, EPC) pass detection with time-based eviction."""
+
+    def __init__(
+        self,
+        inside_antennas: Iterable[int] = (1,),
+        outside_antennas: Iterable[int] = (2,),
+        pass_timeout_seconds: float = 2.0,
+        max_pass_seconds: float = 30.0,
+    ):
+        self._sides = {antenna: INSIDE for antenna in inside_antennas}
+        self._sides.update({antenna: OUTSIDE for antenna in outside_antennas})
+        self.pass_timeout_seconds = pass_timeout_seconds
+        self.max_pass_seconds = max_pass_seconds
+        # Least recently read first, so eviction only looks at the front
+        self._passes: "OrderedDict[Tuple[str, str], _Pass]" = OrderedDict()
+
+    def on_read(
+        self,
+        gate_id: str,
+        epc: str,
+        antenna: Optional[int] = None,
+        rssi: Optional[float] = None,
+        now: Optional[float] = None,
+        context: Any = None,
+    ) -> Optional[Traversal]:
+        """
+        Record a read.
+
+        Returns:
+            The tag's previous pass through this gate, if this read starts a
+            new one (the tag went quiet, or the pass ran too long).
+        """
+        now = time.monotonic() if now is None else now
+        key = (gate_id, epc)
+        finished = None
+
+        current = self._passes.get(key)
+        if current is not None and (
+            now - current.last_seen > self.pass_timeout_seconds
+            or now - current.first_seen > self.max_pass_seconds
+        ):
+            finished = self._finish(key, self._passes.pop(key))
+            current = None
+        if current is None:
+            current = self._passes[key] = _Pass(first_seen=now, last_seen=now)
+        else:
+            self._passes.move_to_end(key)
+
+        current.reads += 1
+        current.last_seen = now
+        if context is not None:
+            current.context = context
+
+        side = self._sides.get(antenna)
+        if side:
+            peak = current.peaks.get(side)
+            if peak is None:
+                current.peaks[side] = (rssi, now, now)
+            elif rssi is not None and (peak[0] is None or rssi > peak[0]):
+                current.peaks[side] = (rssi, now, peak[2])
+        return finished
+
+    def sweep(self, now: Optional[float] = None) -> List[Traversal]:
+        """End the passes of tags that stopped being read."""
+        now = time.monotonic() if now is None else now
+        finished = []
+        while self._passes:
+            key, current = next(iter(self._passes.items()))
+            if now - current.last_seen <= self.pass_timeout_seconds:
+                break
+            del self._passes[key]
+            finished.append(self._finish(key, current))
+        return finished
+
+    @property
+    def active_count(self) -> int:
+        return len(self._passes)
+
+    def _finish(self, key: Tuple[str, str], current: _Pass) -> Traversal:
+        inside = current.peaks.get(INSIDE)
+        outside = current.peaks.get(OUTSIDE)
+        if inside and outside:
+            # Compare when the tag was closest to each side; fall back to read order
+            inside_order = (inside[1], inside[2])
+            outside_order = (outside[1], outside[2])
+            if inside_order == outside_order:
+                direction = UNKNOWN
+            else:
+                direction = EXIT if inside_order < outside_order else ENTRY
+        else:
+            direction = UNKNOWN
+
+        rssis = [peak[0] for peak in current.peaks.values() if peak[0] is not None]
+        return Traversal(
+            gate_id=key[0],
+            epc=key[1],
+            direction=direction,
+            dwell_seconds=current.last_seen - current.first_seen,
+            reads=current.reads,
+            sides=sorted(current.peaks),
+            peak_rssi=max(rssis) if rssis else None,
+            context=current.context,
+        )
+
+
+class GateTraversalMonitor:
+    """Turns GATE reader streams into traversal events and per-pass theft checks."""
+
+    def __init__(self, tracker: Optional[GateTraversalTracker] = None):
+        self.tracker = tracker or GateTraversalTracker()
+
+    def configure(
+        self,
+        inside_antennas: Iterable[int],
+        outside_antennas: Iterable[int],
+        pass_timeout_seconds: float,
+        max_pass_seconds: float,
+    ) -> None:
+        """Replace the tracker with one using the given gate layout and thresholds."""
+        self.tracker = GateTraversalTracker(
+            inside_antennas=inside_antennas,
+            outside_antennas=outside_antennas,
+            pass_timeout_seconds=pass_timeout_seconds,
+            max_pass_seconds=max_pass_seconds,
+        )
+
+    async def on_read(self, reader: Any, tag_payload: Dict[str, Any]) -> None:
+        """
+        Handle one pushed read from a GATE reader.
+
+        Args:
+            reader: The ``RfidReader`` the read came from.
+            tag_payload: The ``tag_scanned`` payload broadcast for the read.
+        """
+        finished = self.tracker.on_read(
+            reader.id,
+            tag_payload["epc"],
+            antenna=tag_payload.get("antenna_port"),
+            rssi=tag_payload.get("rssi"),
+            context=(reader, tag_payload),
+        )
+        if finished:
+            await self._handle(finished)
+
+    async def sweep(self) -> int:
+        """Finish passes of tags that left their gate. Returns the number finished."""
+        finished = self.tracker.sweep()
+        for traversal in finished:
+            await self._handle(traversal)
+        return len(finished)
+
+    async def _handle(self, traversal: Traversal) -> None:
+        reader, tag_payload = traversal.context
+        logger.info(
+            f"Gate {traversal.gate_id}: {traversal.epc} {traversal.direction} "
+            f"({traversal.reads} reads over {traversal.dwell_seconds:.1f}s)"
+        )
+        await manager.broadcast({"type": "traversal", "data": traversal.as_event()})
+
+        if traversal.direction == ENTRY:
+            return
+        await self._check_payment(traversal, reader, tag_payload)
+
+    async def _check_payment(
+        self, traversal: Traversal, reader: Any, tag_payload: Dict[str, Any]
+    ) -> None:
+        from app.services.theft_detection import TheftDetectionService
+
+        reader_ip = tag_payload.get("reader_ip")
+        is_paid = await TheftDetectionService().check_tag_payment_status(
+            traversal.epc, location=f"{reader.name} ({reader_ip})"
+        )
+        if is_paid:
+            return
+
+        # Additional real-time notification via WebSocket (Service handles DB/SMS/Push)
+        item = tag_payload.get("product_name") or traversal.epc
+        await manager.broadcast(
+            {
+                "type": "theft_alert",
+                "data": {
+                    "message": f"Unpaid item detected at {reader.name}: {item}",
+                    "tag": tag_payload,
+                    "traversal": traversal.as_event(),
+                    "severity": "critical",
+                    "timestamp": datetime.now().isoformat(),
+                    "location": reader.location or reader.name,
+                },
+            }
+        )
+
+    async def run(self, interval: float = 0.5) -> None:
+        """Sweep for finished passes until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Gate traversal sweep failed: {e}", exc_info=True)
+
+
+# Singleton instance
+gate_traversal_monitor = GateTraversalMonitor()
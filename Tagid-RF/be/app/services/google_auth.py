@@ -0,0 +1,171 @@
+"""Google ID-token verification with a cached signing-key set.
+
+``id_token.verify_oauth2_token`` fetches Google's signing certificates on
+every call through the transport it is given. ``GoogleKeyStore`` is that
+transport: it answers certificate fetches from memory until the response's
+``Cache-Control: max-age`` runs out, so signatures are checked locally and
+Google is only contacted when its keys rotate.
+
+``GoogleTokenVerifier`` wraps verification, runs it off the event loop and
+keeps latency figures for the login endpoint's logs.
+"""
+
+import asyncio
+import logging
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import requests
+from google.auth import transport
+from google.auth.transport import requests as google_requests
+from google.oauth2 import id_token
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_CERTS_URLS = (
+    "https://www.googleapis.com/oauth2/v1/certs",
+    "https://www.googleapis.com/oauth2/v3/certs",
+)
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+def parse_max_age(cache_control: Optional[str], default: int) -> int:
+    """Get ``max-age`` (seconds) from a Cache-Control header, or the default."""
+    if cache_control:
+        if "no-store" in cache_control or "no-cache" in cache_control:
+            return 0
+        match = _MAX_AGE_RE.search(cache_control)
+        if match:
+            return int(match.group(1))
+    return default
+
+
+class GoogleKeyStore(transport.Request):
+    """
+    google-auth transport that caches certificate responses in memory.
+
+    Args:
+        certs_url: Fetch Google's keys from this URL instead (a mirror, or a
+            stand-in server in tests).
+        default_max_age: Cache lifetime when the response has no max-age.
+        session: ``requests.Session`` for keep-alive on refreshes.
+    """
+
+    def __init__(
+        self,
+        certs_url: Optional[str] = None,
+        default_max_age: int = 300,
+        session: Optional[requests.Session] = None,
+    ):
+        self.certs_url = certs_url
+        self.default_max_age = default_max_age
+        self._transport = google_requests.Request(session or requests.Session())
+        self._cache: Dict[str, Tuple[Any, float]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.refreshes = 0
+
+    def __call__(self, url, method="GET", body=None, headers=None, timeout=None, **kwargs):
+        if method != "GET":
+            return self._transport(url, method=method, body=body, headers=headers, **kwargs)
+
+        if self.certs_url and url in GOOGLE_CERTS_URLS:
+            url = self.certs_url
+
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(url)
+            if cached and cached[1] > now:
+                self.hits += 1
+                return cached[0]
+
+            # Refresh under the lock so concurrent logins share one fetch
+            response = self._transport(url, method="GET", headers=headers, timeout=timeout or 10)
+            self.refreshes += 1
+            if response.status == 200:
+                max_age = parse_max_age(response.headers.get("cache-control"), self.default_max_age)
+                self._cache[url] = (response, now + max_age)
+                logger.info(f"Refreshed Google signing keys from {url} (max-age {max_age}s)")
+            return response
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+class GoogleTokenVerifier:
+    """Verifies Google ID tokens against the cached key set."""
+
+    def __init__(
+        self,
+        client_id: Optional[str],
+        clock_skew_seconds: int = 0,
+        key_store: Optional[GoogleKeyStore] = None,
+        latency_window: int = 500,
+    ):
+        self.client_id = client_id
+        self.clock_skew_seconds = clock_skew_seconds
+        self.key_store = key_store or GoogleKeyStore()
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Verify a Google ID token (blocking on the first key fetch only).
+
+        Raises:
+            ValueError: If the token is invalid or expired.
+            google.auth.exceptions.GoogleAuthError: If the issuer is wrong.
+        """
+        started = time.perf_counter()
+        try:
+            return id_token.verify_oauth2_token(
+                token,
+                self.key_store,
+                self.client_id,
+                clock_skew_in_seconds=self.clock_skew_seconds,
+            )
+        finally:
+            self._latencies.append((time.perf_counter() - started) * 1000)
+
+    async def verify_async(self, token: str) -> Dict[str, Any]:
+        """Verify a token in a worker thread so key refreshes never block the loop."""
+        return await asyncio.to_thread(self.verify, token)
+
+    @property
+    def last_latency_ms(self) -> Optional[float]:
+        return self._latencies[-1] if self._latencies else None
+
+    def stats(self) -> Dict[str, Any]:
+        """Verification latency percentiles and key cache counters."""
+        samples = sorted(self._latencies)
+        result: Dict[str, Any] = {
+            "verifications": len(samples),
+            "key_cache_hits": self.key_store.hits,
+            "key_refreshes": self.key_store.refreshes,
+        }
+        if samples:
+            result["p50_ms"] = round(samples[len(samples) // 2], 3)
+            result["p95_ms"] = round(samples[max(int(len(samples) * 0.95) - 1, 0)], 3)
+            result["max_ms"] = round(samples[-1], 3)
+        return result
+
+
+_verifier: Optional[GoogleTokenVerifier] = None
+
+
+def get_google_token_verifier() -> GoogleTokenVerifier:
+    """Get the process-wide verifier, configured from settings."""
+    global _verifier
+    if _verifier is None:
+        from app.core.config import settings
+
+        _verifier = GoogleTokenVerifier(
+            client_id=settings.GOOGLE_CLIENT_ID,
+            clock_skew_seconds=settings.GOOGLE_TOKEN_TIMEOUT,
+            key_store=GoogleKeyStore(certs_url=settings.GOOGLE_CERTS_URL),
+        )
+    return _verifier
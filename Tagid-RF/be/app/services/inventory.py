@@ -4,16 +4,94 @@ Provides functions for:
 - Taking inventory snapshots from readers
 - Retrieving inventory history
 - Calculating stock levels
+
+Current stock is derived from the latest snapshot of every reader. Rather than
+walking readers one by one, the latest snapshot per reader is resolved in a
+single ``DISTINCT ON`` query, and a per-reader ``StoreStock`` row is upserted as
+each snapshot arrives so store totals can be read without touching snapshots.
 """
 
 import logging
+from collections import defaultdict
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from app.db.prisma import prisma_client
 
 logger = logging.getLogger(__name__)
 
+# Latest snapshot per reader, joined to every reader so readers that never
+# reported still count towards readerCount. Items are never touched here.
+LATEST_STOCK_SQL = """
+SELECT r."id" AS "readerId", r."name" AS "readerName", r."location", r."storeId",
+       s."id" AS "snapshotId", s."itemCount", s."timestamp"
+FROM "RfidReader" r
+LEFT JOIN (
+    SELECT DISTINCT ON ("readerId") "id", "readerId", "itemCount", "timestamp"
+    FROM "InventorySnapshot"
+    ORDER BY "readerId", "timestamp" DESC
+) s ON s."readerId" = r."id"
+WHERE $1::text IS NULL OR r."storeId" = $1
+ORDER BY r."name", r."id"
+"""
+
+# Item counts of the latest snapshots grouped by store and product.
+STOCK_BY_PRODUCT_SQL = """
+WITH latest AS (
+    SELECT DISTINCT ON ("readerId") "id", "readerId"
+    FROM "InventorySnapshot"
+    ORDER BY "readerId", "timestamp" DESC
+)
+SELECT r."storeId", t."productId", COUNT(i."id")::int AS "itemCount"
+FROM latest l
+JOIN "RfidReader" r ON r."id" = l."readerId"
+JOIN "InventorySnapshotItem" i ON i."snapshotId" = l."id"
+LEFT JOIN "RfidTag" t ON t."id" = i."tagId"
+WHERE $1::text IS NULL OR r."storeId" = $1
+GROUP BY r."storeId", t."productId"
+ORDER BY r."storeId", t."productId"
+"""
+
+# Incremental refresh of the materialized stock row for a single reader.
+# Older snapshots never overwrite newer ones.
+UPSERT_STORE_STOCK_SQL = """
+INSERT INTO "StoreStock" ("readerId", "storeId", "snapshotId", "itemCount", "snapshotAt", "updatedAt")
+SELECT r."id", r."storeId", $2, $3, $4::timestamp, NOW()
+FROM "RfidReader" r
+WHERE r."id" = $1
+ON CONFLICT ("readerId") DO UPDATE SET
+    "storeId" = EXCLUDED."storeId",
+    "snapshotId" = EXCLUDED."snapshotId",
+    "itemCount" = EXCLUDED."itemCount",
+    "snapshotAt" = EXCLUDED."snapshotAt",
+    "updatedAt" = NOW()
+WHERE "StoreStock"."snapshotAt" <= EXCLUDED."snapshotAt"
+"""
+
+# Full rebuild of the materialized table from snapshots (backfill / repair).
+REBUILD_STORE_STOCK_SQL = """
+INSERT INTO "StoreStock" ("readerId", "storeId", "snapshotId", "itemCount", "snapshotAt", "updatedAt")
+SELECT DISTINCT ON (s."readerId") s."readerId", r."storeId", s."id", s."itemCount", s."timestamp", NOW()
+FROM "InventorySnapshot" s
+JOIN "RfidReader" r ON r."id" = s."readerId"
+ORDER BY s."readerId", s."timestamp" DESC
+ON CONFLICT ("readerId") DO UPDATE SET
+    "storeId" = EXCLUDED."storeId",
+    "snapshotId" = EXCLUDED."snapshotId",
+    "itemCount" = EXCLUDED."itemCount",
+    "snapshotAt" = EXCLUDED."snapshotAt",
+    "updatedAt" = NOW()
+"""
+
+STOCK_GROUPS = ("store", "product")
+
+
+def _iso(value: Any) -> Optional[str]:
+    """Normalize a raw-query timestamp (datetime or string) to ISO format."""
+    if value is None:
+        return None
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
 
 async def take_snapshot(reader_id: str, tags: List[dict]) -> Optional[str]:
     """
@@ -29,11 +107,12 @@ async def take_snapshot(reader_id: str, tags: List[dict]) -> Optional[str]:
     try:
         async with prisma_client.client as db:
             # Create snapshot record
+            timestamp = datetime.utcnow()
             snapshot = await db.inventorysnapshot.create(
                 data={
                     "readerId": reader_id,
                     "itemCount": len(tags),
-                    "timestamp": datetime.utcnow(),
+                    "timestamp": timestamp,
                 }
             )
 
@@ -59,6 +138,8 @@ async def take_snapshot(reader_id: str, tags: List[dict]) -> Optional[str]:
                     # Tag not registered - log warning
                     logger.warning(f"Unknown tag scanned: {epc}")
 
+            await _refresh_store_stock(db, reader_id, snapshot.id, len(tags), timestamp)
+
             logger.info(f"Snapshot created: {snapshot.id} with {len(tags)} items")
             return snapshot.id
 
@@ -67,26 +148,51 @@ async def take_snapshot(reader_id: str, tags: List[dict]) -> Optional[str]:
         return None
 
 
-async def get_latest_snapshot(reader_id: str) -> Optional[dict]:
+async def _refresh_store_stock(
+    db: Any, reader_id: str, snapshot_id: str, item_count: int, timestamp: datetime
+) -> None:
+    """
+    Upsert the materialized stock row for a reader after a new snapshot.
+
+    Failures are logged but never fail the snapshot itself; the table can be
+    rebuilt at any time with ``rebuild_store_stock``.
+    """
+    try:
+        await db.execute_raw(
+            UPSERT_STORE_STOCK_SQL, reader_id, snapshot_id, item_count, timestamp.isoformat()
+        )
+    except Exception as e:
+        logger.warning(f"Failed to refresh store stock for reader {reader_id}: {e}")
+
+
+async def get_latest_snapshot(reader_id: str, include_items: bool = True) -> Optional[dict]:
     """
     Get the most recent inventory snapshot for a reader.
+
+    Args:
+        reader_id: The ID of the RFID reader.
+        include_items: Whether to load the snapshot items as well.
     """
     try:
         async with prisma_client.client as db:
             snapshot = await db.inventorysnapshot.find_first(
                 where={"readerId": reader_id},
                 order={"timestamp": "desc"},
-                include={"items": True},
+                include={"items": True} if include_items else None,
             )
 
             if snapshot:
-                return {
+                result = {
                     "id": snapshot.id,
                     "readerId": snapshot.readerId,
                     "timestamp": snapshot.timestamp.isoformat(),
                     "itemCount": snapshot.itemCount,
-                    "items": [{"epc": item.epc, "rssi": item.rssi} for item in snapshot.items],
                 }
+                if include_items:
+                    result["items"] = [
+                        {"epc": item.epc, "rssi": item.rssi} for item in snapshot.items
+                    ]
+                return result
             return None
 
     except Exception as e:
@@ -120,39 +226,143 @@ async def get_inventory_history(reader_id: str, limit: int = 10) -> List[dict]:
         return []
 
 
-async def get_current_stock(store_id: Optional[str] = None) -> dict:
+async def get_current_stock(
+    store_id: Optional[str] = None,
+    group_by: Optional[str] = None,
+    include_items: bool = False,
+) -> dict:
     """
     Get current stock levels based on the latest snapshots from all readers.
+
+    The latest snapshot of every reader is resolved in one query; snapshot
+    items are only loaded when ``include_items`` is set (one extra query for
+    all readers) or when grouping by product.
+
+    Args:
+        store_id: Restrict to readers of a single store.
+        group_by: Optional extra breakdown, ``"store"`` or ``"product"``.
+        include_items: Attach the item list of each reader's latest snapshot.
+
+    Returns:
+        Dict with ``totalItems``, ``readerCount``, ``readers`` and, when
+        grouping was requested, ``groups``.
     """
+    if group_by is not None and group_by not in STOCK_GROUPS:
+        raise ValueError(f"Unsupported group_by: {group_by}")
+
     try:
         async with prisma_client.client as db:
-            # Get all readers (optionally filtered by store)
-            where_clause = {"storeId": store_id} if store_id else {}
-            readers = await db.rfidreader.find_many(where=where_clause)
+            rows = await db.query_raw(LATEST_STOCK_SQL, store_id)
 
             total_items = 0
             reader_summaries = []
+            for row in rows:
+                if row.get("snapshotId") is None:
+                    continue
+                total_items += row["itemCount"]
+                reader_summaries.append(
+                    {
+                        "readerId": row["readerId"],
+                        "readerName": row["readerName"],
+                        "location": row.get("location"),
+                        "storeId": row.get("storeId"),
+                        "itemCount": row["itemCount"],
+                        "lastScan": _iso(row["timestamp"]),
+                        "snapshotId": row["snapshotId"],
+                    }
+                )
 
-            for reader in readers:
-                latest = await get_latest_snapshot(reader.id)
-                if latest:
-                    total_items += latest["itemCount"]
-                    reader_summaries.append(
-                        {
-                            "readerId": reader.id,
-                            "readerName": reader.name,
-                            "location": reader.location,
-                            "itemCount": latest["itemCount"],
-                            "lastScan": latest["timestamp"],
-                        }
-                    )
+            if include_items and reader_summaries:
+                items = await db.inventorysnapshotitem.find_many(
+                    where={"snapshotId": {"in": [r["snapshotId"] for r in reader_summaries]}}
+                )
+                by_snapshot: Dict[str, List[dict]] = defaultdict(list)
+                for item in items:
+                    by_snapshot[item.snapshotId].append({"epc": item.epc, "tagId": item.tagId})
+                for summary in reader_summaries:
+                    summary["items"] = by_snapshot.get(summary["snapshotId"], [])
 
-            return {
+            result = {
                 "totalItems": total_items,
-                "readerCount": len(readers),
+                "readerCount": len(rows),
                 "readers": reader_summaries,
             }
 
+            if group_by == "store":
+                result["groups"] = _group_by_store(reader_summaries)
+            elif group_by == "product":
+                product_rows = await db.query_raw(STOCK_BY_PRODUCT_SQL, store_id)
+                result["groups"] = [
+                    {
+                        "storeId": row.get("storeId"),
+                        "productId": row.get("productId"),
+                        "itemCount": row["itemCount"],
+                    }
+                    for row in product_rows
+                ]
+
+            return result
+
     except Exception as e:
         logger.error(f"Failed to get stock: {e}", exc_info=True)
         return {"totalItems": 0, "readerCount": 0, "readers": []}
+
+
+def _group_by_store(reader_summaries: List[dict]) -> List[dict]:
+    """Sum reader summaries per store."""
+    totals: Dict[Optional[str], dict] = {}
+    for summary in reader_summaries:
+        group = totals.setdefault(
+            summary["storeId"], {"storeId": summary["storeId"], "itemCount": 0, "readerCount": 0}
+        )
+        group["itemCount"] += summary["itemCount"]
+        group["readerCount"] += 1
+    return list(totals.values())
+
+
+async def get_store_stock(store_id: Optional[str] = None) -> List[dict]:
+    """
+    Get per-store stock totals from the materialized ``StoreStock`` table.
+
+    This never touches snapshots, so it stays cheap regardless of history size.
+    """
+    try:
+        async with prisma_client.client as db:
+            where = {"storeId": store_id} if store_id else {}
+            rows = await db.storestock.find_many(where=where)
+
+            totals: Dict[Optional[str], dict] = {}
+            for row in rows:
+                group = totals.setdefault(
+                    row.storeId,
+                    {"storeId": row.storeId, "itemCount": 0, "readerCount": 0, "lastScan": None},
+                )
+                group["itemCount"] += row.itemCount
+                group["readerCount"] += 1
+                last_scan = row.snapshotAt.isoformat()
+                if group["lastScan"] is None or last_scan > group["lastScan"]:
+                    group["lastScan"] = last_scan
+
+            return list(totals.values())
+
+    except Exception as e:
+        logger.error(f"Failed to get store stock: {e}", exc_info=True)
+        return []
+
+
+async def rebuild_store_stock() -> int:
+    """
+    Rebuild the materialized ``StoreStock`` table from the latest snapshots.
+
+    Returns:
+        Number of rows written, or -1 on failure.
+    """
+    try:
+        async with prisma_client.client as db:
+            count = await db.execute_raw(REBUILD_STORE_STOCK_SQL)
+            logger.info(f"Store stock rebuilt: {count} readers")
+            return count
+
+    except Exception as e:
+        logger.error(f"Failed to rebuild store stock: {e}", exc_info=True)
+        return -1
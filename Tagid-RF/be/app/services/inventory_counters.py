@@ -0,0 +1,216 @@
+"""Incremental per-product inventory counters.
+
+``GET /inventory/summary`` used to group every row of ``rfid_tags`` on each
+call. ``InventoryCounters`` keeps total and sold counts per product
+(SKU, name, price) in memory instead:
+
+- Writers capture ``tag_state(tag)`` before changing a tag and call
+  ``record_tag_change(before, tag_state(tag))`` after committing. Creating,
+  paying, unpaying, deactivating and re-pricing a tag are all state changes.
+- Only active tags with a SKU or a name are counted.
+- ``reconcile`` periodically re-reads the counts from the database, replaces
+  the in-memory ones and keeps a report of the drift it corrected.
+"""
+
+import asyncio
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.models.rfid_tag import RFIDTag
+
+logger = logging.getLogger(__name__)
+
+# (product_sku, product_name, price_cents)
+ProductKey = Tuple[Optional[str], Optional[str], Optional[int]]
+# (product, is_paid) for a counted tag, None for a tag outside the inventory
+TagState = Optional[Tuple[ProductKey, bool]]
+
+
+def tag_state(tag: Optional[RFIDTag]) -> TagState:
+    """The inventory state of ``tag``; None if it is not counted."""
+    if tag is None or not tag.is_active:
+        return None
+    if tag.product_sku is None and tag.product_name is None:
+        return None
+    return (tag.product_sku, tag.product_name, tag.price_cents), bool(tag.is_paid)
+
+
+class InventoryCounters:
+    """Per-product tag counts, updated on tag changes and reconciled against the DB."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget everything; the next read triggers a reconciliation."""
+        with self._lock:
+            # product -> [total, sold]
+            self._counts: Dict[ProductKey, List[int]] = {}
+            self.reconciled_at: Optional[datetime] = None
+            self.last_drift: Dict[str, Any] = {"products": [], "total_items": 0, "sold_items": 0}
+
+    @property
+    def is_reconciled(self) -> bool:
+        return self.reconciled_at is not None
+
+    def _adjust(self, state: TagState, delta: int) -> None:
+        if state is None:
+            return
+        product, is_paid = state
+        counts = self._counts.setdefault(product, [0, 0])
+        counts[0] += delta
+        if is_paid:
+            counts[1] += delta
+        if counts[0] <= 0 and counts[1] <= 0:
+            del self._counts[product]
+
+    def record_change(self, before: TagState, after: TagState) -> None:
+        """
+        Account for one tag moving from ``before`` to ``after``.
+
+        Pass ``before=None`` for a new tag and ``after=None`` for a tag that
+        left the inventory (deactivated or stripped of its product).
+        """
+        if before == after:
+            return
+        with self._lock:
+            self._adjust(before, -1)
+            self._adjust(after, 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current summary in the shape of ``InventoryResponse``."""
+        with self._lock:
+            items = sorted(self._counts.items(), key=lambda item: tuple(map(str, item[0])))
+
+        products = []
+        total_value = 0
+        for (sku, name, price), (total, sold) in items:
+            available = total - sold
+            # Inventory value is the value of the items still on the shelf
+            total_value += available * (price or 0)
+            products.append(
+                {
+                    "product_sku": sku,
+                    "product_name": name,
+                    "total_items": total,
+                    "available_items": available,
+                    "sold_items": sold,
+                    "price_cents": price,
+                }
+            )
+        return {
+            "products": products,
+            "total_products": len(products),
+            "total_value_cents": total_value,
+        }
+
+    def reconcile(self, db: Session) -> Dict[str, Any]:
+        """
+        Reload the counts from the database and return the drift report.
+
+        Runs the GROUP BY the summary endpoint used to run per request; this
+        is only done on startup, periodically and on demand.
+        """
+        rows = (
+            db.query(
+                RFIDTag.product_sku,
+                RFIDTag.product_name,
+                RFIDTag.price_cents,
+                func.count(RFIDTag.id).label("total"),
+                func.sum(case((RFIDTag.is_paid.is_(True), 1), else_=0)).label("sold"),
+            )
+            .filter(RFIDTag.is_active.is_(True))
+            .filter((RFIDTag.product_sku.isnot(None)) | (RFIDTag.product_name.isnot(None)))
+            .group_by(RFIDTag.product_sku, RFIDTag.product_name, RFIDTag.price_cents)
+            .all()
+        )
+        counts = {
+            (row.product_sku, row.product_name, row.price_cents): [row.total, row.sold or 0]
+            for row in rows
+        }
+        now = datetime.now(timezone.utc)
+
+        with self._lock:
+            drifted = []
+            for product in sorted(
+                set(counts) | set(self._counts), key=lambda key: tuple(map(str, key))
+            ):
+                expected = counts.get(product, [0, 0])
+                counted = self._counts.get(product, [0, 0])
+                if expected != counted:
+                    drifted.append(
+                        {
+                            "product_sku": product[0],
+                            "product_name": product[1],
+                            "price_cents": product[2],
+                            "total_drift": counted[0] - expected[0],
+                            "sold_drift": counted[1] - expected[1],
+                        }
+                    )
+            # The first reconciliation has nothing to compare against
+            if self.reconciled_at is None:
+                drifted = []
+            self._counts = counts
+            self.last_drift = {
+                "products": drifted,
+                "total_items": sum(abs(d["total_drift"]) for d in drifted),
+                "sold_items": sum(abs(d["sold_drift"]) for d in drifted),
+            }
+            self.reconciled_at = now
+            report = self.drift_report()
+
+        if drifted:
+            logger.warning(
+                f"Inventory counters drifted on {len(drifted)} products "
+                f"(total={report['total_items']}, sold={report['sold_items']}); corrected"
+            )
+        else:
+            logger.info(f"Inventory counters reconciled: {len(counts)} products, no drift")
+        return report
+
+    def drift_report(self) -> Dict[str, Any]:
+        """The corrections made by the last reconciliation."""
+        return {
+            "reconciled_at": self.reconciled_at,
+            "drifted_products": len(self.last_drift["products"]),
+            "total_items": self.last_drift["total_items"],
+            "sold_items": self.last_drift["sold_items"],
+            "products": [dict(product) for product in self.last_drift["products"]],
+        }
+
+
+inventory_counters = InventoryCounters()
+
+
+def record_tag_change(before: TagState, after: TagState) -> None:
+    """Feed a committed tag change to the counters; never fails the caller."""
+    try:
+        inventory_counters.record_change(before, after)
+    except Exception as e:
+        logger.warning(f"Failed to record inventory change: {e}")
+
+
+def _reconcile_with_new_session() -> None:
+    from app.services.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        inventory_counters.reconcile(db)
+    finally:
+        db.close()
+
+
+async def run_inventory_reconcile_loop(interval: float) -> None:
+    """Reconcile the inventory counters against the database until cancelled."""
+    while True:
+        try:
+            await asyncio.to_thread(_reconcile_with_new_session)
+        except Exception as e:
+            logger.error(f"Inventory reconciliation failed: {e}", exc_info=True)
+        await asyncio.sleep(interval)
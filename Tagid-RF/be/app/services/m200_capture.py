@@ -0,0 +1,231 @@
+"""
+Wire captures of M-200 reader traffic: recording, reading and replay.
+
+File format (big-endian)::
+
+    header:  b"M2CAP" + version (1 byte)
+    record:  [timestamp_us: u64][direction: u8][length: u16][bytes...]
+
+Records hold bytes exactly as one ``recv``/``send`` saw them, so TCP
+chunking (frames split or batched) is preserved for the parser. Timestamps
+are absolute, so a capture can be appended to across sessions; a record cut
+short by a crash is ignored on read.
+
+``CaptureReplayer`` plays records back at their original pace, N times
+faster, or as fast as the consumer accepts.
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import re
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Awaitable, BinaryIO, Callable, Iterable, Iterator, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"M2CAP"
+VERSION = 1
+HEADER = MAGIC + bytes([VERSION])
+RECORD = struct.Struct(">QBH")
+MAX_CHUNK = 0xFFFF
+
+HOST_TO_READER = 0  # commands (TX / APP->READER)
+READER_TO_HOST = 1  # responses and tag reports (RX / READER->APP)
+
+
+@dataclass
+class CaptureRecord:
+    """One chunk of bytes seen on the wire."""
+
+    timestamp_us: int
+    direction: int
+    data: bytes
+
+    @property
+    def timestamp(self) -> float:
+        return self.timestamp_us / 1_000_000
+
+
+class CaptureWriter:
+    """
+    Append-only, thread-safe capture file writer.
+
+    Args:
+        path: Capture file; created with a header if missing or empty.
+        flush_every: Flush after this many records (1 = every record).
+    """
+
+    def __init__(self, path: str, flush_every: int = 1):
+        self.path = path
+        self.flush_every = flush_every
+        self.records = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file: Optional[BinaryIO] = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(HEADER)
+        else:
+            with open(path, "rb") as existing:
+                if existing.read(len(HEADER)) != HEADER:
+                    self._file.close()
+                    raise ValueError(f"{path} is not an M-200 capture file")
+
+    def write(self, direction: int, data: bytes, timestamp_us: Optional[int] = None) -> None:
+        """Record bytes sent (``HOST_TO_READER``) or received (``READER_TO_HOST``)."""
+        if not data:
+            return
+        ts = timestamp_us if timestamp_us is not None else time.time_ns() // 1000
+        with self._lock:
+            # Checked under the lock: close() may run on another thread
+            if self._file is None:
+                return
+            for start in range(0, len(data), MAX_CHUNK):
+                chunk = data[start : start + MAX_CHUNK]
+                self._file.write(RECORD.pack(ts, direction, len(chunk)) + chunk)
+                self.records += 1
+            if self.records % self.flush_every == 0:
+                self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self) -> "CaptureWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_capture(path: str) -> Iterator[CaptureRecord]:
+    """
+    Iterate over a capture's records.
+
+    Raises:
+        ValueError: If the file is not a capture.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(HEADER)) != HEADER:
+            raise ValueError(f"{path} is not an M-200 capture file")
+        while True:
+            head = f.read(RECORD.size)
+            if len(head) < RECORD.size:
+                return
+            ts, direction, length = RECORD.unpack(head)
+            data = f.read(length)
+            if len(data) < length:
+                logger.warning(f"Ignoring truncated record at the end of {path}")
+                return
+            yield CaptureRecord(ts, direction, data)
+
+
+_HEX_LINE = re.compile(r"(?:\b(TX|RX):|\[(APP->READER|READER->APP)\])\s*((?:[0-9A-Fa-f]{2}\s?)+)")
+
+
+def import_hex_log(
+    log_path: str, capture_path: str, interval: float = 0.01, start_us: Optional[int] = None
+) -> int:
+    """
+    Convert a hex dump into a capture.
+
+    Understands ``TX:``/``RX:`` lines (rfid_full_log.txt, rfid_log.txt) and
+    ``[APP->READER]``/``[READER->APP]`` lines (sniffer_proxy.py output).
+    Those logs carry no per-line timestamps, so records are spaced
+    ``interval`` seconds apart.
+
+    Returns:
+        Number of records written.
+    """
+    with open(log_path, "rb") as f:
+        raw = f.read()
+    if raw[:2] in (b"\xff\xfe", b"\xfe\xff"):  # PowerShell-redirected logs are UTF-16
+        text = raw.decode("utf-16")
+    else:
+        text = raw.decode("utf-8", errors="replace")
+
+    ts = start_us if start_us is not None else time.time_ns() // 1000
+    step = int(interval * 1_000_000)
+    count = 0
+    with CaptureWriter(capture_path, flush_every=1000) as writer:
+        for line in text.splitlines():
+            match = _HEX_LINE.search(line)
+            if not match:
+                continue
+            tag = match.group(1) or match.group(2)
+            direction = HOST_TO_READER if tag in ("TX", "APP->READER") else READER_TO_HOST
+            writer.write(direction, bytes.fromhex(match.group(3).replace(" ", "")), ts)
+            ts += step
+            count += 1
+    return count
+
+
+@dataclass
+class ReplayStats:
+    records: int = 0
+    bytes: int = 0
+    elapsed: float = 0.0
+    max_lag_ms: float = 0.0  # how far behind schedule a record was delivered
+
+    @property
+    def records_per_second(self) -> float:
+        return self.records / self.elapsed if self.elapsed else 0.0
+
+
+Sink = Callable[[bytes], Union[None, Awaitable[None]]]
+
+
+class CaptureReplayer:
+    """
+    Play capture records into a sink with their original timing.
+
+    Args:
+        records: Records to play (e.g. ``read_capture(path)``).
+        speed: 1.0 = real time, N = N times faster, 0 = as fast as possible.
+        direction: Which side of the conversation to play.
+    """
+
+    def __init__(
+        self,
+        records: Iterable[CaptureRecord],
+        speed: float = 1.0,
+        direction: Optional[int] = READER_TO_HOST,
+    ):
+        if speed < 0:
+            raise ValueError("speed must be >= 0")
+        self.records: List[CaptureRecord] = [
+            r for r in records if direction is None or r.direction == direction
+        ]
+        self.speed = speed
+
+    async def replay(self, sink: Sink) -> ReplayStats:
+        """Deliver every record to ``sink`` (sync or async callable)."""
+        stats = ReplayStats()
+        if not self.records:
+            return stats
+
+        loop = asyncio.get_running_loop()
+        first_ts = self.records[0].timestamp_us
+        started = loop.time()
+        for record in self.records:
+            if self.speed:
+                due = started + (record.timestamp_us - first_ts) / 1_000_000 / self.speed
+                delay = due - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                stats.max_lag_ms = max(stats.max_lag_ms, (loop.time() - due) * 1000)
+            result = sink(record.data)
+            if inspect.isawaitable(result):
+                await result
+            stats.records += 1
+            stats.bytes += len(record.data)
+        stats.elapsed = loop.time() - started
+        return stats
@@ -0,0 +1,16 @@
+# M-200 Reader Emulator Package
+from .network import AnswerModeServer, EmulatorFleet, PushClient
+from .population import TagPopulation, TagRead
+from .reader import EmulatedReader, active_report_frame, inventory_record, split_frames
+
+__all__ = [
+    "AnswerModeServer",
+    "EmulatedReader",
+    "EmulatorFleet",
+    "PushClient",
+    "TagPopulation",
+    "TagRead",
+    "active_report_frame",
+    "inventory_record",
+    "split_frames",
+]
@@ -0,0 +1,234 @@
+"""
+Running emulated readers over TCP.
+
+- ``AnswerModeServer``: a reader listening on a port, answering commands
+  (how ``RFIDReaderService`` talks to a reader).
+- ``PushClient``: a reader connecting to a listener and pushing 0x0082
+  active reports (how gate readers feed ``tag_listener_server``), while
+  still answering commands sent back over the same connection.
+- ``EmulatorFleet``: many of either in one event loop, so a laptop can drive
+  the backend to saturation.
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from app.services.m200_emulator.population import TagPopulation
+from app.services.m200_emulator.reader import EmulatedReader
+
+logger = logging.getLogger(__name__)
+
+
+class AnswerModeServer:
+    """Serve one emulated reader on ``host:port`` (port 0 picks a free port)."""
+
+    def __init__(self, reader: EmulatedReader, host: str = "127.0.0.1", port: int = 0):
+        self.reader = reader
+        self.host = host
+        self.port = port
+        self.connections = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._sessions: Set[asyncio.Task] = set()
+
+    async def start(self) -> "AnswerModeServer":
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(
+            f"Emulated reader {self.reader.serial_number} answering on {self.host}:{self.port}"
+        )
+        return self
+
+    async def _handle(self, stream_reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        task = asyncio.current_task()
+        self._sessions.add(task)
+        buffer = b""
+        try:
+            while True:
+                chunk = await stream_reader.read(4096)
+                if not chunk:
+                    break
+                responses, buffer = self.reader.handle_bytes(buffer + chunk)
+                air_time = self.reader.take_air_time()
+                if air_time:
+                    await asyncio.sleep(air_time)
+                if responses:
+                    writer.write(b"".join(responses))
+                    await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._sessions.discard(task)
+            writer.close()
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for session in list(self._sessions):
+                session.cancel()
+            await asyncio.gather(*self._sessions, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+
+class PushClient:
+    """
+    Push active reports from one emulated reader to a listener.
+
+    Args:
+        reader: The emulated reader (its population sets rate and bursts).
+        host, port: Where the backend's tag listener runs.
+        max_reads: Stop pushing after this many tag reads (None = until stopped).
+        reconnect_delay: Seconds to wait before reconnecting after a drop.
+    """
+
+    def __init__(
+        self,
+        reader: EmulatedReader,
+        host: str = "127.0.0.1",
+        port: int = 2022,
+        max_reads: Optional[int] = None,
+        reconnect_delay: float = 1.0,
+    ):
+        self.reader = reader
+        self.host = host
+        self.port = port
+        self.max_reads = max_reads
+        self.reconnect_delay = reconnect_delay
+        self.done = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> "PushClient":
+        self.reader.state.inventory_running = True
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def _run(self):
+        while not self.done.is_set():
+            try:
+                stream_reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError as e:
+                logger.warning(f"Emulated reader cannot reach {self.host}:{self.port}: {e}")
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+
+            commands = asyncio.create_task(self._answer(stream_reader, writer))
+            try:
+                await self._push(writer)
+            except ConnectionError:
+                logger.warning("Listener closed the connection; reconnecting")
+                await asyncio.sleep(self.reconnect_delay)
+            finally:
+                commands.cancel()
+                writer.close()
+
+    async def _push(self, writer: asyncio.StreamWriter):
+        loop = asyncio.get_running_loop()
+        interval = self.reader.population.burst_interval
+        next_at = loop.time()
+        while not self.done.is_set():
+            if self.max_reads is not None and self.reader.stats["tag_reads"] >= self.max_reads:
+                self.done.set()
+                break
+            if self.reader.state.inventory_running:
+                report = self.reader.next_report()
+                if report:
+                    writer.write(report)
+                    await writer.drain()
+            next_at += interval
+            await asyncio.sleep(max(0.0, next_at - loop.time()))
+
+    async def _answer(self, stream_reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        buffer = b""
+        while True:
+            chunk = await stream_reader.read(4096)
+            if not chunk:
+                return
+            responses, buffer = self.reader.handle_bytes(buffer + chunk)
+            if responses:
+                writer.write(b"".join(responses))
+
+    async def stop(self) -> None:
+        self.done.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class EmulatorFleet:
+    """
+    Many emulated readers in one process.
+
+    ``population_factory(index)`` builds each reader's tags; by default every
+    reader gets its own 50-tag range so EPCs do not collide across readers.
+    ``anticollision`` is passed to every ``EmulatedReader``.
+    """
+
+    def __init__(
+        self,
+        population_factory: Optional[Callable[[int], TagPopulation]] = None,
+        anticollision: bool = False,
+    ):
+        self.population_factory = population_factory or (
+            lambda i: TagPopulation(first_serial=i * 100000 + 1, seed=i)
+        )
+        self.anticollision = anticollision
+        self.servers: List[AnswerModeServer] = []
+        self.push_clients: List[PushClient] = []
+
+    def _reader(self, index: int) -> EmulatedReader:
+        return EmulatedReader(
+            population=self.population_factory(index),
+            serial_number=f"EMU{index:09d}",
+            anticollision=self.anticollision,
+        )
+
+    @property
+    def readers(self) -> List[EmulatedReader]:
+        return [s.reader for s in self.servers] + [c.reader for c in self.push_clients]
+
+    async def add_answer_readers(
+        self, count: int, host: str = "127.0.0.1", base_port: int = 0
+    ) -> List[AnswerModeServer]:
+        """Start ``count`` answer-mode readers on consecutive ports (or free ports)."""
+        started = []
+        for _ in range(count):
+            index = len(self.readers)
+            port = base_port + len(self.servers) if base_port else 0
+            started.append(await AnswerModeServer(self._reader(index), host, port).start())
+            self.servers.append(started[-1])
+        return started
+
+    async def add_push_readers(
+        self, count: int, host: str, port: int, max_reads: Optional[int] = None
+    ) -> List[PushClient]:
+        """Start ``count`` readers pushing to one listener."""
+        started = []
+        for _ in range(count):
+            index = len(self.readers)
+            client = PushClient(self._reader(index), host, port, max_reads=max_reads)
+            self.push_clients.append(client)
+            started.append(await client.start())
+        return started
+
+    async def wait_pushed(self) -> None:
+        """Wait until every push client with ``max_reads`` has sent them all."""
+        await asyncio.gather(*(c.done.wait() for c in self.push_clients))
+
+    async def stop(self) -> None:
+        for client in self.push_clients:
+            await client.stop()
+        for server in self.servers:
+            await server.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        totals: Dict[str, Any] = {"readers": len(self.readers)}
+        for reader in self.readers:
+            for key, value in reader.stats.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
@@ -0,0 +1,114 @@
+"""
+Simulated tag populations for the M-200 emulator.
+
+A ``TagPopulation`` is the set of tags in a reader's field plus how the
+reader sees them: how many reads per second it reports, how many tags arrive
+together in one burst, which antennas pick them up and how strong the
+signal is.
+"""
+
+import random
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+# Impinj Monza prefix used by the store's gate tags (see tag_listener_server)
+DEFAULT_EPC_PREFIX = "E2806894"
+DEFAULT_PC = 0x3000  # 96-bit EPC
+
+
+@dataclass
+class TagRead:
+    """One tag observation as the reader reports it."""
+
+    epc: bytes
+    rssi_dbm: int
+    antenna: int
+    pc: int = DEFAULT_PC
+
+    @property
+    def epc_hex(self) -> str:
+        return self.epc.hex().upper()
+
+
+@dataclass
+class TagPopulation:
+    """
+    Tags in the field and the reader's view of them.
+
+    Args:
+        tag_count: Number of distinct tags in the field.
+        read_rate: Tag reads per second (0 = as fast as the consumer accepts).
+        burst_size: Tags reported together in one burst.
+        rssi_mean_dbm: Mean signal strength (negative dBm).
+        rssi_stddev_dbm: Spread of the signal strength.
+        antennas: Antenna ports that see the tags.
+        epc_prefix: Hex prefix shared by all EPCs; the rest is a serial number.
+        epc_bytes: EPC length in bytes (12 for 96-bit EPCs).
+        first_serial: Serial number of the first tag; give each emulated
+            reader its own range so their populations do not overlap.
+        seed: Random seed, so runs are reproducible.
+        epcs: Explicit EPCs (hex); overrides ``tag_count``/``epc_prefix``.
+    """
+
+    tag_count: int = 50
+    read_rate: float = 100.0
+    burst_size: int = 1
+    rssi_mean_dbm: float = -55.0
+    rssi_stddev_dbm: float = 6.0
+    antennas: Sequence[int] = (1, 2, 3, 4)
+    epc_prefix: str = DEFAULT_EPC_PREFIX
+    epc_bytes: int = 12
+    first_serial: int = 1
+    seed: Optional[int] = None
+    epcs: Optional[List[str]] = None
+    _tags: List[bytes] = field(init=False, repr=False)
+    _rng: random.Random = field(init=False, repr=False)
+
+    def __post_init__(self):
+        if self.burst_size < 1:
+            raise ValueError("burst_size must be at least 1")
+        if not self.antennas:
+            raise ValueError("At least one antenna is required")
+        self._rng = random.Random(self.seed)
+        if self.epcs is not None:
+            self._tags = [bytes.fromhex(epc) for epc in self.epcs]
+        else:
+            prefix = bytes.fromhex(self.epc_prefix)
+            serial_bytes = self.epc_bytes - len(prefix)
+            if serial_bytes < 1:
+                raise ValueError("epc_prefix leaves no room for a serial number")
+            self._tags = [
+                prefix + i.to_bytes(serial_bytes, "big")
+                for i in range(self.first_serial, self.first_serial + self.tag_count)
+            ]
+
+    @property
+    def tags(self) -> List[bytes]:
+        return list(self._tags)
+
+    @property
+    def burst_interval(self) -> float:
+        """Seconds between bursts needed to hold ``read_rate``."""
+        return self.burst_size / self.read_rate if self.read_rate > 0 else 0.0
+
+    def _rssi(self) -> int:
+        value = round(self._rng.gauss(self.rssi_mean_dbm, self.rssi_stddev_dbm))
+        return max(-99, min(-20, value))
+
+    def read(self, epc: bytes) -> TagRead:
+        return TagRead(epc=epc, rssi_dbm=self._rssi(), antenna=self._rng.choice(self.antennas))
+
+    def next_burst(self) -> List[TagRead]:
+        """Reads for one burst (an empty field yields no reads)."""
+        if not self._tags:
+            return []
+        return [self.read(self._rng.choice(self._tags)) for _ in range(self.burst_size)]
+
+    def sample(self, count: int) -> List[TagRead]:
+        """Reads for ``count`` distinct tags, as one inventory round sees them."""
+        chosen = self._rng.sample(self._tags, min(count, len(self._tags)))
+        return [self.read(epc) for epc in chosen]
+
+    def tid(self, epc: bytes) -> bytes:
+        """A stable fake TID for a tag (Impinj class ID + the EPC's serial)."""
+        return bytes.fromhex("E2801100") + epc[-8:].rjust(8, b"\x00")
@@ -0,0 +1,454 @@
+"""
+Protocol core of the emulated M-200 reader.
+
+``EmulatedReader`` keeps the configuration a real reader would (power,
+antennas, filters, GPIO, relays, network, gate and query parameters),
+answers every command in ``M200Commands`` with properly framed responses,
+and turns a ``TagPopulation`` into inventory results or 0x0082 active
+reports. It does no I/O; ``network`` runs it over TCP.
+
+Frames are built with ``m200_protocol`` so CRC and framing stay identical to
+what the backend parses.
+"""
+
+import logging
+import random
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.services.m200_emulator.population import TagPopulation, TagRead
+from app.services.m200_protocol import (
+    HEAD,
+    M200Commands,
+    M200Status,
+    build_response_frame,
+    calculate_crc16,
+)
+
+logger = logging.getLogger(__name__)
+
+MIN_FRAME = 7  # HEAD + ADDR + CMD(2) + LEN + CRC(2)
+MAX_DATA = 254  # LEN is one byte and includes STATUS
+SET, GET = 0x01, 0x02
+
+# GET_ALL_PARAM payload captured from a real reader (rfid_full_log.txt)
+CAPTURED_ALL_PARAMS = bytes.fromhex("01000120000001030361006400C80F2101040000" "0C03030100")
+
+
+def split_frames(buffer: bytes) -> Tuple[List[bytes], bytes]:
+    """
+    Cut complete ``[HEAD][ADDR][CMD][LEN][...][CRC]`` frames off a byte stream.
+
+    Bytes before a HEAD are dropped. Returns the frames and the unconsumed tail.
+    """
+    frames = []
+    while len(buffer) >= MIN_FRAME:
+        if buffer[0] != HEAD:
+            idx = buffer.find(bytes([HEAD]))
+            buffer = buffer[idx:] if idx != -1 else b""
+            continue
+        total = MIN_FRAME + buffer[4]
+        if len(buffer) < total:
+            break
+        frames.append(buffer[:total])
+        buffer = buffer[total:]
+    return frames, buffer
+
+
+def inventory_record(read: TagRead) -> bytes:
+    """``[RSSI][ANT][PC(2)][EPC_LEN][EPC]``, as ``parse_inventory_response`` reads it."""
+    return struct.pack(">BBHB", abs(read.rssi_dbm), read.antenna, read.pc, len(read.epc)) + read.epc
+
+
+def active_report_frame(read: TagRead, addr: int = 0x01) -> bytes:
+    """
+    A 0x0082 active report: ``[ANT][RSSI][PC(2)][EPC_LEN][EPC]`` after LEN.
+
+    This is the layout ``tag_listener_server.parse_frame`` decodes.
+    """
+    payload = struct.pack(">BBHB", read.antenna, abs(read.rssi_dbm), read.pc, len(read.epc))
+    frame = (
+        struct.pack(">BBHB", HEAD, addr, M200Commands.RFM_GET_GATE_STATUS, len(read.epc) + 5)
+        + payload
+        + read.epc
+    )
+    return frame + struct.pack(">H", calculate_crc16(frame))
+
+
+def _ascii(value: str, size: int) -> bytes:
+    return value.encode("ascii")[:size].ljust(size, b"\x00")
+
+
+@dataclass
+class ReaderState:
+    """Settings a reader keeps between commands."""
+
+    power_dbm: int = 30
+    antenna_mask: int = 0x0F
+    rf_protocol: int = 0x04
+    ip: bytes = bytes([192, 168, 1, 200])
+    subnet: bytes = bytes([255, 255, 255, 0])
+    gateway: bytes = bytes([192, 168, 1, 1])
+    port: int = 2022
+    remote_ip: bytes = bytes([192, 168, 1, 100])
+    remote_port: int = 2022
+    remote_enabled: bool = True
+    query: bytes = bytes([4, 0, 0])  # Q, session, target
+    select_param: bytes = bytes([0, 0])
+    select_mask: bytes = b""
+    io_param: bytes = bytes([0, 0])
+    wifi: bytes = bytes(65)
+    password: bytes = bytes(8)
+    relays: Dict[int, int] = field(default_factory=lambda: {1: 0, 2: 0})
+    rssi_filters: Dict[int, int] = field(default_factory=dict)
+    gpio: Dict[int, Tuple[int, int]] = field(
+        default_factory=lambda: {pin: (0, 0) for pin in (1, 2, 3, 4)}
+    )
+    gate: bytes = bytes([1, 0x50, 1])  # mode, sensitivity, direction detect
+    gate_direction: int = 0  # last detected direction: 0 none, 1 in, 2 out
+    eas_mask: bytes = b""
+    inventory_running: bool = False
+
+
+class EmulatedReader:
+    """
+    One emulated M-200 reader.
+
+    Args:
+        population: Tags in the field.
+        addr: Device address used in responses (real readers answer with 0x01).
+        serial_number: Reported in device info.
+        respond_to_unknown: Real readers stay silent on unknown commands
+            (see 0x002F in rfid_full_log.txt); set True to answer PARAM_ERROR.
+        anticollision: Model Gen2 anticollision in inventory rounds: tags pick
+            one of 2^Q slots and only tags alone in their slot are read, and
+            in sessions 1-3 a read tag flips its inventoried flag and stays
+            out of rounds for the other target for ``session_persistence``
+            seconds. Each round also costs 2^Q ``slot_seconds`` of air time,
+            which ``AnswerModeServer`` waits out before answering. Off by
+            default, where every visible tag is read at once.
+    """
+
+    def __init__(
+        self,
+        population: Optional[TagPopulation] = None,
+        addr: int = 0x01,
+        serial_number: str = "EMU000000001",
+        respond_to_unknown: bool = False,
+        anticollision: bool = False,
+    ):
+        self.population = population or TagPopulation()
+        self.addr = addr
+        self.serial_number = serial_number
+        self.respond_to_unknown = respond_to_unknown
+        self.anticollision = anticollision
+        # Seconds a tag stays in inventoried state B, per session
+        self.session_persistence: Dict[int, float] = {0: 0.0, 1: 0.5, 2: 2.0, 3: 2.0}
+        self.slot_seconds = 0.0005
+        # Air time used by rounds since the last ``take_air_time``
+        self.air_time = 0.0
+        self.state = ReaderState()
+        self._flags: Dict[Tuple[int, bytes], float] = {}
+        self._slot_rng = random.Random(0)
+        self.stats: Dict[str, int] = {
+            "commands": 0,
+            "crc_errors": 0,
+            "unknown_commands": 0,
+            "tag_reads": 0,
+            "frames_out": 0,
+        }
+        self._handlers: Dict[int, Callable[[bytes], Tuple[int, bytes]]] = {
+            M200Commands.RFM_INVENTORYISO_CONTINUE: self._inventory,
+            M200Commands.RFM_INVENTORY_STOP: self._stop_inventory,
+            M200Commands.RFM_READISO_TAG: self._read_tag,
+            M200Commands.RFM_SETISO_SELECTMASK: self._select_mask,
+            M200Commands.RFM_SET_SELPRM: self._set_select_param,
+            M200Commands.RFM_GET_SELPRM: lambda data: (0, self.state.select_param),
+            M200Commands.RFM_SET_QUERY_PARAM: self._set_query,
+            M200Commands.RFM_GET_QUERY_PARAM: lambda data: (0, self.state.query),
+            M200Commands.RFM_MODULE_INT: self._module_init,
+            M200Commands.RFM_REBOOT: self._module_init,
+            M200Commands.RFM_SET_PWR: self._set_power,
+            M200Commands.RFM_SET_GET_RFID_PRO: self._rf_protocol,
+            M200Commands.RFM_SET_GET_NETPARA: self._network,
+            M200Commands.RFM_SET_GET_REMOTE_NETPARA: self._remote_server,
+            M200Commands.RFM_GET_DEVICE_INFO: lambda data: (0, self.device_info()),
+            M200Commands.RFM_SET_ALL_PARAM: self._set_all_params,
+            M200Commands.RFM_GET_ALL_PARAM: lambda data: (0, CAPTURED_ALL_PARAMS),
+            M200Commands.RFM_SET_GET_IOPUT_PARAM: self._io_param,
+            M200Commands.RFM_SET_GET_WiFi_PARAM: self._wifi,
+            M200Commands.RFM_SET_GET_S_PERMISSION_PARAM: self._permission,
+            M200Commands.RFM_RELEASE_CLOSE_RELAY1: lambda data: self._relay(1, data),
+            M200Commands.RFM_RELEASE_CLOSE_RELAY2: lambda data: self._relay(2, data),
+            M200Commands.RFM_SET_GET_AntN_RSSI_Filter: self._rssi_filter,
+            M200Commands.RFM_SET_GET_G_PIO_WORKPARAM: self._gpio_param,
+            M200Commands.RFM_GET_G_PIO_LEVEL: self._gpio_levels,
+            M200Commands.RFM_GET_GATE_STATUS: lambda data: (
+                0,
+                self.state.gate[:1] + bytes([self.state.gate_direction]),
+            ),
+            M200Commands.RFM_SET_GET_GATE_PARAM: self._gate_param,
+            M200Commands.RFM_SET_GET_EAS_MASK: self._eas_mask,
+        }
+
+    # ------------------------------------------------------------------
+    # Commands
+    # ------------------------------------------------------------------
+
+    def handle_frame(self, frame: bytes) -> Optional[bytes]:
+        """Answer one command frame; ``None`` when a real reader would stay silent."""
+        if len(frame) < MIN_FRAME or frame[0] != HEAD:
+            return None
+        if struct.unpack(">H", frame[-2:])[0] != calculate_crc16(frame[:-2]):
+            self.stats["crc_errors"] += 1
+            logger.debug(f"Emulator dropped frame with bad CRC: {frame.hex().upper()}")
+            return None
+
+        cmd = struct.unpack(">H", frame[2:4])[0]
+        data = frame[5:-2]
+        self.stats["commands"] += 1
+
+        handler = self._handlers.get(cmd)
+        if handler is None:
+            self.stats["unknown_commands"] += 1
+            if not self.respond_to_unknown:
+                return None
+            status, payload = M200Status.PARAM_ERROR, b""
+        else:
+            try:
+                status, payload = handler(data)
+            except (IndexError, ValueError, struct.error):
+                status, payload = M200Status.PARAM_ERROR, b""
+
+        self.stats["frames_out"] += 1
+        return build_response_frame(cmd, payload, status=status, addr=self.addr)
+
+    def handle_bytes(self, buffer: bytes) -> Tuple[List[bytes], bytes]:
+        """Answer every complete frame in ``buffer``; returns responses and the tail."""
+        frames, rest = split_frames(buffer)
+        responses = [r for r in (self.handle_frame(f) for f in frames) if r is not None]
+        return responses, rest
+
+    def device_info(self) -> bytes:
+        return (
+            _ascii("CP-EMULATOR_V1.0", 32)
+            + _ascii("UHF Gate Reader Emulator V1.0", 32)
+            + _ascii(self.serial_number, 12)
+            + _ascii("EMU-RFID_V1.0", 32)
+            + _ascii("UHF Emulated Reader", 32)
+            + _ascii(self.serial_number, 12)
+        )
+
+    def _inventory(self, data: bytes) -> Tuple[int, bytes]:
+        # [type][param]; param 0 means "continuous until stop"
+        self.state.inventory_running = len(data) < 2 or data[1] == 0
+        records = b""
+        reads = self.visible_reads(self.population.sample(len(self.population.tags)))
+        if self.anticollision:
+            reads = self.singulate(reads)
+        for read in reads:
+            record = inventory_record(read)
+            if len(records) + len(record) > MAX_DATA:
+                break
+            records += record
+            self.stats["tag_reads"] += 1
+        if not records:
+            return M200Status.INVENTORY_COMPLETE, b""
+        return 0, records
+
+    def _stop_inventory(self, data: bytes) -> Tuple[int, bytes]:
+        self.state.inventory_running = False
+        return 0, b""
+
+    def _read_tag(self, data: bytes) -> Tuple[int, bytes]:
+        bank, start, words = data[0], data[1], data[2]
+        candidates = self.visible_reads(self.population.sample(1))
+        if not candidates:
+            return M200Status.TAG_TIMEOUT, b""
+        read = candidates[0]
+        memory = {
+            0: bytes(8),  # kill + access passwords
+            1: struct.pack(">HH", calculate_crc16(read.epc), read.pc) + read.epc,
+            2: self.population.tid(read.epc),
+            3: bytes(64),
+        }.get(bank)
+        if memory is None or (start + words) * 2 > len(memory):
+            return M200Status.PARAM_ERROR, b""
+        return 0, memory[start * 2 : (start + words) * 2]
+
+    def _select_mask(self, data: bytes) -> Tuple[int, bytes]:
+        bits = data[2]
+        self.state.select_mask = data[3 : 3 + (bits + 7) // 8]
+        return 0, b""
+
+    def _set_select_param(self, data: bytes) -> Tuple[int, bytes]:
+        self.state.select_param = data[:2]
+        return 0, b""
+
+    def _set_query(self, data: bytes) -> Tuple[int, bytes]:
+        q, session, target = data[0], data[1], data[2]
+        if q > 15 or session > 3 or target > 1:
+            return M200Status.PARAM_ERROR, b""
+        self.state.query = bytes([q, session, target])
+        return 0, b""
+
+    def _module_init(self, data: bytes) -> Tuple[int, bytes]:
+        self.state.inventory_running = False
+        return 0, b""
+
+    def _set_power(self, data: bytes) -> Tuple[int, bytes]:
+        if data[0] > 33:
+            return M200Status.PARAM_ERROR, b""
+        self.state.power_dbm = data[0]
+        return 0, b""
+
+    def _rf_protocol(self, data: bytes) -> Tuple[int, bytes]:
+        if data[0] == SET:
+            self.state.rf_protocol = data[1]
+            return 0, b""
+        return 0, bytes([self.state.rf_protocol])
+
+    def _network(self, data: bytes) -> Tuple[int, bytes]:
+        s = self.state
+        if data[0] == SET:
+            s.ip, s.subnet, s.gateway = data[1:5], data[5:9], data[9:13]
+            s.port = struct.unpack(">H", data[13:15])[0]
+            return 0, b""
+        return 0, s.ip + s.subnet + s.gateway + struct.pack(">H", s.port)
+
+    def _remote_server(self, data: bytes) -> Tuple[int, bytes]:
+        s = self.state
+        if data[0] == SET:
+            s.remote_ip = data[1:5]
+            s.remote_port = struct.unpack(">H", data[5:7])[0]
+            s.remote_enabled = bool(data[7])
+            return 0, b""
+        return 0, s.remote_ip + struct.pack(">HB", s.remote_port, int(s.remote_enabled))
+
+    def _set_all_params(self, data: bytes) -> Tuple[int, bytes]:
+        self.state.power_dbm = data[0]
+        if len(data) > 1:
+            self.state.antenna_mask = data[1]
+        return 0, b""
+
+    def _io_param(self, data: bytes) -> Tuple[int, bytes]:
+        if data[0] == SET:
+            self.state.io_param = data[1:3]
+            return 0, b""
+        return 0, self.state.io_param
+
+    def _wifi(self, data: bytes) -> Tuple[int, bytes]:
+        if data[0] == SET:
+            self.state.wifi = data[1:66]
+            return 0, b""
+        return 0, self.state.wifi
+
+    def _permission(self, data: bytes) -> Tuple[int, bytes]:
+        if data[0] == SET:
+            self.state.password = data[1:9]
+            return 0, b""
+        return 0, bytes([int(any(self.state.password))])
+
+    def _relay(self, relay: int, data: bytes) -> Tuple[int, bytes]:
+        self.state.relays[relay] = data[0] if data else 0
+        return 0, b""
+
+    def _rssi_filter(self, data: bytes) -> Tuple[int, bytes]:
+        antenna = data[1]
+        if data[0] == SET:
+            self.state.rssi_filters[antenna] = data[2]
+            return 0, b""
+        return 0, bytes([antenna, self.state.rssi_filters.get(antenna, 0)])
+
+    def _gpio_param(self, data: bytes) -> Tuple[int, bytes]:
+        pin = data[1]
+        if pin not in self.state.gpio:
+            return M200Status.PARAM_ERROR, b""
+        if data[0] == SET:
+            self.state.gpio[pin] = (data[2], data[3])
+            return 0, b""
+        return 0, bytes([pin, *self.state.gpio[pin]])
+
+    def _gpio_levels(self, data: bytes) -> Tuple[int, bytes]:
+        return 0, bytes(self.state.gpio[pin][1] for pin in (1, 2, 3, 4))
+
+    def _gate_param(self, data: bytes) -> Tuple[int, bytes]:
+        if data[0] == SET:
+            self.state.gate = data[1:4]
+            return 0, b""
+        return 0, self.state.gate
+
+    def _eas_mask(self, data: bytes) -> Tuple[int, bytes]:
+        if data[0] == SET:
+            self.state.eas_mask = data[1:]
+            return 0, b""
+        return 0, self.state.eas_mask
+
+    # ------------------------------------------------------------------
+    # Tag reads
+    # ------------------------------------------------------------------
+
+    def take_air_time(self) -> float:
+        """Seconds the rounds answered since the last call took on air."""
+        air_time, self.air_time = self.air_time, 0.0
+        return air_time
+
+    def singulate(self, reads: List[TagRead], now: Optional[float] = None) -> List[TagRead]:
+        """One Gen2 inventory round over ``reads`` with the current Query parameters."""
+        q, session, target = self.state.query[:3]
+        self.air_time += 2**q * self.slot_seconds
+        now = time.monotonic() if now is None else now
+        persistence = self.session_persistence.get(session, 0.0)
+
+        def in_b(epc: bytes) -> bool:
+            flipped = self._flags.get((session, epc))
+            return flipped is not None and now - flipped < persistence
+
+        slots: Dict[int, List[TagRead]] = {}
+        for read in reads:
+            if in_b(read.epc) == bool(target):
+                slots.setdefault(self._slot_rng.randrange(2**q), []).append(read)
+        singulated = [tags[0] for tags in slots.values() if len(tags) == 1]
+
+        if session:
+            for read in singulated:
+                if target:
+                    self._flags.pop((session, read.epc), None)
+                else:
+                    self._flags[(session, read.epc)] = now
+        return singulated
+
+    def visible_reads(self, reads: Iterable[TagRead]) -> List[TagRead]:
+        """
+        Apply what the reader's settings do to raw reads.
+
+        Lower power weakens every read by the same number of dB; reads on
+        disabled antennas, below an antenna's RSSI filter, or not matching the
+        select mask are dropped.
+        """
+        s = self.state
+        attenuation = 30 - s.power_dbm
+        visible = []
+        for read in reads:
+            if not s.antenna_mask & (1 << (read.antenna - 1)):
+                continue
+            if s.select_mask and not read.epc.startswith(s.select_mask):
+                continue
+            rssi = read.rssi_dbm - max(attenuation, 0)
+            if rssi < -99:
+                continue
+            threshold = s.rssi_filters.get(read.antenna)
+            if threshold and abs(rssi) > threshold:
+                continue
+            read.rssi_dbm = rssi
+            visible.append(read)
+        return visible
+
+    def next_report(self) -> bytes:
+        """One burst of 0x0082 active reports, concatenated as a reader sends them."""
+        reads = self.visible_reads(self.population.next_burst())
+        self.stats["tag_reads"] += len(reads)
+        self.stats["frames_out"] += len(reads)
+        return b"".join(active_report_frame(read, self.addr) for read in reads)
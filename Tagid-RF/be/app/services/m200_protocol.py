@@ -50,6 +50,13 @@ def calculate_crc16(data: bytes) -> int:
     return crc_value
 
 
+def crc_ok(frame: bytes) -> bool:
+    """Whether a complete frame's trailing CRC matches its contents."""
+    if len(frame) < 3:
+        return False
+    return struct.unpack(">H", frame[-2:])[0] == calculate_crc16(frame[:-2])
+
+
 @dataclass
 class M200Response:
     """Parsed response from M-200 reader"""
@@ -182,6 +189,18 @@ class M200ResponseParser:
         return M200Response(addr=addr, cmd=cmd, status=status, data=data, crc=crc_received)
 
 
+def build_response_frame(
+    cmd: int, data: bytes = b"", status: int = 0x00, addr: int = DEFAULT_ADDR
+) -> bytes:
+    """
+    Build a reader response frame (the inverse of ``M200ResponseParser.parse``).
+
+    Used by stand-in readers in tests and benchmarks.
+    """
+    frame = struct.pack(">BBHBB", HEAD, addr, cmd, len(data) + 1, status) + data
+    return frame + struct.pack(">H", calculate_crc16(frame))
+
+
 # Command Codes (from manual Section 2.1 - Table A-7)
 # Command Codes (corrected for UHF Gate Reader V1.1)
 class M200Commands:
@@ -7,9 +7,8 @@ import logging
 from datetime import datetime
 from typing import Any, Dict, Optional
 
-import httpx
-
 from app.core.config import settings
+from app.services.http_clients import get_http_client
 from app.services.payment_provider import PaymentProvider, PaymentStatus
 
 logger = logging.getLogger(__name__)
@@ -49,23 +48,22 @@ class NexiProvider(PaymentProvider):
 
             transaction_id = f"nexi_{datetime.now().timestamp()}"
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.api_endpoint}/payments",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "merchant_id": self.merchant_id,
-                        "terminal_id": self.terminal_id,
-                        "amount": amount_ils,
-                        "currency": currency,
-                        "transaction_id": transaction_id,
-                        "metadata": metadata or {},
-                    },
-                    timeout=30.0,
-                )
+            client = get_http_client("nexi")
+            response = await client.post(
+                f"{self.api_endpoint}/payments",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                },
+                json={
+                    "merchant_id": self.merchant_id,
+                    "terminal_id": self.terminal_id,
+                    "amount": amount_ils,
+                    "currency": currency,
+                    "transaction_id": transaction_id,
+                    "metadata": metadata or {},
+                },
+            )
 
             if response.status_code in [200, 201]:
                 result = response.json()
@@ -114,15 +112,14 @@ class NexiProvider(PaymentProvider):
         transaction = self.pending_transactions[payment_id]
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.api_endpoint}/payments/{payment_id}/confirm",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    timeout=30.0,
-                )
+            client = get_http_client("nexi")
+            response = await client.post(
+                f"{self.api_endpoint}/payments/{payment_id}/confirm",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                },
+            )
 
             if response.status_code == 200:
                 result = response.json()
@@ -166,16 +163,15 @@ class NexiProvider(PaymentProvider):
         refund_amount_ils = refund_amount / 100
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.api_endpoint}/payments/{payment_id}/refund",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json={"amount": refund_amount_ils},
-                    timeout=30.0,
-                )
+            client = get_http_client("nexi")
+            response = await client.post(
+                f"{self.api_endpoint}/payments/{payment_id}/refund",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                },
+                json={"amount": refund_amount_ils},
+            )
 
             if response.status_code == 200:
                 result = response.json()
@@ -230,15 +226,14 @@ class NexiProvider(PaymentProvider):
             raise ValueError(f"Cannot cancel transaction with status {transaction['status']}")
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.api_endpoint}/payments/{payment_id}/cancel",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    timeout=30.0,
-                )
+            client = get_http_client("nexi")
+            response = await client.post(
+                f"{self.api_endpoint}/payments/{payment_id}/cancel",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                },
+            )
 
             if response.status_code == 200:
                 transaction["status"] = PaymentStatus.FAILED
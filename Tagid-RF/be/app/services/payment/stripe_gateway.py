@@ -1,5 +1,10 @@
-"""Stripe payment gateway integration."""
+"""Stripe payment gateway integration.
 
+The Stripe SDK is synchronous; every API call runs in a worker thread so
+card authorization does not block the event loop.
+"""
+
+import asyncio
 import logging
 from typing import Optional
 
@@ -42,7 +47,8 @@ class StripeGateway(PaymentGateway):
     async def create_payment(self, request: PaymentRequest) -> PaymentResult:
         """Create a Stripe Payment Intent."""
         try:
-            intent = stripe.PaymentIntent.create(
+            intent = await asyncio.to_thread(
+                stripe.PaymentIntent.create,
                 amount=request.amount,
                 currency=request.currency.lower(),
                 metadata={"order_id": request.order_id, **(request.metadata or {})},
@@ -68,7 +74,9 @@ class StripeGateway(PaymentGateway):
     ) -> PaymentResult:
         """Confirm a Stripe Payment Intent."""
         try:
-            intent = stripe.PaymentIntent.confirm(payment_id, payment_method=payment_method)
+            intent = await asyncio.to_thread(
+                stripe.PaymentIntent.confirm, payment_id, payment_method=payment_method
+            )
 
             return PaymentResult(
                 success=intent.status in ["succeeded", "processing"],
@@ -83,7 +91,7 @@ class StripeGateway(PaymentGateway):
     async def get_payment_status(self, payment_id: str) -> PaymentResult:
         """Get the status of a Stripe Payment Intent."""
         try:
-            intent = stripe.PaymentIntent.retrieve(payment_id)
+            intent = await asyncio.to_thread(stripe.PaymentIntent.retrieve, payment_id)
 
             return PaymentResult(
                 success=True,
@@ -102,7 +110,7 @@ class StripeGateway(PaymentGateway):
             if amount:
                 refund_params["amount"] = amount
 
-            refund = stripe.Refund.create(**refund_params)
+            refund = await asyncio.to_thread(stripe.Refund.create, **refund_params)
 
             return RefundResult(success=True, refund_id=refund.id)
         except stripe.error.StripeError as e:
@@ -4,7 +4,7 @@ import logging
 from typing import Optional
 from urllib.parse import urlencode
 
-import httpx
+from app.services.http_clients import get_http_client
 
 from .base import (
     PaymentGateway,
@@ -119,18 +119,18 @@ class TranzilaGateway(PaymentGateway):
             if amount:
                 params["sum"] = amount / 100
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(self.DIRECT_URL, data=params, timeout=30.0)
+            client = get_http_client("tranzila")
+            response = await client.post(self.DIRECT_URL, data=params)
 
-                # Parse Tranzila response
-                result = self._parse_response(response.text)
+            # Parse Tranzila response
+            result = self._parse_response(response.text)
 
-                if result.get("Response") == "000":
-                    return RefundResult(success=True, refund_id=result.get("ConfirmationCode"))
-                else:
-                    return RefundResult(
-                        success=False, error=f"Tranzila error: {result.get('Response')}"
-                    )
+            if result.get("Response") == "000":
+                return RefundResult(success=True, refund_id=result.get("ConfirmationCode"))
+            else:
+                return RefundResult(
+                    success=False, error=f"Tranzila error: {result.get('Response')}"
+                )
 
         except Exception as e:
             logger.error(f"Tranzila refund error: {e}")
@@ -1,7 +1,6 @@
 import json
 import logging
 from typing import Dict, Any, Union
-from pywebpush import webpush, WebPushException
 from app.core.config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -21,6 +20,9 @@ class PushService:
             logger.error("VAPID_PRIVATE_KEY is not set")
             raise ValueError("VAPID_PRIVATE_KEY is not set")
 
+        # pywebpush pulls in requests, http_ece and py_vapid; load it on first send
+        from pywebpush import WebPushException, webpush
+
         try:
             # Ensure keys are strings
             if isinstance(subscription_info, str):
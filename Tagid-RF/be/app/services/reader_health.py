@@ -0,0 +1,308 @@
+"""Reader health telemetry and ``RfidReader`` status upkeep.
+
+``ReaderHealthMonitor`` keeps per-reader state in memory, keyed by the
+reader's address (``RfidReader.ipAddress``):
+
+- connection state, connects/reconnects and the last error
+- frames, tag reads and CRC errors, plus frames/sec between checks
+- when the reader was last heard from, and how many heartbeats it missed
+
+It is fed from the push listener (``tag_listener_server.handle_client``) and
+the answer-mode ``RFIDReaderService``. Neither writes to the database per
+frame: ``flush`` writes ``status`` and ``lastSeen`` for all readers in one
+batch, only when the status changed or ``lastSeen`` is more than
+``last_seen_write_seconds`` behind.
+
+A connected reader that sends nothing for ``max_missed_heartbeats``
+heartbeat intervals is marked ERROR; a disconnected one is OFFLINE. Idle
+readers are prompted with ``RFM_GET_GATE_STATUS``: the listener sends it on
+its own socket, answer-mode services register a poller.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# RfidReader.status values
+ONLINE = "ONLINE"
+OFFLINE = "OFFLINE"
+ERROR = "ERROR"
+
+LISTENER = "listener"  # Reader pushes to our TCP listener
+POLLER = "poller"  # We connect to the reader (answer mode)
+
+
+@dataclass
+class ReaderHealth:
+    """What is known about one reader's connection."""
+
+    address: str
+    source: str
+    status: str = OFFLINE
+    connected: bool = False
+    connected_at: Optional[datetime] = None
+    last_seen: Optional[datetime] = None
+    frames: int = 0
+    tag_reads: int = 0
+    crc_errors: int = 0
+    errors: int = 0
+    connects: int = 0
+    missed_heartbeats: int = 0
+    frames_per_second: float = 0.0
+    last_error: Optional[str] = None
+    # Monotonic bookkeeping
+    heard_at: float = 0.0
+    rate_frames: int = 0
+    rate_at: float = 0.0
+    # What the database last got
+    flushed_status: Optional[str] = None
+    flushed_last_seen: Optional[datetime] = None
+
+    @property
+    def reconnects(self) -> int:
+        return max(self.connects - 1, 0)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "address": self.address,
+            "source": self.source,
+            "status": self.status,
+            "connected": self.connected,
+            "connected_at": self.connected_at,
+            "last_seen": self.last_seen,
+            "frames": self.frames,
+            "frames_per_second": round(self.frames_per_second, 2),
+            "tag_reads": self.tag_reads,
+            "crc_errors": self.crc_errors,
+            "errors": self.errors,
+            "reconnects": self.reconnects,
+            "missed_heartbeats": self.missed_heartbeats,
+            "last_error": self.last_error,
+        }
+
+
+class ReaderHealthMonitor:
+    """
+    In-memory reader health, safe to feed from listener threads.
+
+    Args:
+        heartbeat_seconds: Idle time after which a reader is polled and a
+            heartbeat counts as missed.
+        max_missed_heartbeats: Missed heartbeats before a connected reader
+            is marked ERROR.
+        last_seen_write_seconds: Minimum age of the stored ``lastSeen``
+            before it is rewritten for a reader whose status is unchanged.
+    """
+
+    def __init__(
+        self,
+        heartbeat_seconds: float = 10.0,
+        max_missed_heartbeats: int = 3,
+        last_seen_write_seconds: float = 60.0,
+    ):
+        self._lock = threading.Lock()
+        self._readers: Dict[str, ReaderHealth] = {}
+        self._pollers: Dict[str, Callable[[], Awaitable[bool]]] = {}
+        self.configure(heartbeat_seconds, max_missed_heartbeats, last_seen_write_seconds)
+
+    def configure(
+        self,
+        heartbeat_seconds: float,
+        max_missed_heartbeats: int,
+        last_seen_write_seconds: float,
+    ) -> None:
+        self.heartbeat_seconds = heartbeat_seconds
+        self.max_missed_heartbeats = max_missed_heartbeats
+        self.last_seen_write_seconds = last_seen_write_seconds
+
+    def reset(self) -> None:
+        with self._lock:
+            self._readers.clear()
+            self._pollers.clear()
+
+    def _reader(self, address: str, source: str = LISTENER) -> ReaderHealth:
+        reader = self._readers.get(address)
+        if reader is None:
+            reader = self._readers[address] = ReaderHealth(address=address, source=source)
+        return reader
+
+    # ------------------------------------------------------------------
+    # Events
+    # ------------------------------------------------------------------
+
+    def on_connect(
+        self,
+        address: str,
+        source: str = LISTENER,
+        poller: Optional[Callable[[], Awaitable[bool]]] = None,
+    ) -> None:
+        """A connection to ``address`` was established (``poller`` pings it when idle)."""
+        now = time.monotonic()
+        with self._lock:
+            reader = self._reader(address, source)
+            reader.source = source
+            reader.connected = True
+            reader.connected_at = datetime.now(timezone.utc)
+            reader.connects += 1
+            reader.missed_heartbeats = 0
+            reader.heard_at = reader.rate_at = now
+            reader.rate_frames = reader.frames
+            reader.status = ONLINE
+            if poller is not None:
+                self._pollers[address] = poller
+        if reader.reconnects:
+            logger.info(f"Reader {address} reconnected ({reader.reconnects} reconnects)")
+
+    def on_disconnect(self, address: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            reader = self._reader(address)
+            reader.connected = False
+            reader.status = OFFLINE
+            reader.frames_per_second = 0.0
+            if error:
+                reader.errors += 1
+                reader.last_error = error
+            self._pollers.pop(address, None)
+
+    def on_frames(self, address: str, frames: int, tag_reads: int = 0, crc_errors: int = 0) -> None:
+        """``frames`` complete frames arrived from ``address``."""
+        if not frames:
+            return
+        with self._lock:
+            reader = self._reader(address)
+            reader.frames += frames
+            reader.tag_reads += tag_reads
+            reader.crc_errors += crc_errors
+            reader.heard_at = time.monotonic()
+            reader.last_seen = datetime.now(timezone.utc)
+            reader.missed_heartbeats = 0
+            if reader.connected:
+                reader.status = ONLINE
+
+    def on_error(self, address: str, error: str) -> None:
+        with self._lock:
+            reader = self._reader(address)
+            reader.errors += 1
+            reader.last_error = error
+
+    def is_idle(self, address: str, now: Optional[float] = None) -> bool:
+        """Whether ``address`` has been silent for at least one heartbeat interval."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            reader = self._readers.get(address)
+            return reader is not None and now - reader.heard_at >= self.heartbeat_seconds
+
+    # ------------------------------------------------------------------
+    # Periodic work
+    # ------------------------------------------------------------------
+
+    def check(self, now: Optional[float] = None) -> List[str]:
+        """
+        Update rates and heartbeat state.
+
+        Returns:
+            Addresses that just went from ONLINE to ERROR.
+        """
+        now = time.monotonic() if now is None else now
+        failed = []
+        with self._lock:
+            for reader in self._readers.values():
+                if not reader.connected:
+                    continue
+                if now > reader.rate_at:
+                    reader.frames_per_second = (reader.frames - reader.rate_frames) / (
+                        now - reader.rate_at
+                    )
+                reader.rate_frames, reader.rate_at = reader.frames, now
+
+                reader.missed_heartbeats = int((now - reader.heard_at) // self.heartbeat_seconds)
+                if reader.missed_heartbeats >= self.max_missed_heartbeats:
+                    if reader.status != ERROR:
+                        failed.append(reader.address)
+                    reader.status = ERROR
+        for address in failed:
+            logger.warning(f"Reader {address} missed {self.max_missed_heartbeats} heartbeats")
+        return failed
+
+    async def poll_idle(self) -> None:
+        """Ping answer-mode readers that have been silent for a heartbeat."""
+        with self._lock:
+            pollers = list(self._pollers.items())
+        for address, poll in pollers:
+            if not self.is_idle(address):
+                continue
+            try:
+                ok = await poll()
+            except Exception as e:
+                ok = False
+                logger.debug(f"Heartbeat poll of {address} failed: {e}")
+            if not ok:
+                self.on_error(address, "Heartbeat poll failed")
+
+    def pending_updates(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """``RfidReader`` updates due: status changes, and stale ``lastSeen``."""
+        updates = []
+        with self._lock:
+            for reader in self._readers.values():
+                data: Dict[str, Any] = {}
+                if reader.status != reader.flushed_status:
+                    data["status"] = reader.status
+                if reader.last_seen and (
+                    data
+                    or reader.flushed_last_seen is None
+                    or (reader.last_seen - reader.flushed_last_seen).total_seconds()
+                    >= self.last_seen_write_seconds
+                ):
+                    data["lastSeen"] = reader.last_seen
+                if data:
+                    updates.append((reader.address, data))
+        return updates
+
+    def mark_flushed(self, updates: List[Tuple[str, Dict[str, Any]]]) -> None:
+        with self._lock:
+            for address, data in updates:
+                reader = self._readers[address]
+                if "status" in data:
+                    reader.flushed_status = data["status"]
+                if "lastSeen" in data:
+                    reader.flushed_last_seen = data["lastSeen"]
+
+    async def flush(self, db: Any) -> int:
+        """Write due updates in one batch. Returns the number of readers written."""
+        updates = self.pending_updates()
+        if not updates:
+            return 0
+        async with db.batch_() as batcher:
+            for address, data in updates:
+                batcher.rfidreader.update_many(where={"ipAddress": address}, data=data)
+        self.mark_flushed(updates)
+        return len(updates)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            readers = sorted(self._readers.values(), key=lambda reader: reader.address)
+            return [reader.as_dict() for reader in readers]
+
+    async def run(self, interval: float) -> None:
+        """Poll, check and flush until cancelled."""
+        from app.db.prisma import prisma_client
+
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.poll_idle()
+                self.check()
+                async with prisma_client.client as db:
+                    await self.flush(db)
+            except Exception as e:
+                logger.error(f"Reader health flush failed: {e}", exc_info=True)
+
+
+# Singleton instance
+reader_health_monitor = ReaderHealthMonitor()
@@ -0,0 +1,103 @@
+"""
+Byte transports for the M-200 reader.
+
+``RFIDReaderService`` frames commands and responses itself (``M200Command``
+/ ``M200ResponseParser``) and reads them with socket calls from a worker
+thread. The transports below all offer that same small socket surface —
+``sendall``, ``recv``, ``settimeout``, ``setblocking``, ``close`` — so the
+framing, buffering and timeout logic is shared between:
+
+- TCP: a plain ``socket.socket`` (the M-200's network port).
+- Serial/USB: ``SerialTransport``, wrapping pyserial with socket semantics
+  (``recv`` returns as soon as any bytes arrive and raises ``socket.timeout``
+  when none do).
+"""
+
+import logging
+import socket
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import serial
+
+    SERIAL_AVAILABLE = True
+except ImportError:
+    SERIAL_AVAILABLE = False
+
+TCP = "tcp"
+SERIAL = "serial"
+
+
+class SerialTransport:
+    """Socket-like wrapper around a pyserial port."""
+
+    def __init__(self, port: "serial.Serial"):
+        self._port = port
+        self._blocking_timeout: Optional[float] = port.timeout
+        self._blocking = True
+
+    @classmethod
+    def open(cls, device: str, baudrate: int = 115200, timeout: float = 10.0) -> "SerialTransport":
+        """
+        Open a serial device (e.g. ``/dev/ttyUSB0`` or ``COM3``).
+
+        Raises:
+            RuntimeError: If pyserial is not installed.
+            serial.SerialException: If the device cannot be opened.
+        """
+        if not SERIAL_AVAILABLE:
+            raise RuntimeError("pyserial is not installed. Run: pip install pyserial")
+        port = serial.Serial(
+            port=device,
+            baudrate=baudrate,
+            bytesize=serial.EIGHTBITS,
+            parity=serial.PARITY_NONE,
+            stopbits=serial.STOPBITS_ONE,
+            timeout=timeout,
+            write_timeout=timeout,
+        )
+        return cls(port)
+
+    def settimeout(self, timeout: Optional[float]) -> None:
+        self._blocking_timeout = timeout
+        self._port.timeout = timeout if self._blocking else 0
+
+    def setblocking(self, flag: bool) -> None:
+        self._blocking = flag
+        self._port.timeout = self._blocking_timeout if flag else 0
+
+    def sendall(self, data: bytes) -> None:
+        self._port.write(data)
+        self._port.flush()
+
+    def recv(self, bufsize: int) -> bytes:
+        """
+        Read up to ``bufsize`` bytes, returning as soon as any are available.
+
+        Raises:
+            socket.timeout: No byte arrived within the timeout.
+            BlockingIOError: Non-blocking mode and nothing is buffered.
+        """
+        first = self._port.read(1)
+        if not first:
+            if not self._blocking:
+                raise BlockingIOError("No data buffered")
+            raise socket.timeout("Serial read timed out")
+        waiting = min(bufsize - 1, self._port.in_waiting)
+        return first + (self._port.read(waiting) if waiting > 0 else b"")
+
+    def close(self) -> None:
+        self._port.close()
+
+    def fileno(self) -> int:
+        return self._port.fileno()
+
+
+def open_tcp_transport(host: str, port: int, timeout: float) -> socket.socket:
+    """Connect to a reader's TCP port."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    sock.connect((host, port))
+    return sock
@@ -0,0 +1,384 @@
+"""Reader auto-tuning: find the settings that read the most distinct tags per second.
+
+``ReaderTuner`` drives an ``RFIDReaderService`` through candidate settings
+(RF power, Query Q/session/target, per-antenna RSSI filters). Each candidate
+is applied, inventoried for a timed window and scored by:
+
+- unique EPCs per second, and
+- duplicate ratio (share of reads that repeat an EPC already seen in the
+  window), which costs air time without finding new tags.
+
+The search is coordinate descent: starting from the reader's stored (or
+default) profile, each dimension in turn is swept with the others held at
+the best values found so far. A sweep needs ``sum(len(dimension))`` windows
+instead of the full grid; sweeps repeat while they still improve the best
+profile, up to ``max_sweeps``, and repeated candidates are not re-measured.
+
+``ReaderTuningService`` runs one tuning job per ``RfidReader`` in the
+background, exposes its progress and stores the best profile in
+``ReaderTuningProfile``.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.services.rfid_reader import RFIDReaderService
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+@dataclass(frozen=True)
+class TuningProfile:
+    """Reader settings under test. ``rssi_filters[i]`` is antenna i+1's threshold (0 = off)."""
+
+    power_dbm: int = 30
+    q_value: int = 4
+    session: int = 0
+    target: int = 0
+    rssi_filters: Tuple[int, ...] = (0, 0, 0, 0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["rssi_filters"] = list(self.rssi_filters)
+        return data
+
+
+@dataclass
+class TuningScore:
+    """What one measurement window produced."""
+
+    reads: int
+    unique_epcs: int
+    window_seconds: float
+    unique_per_second: float
+    duplicate_ratio: float
+    score: float
+
+
+@dataclass
+class TuningSpace:
+    """Values tried for each dimension."""
+
+    powers: Sequence[int] = (20, 24, 27, 30)
+    q_values: Sequence[int] = (2, 3, 4, 5, 6)
+    sessions: Sequence[int] = (0, 1, 2)
+    targets: Sequence[int] = (0, 1)
+    rssi_thresholds: Sequence[int] = (0, 70, 60)
+    antennas: Sequence[int] = (1, 2, 3, 4)
+
+    def steps(self) -> int:
+        return (
+            len(self.powers)
+            + len(self.q_values)
+            + len(self.sessions) * len(self.targets)
+            + len(self.antennas) * len(self.rssi_thresholds)
+        )
+
+
+def score_window(
+    reads: int, unique_epcs: int, window_seconds: float, duplicate_weight: float
+) -> TuningScore:
+    """Score a window: unique EPCs/sec, discounted by the duplicate ratio."""
+    unique_per_second = unique_epcs / window_seconds if window_seconds > 0 else 0.0
+    duplicate_ratio = 1 - unique_epcs / reads if reads else 0.0
+    return TuningScore(
+        reads=reads,
+        unique_epcs=unique_epcs,
+        window_seconds=window_seconds,
+        unique_per_second=unique_per_second,
+        duplicate_ratio=duplicate_ratio,
+        score=unique_per_second * (1 - duplicate_weight * duplicate_ratio),
+    )
+
+
+@dataclass
+class TuningJob:
+    """Progress of one tuning run."""
+
+    reader_id: str
+    total_steps: int
+    status: str = PENDING
+    completed_steps: int = 0
+    current: Optional[TuningProfile] = None
+    best: Optional[TuningProfile] = None
+    best_score: Optional[TuningScore] = None
+    results: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None
+    started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: Optional[datetime] = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in (PENDING, RUNNING)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "reader_id": self.reader_id,
+            "status": self.status,
+            "completed_steps": self.completed_steps,
+            "total_steps": self.total_steps,
+            "current": self.current.to_dict() if self.current else None,
+            "best": self.best.to_dict() if self.best else None,
+            "best_score": asdict(self.best_score) if self.best_score else None,
+            "results": list(self.results),
+            "error": self.error,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class ReaderTuner:
+    """
+    Coordinate-descent search over one connected reader's settings.
+
+    Args:
+        reader: A connected ``RFIDReaderService`` that is not scanning.
+        space: Values to try per dimension.
+        window_seconds: How long each candidate is inventoried.
+        duplicate_weight: How much a 100% duplicate ratio discounts the score.
+        settle_seconds: Pause before each window so tags left in inventoried
+            state B by the previous candidate (sessions 1-3) are readable again.
+        max_sweeps: Passes over all dimensions; stops early once a pass
+            leaves the best profile unchanged.
+    """
+
+    def __init__(
+        self,
+        reader: RFIDReaderService,
+        space: Optional[TuningSpace] = None,
+        window_seconds: float = 2.0,
+        duplicate_weight: float = 0.2,
+        settle_seconds: float = 2.0,
+        max_sweeps: int = 2,
+    ):
+        self.reader = reader
+        self.space = space or TuningSpace()
+        self.window_seconds = window_seconds
+        self.duplicate_weight = duplicate_weight
+        self.settle_seconds = settle_seconds
+        self.max_sweeps = max_sweeps
+        self._scores: Dict[TuningProfile, TuningScore] = {}
+
+    async def apply(self, profile: TuningProfile) -> None:
+        """Push a profile to the reader; raises RuntimeError if the reader rejects it."""
+        if not await self.reader.set_power(profile.power_dbm):
+            raise RuntimeError(f"Reader rejected power {profile.power_dbm} dBm")
+        if not await self.reader.set_query_params(profile.q_value, profile.session, profile.target):
+            raise RuntimeError(
+                f"Reader rejected Q={profile.q_value} S{profile.session} target {profile.target}"
+            )
+        for antenna, threshold in enumerate(profile.rssi_filters, start=1):
+            if not await self.reader.set_rssi_filter(antenna, threshold):
+                raise RuntimeError(f"Reader rejected RSSI filter {threshold} on antenna {antenna}")
+
+    async def measure(self) -> TuningScore:
+        """Inventory for one window and score what was read."""
+        await asyncio.sleep(self.settle_seconds)
+        reads = 0
+        seen = set()
+        started = time.monotonic()
+        while time.monotonic() - started < self.window_seconds:
+            if not self.reader.is_connected:
+                raise RuntimeError("Reader disconnected during tuning")
+            tags = await self.reader.read_single_tag()
+            reads += len(tags)
+            seen.update(tag["epc"] for tag in tags)
+        return score_window(reads, len(seen), time.monotonic() - started, self.duplicate_weight)
+
+    async def evaluate(self, profile: TuningProfile, job: TuningJob) -> TuningScore:
+        """Score a profile (once; repeats come from the cache) and track the best."""
+        job.current = profile
+        score = self._scores.get(profile)
+        if score is None:
+            await self.apply(profile)
+            score = self._scores[profile] = await self.measure()
+            job.results.append({"profile": profile.to_dict(), **asdict(score)})
+            logger.info(
+                f"Tuning {job.reader_id}: {profile} -> {score.unique_per_second:.1f} unique/s, "
+                f"{score.duplicate_ratio:.0%} duplicates"
+            )
+        if job.best_score is None or score.score > job.best_score.score:
+            job.best, job.best_score = profile, score
+        return score
+
+    async def tune(self, job: TuningJob, start: Optional[TuningProfile] = None) -> TuningProfile:
+        """Run the search, leave the reader on the best profile and return it."""
+        space = self.space
+        job.status = RUNNING
+        await self.evaluate(start or TuningProfile(), job)
+
+        dimensions = [
+            [{"power_dbm": power} for power in space.powers],
+            [{"q_value": q} for q in space.q_values],
+            [{"session": s, "target": t} for s in space.sessions for t in space.targets],
+        ]
+        for antenna in space.antennas:
+            dimensions.append([{"antenna": antenna, "rssi": v} for v in space.rssi_thresholds])
+
+        # Sweep again while a pass still moves the best profile (e.g. a start
+        # whose filters hide every tag scores all power/Q candidates equal)
+        for sweep in range(self.max_sweeps):
+            if sweep:
+                job.total_steps += space.steps()
+            before = job.best
+            for candidates in dimensions:
+                for change in candidates:
+                    await self.evaluate(self._with(job.best, change), job)
+                    job.completed_steps += 1
+            if job.best == before:
+                break
+
+        await self.apply(job.best)
+        return job.best
+
+    @staticmethod
+    def _with(profile: TuningProfile, change: Dict[str, int]) -> TuningProfile:
+        if "antenna" in change:
+            filters = list(profile.rssi_filters)
+            filters[change["antenna"] - 1] = change["rssi"]
+            return replace(profile, rssi_filters=tuple(filters))
+        return replace(profile, **change)
+
+
+def split_address(address: str, default_port: int) -> Tuple[str, int]:
+    """``host`` or ``host:port`` (emulated readers listen on their own ports)."""
+    host, _, port = address.partition(":")
+    return host, int(port) if port else default_port
+
+
+class ReaderTuningService:
+    """One background tuning job per reader, with progress and persisted results."""
+
+    def __init__(self):
+        self._jobs: Dict[str, TuningJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def get_job(self, reader_id: str) -> Optional[TuningJob]:
+        return self._jobs.get(reader_id)
+
+    def start(
+        self,
+        reader_id: str,
+        address: str,
+        space: Optional[TuningSpace] = None,
+        window_seconds: float = 2.0,
+        duplicate_weight: float = 0.2,
+        settle_seconds: float = 2.0,
+        start_profile: Optional[TuningProfile] = None,
+    ) -> TuningJob:
+        """
+        Start tuning the reader at ``address`` (``host`` or ``host:port``).
+
+        Raises:
+            RuntimeError: A job for this reader is already running.
+        """
+        existing = self._jobs.get(reader_id)
+        if existing and existing.is_active:
+            raise RuntimeError(f"Reader {reader_id} is already being tuned")
+
+        space = space or TuningSpace()
+        job = self._jobs[reader_id] = TuningJob(reader_id=reader_id, total_steps=space.steps())
+        tuner_args = (space, window_seconds, duplicate_weight, settle_seconds)
+        self._tasks[reader_id] = asyncio.create_task(
+            self._run(job, address, tuner_args, start_profile)
+        )
+        return job
+
+    def cancel(self, reader_id: str) -> bool:
+        task = self._tasks.get(reader_id)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    async def _run(
+        self,
+        job: TuningJob,
+        address: str,
+        tuner_args: Tuple[TuningSpace, float, float, float],
+        start_profile: Optional[TuningProfile],
+    ) -> None:
+        reader, owned = self._reader_for(address)
+        try:
+            if reader.is_scanning:
+                raise RuntimeError("Reader is scanning; stop scanning before tuning")
+            if not reader.is_connected and not await reader.connect():
+                raise RuntimeError(f"Cannot connect to reader at {address}")
+
+            best = await ReaderTuner(reader, *tuner_args).tune(job, start_profile)
+            await save_profile(job.reader_id, best, job.best_score)
+            job.status = COMPLETED
+            logger.info(f"Tuning {job.reader_id} finished: {best}")
+        except asyncio.CancelledError:
+            job.status = CANCELLED
+        except Exception as e:
+            logger.error(f"Tuning {job.reader_id} failed: {e}", exc_info=True)
+            job.status, job.error = FAILED, str(e)
+        finally:
+            job.current = None
+            job.finished_at = datetime.now(timezone.utc)
+            self._tasks.pop(job.reader_id, None)
+            if owned:
+                await reader.disconnect()
+
+    @staticmethod
+    def _reader_for(address: str) -> Tuple[RFIDReaderService, bool]:
+        """The app's reader service if it already talks to ``address``, else a new one."""
+        from app.services.rfid_reader import rfid_reader_service
+
+        host, port = split_address(address, rfid_reader_service.reader_port)
+        current = (rfid_reader_service.reader_ip, rfid_reader_service.reader_port)
+        if rfid_reader_service.connection_type == "tcp" and current == (host, port):
+            return rfid_reader_service, False
+
+        reader = RFIDReaderService()
+        reader.connection_type = "tcp"
+        reader.reader_ip, reader.reader_port = host, port
+        return reader, True
+
+
+async def save_profile(reader_id: str, profile: TuningProfile, score: TuningScore) -> None:
+    """Store the best profile for a reader (one row per reader)."""
+    from app.db.prisma import prisma_client
+
+    data = {
+        "powerDbm": profile.power_dbm,
+        "qValue": profile.q_value,
+        "session": profile.session,
+        "target": profile.target,
+        "rssiFilters": list(profile.rssi_filters),
+        "uniquePerSecond": score.unique_per_second,
+        "duplicateRatio": score.duplicate_ratio,
+        "score": score.score,
+        "windowSeconds": score.window_seconds,
+        "tunedAt": datetime.now(timezone.utc),
+    }
+    async with prisma_client.client as db:
+        await db.readertuningprofile.upsert(
+            where={"readerId": reader_id},
+            data={"create": {"readerId": reader_id, **data}, "update": data},
+        )
+
+
+def profile_from_record(record: Any) -> TuningProfile:
+    return TuningProfile(
+        power_dbm=record.powerDbm,
+        q_value=record.qValue,
+        session=record.session,
+        target=record.target,
+        rssi_filters=tuple(record.rssiFilters),
+    )
+
+
+# Singleton instance
+reader_tuning_service = ReaderTuningService()
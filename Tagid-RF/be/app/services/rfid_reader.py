@@ -15,9 +15,11 @@ from datetime import datetime, timezone
 from typing import Any, Callable, Dict, List, Optional
 
 from app.core.config import get_settings
+from app.core.logging import LazyHex, rate_limited_logger
 from app.models.rfid_tag import RFIDScanHistory, RFIDTag
 from app.routers.websocket import manager
 from app.services.database import SessionLocal
+from app.services.inventory_counters import record_tag_change, tag_state
 from app.services.m200_protocol import (  # noqa: F401 - Full protocol API exposed for comprehensive reader control
     HEAD,
     M200Command,
@@ -46,14 +48,22 @@ from app.services.m200_protocol import (  # noqa: F401 - Full protocol API expos
     build_set_query_param_command,
     build_set_rssi_filter_command,
     build_stop_inventory_command,
+    crc_ok,
     parse_device_info,
     parse_gate_status,
     parse_gpio_levels,
     parse_inventory_response,
     parse_network_response,
 )
+from app.services.reader_health import POLLER, reader_health_monitor
+from app.services.reader_transport import SERIAL, SerialTransport, open_tcp_transport
+from app.services.tag_repository import tag_repository
+from app.services.tag_stats import tag_stats
 
 logger = logging.getLogger(__name__)
+# TX/RX frames and per-poll tag reads, rate limited
+frame_logger = rate_limited_logger(f"{__name__}.frames")
+tag_logger = rate_limited_logger(f"{__name__}.tags")
 settings = get_settings()
 
 
@@ -65,10 +75,14 @@ class RFIDReaderService:
         self.reader_port = getattr(settings, "RFID_READER_PORT", 4001)
         self.socket_timeout = getattr(settings, "RFID_SOCKET_TIMEOUT", 10)
         self.reader_id = getattr(settings, "RFID_READER_ID", "M-200")
+        self.connection_type = getattr(settings, "RFID_CONNECTION_TYPE", "tcp")
+        self.serial_device = getattr(settings, "RFID_SERIAL_DEVICE", None)
+        self.serial_baudrate = getattr(settings, "RFID_SERIAL_BAUDRATE", 115200)
 
         self.is_connected = False
         self.is_scanning = False
 
+        # TCP socket or SerialTransport; both expose the same socket-style API
         self._socket: Optional[socket.socket] = None
         self._scan_task: Optional[asyncio.Task] = None
         self._device_info: Optional[Dict[str, Any]] = None
@@ -78,8 +92,10 @@ class RFIDReaderService:
         return {
             "is_connected": self.is_connected,
             "is_scanning": self.is_scanning,
+            "connection_type": self.connection_type,
             "reader_ip": self.reader_ip,
             "reader_port": self.reader_port,
+            "serial_device": self.serial_device,
             "device_info": self._device_info,
         }
 
@@ -98,7 +114,7 @@ class RFIDReaderService:
 
     async def connect(self) -> bool:
         """
-        Connect to M-200 via TCP/IP.
+        Connect to M-200 via TCP/IP or serial, per ``RFID_CONNECTION_TYPE``.
 
         Returns:
             True if connection successful, False otherwise
@@ -107,16 +123,25 @@ class RFIDReaderService:
             logger.info("Already connected to M-200 reader")
             return True
 
+        target = self._target()
         try:
-            logger.info(f"Connecting to M-200 at {self.reader_ip}:{self.reader_port}")
-
-            # Create TCP socket
-            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self._socket.settimeout(self.socket_timeout)
-            self._socket.connect((self.reader_ip, self.reader_port))
+            logger.info(f"Connecting to M-200 at {target}")
+
+            if self.connection_type == SERIAL:
+                self._socket = await asyncio.to_thread(
+                    SerialTransport.open,
+                    self.serial_device,
+                    self.serial_baudrate,
+                    self.socket_timeout,
+                )
+            else:
+                self._socket = open_tcp_transport(
+                    self.reader_ip, self.reader_port, self.socket_timeout
+                )
 
             self.is_connected = True
-            logger.info(f"✓ Connected to M-200 at {self.reader_ip}:{self.reader_port}")
+            logger.info(f"✓ Connected to M-200 at {target}")
+            reader_health_monitor.on_connect(self.health_address, POLLER, poller=self.heartbeat)
 
             # Small delay to let device stabilize
             await asyncio.sleep(0.1)
@@ -127,7 +152,7 @@ class RFIDReaderService:
                 buffered = self._socket.recv(4096)
                 if buffered:
                     logger.debug(
-                        f"Cleared {len(buffered)} bytes of buffered data: {buffered.hex().upper()}"
+                        "Cleared %d bytes of buffered data: %s", len(buffered), LazyHex(buffered)
                     )
             except BlockingIOError:
                 pass  # No data buffered
@@ -146,18 +171,35 @@ class RFIDReaderService:
             return True
 
         except socket.timeout:
-            logger.error(f"Connection timeout to {self.reader_ip}:{self.reader_port}")
+            logger.error(f"Connection timeout to {target}")
             self.is_connected = False
+            reader_health_monitor.on_disconnect(self.health_address, "Connection timeout")
             return False
         except ConnectionRefusedError:
-            logger.error(f"Connection refused by {self.reader_ip}:{self.reader_port}")
+            logger.error(f"Connection refused by {target}")
             self.is_connected = False
+            reader_health_monitor.on_disconnect(self.health_address, "Connection refused")
             return False
         except Exception as e:
             logger.exception(f"Connection failed: {e}")
             self.is_connected = False
+            reader_health_monitor.on_disconnect(self.health_address, str(e))
             return False
 
+    def _target(self) -> str:
+        if self.connection_type == SERIAL:
+            return f"{self.serial_device} ({self.serial_baudrate} baud)"
+        return f"{self.reader_ip}:{self.reader_port}"
+
+    @property
+    def health_address(self) -> str:
+        """Key for ``reader_health_monitor`` (matches ``RfidReader.ipAddress``)."""
+        return self.serial_device if self.connection_type == SERIAL else self.reader_ip
+
+    async def heartbeat(self) -> bool:
+        """Poll the reader (Get Gate Status) to check it still answers."""
+        return "error" not in await self.get_gate_status()
+
     async def disconnect(self):
         """Disconnect from M-200 reader."""
         if self.is_scanning:
@@ -174,12 +216,25 @@ class RFIDReaderService:
 
             self.is_connected = False
             self._device_info = None
+            reader_health_monitor.on_disconnect(self.health_address)
             logger.info("✓ Disconnected from M-200")
 
         except Exception as e:
             logger.error(f"Error during disconnect: {e}", exc_info=True)
 
     def _send_command(self, command: M200Command, max_retries: int = 3) -> bytes:
+        """Send command to M-200 and receive response, recording reader health."""
+        try:
+            response = self._exchange(command, max_retries)
+        except (OSError, ValueError) as e:
+            reader_health_monitor.on_error(self.health_address, f"0x{command.cmd:04X}: {e}")
+            raise
+        reader_health_monitor.on_frames(
+            self.health_address, 1, crc_errors=0 if crc_ok(response) else 1
+        )
+        return response
+
+    def _exchange(self, command: M200Command, max_retries: int = 3) -> bytes:
         """
         Send command to M-200 and receive response.
 
@@ -203,7 +258,7 @@ class RFIDReaderService:
 
         # Send command
         cmd_bytes = command.serialize()
-        logger.debug(f"→ TX: {cmd_bytes.hex().upper()} (CMD=0x{command.cmd:04X})")
+        frame_logger.debug("→ TX: %s (CMD=0x%04X)", LazyHex(cmd_bytes), command.cmd)
         self._socket.sendall(cmd_bytes)
 
         # Receive response - may need to read multiple messages if device sends unsolicited data
@@ -232,7 +287,7 @@ class RFIDReaderService:
                     except socket.timeout:
                         pass  # No more data available
                     # Return what we got - let parser handle the error
-                    logger.debug(f"← RX: {response.hex().upper()} (len={len(response)})")
+                    frame_logger.debug("← RX: %s (len=%d)", LazyHex(response), len(response))
                     return response
 
                 # Restore original timeout
@@ -273,8 +328,8 @@ class RFIDReaderService:
                 # Check if this response matches our command
                 response_cmd = struct.unpack(">H", response[2:4])[0]
 
-                logger.debug(
-                    f"← RX: {response.hex().upper()} (len={len(response)}, CMD=0x{response_cmd:04X})"
+                frame_logger.debug(
+                    "← RX: %s (len=%d, CMD=0x%04X)", LazyHex(response), len(response), response_cmd
                 )
 
                 if response_cmd == command.cmd:
@@ -456,11 +511,15 @@ class RFIDReaderService:
             tags = parse_inventory_response(response.data)
 
             if tags:
-                logger.info(f"Read {len(tags)} tag(s)")
-                for tag in tags:
-                    logger.debug(
-                        f"  Tag: EPC={tag['epc']}, RSSI={tag['rssi']}dBm, Ant={tag['antenna_port']}"
-                    )
+                tag_logger.info("Read %d tag(s)", len(tags))
+                if tag_logger.isEnabledFor(logging.DEBUG):
+                    for tag in tags:
+                        tag_logger.debug(
+                            "  Tag: EPC=%s, RSSI=%sdBm, Ant=%s",
+                            tag["epc"],
+                            tag["rssi"],
+                            tag["antenna_port"],
+                        )
 
             # Add timestamp to each tag
             timestamp = datetime.now(timezone.utc).isoformat()
@@ -502,7 +561,6 @@ class RFIDReaderService:
             try:
                 # Read tags
                 tags = await self.read_single_tag()
-                print(tags)
                 # Process each tag
                 for tag_data in tags:
                     await self._process_tag(tag_data, callback)
@@ -517,6 +575,22 @@ class RFIDReaderService:
                 logger.error(f"Error in scan loop: {e}", exc_info=True)
                 await asyncio.sleep(1)  # Wait before retrying
 
+    def _record_stats(self, tag: RFIDTag, is_new: bool, previous_rssi: Optional[int]) -> None:
+        """Feed an ingested scan to the dashboard stats."""
+        try:
+            tag_stats.record_scan(
+                tag_id=tag.id,
+                epc=tag.epc,
+                read_count=tag.read_count,
+                is_new=is_new,
+                rssi=tag.rssi,
+                previous_rssi=previous_rssi,
+                location=tag.location,
+                previous_location=tag.location,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to record tag stats: {e}")
+
     async def _process_tag(self, tag_data: Dict[str, Any], callback: Optional[Callable] = None):
         """
         Process a scanned tag: save to DB and broadcast via WebSocket.
@@ -526,24 +600,35 @@ class RFIDReaderService:
             callback: Optional callback function
         """
         try:
-            db = SessionLocal()
+            epc = tag_data["epc"]
+
+            # Sale state comes from the tag repository (Prisma); the scan
+            # row below mirrors it
+            registered = None
             try:
-                epc = tag_data["epc"]
+                registered = await tag_repository.get(epc)
+            except Exception as e:
+                logger.error(f"Error checking tag mapping: {e}")
 
+            db = SessionLocal(expire_on_commit=False)
+            try:
                 # Find or create tag
                 existing_tag = db.query(RFIDTag).filter(RFIDTag.epc == epc).first()
 
                 if existing_tag:
+                    previous_rssi = existing_tag.rssi
+                    previous_state = tag_state(existing_tag)
+
                     # Update existing tag
                     existing_tag.read_count += 1
                     existing_tag.last_seen = datetime.now(timezone.utc)
                     existing_tag.rssi = tag_data.get("rssi")
                     existing_tag.antenna_port = tag_data.get("antenna_port")
-                    db.commit()
-                    db.refresh(existing_tag)
-                    tag_id = existing_tag.id
+                    tag = existing_tag
+                    stats_args = (existing_tag, False, previous_rssi)
                 else:
                     # Create new tag
+                    previous_state = None
                     new_tag = RFIDTag(
                         epc=epc,
                         rssi=tag_data.get("rssi"),
@@ -552,9 +637,9 @@ class RFIDReaderService:
                         location=None,  # Set manually
                     )
                     db.add(new_tag)
-                    db.commit()
-                    db.refresh(new_tag)
-                    tag_id = new_tag.id
+                    tag = new_tag
+                    stats_args = (new_tag, True, None)
+                mirrored = tag_repository.mirror_row(tag, registered)
 
                 # Create scan history
                 history = RFIDScanHistory(
@@ -565,24 +650,13 @@ class RFIDReaderService:
                     scanned_at=datetime.now(timezone.utc),
                 )
                 db.add(history)
+                # Tag, mirror and history in one transaction
                 db.commit()
+                tag_id = tag.id
 
-                # Check for existing mapping
-                from app.db.prisma import prisma_client
-
-                encryption_status = {"is_mapped": False, "target_qr": None}
-
-                # Use Prisma to check for mapping
-                try:
-                    mapping = await prisma_client.client.rfidtag.find_unique(where={"epc": epc})
-
-                    if mapping:
-                        encryption_status = {
-                            "is_mapped": True,
-                            "target_qr": mapping.encryptedQr,  # Note casing from Prisma
-                        }
-                except Exception as e:
-                    logger.error(f"Error checking tag mapping: {e}")
+                self._record_stats(*stats_args)
+                if mirrored:
+                    record_tag_change(previous_state, tag_state(tag))
 
                 # Broadcast via WebSocket
                 await manager.broadcast(
@@ -594,7 +668,9 @@ class RFIDReaderService:
                             "rssi": tag_data.get("rssi"),
                             "antenna_port": tag_data.get("antenna_port"),
                             "timestamp": tag_data.get("timestamp"),
-                            **encryption_status,
+                            "is_mapped": registered is not None,
+                            "target_qr": registered.encryptedQr if registered else None,
+                            "is_paid": tag_repository.paid_state(registered, tag),
                         },
                     }
                 )
@@ -0,0 +1,531 @@
+"""Scan history partitioning, hourly rollups and retention.
+
+Every processed read adds a row to ``rfid_scan_history``. The
+``ScanHistoryMaintainer`` job keeps that table bounded:
+
+- Partitioning (Postgres): the table is range-partitioned by ``scanned_at``
+  into daily or weekly partitions, created a few periods ahead. An existing
+  plain table is converted once; its rows become a ``_legacy`` partition.
+  A ``_default`` partition catches rows outside every range.
+- Rollups: each completed hour is aggregated into ``rfid_scan_rollups``
+  (per EPC and reader: count, min/max RSSI, RSSI sum/count for averages).
+  Recent hours are rebuilt when scans for them arrive after their rollup.
+- Retention: raw scans older than ``SCAN_HISTORY_RETENTION_DAYS`` are
+  dropped, but never before their hour is rolled up. On Postgres whole
+  partitions are dropped; other databases delete by range.
+
+``scan_activity`` answers hourly activity queries, reading rollups for
+the part of a long range that has been rolled up and raw scans for the rest.
+"""
+
+import asyncio
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import DateTime, delete, func, insert, literal, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateIndex
+
+from app.models.rfid_tag import RFIDScanHistory, RFIDScanRollup
+
+logger = logging.getLogger(__name__)
+
+HOUR = timedelta(hours=1)
+PARENT_TABLE = RFIDScanHistory.__tablename__
+LEGACY_PARTITION = f"{PARENT_TABLE}_legacy"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+INTERVALS = {"day": timedelta(days=1), "week": timedelta(weeks=1)}
+
+_BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+def _utc(moment: datetime) -> datetime:
+    """Treat naive datetimes (SQLite) as UTC."""
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def floor_hour(moment: datetime) -> datetime:
+    return _utc(moment).replace(minute=0, second=0, microsecond=0)
+
+
+def period_start(moment: datetime, interval: str) -> datetime:
+    """Start of the day (or ISO week, Monday) containing ``moment``, in UTC."""
+    day = _utc(moment).astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "week":
+        day -= timedelta(days=day.weekday())
+    return day
+
+
+def partition_name(start: datetime) -> str:
+    return f"{PARENT_TABLE}_p{start:%Y%m%d}"
+
+
+def parse_bounds(expression: str) -> Optional[Tuple[Optional[datetime], Optional[datetime]]]:
+    """
+    Parse ``pg_get_expr(relpartbound)`` into (lower, upper).
+
+    ``MINVALUE``/``MAXVALUE`` become None; the default partition gives None.
+    """
+    match = _BOUND_RE.search(expression)
+    if not match:
+        return None
+
+    def value(raw: str) -> Optional[datetime]:
+        raw = raw.strip()
+        if raw in ("MINVALUE", "MAXVALUE"):
+            return None
+        return _utc(datetime.fromisoformat(raw.strip("'")))
+
+    return value(match.group(1)), value(match.group(2))
+
+
+class ScanHistoryMaintainer:
+    """Partitions, rolls up and prunes ``rfid_scan_history``."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        interval: str = "day",
+        retention_days: int = 30,
+        rollup_retention_days: int = 365,
+        precreate: int = 3,
+        rollup_lag: timedelta = timedelta(minutes=5),
+        max_hours_per_run: int = 168,
+        late_scan_window: timedelta = timedelta(hours=2),
+    ):
+        if interval not in INTERVALS:
+            raise ValueError(f"Unknown partition interval: {interval}")
+        self.engine = engine
+        self.interval = interval
+        self.retention_days = retention_days
+        self.rollup_retention_days = rollup_retention_days
+        self.precreate = precreate
+        self.rollup_lag = rollup_lag
+        self.max_hours_per_run = max_hours_per_run
+        self.late_scan_window = late_scan_window
+
+    @property
+    def partitioned(self) -> bool:
+        """Whether this database supports native partitioning."""
+        return self.engine.dialect.name == "postgresql"
+
+    # ============ Partitions (Postgres) ============
+
+    def _relkind(self, conn: Connection) -> Optional[str]:
+        return conn.execute(
+            text("SELECT relkind FROM pg_class WHERE relname = :name AND relkind IN ('r', 'p')"),
+            {"name": PARENT_TABLE},
+        ).scalar()
+
+    def list_partitions(self, conn: Connection) -> Dict[str, Optional[Tuple]]:
+        """Partition name -> (lower, upper) bounds, None for the default partition."""
+        rows = conn.execute(
+            text(
+                "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+                "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = CAST(:parent AS regclass)"
+            ),
+            {"parent": PARENT_TABLE},
+        ).all()
+        return {name: parse_bounds(bound) for name, bound in rows}
+
+    def ensure_partitioned(self) -> bool:
+        """
+        Convert a plain ``rfid_scan_history`` into a partitioned table.
+
+        Existing rows are kept in a ``_legacy`` partition bounded by the end of
+        the period holding the newest row. Returns True if a conversion ran.
+        """
+        table = RFIDScanHistory.__table__
+        with self.engine.begin() as conn:
+            if self._relkind(conn) != "r":
+                return False
+
+            conn.execute(text(f"LOCK TABLE {PARENT_TABLE} IN ACCESS EXCLUSIVE MODE"))
+            newest = conn.execute(select(func.max(RFIDScanHistory.scanned_at))).scalar()
+
+            conn.execute(text(f"ALTER TABLE {PARENT_TABLE} RENAME TO {LEGACY_PARTITION}"))
+            conn.execute(
+                text(f"ALTER INDEX IF EXISTS {PARENT_TABLE}_pkey RENAME TO {LEGACY_PARTITION}_pkey")
+            )
+            for index in table.indexes:
+                conn.execute(
+                    text(f"ALTER INDEX IF EXISTS {index.name} RENAME TO {index.name}_legacy")
+                )
+
+            conn.execute(
+                text(
+                    f"CREATE TABLE {PARENT_TABLE} "
+                    f"(LIKE {LEGACY_PARTITION} INCLUDING DEFAULTS INCLUDING COMMENTS) "
+                    f"PARTITION BY RANGE (scanned_at)"
+                )
+            )
+            # The partition key must be part of the primary key
+            conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ADD PRIMARY KEY (id, scanned_at)"))
+            # Keep the id sequence alive when the legacy partition is dropped
+            conn.execute(
+                text(f"ALTER SEQUENCE IF EXISTS {PARENT_TABLE}_id_seq OWNED BY {PARENT_TABLE}.id")
+            )
+            for index in table.indexes:
+                conn.execute(CreateIndex(index))
+
+            if newest is None:
+                conn.execute(text(f"DROP TABLE {LEGACY_PARTITION}"))
+            else:
+                upper = period_start(newest, self.interval) + INTERVALS[self.interval]
+                conn.execute(
+                    text(
+                        f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {LEGACY_PARTITION} "
+                        f"FOR VALUES FROM (MINVALUE) TO ('{upper.isoformat()}')"
+                    )
+                )
+            conn.execute(
+                text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT")
+            )
+
+        logger.warning(
+            f"Converted {PARENT_TABLE} to a partitioned table "
+            f"({'no existing rows' if newest is None else f'existing rows in {LEGACY_PARTITION}'})"
+        )
+        return True
+
+    def ensure_partitions(self, now: datetime) -> List[str]:
+        """Create partitions for the current period and ``precreate`` periods ahead."""
+        step = INTERVALS[self.interval]
+        created = []
+        with self.engine.begin() as conn:
+            ranges = [b for b in self.list_partitions(conn).values() if b]
+            start = period_start(now, self.interval)
+            for _ in range(self.precreate + 1):
+                end = start + step
+                overlaps = any(
+                    (lower is None or lower < end) and (upper is None or upper > start)
+                    for lower, upper in ranges
+                )
+                if not overlaps:
+                    name = partition_name(start)
+                    try:
+                        with conn.begin_nested():
+                            conn.execute(
+                                text(
+                                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF "
+                                    f"{PARENT_TABLE} FOR VALUES FROM ('{start.isoformat()}') "
+                                    f"TO ('{end.isoformat()}')"
+                                )
+                            )
+                        created.append(name)
+                        ranges.append((start, end))
+                    except Exception as e:
+                        # Typically rows for this range already sit in the default partition
+                        logger.error(f"Could not create scan history partition {name}: {e}")
+                start = end
+        if created:
+            logger.info(f"Created scan history partitions: {', '.join(created)}")
+        return created
+
+    # ============ Rollups ============
+
+    def rolled_up_until(self, conn: Connection) -> Optional[datetime]:
+        """End of the newest rolled-up hour, or None before the first rollup."""
+        latest = conn.execute(select(func.max(RFIDScanRollup.bucket_start))).scalar()
+        return _utc(latest) + HOUR if latest else None
+
+    def rollup_hour(self, conn: Connection, hour: datetime) -> int:
+        """(Re)build the rollup rows for one hour. Returns rows written."""
+        raw = RFIDScanHistory
+        conn.execute(delete(RFIDScanRollup).where(RFIDScanRollup.bucket_start == hour))
+        aggregates = (
+            select(
+                literal(hour, DateTime(timezone=True)),
+                raw.epc,
+                raw.reader_id,
+                func.count(),
+                func.min(raw.rssi),
+                func.max(raw.rssi),
+                func.sum(raw.rssi),
+                func.count(raw.rssi),
+            )
+            .where(raw.scanned_at >= hour, raw.scanned_at < hour + HOUR)
+            .group_by(raw.epc, raw.reader_id)
+        )
+        result = conn.execute(
+            insert(RFIDScanRollup).from_select(
+                [
+                    "bucket_start",
+                    "epc",
+                    "reader_id",
+                    "scan_count",
+                    "rssi_min",
+                    "rssi_max",
+                    "rssi_sum",
+                    "rssi_count",
+                ],
+                aggregates,
+            )
+        )
+        return result.rowcount or 0
+
+    def stale_hours(self, conn: Connection, since: datetime, until: datetime) -> List[datetime]:
+        """Hours in [since, until) whose raw scan count differs from their rollup."""
+        raw = RFIDScanHistory
+        hour = _hour_bucket(raw.scanned_at, conn.dialect.name)
+        raw_counts = conn.execute(
+            select(hour, func.count())
+            .where(raw.scanned_at >= since, raw.scanned_at < until)
+            .group_by(hour)
+        ).all()
+        rolled_up = {
+            _utc(bucket): scans
+            for bucket, scans in conn.execute(
+                select(RFIDScanRollup.bucket_start, func.sum(RFIDScanRollup.scan_count))
+                .where(RFIDScanRollup.bucket_start >= since, RFIDScanRollup.bucket_start < until)
+                .group_by(RFIDScanRollup.bucket_start)
+            )
+        }
+        return sorted(
+            _bucket_time(bucket)
+            for bucket, scans in raw_counts
+            if rolled_up.get(_bucket_time(bucket)) != scans
+        )
+
+    def rollup(self, now: datetime) -> int:
+        """
+        Roll up every completed hour since the last run.
+
+        Hours without scans are skipped; at most ``max_hours_per_run`` hours
+        are processed, the rest on the next run. Scans can be stored after
+        their hour was rolled up (buffered or retried reads), so rolled-up
+        hours within ``late_scan_window`` are rebuilt if their raw count
+        changed. Returns hours rolled up.
+        """
+        end = floor_hour(now - self.rollup_lag)
+        hours = 0
+        with self.engine.connect() as conn:
+            start = self.rolled_up_until(conn)
+
+        recheck_from = end - self.late_scan_window
+        if start is not None and start > recheck_from:
+            with self.engine.begin() as conn:
+                for hour in self.stale_hours(conn, recheck_from, min(start, end)):
+                    self.rollup_hour(conn, hour)
+                    hours += 1
+
+        while hours < self.max_hours_per_run:
+            with self.engine.begin() as conn:
+                query = select(func.min(RFIDScanHistory.scanned_at)).where(
+                    RFIDScanHistory.scanned_at < end
+                )
+                if start is not None:
+                    query = query.where(RFIDScanHistory.scanned_at >= start)
+                first = conn.execute(query).scalar()
+                if first is None:
+                    break
+                hour = floor_hour(first)
+                self.rollup_hour(conn, hour)
+            hours += 1
+            start = hour + HOUR
+
+        if hours:
+            logger.info(f"Rolled up {hours} hour(s) of scan history")
+        return hours
+
+    # ============ Retention ============
+
+    def apply_retention(self, now: datetime) -> Dict[str, Any]:
+        """Drop raw scans past retention that are rolled up, and expired rollups."""
+        result: Dict[str, Any] = {
+            "dropped_partitions": [],
+            "deleted_scans": 0,
+            "deleted_rollups": 0,
+        }
+        with self.engine.begin() as conn:
+            rolled_until = self.rolled_up_until(conn)
+            rollup_cutoff = now - timedelta(days=self.rollup_retention_days)
+            result["deleted_rollups"] = (
+                conn.execute(
+                    delete(RFIDScanRollup).where(RFIDScanRollup.bucket_start < rollup_cutoff)
+                ).rowcount
+                or 0
+            )
+        if rolled_until is None:
+            return result
+
+        cutoff = min(now - timedelta(days=self.retention_days), rolled_until)
+        with self.engine.begin() as conn:
+            if self.partitioned and self._relkind(conn) == "p":
+                for name, bounds in self.list_partitions(conn).items():
+                    if bounds and bounds[1] is not None and bounds[1] <= cutoff:
+                        conn.execute(text(f"DROP TABLE {name}"))
+                        result["dropped_partitions"].append(name)
+                    elif bounds is None or bounds[0] is None:
+                        # Default and legacy partitions span open ranges: prune by row
+                        result["deleted_scans"] += (
+                            conn.execute(
+                                text(f"DELETE FROM {name} WHERE scanned_at < :cutoff"),
+                                {"cutoff": cutoff},
+                            ).rowcount
+                            or 0
+                        )
+            else:
+                result["deleted_scans"] = (
+                    conn.execute(
+                        delete(RFIDScanHistory).where(RFIDScanHistory.scanned_at < cutoff)
+                    ).rowcount
+                    or 0
+                )
+
+        if result["dropped_partitions"] or result["deleted_scans"]:
+            logger.info(
+                f"Scan history retention: dropped {result['dropped_partitions']}, "
+                f"deleted {result['deleted_scans']} raw scans before {cutoff.isoformat()}"
+            )
+        return result
+
+    def run_once(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """One maintenance pass: partitions, rollups, then retention."""
+        now = now or datetime.now(timezone.utc)
+        result: Dict[str, Any] = {}
+        if self.partitioned:
+            result["converted"] = self.ensure_partitioned()
+            result["created_partitions"] = self.ensure_partitions(now)
+        result["rolled_up_hours"] = self.rollup(now)
+        result.update(self.apply_retention(now))
+        return result
+
+
+# ============ Queries ============
+
+
+def _hour_bucket(column, dialect: str):
+    """SQL expression truncating a timestamp to the hour."""
+    if dialect == "postgresql":
+        return func.date_trunc("hour", column)
+    return func.strftime("%Y-%m-%d %H:00:00", column)
+
+
+def _bucket_time(value) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return _utc(value)
+
+
+def scan_activity(
+    conn: Connection,
+    since: datetime,
+    until: datetime,
+    epc: Optional[str] = None,
+    reader_id: Optional[str] = None,
+    raw_query_hours: int = 48,
+) -> Dict[str, Any]:
+    """
+    Hourly scan counts and RSSI between ``since`` and ``until``.
+
+    Ranges up to ``raw_query_hours`` are aggregated from raw scans. Longer
+    ones read hourly rollups up to the last rolled-up hour and raw scans
+    after it, so results cover the whole range either way.
+    """
+    buckets: Dict[datetime, Dict[str, Any]] = {}
+
+    def add(hour, count, rssi_min, rssi_max, rssi_sum, rssi_count):
+        bucket = buckets.setdefault(
+            _bucket_time(hour),
+            {"scans": 0, "rssi_min": None, "rssi_max": None, "_sum": 0.0, "_count": 0},
+        )
+        bucket["scans"] += count
+        if rssi_min is not None and (bucket["rssi_min"] is None or rssi_min < bucket["rssi_min"]):
+            bucket["rssi_min"] = rssi_min
+        if rssi_max is not None and (bucket["rssi_max"] is None or rssi_max > bucket["rssi_max"]):
+            bucket["rssi_max"] = rssi_max
+        bucket["_sum"] += rssi_sum or 0
+        bucket["_count"] += rssi_count or 0
+
+    raw_from = since
+    source = "raw"
+    if until - since > timedelta(hours=raw_query_hours):
+        rollup = RFIDScanRollup
+        latest = conn.execute(select(func.max(rollup.bucket_start))).scalar()
+        if latest is not None:
+            raw_from = max(since, min(until, _utc(latest) + HOUR))
+            query = select(
+                rollup.bucket_start,
+                func.sum(rollup.scan_count),
+                func.min(rollup.rssi_min),
+                func.max(rollup.rssi_max),
+                func.sum(rollup.rssi_sum),
+                func.sum(rollup.rssi_count),
+            ).where(rollup.bucket_start >= floor_hour(since), rollup.bucket_start < raw_from)
+            if epc:
+                query = query.where(rollup.epc == epc)
+            if reader_id:
+                query = query.where(rollup.reader_id == reader_id)
+            for row in conn.execute(query.group_by(rollup.bucket_start)):
+                add(*row)
+            source = "rollup" if raw_from >= until else "mixed"
+
+    if raw_from < until:
+        raw = RFIDScanHistory
+        hour = _hour_bucket(raw.scanned_at, conn.dialect.name)
+        query = select(
+            hour,
+            func.count(),
+            func.min(raw.rssi),
+            func.max(raw.rssi),
+            func.sum(raw.rssi),
+            func.count(raw.rssi),
+        ).where(raw.scanned_at >= raw_from, raw.scanned_at < until)
+        if epc:
+            query = query.where(raw.epc == epc)
+        if reader_id:
+            query = query.where(raw.reader_id == reader_id)
+        for row in conn.execute(query.group_by(hour)):
+            add(*row)
+
+    return {
+        "since": since,
+        "until": until,
+        "source": source,
+        "total_scans": sum(b["scans"] for b in buckets.values()),
+        "buckets": [
+            {
+                "hour": hour,
+                "scans": b["scans"],
+                "rssi_min": b["rssi_min"],
+                "rssi_max": b["rssi_max"],
+                "rssi_avg": round(b["_sum"] / b["_count"], 2) if b["_count"] else None,
+            }
+            for hour, b in sorted(buckets.items())
+        ],
+    }
+
+
+# ============ Background job ============
+
+_maintainer: Optional[ScanHistoryMaintainer] = None
+
+
+def get_scan_history_maintainer() -> ScanHistoryMaintainer:
+    """Get the process-wide maintainer, configured from settings."""
+    global _maintainer
+    if _maintainer is None:
+        from app.core.config import settings
+        from app.services.database import get_engine
+
+        _maintainer = ScanHistoryMaintainer(
+            get_engine(),
+            interval=settings.SCAN_HISTORY_PARTITION_INTERVAL,
+            retention_days=settings.SCAN_HISTORY_RETENTION_DAYS,
+            rollup_retention_days=settings.SCAN_ROLLUP_RETENTION_DAYS,
+        )
+    return _maintainer
+
+
+async def run_scan_history_maintenance_loop(interval: float) -> None:
+    """Run scan history maintenance until cancelled."""
+    while True:
+        try:
+            await asyncio.to_thread(get_scan_history_maintainer().run_once)
+        except Exception as e:
+            logger.error(f"Scan history maintenance failed: {e}", exc_info=True)
+        await asyncio.sleep(interval)
@@ -12,6 +12,7 @@ import hashlib
 import logging
 import os
 import secrets
+from functools import lru_cache
 from typing import Optional
 
 from cryptography.fernet import Fernet
@@ -21,6 +22,23 @@ from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=8)
+def derive_fernet_key(secret_key: str) -> bytes:
+    """
+    Derive a Fernet key from the secret using PBKDF2 (100k iterations).
+
+    Cached per secret, so the derivation cost is paid once per process.
+    """
+    salt = b"tagid_rf_salt_v1"  # Static salt, can be made dynamic
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=100000,
+    )
+    return base64.urlsafe_b64encode(kdf.derive(secret_key.encode()))
+
+
 class TagEncryptionService:
     """Service for encrypting UHF tags and generating secure QR codes."""
 
@@ -42,16 +60,7 @@ class TagEncryptionService:
 
     def _create_fernet(self) -> Fernet:
         """Create a Fernet cipher from the secret key."""
-        # Derive a proper key from the secret using PBKDF2
-        salt = b"tagid_rf_salt_v1"  # Static salt, can be made dynamic
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(self.secret_key.encode()))
-        return Fernet(key)
+        return Fernet(derive_fernet_key(self.secret_key))
 
     def encrypt_tag(self, epc: str) -> str:
         """
@@ -143,3 +152,17 @@ def get_encryption_service() -> TagEncryptionService:
     if _encryption_service is None:
         _encryption_service = TagEncryptionService()
     return _encryption_service
+
+
+async def get_encryption_service_async() -> TagEncryptionService:
+    """
+    Get the singleton, deriving its key on the CPU executor the first time.
+
+    Called at startup so request handlers using ``get_encryption_service``
+    never run the key derivation on the event loop.
+    """
+    from app.core.cpu_executor import run_cpu_bound
+
+    if _encryption_service is None:
+        return await run_cpu_bound(get_encryption_service)
+    return _encryption_service
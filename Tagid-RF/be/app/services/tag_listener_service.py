@@ -13,10 +13,11 @@ The service runs the TCP listener as a background thread and provides:
 import asyncio
 import logging
 import threading
-from datetime import datetime
 from typing import Any, Callable, Dict, List, Optional
 
+from app.core.config import settings
 from app.routers.websocket import manager
+from app.services.m200_capture import CaptureWriter
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +25,7 @@ logger = logging.getLogger(__name__)
 # Import from standalone listener (if run as module)
 try:
     from tag_listener_server import (
+        set_capture_writer,
         set_tag_callback,
         start_inventory,
         start_server,
@@ -35,6 +37,9 @@ except ImportError:
     def set_tag_callback(cb):
         pass
 
+    def set_capture_writer(writer):
+        pass
+
     def start_inventory():
         return False
 
@@ -60,6 +65,7 @@ class TagListenerService:
         self._thread: Optional[threading.Thread] = None
         self._callbacks: List[Callable] = []
         self._loop = None
+        self._capture = None
 
     def start_scan(self) -> bool:
         """Send Start Inventory command to connected reader."""
@@ -96,6 +102,11 @@ class TagListenerService:
         # Register callback with the low-level server
         set_tag_callback(self.on_tag_scanned_sync)
 
+        if settings.RFID_CAPTURE_PATH:
+            self._capture = CaptureWriter(settings.RFID_CAPTURE_PATH)
+            set_capture_writer(self._capture)
+            logger.info(f"Recording reader traffic to {settings.RFID_CAPTURE_PATH}")
+
         self._running = True
         self._thread = threading.Thread(
             target=self._run_listener, daemon=True, name="TagListenerThread"
@@ -106,6 +117,10 @@ class TagListenerService:
     def stop(self):
         """Stop the tag listener."""
         self._running = False
+        if self._capture is not None:
+            set_capture_writer(None)
+            self._capture.close()
+            self._capture = None
         logger.info("Tag listener stopped")
 
     def _run_listener(self):
@@ -137,9 +152,8 @@ class TagListenerService:
         try:
             from app.db.prisma import prisma_client
             from app.services.tag_encryption import get_encryption_service
-            from app.services.theft_detection import TheftDetectionService
+            from app.services.tag_repository import tag_repository
 
-            theft_service = TheftDetectionService()
             epc = tag_data.get("epc")
             tag_id = tag_data.get("tag_id")
             reader_ip = tag_data.get("reader_ip", "Unknown")
@@ -157,9 +171,7 @@ class TagListenerService:
                 if epc:
                     try:
                         # Fetch tag with relations
-                        rfid_tag = await db.rfidtag.find_unique(
-                            where={"epc": epc}, include={"payment": True}
-                        )
+                        rfid_tag = await tag_repository.get(epc, db=db, include_payment=True)
 
                         if rfid_tag:
                             existing_tag_db = rfid_tag
@@ -185,7 +197,8 @@ class TagListenerService:
                 "tag_id": tag_id,
                 "epc": epc,
                 "rssi": tag_data.get("rssi"),
-                "antenna_port": tag_data.get("antenna_port"),
+                # The standalone listener reports the port as "antenna"
+                "antenna_port": tag_data.get("antenna_port", tag_data.get("antenna")),
                 "timestamp": tag_data.get("timestamp"),
                 "reader_ip": reader_ip,
                 # Product Info from Prisma
@@ -204,27 +217,18 @@ class TagListenerService:
             )
 
             # THEFT ALERT LOGIC
-            # Use the dedicated service for comprehensive theft detection and notification
             if epc and reader_db and reader_db.type == "GATE":
-                # Only check for theft at exit gates
-                is_paid = await theft_service.check_tag_payment_status(
-                    epc, location=f"{reader_db.name} ({reader_ip})"
-                )
-
-                if not is_paid:
-                    # Additional real-time notification via WebSocket (Service handles DB/SMS/Push)
-                    await manager.broadcast(
-                        {
-                            "type": "theft_alert",
-                            "data": {
-                                "message": f"Unpaid item detected at {reader_db.name}: {existing_tag_db.productDescription if existing_tag_db else epc}",
-                                "tag": tag_payload,
-                                "severity": "critical",
-                                "timestamp": datetime.now().isoformat(),
-                                "location": reader_db.location or reader_db.name,
-                            },
-                        }
-                    )
+                # Reads are folded into one traversal per pass; the payment
+                # check and alert run once per pass that may be an exit
+                from app.services.gate_traversal import gate_traversal_monitor
+
+                await gate_traversal_monitor.on_read(reader_db, tag_payload)
+            elif epc and reader_db and reader_db.type == "BATH":
+                if settings.BATH_AUTO_CART:
+                    # Live cart population from the bath reader's stream
+                    from app.services.bath_presence import bath_cart_feeder
+
+                    await bath_cart_feeder.on_read(reader_db.id, epc, existing_tag_db)
             elif epc and reader_db and reader_db.type == "FIXED":
                 # Logic for shelf movement or inventory updates can go here
                 pass
@@ -0,0 +1,331 @@
+"""One place to read and write a tag's sale state.
+
+Tags live in two stores:
+
+- Prisma ``RfidTag``: registration, encrypted QR, product link, payment.
+  This is the source of truth for ``isPaid`` / ``paidAt``.
+- SQLAlchemy ``rfid_tags``: scan bookkeeping (read counts, RSSI, history)
+  and the product/price columns the inventory counters are built from.
+  Its ``is_paid`` / ``paid_at`` columns are a mirror of Prisma.
+
+The hot path used to ask both stores about the same EPC, and the paid checks
+disagreed whenever only one of them had been written. ``TagRepository``
+answers from Prisma in one query (``get`` / ``get_many``), writes payments to
+Prisma first and then mirrors them (``set_paid``), and ``sync_stores``
+reconciles the mirror in batches. With ``adopt_legacy`` it is also the
+migration path: tags that only ``rfid_tags`` knows as sold or as a product
+are created in Prisma from their rows.
+
+``rfid_tags`` is reached through a blocking SQLAlchemy session, so every
+query and commit on it runs in a worker thread (``asyncio.to_thread``).
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.rfid_tag import RFIDTag
+from app.services.database import SessionLocal
+from app.services.inventory_counters import record_tag_change, tag_state
+
+logger = logging.getLogger(__name__)
+
+
+def _prisma() -> Any:
+    from app.db.prisma import prisma_client
+
+    return prisma_client.client
+
+
+class TagRepository:
+    """Tag lookups and payment writes with Prisma as the source of truth."""
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    async def get(self, epc: str, db: Any = None, include_payment: bool = False) -> Optional[Any]:
+        """The Prisma ``RfidTag`` for ``epc``, or None if it is not registered."""
+        db = db or _prisma()
+        if include_payment:
+            return await db.rfidtag.find_unique(where={"epc": epc}, include={"payment": True})
+        return await db.rfidtag.find_unique(where={"epc": epc})
+
+    async def get_many(self, epcs: Iterable[str], db: Any = None) -> Dict[str, Any]:
+        """Prisma ``RfidTag`` records for ``epcs`` by EPC, in one query."""
+        epcs = list(dict.fromkeys(epcs))
+        if not epcs:
+            return {}
+        db = db or _prisma()
+        tags = await db.rfidtag.find_many(where={"epc": {"in": epcs}})
+        return {tag.epc: tag for tag in tags}
+
+    @staticmethod
+    def paid_state(tag: Optional[Any], row: Optional[RFIDTag] = None) -> bool:
+        """
+        Whether a tag is paid: Prisma decides, ``row`` only for tags that
+        have not been migrated to Prisma yet.
+        """
+        if tag is not None:
+            return bool(tag.isPaid)
+        return bool(row is not None and row.is_paid)
+
+    @staticmethod
+    def mirror_row(row: RFIDTag, tag: Optional[Any]) -> bool:
+        """Copy Prisma's paid state onto ``row``. Returns whether it changed."""
+        if tag is None:
+            return False
+        paid = bool(tag.isPaid)
+        paid_at = tag.paidAt if paid else None
+        if bool(row.is_paid) == paid and (row.paid_at is not None) == (paid_at is not None):
+            return False
+        row.is_paid = paid
+        row.paid_at = paid_at
+        return True
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _adoption(row: RFIDTag) -> Dict[str, Any]:
+        return {
+            "epc": row.epc,
+            "productId": row.product_sku,
+            "productDescription": row.product_name,
+            "isPaid": bool(row.is_paid),
+            "paidAt": row.paid_at,
+        }
+
+    @staticmethod
+    def _rows(session: Session, epcs: List[str]) -> List[RFIDTag]:
+        return session.query(RFIDTag).filter(RFIDTag.epc.in_(epcs)).all()
+
+    async def _adopt(self, rows: List[RFIDTag], db: Any) -> int:
+        """Create Prisma tags for ``rows``; EPCs Prisma already has are skipped."""
+        if not rows:
+            return 0
+        return await db.rfidtag.create_many(
+            data=[self._adoption(row) for row in rows], skip_duplicates=True
+        )
+
+    async def set_paid(
+        self,
+        epcs: Iterable[str],
+        paid: bool,
+        session: Optional[Session] = None,
+        db: Any = None,
+        data: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """
+        Mark tags paid or unpaid.
+
+        Tags that so far only exist in ``rfid_tags`` are created in Prisma
+        first, so every known EPC ends up with the same state in both stores.
+
+        Args:
+            epcs: Tags to update.
+            paid: New paid state.
+            session: SQLAlchemy session to mirror into (and commit); a new
+                one is opened if not given.
+            db: Prisma client; the shared one if not given.
+            data: Extra ``RfidTag`` fields to set, e.g. ``{"status": "SOLD"}``.
+
+        Returns:
+            The number of Prisma tags updated.
+        """
+        epcs = list(dict.fromkeys(epcs))
+        if not epcs:
+            return 0
+        db = db or _prisma()
+        own_session = session is None
+        session = session or SessionLocal()
+        try:
+            rows = await asyncio.to_thread(self._rows, session, epcs)
+            await self._adopt(rows, db)
+
+            paid_at = datetime.now(timezone.utc) if paid else None
+            updated = await db.rfidtag.update_many(
+                where={"epc": {"in": epcs}},
+                data={"isPaid": paid, "paidAt": paid_at, **(data or {})},
+            )
+            await asyncio.to_thread(self._mirror, session, rows, paid, paid_at)
+            return updated
+        finally:
+            if own_session:
+                await asyncio.to_thread(session.close)
+
+    async def mirror_paid(
+        self,
+        epcs: Iterable[str],
+        paid: bool,
+        paid_at: Optional[datetime] = None,
+        session: Optional[Session] = None,
+    ) -> int:
+        """
+        Mirror a paid state already written to Prisma into ``rfid_tags``.
+        Never fails the caller.
+
+        Returns:
+            The number of rows mirrored.
+        """
+        epcs = list(dict.fromkeys(epcs))
+        if not epcs:
+            return 0
+        return await asyncio.to_thread(
+            self._mirror_epcs, epcs, paid, paid_at if paid else None, session
+        )
+
+    def _mirror_epcs(
+        self,
+        epcs: List[str],
+        paid: bool,
+        paid_at: Optional[datetime],
+        session: Optional[Session],
+    ) -> int:
+        own_session = session is None
+        session = session or SessionLocal()
+        try:
+            return self._mirror(session, self._rows(session, epcs), paid, paid_at)
+        except Exception as e:
+            logger.warning(f"Failed to mirror paid state to rfid_tags: {e}")
+            return 0
+        finally:
+            if own_session:
+                session.close()
+
+    @staticmethod
+    def _mirror(
+        session: Session, rows: List[RFIDTag], paid: bool, paid_at: Optional[datetime]
+    ) -> int:
+        """
+        Set and commit the paid state of ``rows``. Prisma already holds the
+        change, so a failure here is logged and left to ``sync_stores``.
+        """
+        changes = []
+        try:
+            for row in rows:
+                previous_state = tag_state(row)
+                row.is_paid = paid
+                row.paid_at = paid_at
+                changes.append((previous_state, tag_state(row)))
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"Failed to mirror paid state to rfid_tags: {e}")
+            return 0
+        for previous_state, state in changes:
+            record_tag_change(previous_state, state)
+        return len(changes)
+
+    # ------------------------------------------------------------------
+    # Reconciliation
+    # ------------------------------------------------------------------
+
+    async def sync_stores(
+        self,
+        batch_size: int = 500,
+        adopt_legacy: bool = False,
+        dry_run: bool = False,
+        db: Any = None,
+    ) -> Dict[str, int]:
+        """
+        Bring ``rfid_tags`` in line with Prisma, ``batch_size`` rows at a time.
+
+        Args:
+            batch_size: Rows read (and EPCs looked up in Prisma) per round-trip.
+            adopt_legacy: Migrate first: create Prisma tags for rows that are
+                paid or carry a product, and mark Prisma tags paid whose row
+                says so. Without it Prisma always wins.
+            dry_run: Count what would change without writing anything.
+            db: Prisma client; the shared one if not given.
+
+        Returns:
+            Counts of rows scanned, tags adopted and promoted, rows mirrored.
+        """
+        db = db or _prisma()
+        report = {"rows": 0, "adopted": 0, "promoted": 0, "mirrored": 0}
+        session = SessionLocal()
+        try:
+            last_id = 0
+            while True:
+                rows = await asyncio.to_thread(self._batch, session, last_id, batch_size)
+                if not rows:
+                    break
+                last_id = rows[-1].id
+                report["rows"] += len(rows)
+                tags = await self.get_many([row.epc for row in rows], db=db)
+
+                if adopt_legacy:
+                    missing = [
+                        row
+                        for row in rows
+                        if row.epc not in tags
+                        and (row.is_paid or row.product_sku or row.product_name)
+                    ]
+                    promote = [
+                        row
+                        for row in rows
+                        if row.is_paid and row.epc in tags and not tags[row.epc].isPaid
+                    ]
+                    report["adopted"] += len(missing)
+                    report["promoted"] += len(promote)
+                    if not dry_run and (missing or promote):
+                        await self._adopt(missing, db)
+                        for row in promote:
+                            await db.rfidtag.update(
+                                where={"epc": row.epc},
+                                data={
+                                    "isPaid": True,
+                                    "paidAt": row.paid_at or datetime.now(timezone.utc),
+                                },
+                            )
+                        tags = await self.get_many([row.epc for row in rows], db=db)
+
+                report["mirrored"] += await asyncio.to_thread(
+                    self._mirror_batch, session, rows, tags, dry_run
+                )
+        finally:
+            await asyncio.to_thread(session.close)
+
+        logger.info(
+            f"Tag store sync{' (dry run)' if dry_run else ''}: "
+            f"{report['rows']} rows, {report['adopted']} adopted, "
+            f"{report['promoted']} promoted, {report['mirrored']} mirrored"
+        )
+        return report
+
+    @staticmethod
+    def _batch(session: Session, last_id: int, batch_size: int) -> List[RFIDTag]:
+        return (
+            session.query(RFIDTag)
+            .filter(RFIDTag.id > last_id)
+            .order_by(RFIDTag.id)
+            .limit(batch_size)
+            .all()
+        )
+
+    def _mirror_batch(
+        self, session: Session, rows: List[RFIDTag], tags: Dict[str, Any], dry_run: bool
+    ) -> int:
+        """Copy ``tags`` onto ``rows`` and commit (roll back on a dry run)."""
+        changes = []
+        for row in rows:
+            previous_state = tag_state(row)
+            if self.mirror_row(row, tags.get(row.epc)):
+                changes.append((previous_state, tag_state(row)))
+
+        if dry_run:
+            session.rollback()
+            return len(changes)
+        session.commit()
+        for previous_state, state in changes:
+            record_tag_change(previous_state, state)
+        return len(changes)
+
+
+# Singleton instance
+tag_repository = TagRepository()
@@ -0,0 +1,241 @@
+"""Incremental RFID tag statistics for the dashboard.
+
+``GET /tags/stats/summary`` used to run seven aggregate queries per request.
+``TagStatsCollector`` keeps the same figures in memory instead:
+
+- Tag totals, RSSI sum and per-location counts are adjusted as scans are
+  ingested (``record_scan``).
+- Scan activity is kept in per-minute buckets for the last hour and per-hour
+  buckets for the current UTC day.
+- ``reconcile`` periodically re-reads the authoritative numbers from the
+  database, correcting drift from writers this process does not see.
+"""
+
+import asyncio
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import desc, func
+from sqlalchemy.orm import Session
+
+from app.models.rfid_tag import RFIDScanHistory, RFIDTag
+
+logger = logging.getLogger(__name__)
+
+
+def _minute_key(moment: datetime) -> int:
+    return int(moment.timestamp()) // 60
+
+
+def _spread_over_hour(count: int, newest: int) -> Dict[int, int]:
+    """
+    Spread ``count`` evenly over the 60 minute keys ending at ``newest``, the
+    remainder going to the most recent ones, so it ages out minute by minute.
+    """
+    sign = 1 if count >= 0 else -1
+    share, extra = divmod(abs(count), 60)
+    return {
+        newest - i: sign * (share + (1 if i < extra else 0))
+        for i in range(60)
+        if share or i < extra
+    }
+
+
+class TagStatsCollector:
+    """In-memory tag statistics, updated per scan and reconciled against the DB."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget everything; the next read triggers a reconciliation."""
+        with self._lock:
+            self.total_tags = 0
+            self.active_tags = 0
+            self._rssi_sum = 0
+            self._rssi_count = 0
+            self.most_scanned: Optional[Dict[str, Any]] = None
+            self.tags_by_location: Dict[str, int] = {}
+            self._minute_buckets: Dict[int, int] = {}
+            self._hour_buckets: Dict[int, int] = {}
+            self._day = None
+            # Corrections from the last reconciliation for scans this process did
+            # not record; the hourly one is spread over minutes and rolls with them
+            self._minute_offsets: Dict[int, int] = {}
+            self._day_offset = 0
+            self.reconciled_at: Optional[datetime] = None
+
+    @property
+    def is_reconciled(self) -> bool:
+        return self.reconciled_at is not None
+
+    def _roll(self, now: datetime) -> None:
+        """Drop buckets that fell out of the hour/day windows."""
+        if self._day != now.date():
+            self._day = now.date()
+            self._hour_buckets.clear()
+            self._day_offset = 0
+        oldest = _minute_key(now) - 59
+        for buckets in (self._minute_buckets, self._minute_offsets):
+            for key in [k for k in buckets if k < oldest]:
+                del buckets[key]
+
+    def record_scan(
+        self,
+        tag_id: int,
+        epc: str,
+        read_count: int,
+        is_new: bool,
+        rssi: Optional[int] = None,
+        previous_rssi: Optional[int] = None,
+        location: Optional[str] = None,
+        previous_location: Optional[str] = None,
+        scanned_at: Optional[datetime] = None,
+    ) -> None:
+        """
+        Account for one ingested scan.
+
+        Args:
+            tag_id: Database id of the scanned tag.
+            epc: Tag EPC.
+            read_count: The tag's read count after this scan.
+            is_new: Whether the scan created the tag.
+            rssi / previous_rssi: The tag's stored RSSI after and before the scan.
+            location / previous_location: The tag's location after and before the scan.
+            scanned_at: Scan time (defaults to now, UTC).
+        """
+        now = scanned_at or datetime.now(timezone.utc)
+        with self._lock:
+            self._roll(now)
+            self._minute_buckets[_minute_key(now)] = (
+                self._minute_buckets.get(_minute_key(now), 0) + 1
+            )
+            self._hour_buckets[now.hour] = self._hour_buckets.get(now.hour, 0) + 1
+
+            if is_new:
+                self.total_tags += 1
+                self.active_tags += 1
+
+            if previous_rssi is not None:
+                self._rssi_sum -= previous_rssi
+                self._rssi_count -= 1
+            if rssi is not None:
+                self._rssi_sum += rssi
+                self._rssi_count += 1
+
+            if location != previous_location:
+                if previous_location:
+                    remaining = self.tags_by_location.get(previous_location, 0) - 1
+                    if remaining > 0:
+                        self.tags_by_location[previous_location] = remaining
+                    else:
+                        self.tags_by_location.pop(previous_location, None)
+                if location:
+                    self.tags_by_location[location] = self.tags_by_location.get(location, 0) + 1
+
+            if self.most_scanned is None or read_count > self.most_scanned["read_count"]:
+                self.most_scanned = {"id": tag_id, "epc": epc, "read_count": read_count}
+
+    def snapshot(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Current statistics in the shape of ``RFIDTagStatsResponse``."""
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            self._roll(now)
+            scans_last_hour = sum(self._minute_buckets.values())
+            scans_last_hour += sum(self._minute_offsets.values())
+            scans_today = sum(self._hour_buckets.values()) + self._day_offset
+            return {
+                "total_tags": self.total_tags,
+                "active_tags": self.active_tags,
+                "scans_today": max(scans_today, 0),
+                "scans_last_hour": max(scans_last_hour, 0),
+                "most_scanned_tag": dict(self.most_scanned) if self.most_scanned else None,
+                "average_rssi": (
+                    self._rssi_sum / self._rssi_count if self._rssi_count > 0 else None
+                ),
+                "tags_by_location": dict(self.tags_by_location),
+            }
+
+    def reconcile(self, db: Session) -> None:
+        """
+        Reload the authoritative figures from the database.
+
+        Runs the aggregate queries the endpoint used to run per request; this
+        is only done on startup and periodically, never on the request path.
+        """
+        now = datetime.now(timezone.utc)
+        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        hour_ago = now - timedelta(hours=1)
+
+        total_tags = db.query(RFIDTag).count()
+        active_tags = db.query(RFIDTag).filter(RFIDTag.is_active.is_(True)).count()
+        scans_today = (
+            db.query(RFIDScanHistory).filter(RFIDScanHistory.scanned_at >= today_start).count()
+        )
+        scans_last_hour = (
+            db.query(RFIDScanHistory).filter(RFIDScanHistory.scanned_at >= hour_ago).count()
+        )
+        most_scanned = db.query(RFIDTag).order_by(desc(RFIDTag.read_count)).first()
+        rssi_sum, rssi_count = (
+            db.query(func.sum(RFIDTag.rssi), func.count(RFIDTag.rssi))
+            .filter(RFIDTag.rssi.isnot(None))
+            .one()
+        )
+        location_counts = (
+            db.query(RFIDTag.location, func.count(RFIDTag.id))
+            .filter(RFIDTag.location.isnot(None))
+            .group_by(RFIDTag.location)
+            .all()
+        )
+
+        with self._lock:
+            self._roll(now)
+            self.total_tags = total_tags
+            self.active_tags = active_tags
+            self._rssi_sum = rssi_sum or 0
+            self._rssi_count = rssi_count or 0
+            self.most_scanned = (
+                {
+                    "id": most_scanned.id,
+                    "epc": most_scanned.epc,
+                    "read_count": most_scanned.read_count,
+                }
+                if most_scanned
+                else None
+            )
+            self.tags_by_location = {loc: count for loc, count in location_counts if loc}
+            hour_drift = scans_last_hour - sum(self._minute_buckets.values())
+            self._minute_offsets = _spread_over_hour(hour_drift, _minute_key(now))
+            self._day_offset = scans_today - sum(self._hour_buckets.values())
+            self.reconciled_at = now
+
+        logger.info(
+            f"Tag stats reconciled: {total_tags} tags, {scans_today} scans today "
+            f"(drift: hour={hour_drift}, day={self._day_offset})"
+        )
+
+
+tag_stats = TagStatsCollector()
+
+
+def _reconcile_with_new_session() -> None:
+    from app.services.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        tag_stats.reconcile(db)
+    finally:
+        db.close()
+
+
+async def run_stats_reconcile_loop(interval: float) -> None:
+    """Reconcile the in-memory stats against the database until cancelled."""
+    while True:
+        try:
+            await asyncio.to_thread(_reconcile_with_new_session)
+        except Exception as e:
+            logger.error(f"Tag stats reconciliation failed: {e}", exc_info=True)
+        await asyncio.sleep(interval)
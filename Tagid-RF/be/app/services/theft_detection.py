@@ -9,6 +9,7 @@ from typing import List, Optional
 
 from app.db.prisma import prisma_client
 from app.services.push_service import push_service
+from app.services.tag_repository import tag_repository
 
 logger = logging.getLogger(__name__)
 
@@ -36,9 +37,7 @@ class TheftDetectionService:
         """
         try:
             # Get tag mapping
-            tag = await prisma_client.client.rfidtag.find_unique(
-                where={"epc": epc}, include={"payment": True}
-            )
+            tag = await tag_repository.get(epc, db=prisma_client.client, include_payment=True)
 
             if not tag:
                 logger.warning(f"Tag not found in database: {epc}")
@@ -0,0 +1,36 @@
+"""
+QR code rendering shared by the product, tag and bath reader endpoints.
+
+``qrcode`` (and PIL behind it) is only imported when a code is rendered,
+which keeps it out of application startup.
+"""
+
+import base64
+import io
+
+
+def render_qr_png(data: str) -> io.BytesIO:
+    """Render ``data`` as a PNG QR code, rewound and ready to read."""
+    import qrcode
+
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+
+    img = qr.make_image(fill_color="black", back_color="white")
+
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    buffer.seek(0)
+    return buffer
+
+
+def generate_qr_code(data: str) -> str:
+    """Generate a QR code as base64-encoded PNG"""
+    base64_img = base64.b64encode(render_qr_png(data).getvalue()).decode("utf-8")
+    return f"data:image/png;base64,{base64_img}"
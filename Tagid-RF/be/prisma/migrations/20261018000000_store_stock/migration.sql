@@ -0,0 +1,27 @@
+-- CreateIndex
+CREATE INDEX "InventorySnapshot_readerId_timestamp_idx" ON "InventorySnapshot"("readerId", "timestamp");
+
+-- CreateTable
+CREATE TABLE "StoreStock" (
+    "readerId" TEXT NOT NULL,
+    "storeId" TEXT,
+    "snapshotId" TEXT NOT NULL,
+    "itemCount" INTEGER NOT NULL,
+    "snapshotAt" TIMESTAMP(3) NOT NULL,
+    "updatedAt" TIMESTAMP(3) NOT NULL,
+
+    CONSTRAINT "StoreStock_pkey" PRIMARY KEY ("readerId")
+);
+
+-- CreateIndex
+CREATE INDEX "StoreStock_storeId_idx" ON "StoreStock"("storeId");
+
+-- AddForeignKey
+ALTER TABLE "StoreStock" ADD CONSTRAINT "StoreStock_readerId_fkey" FOREIGN KEY ("readerId") REFERENCES "RfidReader"("id") ON DELETE RESTRICT ON UPDATE CASCADE;
+
+-- Backfill from existing snapshots
+INSERT INTO "StoreStock" ("readerId", "storeId", "snapshotId", "itemCount", "snapshotAt", "updatedAt")
+SELECT DISTINCT ON (s."readerId") s."readerId", r."storeId", s."id", s."itemCount", s."timestamp", NOW()
+FROM "InventorySnapshot" s
+JOIN "RfidReader" r ON r."id" = s."readerId"
+ORDER BY s."readerId", s."timestamp" DESC;
@@ -0,0 +1,16 @@
+-- CreateTable
+CREATE TABLE "BathCartItem" (
+    "id" TEXT NOT NULL,
+    "bathId" TEXT NOT NULL,
+    "tagId" TEXT NOT NULL,
+    "addedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "touchedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "BathCartItem_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE UNIQUE INDEX "BathCartItem_bathId_tagId_key" ON "BathCartItem"("bathId", "tagId");
+
+-- CreateIndex
+CREATE INDEX "BathCartItem_touchedAt_idx" ON "BathCartItem"("touchedAt");
@@ -0,0 +1,20 @@
+-- CreateTable
+CREATE TABLE "ReaderTuningProfile" (
+    "readerId" TEXT NOT NULL,
+    "powerDbm" INTEGER NOT NULL,
+    "qValue" INTEGER NOT NULL,
+    "session" INTEGER NOT NULL,
+    "target" INTEGER NOT NULL,
+    "rssiFilters" INTEGER[],
+    "uniquePerSecond" DOUBLE PRECISION NOT NULL,
+    "duplicateRatio" DOUBLE PRECISION NOT NULL,
+    "score" DOUBLE PRECISION NOT NULL,
+    "windowSeconds" DOUBLE PRECISION NOT NULL,
+    "tunedAt" TIMESTAMP(3) NOT NULL,
+    "updatedAt" TIMESTAMP(3) NOT NULL,
+
+    CONSTRAINT "ReaderTuningProfile_pkey" PRIMARY KEY ("readerId")
+);
+
+-- AddForeignKey
+ALTER TABLE "ReaderTuningProfile" ADD CONSTRAINT "ReaderTuningProfile_readerId_fkey" FOREIGN KEY ("readerId") REFERENCES "RfidReader"("id") ON DELETE CASCADE ON UPDATE CASCADE;
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""
+Prisma connection lifecycle benchmark.
+
+Compares the latency of a trivial query when every request opens and closes
+its own connection (the old ``async with prisma_client.client`` behaviour)
+against borrowing the shared, long-lived client.
+
+Usage:
+    DATABASE_URL=postgresql://... python scripts/benchmark_prisma_sessions.py --requests 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prisma import Prisma  # noqa: E402
+
+
+def _summary(samples):
+    samples = sorted(samples)
+    return {
+        "count": len(samples),
+        "mean_ms": round(statistics.mean(samples), 3),
+        "p50_ms": round(samples[len(samples) // 2], 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+        "max_ms": round(samples[-1], 3),
+    }
+
+
+async def per_request_connection(requests: int):
+    """Connect, query and disconnect for every request."""
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        async with Prisma() as db:
+            await db.query_raw("SELECT 1")
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+async def shared_connection(requests: int, concurrency: int):
+    """Borrow the long-lived shared client."""
+    from app.db.prisma import prisma_client
+
+    await prisma_client.ensure_connected()
+    samples = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            async with prisma_client.get_db() as db:
+                await db.query_raw("SELECT 1")
+            samples.append((time.perf_counter() - started) * 1000)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    await prisma_client.disconnect()
+    return samples
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    if not os.environ.get("DATABASE_URL"):
+        print("Error: DATABASE_URL environment variable not set")
+        return False
+
+    before = await per_request_connection(args.requests)
+    after = await shared_connection(args.requests, args.concurrency)
+
+    result = {
+        "per_request_connection": _summary(before),
+        "shared_connection": _summary(after),
+    }
+    result["speedup_p50"] = round(
+        result["per_request_connection"]["p50_ms"] / result["shared_connection"]["p50_ms"], 1
+    )
+    print(json.dumps(result, indent=2))
+    return True
+
+
+if __name__ == "__main__":
+    success = asyncio.run(main())
+    sys.exit(0 if success else 1)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+"""
+GET /tags/ benchmark at 1M tags: OFFSET vs keyset pages, search and totals.
+
+Seeds ``--tags`` rows into the RFID database (``--db-url``, SQLite file by
+default), creates the app's indexes with ``init_db`` (trigram indexes on
+Postgres) and times the endpoint through the ASGI app:
+
+- ``page=N`` (OFFSET) against ``cursor=`` (keyset) at increasing depths
+- substring search on an EPC fragment
+- ``total=exact`` against ``total=estimate``
+
+Usage:
+    python scripts/benchmark_tag_listing.py --tags 1000000
+    python scripts/benchmark_tag_listing.py --db-url postgresql://.../bench --tags 1000000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+EPC_PREFIX = "E2806894"
+
+
+def seed(tags: int, batch_size: int) -> None:
+    from sqlalchemy import func, insert, select
+
+    from app.models.rfid_tag import RFIDTag
+    from app.services.database import engine, init_db
+
+    init_db()
+    with engine.begin() as conn:
+        existing = conn.execute(select(func.count()).select_from(RFIDTag)).scalar()
+    if existing >= tags:
+        print(f"Using existing {existing} tags")
+        return
+
+    rng = random.Random(1)
+    now = datetime.now(timezone.utc)
+    started = time.perf_counter()
+    for start in range(existing, tags, batch_size):
+        rows = [
+            {
+                "epc": f"{EPC_PREFIX}{serial:016X}",
+                "tid": f"E280{serial:020X}",
+                "is_active": rng.random() < 0.97,
+                "read_count": 1,
+                # Seconds resolution leaves ties for the id tie-breaker
+                "last_seen": now - timedelta(seconds=rng.randrange(90 * 86400)),
+            }
+            for serial in range(start, min(start + batch_size, tags))
+        ]
+        with engine.begin() as conn:
+            conn.execute(insert(RFIDTag), rows)
+    print(f"Seeded {tags - existing} tags in {time.perf_counter() - started:.1f}s")
+
+
+async def timed(client, url: str, repeat: int):
+    samples = []
+    response = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = await client.get(url)
+        samples.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+    return round(statistics.median(samples), 3), response
+
+
+async def run(args):
+    import httpx
+    from fastapi import FastAPI
+    from sqlalchemy import desc
+
+    from app.models.rfid_tag import RFIDTag
+    from app.routers import tags
+    from app.services.database import SessionLocal
+    from app.services.tag_stats import tag_stats
+
+    app = FastAPI()
+    app.include_router(tags.router, prefix="/tags")
+    size = args.page_size
+    results = {"offset": {}, "cursor": {}, "search": {}, "total": {}}
+
+    with SessionLocal() as db:
+        tag_stats.reconcile(db)
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=300
+    ) as client:
+        for page in args.pages:
+            offset_ms, _ = await timed(client, f"/tags/?page_size={size}&page={page}", args.repeat)
+
+            # The cursor a client would hold after walking to this page
+            with SessionLocal() as db:
+                anchor = (
+                    db.query(RFIDTag)
+                    .order_by(desc(RFIDTag.last_seen), desc(RFIDTag.id))
+                    .offset((page - 1) * size - 1)
+                    .first()
+                    if page > 1
+                    else None
+                )
+            url = f"/tags/?page_size={size}"
+            if anchor:
+                url += f"&cursor={tags.encode_cursor(anchor)}"
+            cursor_ms, _ = await timed(client, url, args.repeat)
+
+            results["offset"][page] = offset_ms
+            results["cursor"][page] = cursor_ms
+            print(f"page {page:>6}: offset {offset_ms:>10} ms   cursor {cursor_ms:>8} ms")
+
+        fragment = f"{random.Random(2).randrange(args.tags):016X}"[-6:]
+        search_ms, response = await timed(client, f"/tags/?search={fragment}", args.repeat)
+        results["search"] = {"fragment": fragment, "ms": search_ms, "hits": len(response.json())}
+        print(f"search {fragment}: {search_ms} ms ({len(response.json())} hits)")
+
+        for mode in ("exact", "estimate"):
+            ms, response = await timed(client, f"/tags/?total={mode}", args.repeat)
+            results["total"][mode] = {"ms": ms, "count": int(response.headers["X-Total-Count"])}
+            print(f"total={mode}: {ms} ms ({response.headers['X-Total-Count']})")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db-url", default="sqlite:///./tag_listing_bench.db")
+    parser.add_argument("--tags", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=20_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # The app reads its RFID database from settings at import time
+    os.environ["RFID_DATABASE_URL"] = args.db_url
+    os.environ.setdefault("DATABASE_URL", args.db_url)
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+
+    seed(args.tags, args.batch_size)
+    results = asyncio.run(run(args))
+    print(json.dumps({"tags": args.tags, "page_size": args.page_size, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,468 @@
+#!/usr/bin/env python
+"""
+HTTP API load test for the scan, cart, exit-scan and dashboard endpoints.
+
+Seeds a database with production-like volumes (100k tags, millions of
+``rfid_scan_history`` rows), then drives the ASGI app with concurrent
+clients and reports throughput and p50/p95/p99 latency per endpoint as JSON,
+so results from two releases can be diffed with ``--compare``.
+
+Endpoints:
+    exit_scan_check      POST /exit-scan/check (a gate batch of EPCs)
+    tags_stats_summary   GET  /tags/stats/summary
+    tags_stats_refresh   GET  /tags/stats/summary?refresh=true (DB reconciliation)
+    tags_search          GET  /tags/?search=...
+    bath_cart_scan       POST /bath-cart/{id}/scan          (Prisma, --prisma)
+    rfid_scan_available  GET  /rfid-scan/available          (Prisma, --prisma)
+
+The RFID tables (SQLAlchemy) live at ``--db-url``: a local SQLite file by
+default, or a Postgres URL. The bath cart and reader endpoints use the main
+Prisma database (``DATABASE_URL``) and only run with ``--prisma``.
+
+Requests go through ``httpx.ASGITransport`` by default, i.e. the app's own
+routing, validation and database code without a server in front; pass
+``--base-url`` (and ``--token``) to load a running uvicorn instead.
+
+Seeding only happens into empty tables; re-running against a seeded
+database reuses the data. ``--reseed`` deletes the harness tables' rows
+first, so never point it at a database you care about.
+
+Usage:
+    python scripts/load_test_api.py --output loadtest-1.4.json
+    python scripts/load_test_api.py --db-url postgresql://.../loadtest --scan-rows 5000000
+    DATABASE_URL=postgresql://... python scripts/load_test_api.py --prisma
+    python scripts/load_test_api.py --compare loadtest-1.3.json loadtest-1.4.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+EPC_PREFIX = "E2806894"
+LOCATIONS = ["Warehouse A", "Warehouse B", "Floor 1", "Floor 2", "Fitting Rooms", "Exit Gate"]
+READERS = ["gate-1", "gate-2", "floor-1", "floor-2", "bath-1", "bath-2"]
+BATH_READER_QR = "LOADTEST-BATH"
+STORE_ID = 1
+
+
+def epc_for(serial: int) -> str:
+    return f"{EPC_PREFIX}{serial:016X}"
+
+
+def _summary(samples: List[float], elapsed: float) -> Dict[str, Any]:
+    samples = sorted(samples)
+    if not samples:
+        return {"requests": 0}
+    return {
+        "requests": len(samples),
+        "rps": round(len(samples) / elapsed, 1),
+        "mean_ms": round(sum(samples) / len(samples), 3),
+        "p50_ms": round(samples[len(samples) // 2], 3),
+        "p95_ms": round(samples[max(int(len(samples) * 0.95) - 1, 0)], 3),
+        "p99_ms": round(samples[max(int(len(samples) * 0.99) - 1, 0)], 3),
+        "max_ms": round(samples[-1], 3),
+    }
+
+
+# ============ Seeding ============
+
+
+def _tag_rows(start: int, stop: int, rng: random.Random, now: datetime) -> List[Dict[str, Any]]:
+    rows = []
+    for serial in range(start, stop):
+        first_seen = now - timedelta(days=rng.uniform(1, 365))
+        price = rng.choice([1990, 4990, 8990, 12990, 19990, 29990])
+        rows.append(
+            {
+                "epc": epc_for(serial),
+                "tid": f"E280{serial:020X}",
+                "rssi": round(rng.gauss(-55, 8), 1),
+                "antenna_port": rng.randint(1, 4),
+                "read_count": rng.randint(1, 500),
+                "pc": "3000",
+                "location": rng.choice(LOCATIONS),
+                "is_paid": rng.random() < 0.7,
+                "product_name": f"Product {serial % 5000}",
+                "product_sku": f"SKU-{serial % 5000:05d}",
+                "price_cents": price,
+                "store_id": STORE_ID,
+                "is_active": rng.random() < 0.97,
+                "first_seen": first_seen,
+                "last_seen": now - timedelta(seconds=rng.uniform(0, 30 * 86400)),
+                "created_at": first_seen,
+                "updated_at": now,
+            }
+        )
+    return rows
+
+
+def _scan_rows(
+    count: int, tags: int, days: int, rng: random.Random, now: datetime
+) -> List[Dict[str, Any]]:
+    span = days * 86400
+    return [
+        {
+            "epc": epc_for(rng.randrange(tags)),
+            "rssi": round(rng.gauss(-55, 8), 1),
+            "antenna_port": rng.randint(1, 4),
+            "frequency": 902.75 + 0.5 * rng.randrange(50),
+            "location": rng.choice(LOCATIONS),
+            "reader_id": rng.choice(READERS),
+            # Weight towards recent scans, as in a live store
+            "scanned_at": now - timedelta(seconds=span * rng.random() ** 2),
+        }
+        for _ in range(count)
+    ]
+
+
+def seed_rfid_tables(args) -> Dict[str, Any]:
+    """Create and fill the SQLAlchemy RFID tables unless already seeded."""
+    from sqlalchemy import delete, func, insert, select
+
+    import app.models  # noqa: F401 - registers every table on Base
+    from app.models.rfid_tag import RFIDScanHistory, RFIDScanRollup, RFIDTag
+    from app.models.store import Notification, Store, User
+    from app.services.database import Base, engine
+
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        if args.reseed:
+            for model in (Notification, RFIDScanRollup, RFIDScanHistory, RFIDTag, User, Store):
+                conn.execute(delete(model))
+        tags = conn.execute(select(func.count()).select_from(RFIDTag)).scalar()
+        scans = conn.execute(select(func.count()).select_from(RFIDScanHistory)).scalar()
+
+    if tags or scans:
+        print(f"Using existing data: {tags} tags, {scans} scan history rows")
+        return {"tags": tags, "scan_rows": scans, "seeded_seconds": 0}
+
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(insert(Store), [{"id": STORE_ID, "name": "Load Test Store"}])
+        # Stakeholders that receive UNPAID_EXIT notifications
+        conn.execute(
+            insert(User),
+            [
+                {"name": "Load Admin", "email": "admin@loadtest.local", "role": "ADMIN"},
+                {
+                    "name": "Load Manager",
+                    "email": "manager@loadtest.local",
+                    "role": "MANAGER",
+                    "store_id": STORE_ID,
+                },
+            ],
+        )
+
+    for start in range(0, args.tags, args.batch_size):
+        with engine.begin() as conn:
+            stop = min(start + args.batch_size, args.tags)
+            conn.execute(insert(RFIDTag), _tag_rows(start, stop, rng, now))
+    print(f"Seeded {args.tags} tags")
+
+    for done in range(0, args.scan_rows, args.batch_size):
+        count = min(args.batch_size, args.scan_rows - done)
+        with engine.begin() as conn:
+            conn.execute(
+                insert(RFIDScanHistory),
+                _scan_rows(count, args.tags, args.history_days, rng, now),
+            )
+        if (done // args.batch_size) % 20 == 0:
+            print(f"  scan history: {done + count}/{args.scan_rows}")
+
+    seconds = round(time.perf_counter() - started, 1)
+    print(f"Seeded {args.scan_rows} scan history rows in {seconds}s")
+    return {"tags": args.tags, "scan_rows": args.scan_rows, "seeded_seconds": seconds}
+
+
+async def seed_prisma(args) -> Dict[str, Any]:
+    """Create the bath reader and unpaid tags in the Prisma database."""
+    from app.db.prisma import prisma_client
+
+    await prisma_client.connect()
+    db = prisma_client.client
+
+    reader = await db.rfidreader.upsert(
+        where={"ipAddress": "loadtest-bath"},
+        data={
+            "create": {
+                "name": "Load Test Bath",
+                "ipAddress": "loadtest-bath",
+                "type": "BATH",
+                "qrCode": BATH_READER_QR,
+            },
+            "update": {},
+        },
+    )
+    existing = await db.rfidtag.count(where={"epc": {"startswith": EPC_PREFIX}})
+    if existing < args.tags:
+        for start in range(0, args.tags, args.batch_size):
+            stop = min(start + args.batch_size, args.tags)
+            await db.rfidtag.create_many(
+                data=[{"epc": epc_for(serial)} for serial in range(start, stop)],
+                skip_duplicates=True,
+            )
+        print(f"Seeded {args.tags} Prisma tags")
+    return {"bath_reader_id": reader.id, "prisma_tags": max(existing, args.tags)}
+
+
+def fill_recent_reads(args) -> None:
+    """Give ``/rfid-scan/available`` a listener buffer to filter."""
+    from app.services.tag_store import tag_store
+
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc).isoformat()
+    for _ in range(200):
+        # Mostly unknown EPCs, as when new stock is being registered
+        serial = rng.randrange(args.tags * 2)
+        tag_store.add_tag({"epc": epc_for(serial), "rssi": -50, "timestamp": now})
+
+
+# ============ Scenarios ============
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    request: Callable[[random.Random], Tuple[str, Optional[Dict[str, Any]]]]
+    needs_prisma: bool = False
+
+
+def build_scenarios(args, api: str) -> List[Scenario]:
+    tags = args.tags
+
+    def exit_scan(rng):
+        epcs = [epc_for(rng.randrange(tags)) for _ in range(args.exit_batch)]
+        return f"{api}/exit-scan/check", {
+            "epcs": epcs,
+            "gate_id": "loadtest",
+            "store_id": STORE_ID,
+        }
+
+    def search(rng):
+        # A fragment of a real EPC, as typed into the dashboard search box
+        fragment = epc_for(rng.randrange(tags))[-6:]
+        return f"{api}/tags/?search={fragment}&page_size=50", None
+
+    def bath_scan(rng):
+        return f"{api}/bath-cart/{BATH_READER_QR}/scan", {"epc": epc_for(rng.randrange(tags))}
+
+    return [
+        Scenario("exit_scan_check", "POST", exit_scan),
+        Scenario("tags_stats_summary", "GET", lambda rng: (f"{api}/tags/stats/summary", None)),
+        Scenario(
+            "tags_stats_refresh",
+            "GET",
+            lambda rng: (f"{api}/tags/stats/summary?refresh=true", None),
+        ),
+        Scenario("tags_search", "GET", search),
+        Scenario("bath_cart_scan", "POST", bath_scan, needs_prisma=True),
+        Scenario(
+            "rfid_scan_available",
+            "GET",
+            lambda rng: (f"{api}/rfid-scan/available", None),
+            needs_prisma=True,
+        ),
+    ]
+
+
+async def run_scenario(client, scenario: Scenario, args) -> Dict[str, Any]:
+    """Hit one endpoint from ``--concurrency`` clients for ``--duration`` seconds."""
+    samples: List[float] = []
+    statuses: Dict[str, int] = {}
+    recording = False
+
+    async def worker(index: int, deadline: float):
+        rng = random.Random(args.seed * 1000 + index)
+        while time.perf_counter() < deadline:
+            url, body = scenario.request(rng)
+            started = time.perf_counter()
+            try:
+                response = await client.request(scenario.method, url, json=body)
+                status = str(response.status_code)
+            except Exception as e:
+                status = type(e).__name__
+            if recording:
+                samples.append((time.perf_counter() - started) * 1000)
+                statuses[status] = statuses.get(status, 0) + 1
+
+    if args.warmup > 0:
+        deadline = time.perf_counter() + args.warmup
+        await asyncio.gather(*(worker(i, deadline) for i in range(args.concurrency)))
+
+    recording = True
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(worker(i, deadline) for i in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    result = _summary(samples, elapsed)
+    result["errors"] = sum(n for s, n in statuses.items() if not s.startswith("2"))
+    result["status"] = statuses
+    return result
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> Dict[str, Any]:
+    import httpx
+
+    seed_info = seed_rfid_tables(args)
+
+    from app.core.config import settings
+
+    api = settings.API_V1_STR
+    if args.base_url:
+        headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+        client = httpx.AsyncClient(base_url=args.base_url, headers=headers, timeout=60)
+    else:
+        from app.api.dependencies.auth import get_current_user
+        from app.main import app
+
+        # Authentication is not what is being measured
+        app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(
+            id="loadtest", role="SUPER_ADMIN", email="loadtest@loadtest.local"
+        )
+        if args.prisma:
+            from app.db.prisma import prisma_client
+
+            app.state.prisma = prisma_client
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=60
+        )
+
+    if args.prisma:
+        seed_info.update(await seed_prisma(args))
+        fill_recent_reads(args)
+
+    endpoints: Dict[str, Any] = {}
+    try:
+        for scenario in build_scenarios(args, api):
+            if args.only and scenario.name not in args.only:
+                continue
+            if scenario.needs_prisma and not args.prisma:
+                endpoints[scenario.name] = {"skipped": "needs --prisma"}
+                continue
+            result = await run_scenario(client, scenario, args)
+            endpoints[scenario.name] = result
+            print(
+                f"{scenario.name:22s} {result.get('rps', 0):>8} req/s  "
+                f"p50 {result.get('p50_ms')} ms  p95 {result.get('p95_ms')} ms  "
+                f"p99 {result.get('p99_ms')} ms  errors {result['errors']}"
+            )
+    finally:
+        await client.aclose()
+        if args.prisma:
+            from app.db.prisma import prisma_client
+
+            await prisma_client.disconnect()
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "target": args.base_url or "asgi",
+        "database": args.db_url.split("://", 1)[0],
+        "data": seed_info,
+        "settings": {
+            "concurrency": args.concurrency,
+            "duration_seconds": args.duration,
+            "warmup_seconds": args.warmup,
+            "exit_batch": args.exit_batch,
+        },
+        "endpoints": endpoints,
+    }
+
+
+def compare(before_path: str, after_path: str) -> None:
+    """Print per-endpoint throughput and latency changes between two reports."""
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+
+    print(f"{before.get('revision')} -> {after.get('revision')}")
+    print(f"{'endpoint':22s} {'req/s':>20s} {'p95 ms':>20s} {'p99 ms':>20s}")
+    for name, new in after["endpoints"].items():
+        old = before["endpoints"].get(name, {})
+        cells = []
+        for key in ("rps", "p95_ms", "p99_ms"):
+            if key not in new or key not in old:
+                cells.append(f"{'-':>20s}")
+                continue
+            change = (new[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+            cells.append(f"{old[key]:>8} -> {new[key]:<8} {change:+.0f}%".rjust(20))
+        print(f"{name:22s} {' '.join(cells)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--db-url", default="sqlite:///./loadtest.db", help="RFID tables database")
+    parser.add_argument("--tags", type=int, default=100_000)
+    parser.add_argument("--scan-rows", type=int, default=2_000_000)
+    parser.add_argument("--history-days", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--reseed", action="store_true", help="Delete harness rows first")
+    parser.add_argument("--prisma", action="store_true", help="Also run Prisma endpoints")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per endpoint")
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--exit-batch", type=int, default=10, help="EPCs per exit-scan request")
+    parser.add_argument("--only", nargs="+", help="Endpoint names to run")
+    parser.add_argument("--base-url", help="Load a running server instead of the ASGI app")
+    parser.add_argument("--token", help="Bearer token for --base-url")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--app-log-level", default="CRITICAL", help="Level for app loggers during the run"
+    )
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    # The app reads its RFID database from settings at import time
+    os.environ["RFID_DATABASE_URL"] = args.db_url
+    os.environ.setdefault("DATABASE_URL", args.db_url)
+    os.environ.setdefault("SECRET_KEY", "loadtest")
+
+    # Per-request alert logging would otherwise flood the terminal
+    logging.getLogger("app").setLevel(args.app_log_level)
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""
+Reconcile the two tag stores: Prisma RfidTag (source of truth for payment)
+and the SQLAlchemy rfid_tags scan table.
+
+By default Prisma wins and rfid_tags.is_paid / paid_at are rewritten to
+match it. --adopt-legacy runs the one-off migration first: tags that only
+rfid_tags knows as paid or as a product are created in Prisma, and Prisma
+tags whose row says paid are marked paid.
+
+Usage:
+    python scripts/sync_tag_stores.py --dry-run
+    python scripts/sync_tag_stores.py --adopt-legacy
+    python scripts/sync_tag_stores.py --batch-size 1000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.tag_repository import tag_repository  # noqa: E402
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument(
+        "--adopt-legacy",
+        action="store_true",
+        help="Migrate tags known only to rfid_tags into Prisma first",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Report without writing")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    from app.db.prisma import prisma_client
+
+    await prisma_client.ensure_connected()
+    try:
+        report = await tag_repository.sync_stores(
+            batch_size=args.batch_size, adopt_legacy=args.adopt_legacy, dry_run=args.dry_run
+        )
+    finally:
+        await prisma_client.disconnect()
+
+    for key, value in report.items():
+        print(f"  {key:<10} {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
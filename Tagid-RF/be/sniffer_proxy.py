@@ -10,17 +10,24 @@ Usage:
 3. In the Software, set IP = 127.0.0.1 and Port = 8888 (CLIENT_SIDE_PORT).
 4. Click 'Open', 'Get Param', or 'Inventory'.
 5. Watch the console for captured commands!
+
+To also record the session for replay (see app/services/m200_capture.py):
+    python sniffer_proxy.py captures/session.m2cap
 """
 
 import socket
 import sys
 import threading
 
+from app.services.m200_capture import HOST_TO_READER, READER_TO_HOST, CaptureWriter
+
 # Configuration
 CLIENT_SIDE_PORT = 8888  # Port for the PC Software to connect to
 READER_IP = "192.168.1.200"  # Real Reader IP
 READER_PORT = 2022  # Real Reader Command Port
 
+capture = None  # CaptureWriter when a capture file is given on the command line
+
 
 def forward(source, destination, direction):
     """Forward data between sockets and print hex."""
@@ -32,6 +39,9 @@ def forward(source, destination, direction):
 
             # Print intercepted data
             print(f"[{direction}] {data.hex().upper()}")
+            if capture:
+                to_reader = direction == "APP->READER"
+                capture.write(HOST_TO_READER if to_reader else READER_TO_HOST, data)
 
             # Forward
             destination.sendall(data)
@@ -86,4 +96,7 @@ def main():
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        capture = CaptureWriter(sys.argv[1])
+        print(f"📼 Recording to {sys.argv[1]}")
     main()
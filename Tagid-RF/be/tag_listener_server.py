@@ -14,10 +14,11 @@ Features:
 - Statistics on connection close
 
 Usage:
-    python tag_listener_server.py [port]
+    python tag_listener_server.py [port] [capture_file]
 
 Example:
     python tag_listener_server.py 4001
+    python tag_listener_server.py 2022 captures/store.m2cap   # also record the wire
 
 =============================================================================
 """
@@ -31,7 +32,12 @@ import sys
 import threading
 from datetime import datetime
 from logging.handlers import RotatingFileHandler
-from typing import Any, Callable, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.logging import LazyHex, queue_handler, rate_limited_logger
+from app.services.m200_capture import HOST_TO_READER, READER_TO_HOST, CaptureWriter
+from app.services.m200_protocol import crc_ok
+from app.services.reader_health import LISTENER, reader_health_monitor
 
 # ============================================================================
 # CONFIGURATION
@@ -42,6 +48,8 @@ LOG_DIR = "logs"
 LOG_FILE = os.path.join(LOG_DIR, "tag_listener.log")
 MAX_LOG_SIZE = 5 * 1024 * 1024  # 5 MB
 LOG_BACKUP_COUNT = 5
+LOG_LEVEL = os.environ.get("TAG_LISTENER_LOG_LEVEL", "INFO")  # DEBUG adds raw frames
+TAG_LOG_RATE = 20  # Per-tag / per-chunk lines per second; the rest are only counted
 
 # ============================================================================
 # GLOBAL CALLBACK
@@ -55,18 +63,32 @@ def set_tag_callback(callback: Callable[[Dict[str, Any]], None]):
     _tag_callback = callback
 
 
+_capture: Optional[CaptureWriter] = None
+
+
+def set_capture_writer(writer: Optional[CaptureWriter]):
+    """Record all reader traffic to a capture file (None stops recording)."""
+    global _capture
+    _capture = writer
+
+
 # ============================================================================
 # LOGGING SETUP
 # ============================================================================
 
 
 def setup_logging():
-    """Setup logging with file and console handlers."""
+    """
+    Setup logging with file and console handlers.
+
+    Both sit behind a queue, so reader threads hand records off instead of
+    writing to the console and file themselves.
+    """
     os.makedirs(LOG_DIR, exist_ok=True)
 
     # Create logger
     logger = logging.getLogger("tag_listener")
-    logger.setLevel(logging.DEBUG)
+    logger.setLevel(LOG_LEVEL)
 
     # File handler with rotation
     file_handler = RotatingFileHandler(
@@ -80,17 +102,19 @@ def setup_logging():
 
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.DEBUG)  # Changed to DEBUG to see raw frames
+    console_handler.setLevel(logging.DEBUG)  # Follows LOG_LEVEL
     console_formatter = logging.Formatter("[%(asctime)s] %(message)s", datefmt="%H:%M:%S")
     console_handler.setFormatter(console_formatter)
 
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    logger.addHandler(queue_handler(file_handler, console_handler))
 
     return logger
 
 
 logger = setup_logging()
+# Hot-path messages, rate limited (they propagate to the handlers above)
+tag_logger = rate_limited_logger("tag_listener.tags", TAG_LOG_RATE)
+frame_logger = rate_limited_logger("tag_listener.frames", TAG_LOG_RATE)
 
 # ============================================================================
 # COMMAND CODES
@@ -186,6 +210,7 @@ def parse_frame(data: bytes) -> Optional[Dict[str, Any]]:
         "length": length,
         "raw_hex": data.hex().upper(),
         "timestamp": datetime.now().isoformat(),
+        "crc_ok": crc_ok(data),
     }
 
     # 0x0082 (Active Report), 0x0001 (Inventory Resp), 0x0018 (Cached)
@@ -248,7 +273,7 @@ def extract_epcs_from_raw(data: bytes) -> List[str]:
     pattern = b"\xe2\x80\x68\x94"
 
     i = 0
-    while i < len(data) - 12:
+    while i <= len(data) - 12:
         if data[i : i + 4] == pattern:
             # Extract 12-byte EPC
             epc = data[i : i + 12].hex().upper()
@@ -398,6 +423,8 @@ def send_command_to_active_client(cmd_code: int, data: bytes = b"") -> bool:
 
             frame = build_command(cmd_code, data)
             _active_client.send(frame)
+            if _capture:
+                _capture.write(HOST_TO_READER, frame)
             logger.info(f"Sent Command 0x{cmd_code:04X} to reader")
             return True
         except Exception as e:
@@ -424,8 +451,97 @@ def stop_inventory():
 # ============================================================================
 
 
+def ingest_frames(frames: List[Dict[str, Any]], reader_ip: str) -> int:
+    """
+    Act on parsed frames: passive-mode detection, tag store and callback.
+
+    Returns:
+        Number of tag reads ingested.
+    """
+    global _reader_mode
+
+    tag_count = 0
+    for result in frames:
+        frame_type = result.get("type", "UNKNOWN")
+        cmd = result.get("cmd", 0)
+
+        # Auto-Detect Passive Mode
+        if cmd == 0x0082 and _reader_mode != "PASSIVE":
+            _reader_mode = "PASSIVE"
+            logger.info("!!! AUTO-DETECTED PASSIVE MODE (Receiving 0x0082 frames) !!!")
+            logger.info("Disabling automatic 'Start Inventory' commands.")
+
+        if frame_type == "TAG":
+            epc = result.get("epc", "")
+            if epc and epc != "EMPTY":
+                tag_count += 1
+                tag_data = {
+                    "epc": epc,
+                    "epc_length": result.get("epc_length", 0),
+                    "timestamp": result.get("timestamp"),
+                    "reader_ip": reader_ip,
+                    "raw": result.get("raw_hex"),
+                    "rssi": result.get("rssi", -60),
+                    "antenna": result.get("antenna", 1),
+                }
+
+                # Add to local store
+                is_new = tag_store.add_tag(tag_data)
+
+                # Log
+                status_str = "NEW" if is_new else "SEEN"
+                tag_logger.info("*** %s TAG *** EPC: %s", status_str, epc)
+
+                # Trigger Callback (Critical for WebSocket)
+                if _tag_callback:
+                    try:
+                        _tag_callback(tag_data)
+                    except Exception as e:
+                        logger.error(f"Callback error: {e}")
+    return tag_count
+
+
+def ingest_chunk(buffer: bytes, chunk: bytes, reader_ip: str) -> Tuple[bytes, int]:
+    """
+    Feed bytes received from a reader through the parser and ingestion.
+
+    Shared by live connections and capture replay.
+
+    Returns:
+        (remaining_buffer, tags_ingested)
+    """
+    buffer, parsed_frames = process_buffer(buffer + chunk)
+
+    if len(parsed_frames) > 0:
+        frame_logger.debug(
+            "Processed %d frames from buffer. Remaining: %d bytes", len(parsed_frames), len(buffer)
+        )
+
+    ingested = ingest_frames(parsed_frames, reader_ip)
+    reader_health_monitor.on_frames(
+        reader_ip,
+        len(parsed_frames),
+        tag_reads=ingested,
+        crc_errors=sum(1 for frame in parsed_frames if not frame["crc_ok"]),
+    )
+    return buffer, ingested
+
+
+def send_heartbeat(client_socket: socket.socket, reader_ip: str) -> None:
+    """Poll an idle reader with Get Device Info so it proves it is alive."""
+    # RFM_GET_DEVICE_INFO = 0x0070. Not Get Gate Status: it shares 0x0082 with
+    # active reports, so its reply would be parsed (and ingested) as a tag read
+    frame = build_command(0x0070)
+    try:
+        client_socket.send(frame)
+        if _capture:
+            _capture.write(HOST_TO_READER, frame)
+    except OSError as e:
+        reader_health_monitor.on_error(reader_ip, f"Heartbeat send failed: {e}")
+
+
 def handle_client(client_socket: socket.socket, client_address: tuple):
-    global _active_client, _reader_mode
+    global _active_client
 
     reader_ip = client_address[0]
     reader_port = client_address[1]
@@ -441,74 +557,45 @@ def handle_client(client_socket: socket.socket, client_address: tuple):
     tag_count = 0
     buffer = b""
     connection_start = datetime.now()
+    error = None
+
+    reader_health_monitor.on_connect(reader_ip, LISTENER)
+    # Wake up once per heartbeat interval to prompt an idle reader
+    client_socket.settimeout(reader_health_monitor.heartbeat_seconds)
 
     try:
         while True:
-            chunk = client_socket.recv(4096)
+            try:
+                chunk = client_socket.recv(4096)
+            except socket.timeout:
+                send_heartbeat(client_socket, reader_ip)
+                continue
             if not chunk:
                 logger.info("Reader disconnected (closed connection)")
                 break
 
-            buffer += chunk
+            if _capture:
+                _capture.write(READER_TO_HOST, chunk)
 
-            # Log raw chunk for debugging (first 50 chars)
-            logger.debug(f"Received {len(chunk)} bytes. Raw: {chunk.hex().upper()[:50]}...")
+            # Raw chunk for debugging (first 25 bytes; hex is only built at DEBUG)
+            frame_logger.debug("Received %d bytes. Raw: %s", len(chunk), LazyHex(chunk, 25))
 
             # Process buffer with stream logic
-            buffer, parsed_frames = process_buffer(buffer)
-
-            if len(parsed_frames) > 0:
-                logger.debug(
-                    f"Processed {len(parsed_frames)} frames from buffer. Remaining: {len(buffer)} bytes"
-                )
-
-            for result in parsed_frames:
-                frame_type = result.get("type", "UNKNOWN")
-                cmd = result.get("cmd", 0)
-
-                # Auto-Detect Passive Mode
-                if cmd == 0x0082 and _reader_mode != "PASSIVE":
-                    _reader_mode = "PASSIVE"
-                    logger.info("!!! AUTO-DETECTED PASSIVE MODE (Receiving 0x0082 frames) !!!")
-                    logger.info("Disabling automatic 'Start Inventory' commands.")
-
-                if frame_type == "TAG":
-                    epc = result.get("epc", "")
-                    if epc and epc != "EMPTY":
-                        tag_count += 1
-                        tag_data = {
-                            "epc": epc,
-                            "epc_length": result.get("epc_length", 0),
-                            "timestamp": result.get("timestamp"),
-                            "reader_ip": reader_ip,
-                            "raw": result.get("raw_hex"),
-                            "rssi": result.get("rssi", -60),
-                            "antenna": result.get("antenna", 1),
-                        }
-
-                        # Add to local store
-                        is_new = tag_store.add_tag(tag_data)
-
-                        # Log
-                        status_str = "NEW" if is_new else "SEEN"
-                        logger.info(f"*** {status_str} TAG *** EPC: {epc}")
-
-                        # Trigger Callback (Critical for WebSocket)
-                        if _tag_callback:
-                            try:
-                                _tag_callback(tag_data)
-                            except Exception as e:
-                                logger.error(f"Callback error: {e}")
+            buffer, ingested = ingest_chunk(buffer, chunk, reader_ip)
+            tag_count += ingested
 
     except ConnectionResetError:
         logger.warning("Connection reset by reader")
+        error = "Connection reset by reader"
     except Exception as e:
         logger.error(f"Error: {e}")
+        error = str(e)
     finally:
         with _client_lock:
             if _active_client == client_socket:
                 _active_client = None
         client_socket.close()
+        reader_health_monitor.on_disconnect(reader_ip, error)
 
 
 # ============================================================================
@@ -555,4 +642,7 @@ def get_tag_stats() -> Dict[str, Any]:
 
 if __name__ == "__main__":
     port = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+    if len(sys.argv) > 2:
+        set_capture_writer(CaptureWriter(sys.argv[2]))
+        print(f"Recording reader traffic to {sys.argv[2]}")
     start_server(port)
@@ -42,3 +42,44 @@ async def test_get_current_user_not_found():
         with pytest.raises(HTTPException) as exc:
             await get_current_user(mock_token, mock_db)
         assert exc.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_served_from_cache():
+    """A second request with the same token skips JWT decoding and the DB lookup."""
+    mock_token = MagicMock(credentials="cached-token")
+    mock_user = MagicMock(id="u-cache")
+    payload = {"user_id": "u-cache", "exp": 9999999999}
+
+    with (
+        patch("app.api.dependencies.auth.verify_access_token", return_value=payload) as verify,
+        patch("app.api.dependencies.auth.get_user_by_id", new_callable=AsyncMock) as mock_get,
+    ):
+        mock_get.return_value = mock_user
+        first = await get_current_user(mock_token, MagicMock())
+        second = await get_current_user(mock_token, MagicMock())
+
+    assert first is second is mock_user
+    verify.assert_called_once()
+    mock_get.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_reloads_after_invalidation():
+    from app.core.auth_cache import invalidate_user
+
+    mock_token = MagicMock(credentials="cached-token")
+    with (
+        patch(
+            "app.api.dependencies.auth.verify_access_token",
+            return_value={"user_id": "u-cache", "exp": 9999999999},
+        ),
+        patch("app.api.dependencies.auth.get_user_by_id", new_callable=AsyncMock) as mock_get,
+    ):
+        mock_get.side_effect = [MagicMock(role="EMPLOYEE"), MagicMock(role="STORE_MANAGER")]
+        await get_current_user(mock_token, MagicMock())
+        invalidate_user("u-cache")
+        user = await get_current_user(mock_token, MagicMock())
+
+    assert user.role == "STORE_MANAGER"
+    assert mock_get.await_count == 2
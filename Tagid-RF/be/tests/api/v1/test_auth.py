@@ -25,7 +25,7 @@ async def test_google_login_invalid_token(client: AsyncClient):
     try:
         payload = {"token": "invalid-token-123"}
 
-        with patch("app.api.v1.endpoints.auth.id_token.verify_oauth2_token") as mock_verify:
+        with patch("app.services.google_auth.id_token.verify_oauth2_token") as mock_verify:
             mock_verify.side_effect = ValueError("Invalid token")
             response = await client.post("/api/v1/auth/google", json=payload)
             # Token verification should fail and return 401
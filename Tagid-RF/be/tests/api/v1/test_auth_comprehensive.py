@@ -219,7 +219,7 @@ class TestLoginWithGoogle:
         app.dependency_overrides[get_db] = lambda: mock_db_instance
 
         try:
-            with patch("app.api.v1.endpoints.auth.id_token.verify_oauth2_token") as mock_verify:
+            with patch("app.services.google_auth.id_token.verify_oauth2_token") as mock_verify:
                 mock_verify.side_effect = ValueError("Invalid token")
                 response = await client.post("/api/v1/auth/google", json={"token": "invalid_token"})
                 assert response.status_code == 401
@@ -237,7 +237,7 @@ class TestLoginWithGoogle:
 
         try:
             with (
-                patch("app.api.v1.endpoints.auth.id_token.verify_oauth2_token") as mock_verify,
+                patch("app.services.google_auth.id_token.verify_oauth2_token") as mock_verify,
                 patch("app.api.v1.endpoints.auth.get_user_by_email") as mock_get_user,
             ):
 
@@ -267,7 +267,7 @@ class TestLoginWithGoogle:
 
         try:
             with (
-                patch("app.api.v1.endpoints.auth.id_token.verify_oauth2_token") as mock_verify,
+                patch("app.services.google_auth.id_token.verify_oauth2_token") as mock_verify,
                 patch("app.api.v1.endpoints.auth.get_user_by_email") as mock_get_user,
                 patch("app.api.v1.endpoints.auth.update_user_google_info") as mock_update,
             ):
@@ -32,7 +32,7 @@ async def test_get_me_success(client: AsyncClient):
 @pytest.mark.asyncio
 async def test_google_login_missing_info(client: AsyncClient):
     """Test Google login when token info is missing email or sub."""
-    with patch("app.api.v1.endpoints.auth.id_token.verify_oauth2_token") as mock_verify:
+    with patch("app.services.google_auth.id_token.verify_oauth2_token") as mock_verify:
         mock_verify.return_value = {"email": "test@example.com"}  # Missing 'sub'
         response = await client.post("/api/v1/auth/google", json={"token": "valid"})
         assert response.status_code == 400
@@ -47,7 +47,7 @@ async def test_google_login_subid_update_fail(client: AsyncClient):
     mock_user.id = "user-789"
 
     with (
-        patch("app.api.v1.endpoints.auth.id_token.verify_oauth2_token") as mock_verify,
+        patch("app.services.google_auth.id_token.verify_oauth2_token") as mock_verify,
         patch("app.api.v1.endpoints.auth.get_user_by_email", return_value=mock_user),
         patch(
             "app.api.v1.endpoints.auth.update_user_google_info",
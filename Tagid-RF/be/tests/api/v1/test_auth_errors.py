@@ -18,7 +18,7 @@ async def test_google_login_no_client_id(client: AsyncClient):
 async def test_google_login_invalid_token_format(client: AsyncClient):
     """Test Google login with token that fails verification."""
     with patch(
-        "app.api.v1.endpoints.auth.id_token.verify_oauth2_token",
+        "app.services.google_auth.id_token.verify_oauth2_token",
         side_effect=ValueError("Invalid token"),
     ):
         response = await client.post("/api/v1/auth/google", json={"token": "invalid"})
@@ -30,7 +30,7 @@ async def test_google_login_invalid_token_format(client: AsyncClient):
 async def test_google_login_user_not_found(client: AsyncClient):
     """Test Google login when user is authenticated by Google but missing in DB."""
     with (
-        patch("app.api.v1.endpoints.auth.id_token.verify_oauth2_token") as mock_verify,
+        patch("app.services.google_auth.id_token.verify_oauth2_token") as mock_verify,
         patch("app.api.v1.endpoints.auth.get_user_by_email", return_value=None),
     ):
 
@@ -44,7 +44,7 @@ async def test_google_login_user_not_found(client: AsyncClient):
 async def test_google_login_db_error(client: AsyncClient):
     """Test Google login with database exception."""
     with (
-        patch("app.api.v1.endpoints.auth.id_token.verify_oauth2_token") as mock_verify,
+        patch("app.services.google_auth.id_token.verify_oauth2_token") as mock_verify,
         patch(
             "app.api.v1.endpoints.auth.get_user_by_email",
             side_effect=Exception("DB Down"),
@@ -53,7 +53,7 @@ async def test_google_login_success(client: AsyncClient):
         payload = {"token": "mock-valid-token"}
 
         with (
-            patch("app.api.v1.endpoints.auth.id_token.verify_oauth2_token") as mock_verify,
+            patch("app.services.google_auth.id_token.verify_oauth2_token") as mock_verify,
             patch("app.api.v1.endpoints.auth.get_user_by_email") as mock_get_user,
         ):
 
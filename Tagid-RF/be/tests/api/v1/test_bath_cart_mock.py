@@ -2,28 +2,39 @@
 Mock-based tests for Bath Cart endpoints (no DB required).
 """
 
+from collections import OrderedDict
+from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
 
-from app.api.v1.endpoints.bath_cart import _bath_carts
 from app.db.dependencies import get_db
 from app.main import app
+from app.services.bath_cart import bath_reader_cache, cart_totals
+from app.services.cart_store import InMemoryCartStore, get_cart_store
 from tests.mock_utils import MockModel
 
 client = TestClient(app)
 
 
+def fill_cart(store: InMemoryCartStore, cart_id: str, *tag_ids: str):
+    """Pre-fill an in-memory cart without going through the event loop."""
+    store._carts[cart_id] = OrderedDict((tag_id, datetime(2024, 1, 1)) for tag_id in tag_ids)
+    store._touch(cart_id)
+
+
 class TestBathCartEndpointsMock:
     """Tests for bath cart endpoints using mocks."""
 
     def setup_method(self):
-        _bath_carts.clear()
+        self.store = InMemoryCartStore()
+        app.dependency_overrides[get_cart_store] = lambda: self.store
+        bath_reader_cache.invalidate()
+        cart_totals.clear()
 
     def teardown_method(self):
         app.dependency_overrides.clear()
-        _bath_carts.clear()
 
     def test_scan_tag_to_cart_success(self):
         """Test scanning a tag into the bath cart."""
@@ -31,7 +42,7 @@ class TestBathCartEndpointsMock:
 
         # Reader exists and is BATH
         reader = MockModel(id="b1", type="BATH")
-        mock_db.rfidreader.find_unique = AsyncMock(return_value=reader)
+        mock_db.rfidreader.find_first = AsyncMock(return_value=reader)
 
         # Tag exists and not paid
         tag = MockModel(id="t1", epc="E1", isPaid=False, productId="p1")
@@ -49,14 +60,14 @@ class TestBathCartEndpointsMock:
         data = response.json()
         assert data["tag_id"] == "t1"
         assert data["product_name"] == "Product 1"
-        assert "t1" in _bath_carts["b1"]
+        assert "t1" in self.store._carts["b1"]
         mock_db.rfidtag.update.assert_awaited_once()
 
     def test_scan_tag_wrong_reader_type(self):
         """Test scanning into a non-bath reader."""
         mock_db = MagicMock()
         reader = MockModel(id="r1", type="GATE")
-        mock_db.rfidreader.find_unique = AsyncMock(return_value=reader)
+        mock_db.rfidreader.find_first = AsyncMock(return_value=reader)
 
         app.dependency_overrides[get_db] = lambda: mock_db
 
@@ -68,7 +79,7 @@ class TestBathCartEndpointsMock:
         """Test scanning a paid tag."""
         mock_db = MagicMock()
         reader = MockModel(id="b1", type="BATH")
-        mock_db.rfidreader.find_unique = AsyncMock(return_value=reader)
+        mock_db.rfidreader.find_first = AsyncMock(return_value=reader)
 
         tag = MockModel(id="t1", epc="E1", isPaid=True)
         mock_db.rfidtag.find_unique = AsyncMock(return_value=tag)
@@ -79,29 +90,38 @@ class TestBathCartEndpointsMock:
         assert response.status_code == 400
         assert "already paid" in response.json()["detail"]
 
+    def test_reader_lookup_is_cached(self):
+        """Repeated requests resolve the reader (by id or QR) with a single query."""
+        mock_db = MagicMock()
+        reader = MockModel(id="b1", name="Bath 1", type="BATH", qrCode="QR-1")
+        mock_db.rfidreader.find_first = AsyncMock(return_value=reader)
+        mock_db.rfidtag.find_many = AsyncMock(return_value=[])
+
+        app.dependency_overrides[get_db] = lambda: mock_db
+
+        assert client.get("/api/v1/bath/QR-1/cart").status_code == 200
+        assert client.get("/api/v1/bath/b1/cart").status_code == 200
+        assert client.get("/api/v1/bath/QR-1/cart").status_code == 200
+
+        mock_db.rfidreader.find_first.assert_awaited_once_with(
+            where={"OR": [{"id": "QR-1"}, {"qrCode": "QR-1"}]}
+        )
+
     def test_get_cart_contents(self):
         """Test retrieving bath cart contents."""
         mock_db = MagicMock()
         reader = MockModel(id="b1", name="Bath 1", type="BATH")
-        mock_db.rfidreader.find_unique = AsyncMock(return_value=reader)
+        mock_db.rfidreader.find_first = AsyncMock(return_value=reader)
 
         # Pre-fill cart
-        _bath_carts["b1"] = ["t1", "t2"]
+        fill_cart(self.store, "b1", "t1", "t2")
 
         tag1 = MockModel(id="t1", epc="E1", productId="p1")
         tag2 = MockModel(id="t2", epc="E2", productId=None, productDescription="Loose Item")
-
-        async def mock_find_tag(where):
-            if where["id"] == "t1":
-                return tag1
-            if where["id"] == "t2":
-                return tag2
-            return None
-
-        mock_db.rfidtag.find_unique.side_effect = mock_find_tag
+        mock_db.rfidtag.find_many = AsyncMock(return_value=[tag2, tag1])
 
         product = MockModel(id="p1", name="P1", price=50.0)
-        mock_db.product.find_unique = AsyncMock(return_value=product)
+        mock_db.product.find_many = AsyncMock(return_value=[product])
 
         app.dependency_overrides[get_db] = lambda: mock_db
 
@@ -110,22 +130,64 @@ class TestBathCartEndpointsMock:
         data = response.json()
         assert data["total_items"] == 2
         assert data["total_price"] == 50.0  # Only tag1 has a product with price
+        assert [item["tag_id"] for item in data["items"]] == ["t1", "t2"]
+        assert data["items"][0]["added_at"] == "2024-01-01T00:00:00"
+        assert data["items"][1]["product_name"] == "Loose Item"
+
+        # One query for tags, one for products
+        mock_db.rfidtag.find_many.assert_awaited_once_with(where={"id": {"in": ["t1", "t2"]}})
+        mock_db.product.find_many.assert_awaited_once_with(where={"id": {"in": ["p1"]}})
+
+    def test_cart_summary_tracks_scans_incrementally(self):
+        """Summary is seeded once and then updated by scans and removals."""
+        mock_db = MagicMock()
+        reader = MockModel(id="b1", name="Bath 1", type="BATH")
+        mock_db.rfidreader.find_first = AsyncMock(return_value=reader)
+        mock_db.rfidtag.find_many = AsyncMock(
+            return_value=[MockModel(id="t0", epc="E0", productId=None)]
+        )
+        mock_db.rfidtag.update = AsyncMock()
+
+        tag = MockModel(id="t1", epc="E1", isPaid=False, productId="p1")
+        mock_db.rfidtag.find_unique = AsyncMock(return_value=tag)
+        mock_db.product.find_unique = AsyncMock(
+            return_value=MockModel(id="p1", name="P1", price=30.0)
+        )
+
+        fill_cart(self.store, "b1", "t0")
+        app.dependency_overrides[get_db] = lambda: mock_db
+
+        data = client.get("/api/v1/bath/b1/cart/summary").json()
+        assert data == {"bath_id": "b1", "total_items": 1, "total_price": 0.0}
+
+        client.post("/api/v1/bath/b1/scan", json={"epc": "E1"})
+        data = client.get("/api/v1/bath/b1/cart/summary").json()
+        assert data["total_items"] == 2
+        assert data["total_price"] == 30.0
+
+        client.delete("/api/v1/bath/b1/cart/t1")
+        data = client.get("/api/v1/bath/b1/cart/summary").json()
+        assert data["total_items"] == 1
+        assert data["total_price"] == 0.0
+
+        # Seeded once, then served from the running totals
+        mock_db.rfidtag.find_many.assert_awaited_once()
 
     def test_remove_from_cart(self):
         """Test removing an item from the bath cart."""
         mock_db = MagicMock()
         reader = MockModel(id="b1", type="BATH")
-        mock_db.rfidreader.find_unique = AsyncMock(return_value=reader)
+        mock_db.rfidreader.find_first = AsyncMock(return_value=reader)
         mock_db.rfidtag.update = AsyncMock()
 
-        _bath_carts["b1"] = ["t1"]
+        fill_cart(self.store, "b1", "t1")
 
         app.dependency_overrides[get_db] = lambda: mock_db
 
         response = client.delete("/api/v1/bath/b1/cart/t1")
         assert response.status_code == 200
         assert "removed" in response.json()["message"]
-        assert "t1" not in _bath_carts["b1"]
+        assert "t1" not in self.store._carts.get("b1", {})
         mock_db.rfidtag.update.assert_awaited_once()
 
     @patch("uuid.uuid4")
@@ -134,15 +196,15 @@ class TestBathCartEndpointsMock:
         mock_uuid.return_value = MagicMock(hex="ABCDEF12")
         mock_db = MagicMock()
         reader = MockModel(id="b1", type="BATH")
-        mock_db.rfidreader.find_unique = AsyncMock(return_value=reader)
+        mock_db.rfidreader.find_first = AsyncMock(return_value=reader)
 
-        _bath_carts["b1"] = ["t1"]
+        fill_cart(self.store, "b1", "t1")
         tag = MockModel(id="t1", epc="E1", productId="p1")
-        mock_db.rfidtag.find_unique = AsyncMock(return_value=tag)
+        mock_db.rfidtag.find_many = AsyncMock(return_value=[tag])
 
         product = MockModel(id="p1", price=150.0)
-        mock_db.product.find_unique = AsyncMock(return_value=product)
-        mock_db.rfidtag.update = AsyncMock()
+        mock_db.product.find_many = AsyncMock(return_value=[product])
+        mock_db.rfidtag.update_many = AsyncMock()
 
         app.dependency_overrides[get_db] = lambda: mock_db
 
@@ -152,14 +214,15 @@ class TestBathCartEndpointsMock:
         assert data["success"] is True
         assert data["total_price"] == 150.0
         assert data["order_id"] == "ORD-ABCDEF12"
-        assert "t1" not in _bath_carts["b1"]
-        mock_db.rfidtag.update.assert_awaited_once()
+        assert "t1" not in self.store._carts.get("b1", {})
+        mock_db.rfidtag.update_many.assert_awaited_once()
+        assert mock_db.rfidtag.update_many.await_args.kwargs["where"] == {"id": {"in": ["t1"]}}
 
     def test_checkout_empty_cart(self):
         """Test checkout with an empty cart."""
         mock_db = MagicMock()
         reader = MockModel(id="b1", type="BATH")
-        mock_db.rfidreader.find_unique = AsyncMock(return_value=reader)
+        mock_db.rfidreader.find_first = AsyncMock(return_value=reader)
 
         app.dependency_overrides[get_db] = lambda: mock_db
 
@@ -171,14 +234,51 @@ class TestBathCartEndpointsMock:
         """Test clearing the cart endpoint."""
         mock_db = MagicMock()
         reader = MockModel(id="b1", type="BATH")
-        mock_db.rfidreader.find_unique = AsyncMock(return_value=reader)
-        mock_db.rfidtag.update = AsyncMock()
+        mock_db.rfidreader.find_first = AsyncMock(return_value=reader)
+        mock_db.rfidtag.update_many = AsyncMock()
 
-        _bath_carts["b1"] = ["t1", "t2"]
+        fill_cart(self.store, "b1", "t1", "t2")
 
         app.dependency_overrides[get_db] = lambda: mock_db
 
         response = client.post("/api/v1/bath/b1/clear")
         assert response.status_code == 200
-        assert len(_bath_carts["b1"]) == 0
-        assert mock_db.rfidtag.update.await_count == 2
+        assert "b1" not in self.store._carts
+        mock_db.rfidtag.update_many.assert_awaited_once_with(
+            where={"id": {"in": ["t1", "t2"]}}, data={"status": "REGISTERED"}
+        )
+
+    def test_scan_tag_twice_keeps_single_entry(self):
+        """Scanning the same tag again does not duplicate it or re-update status."""
+        mock_db = MagicMock()
+        reader = MockModel(id="b1", type="BATH")
+        mock_db.rfidreader.find_first = AsyncMock(return_value=reader)
+        tag = MockModel(id="t1", epc="E1", isPaid=False, productId=None, productDescription="X")
+        mock_db.rfidtag.find_unique = AsyncMock(return_value=tag)
+        mock_db.rfidtag.update = AsyncMock()
+
+        app.dependency_overrides[get_db] = lambda: mock_db
+
+        client.post("/api/v1/bath/b1/scan", json={"epc": "E1"})
+        client.post("/api/v1/bath/b1/scan", json={"epc": "E1"})
+
+        assert list(self.store._carts["b1"]) == ["t1"]
+        mock_db.rfidtag.update.assert_awaited_once()
+
+    def test_checkout_failure_restores_cart(self):
+        """If marking tags paid fails, the drained items go back into the cart."""
+        mock_db = MagicMock()
+        reader = MockModel(id="b1", type="BATH")
+        mock_db.rfidreader.find_first = AsyncMock(return_value=reader)
+        mock_db.rfidtag.find_many = AsyncMock(
+            return_value=[MockModel(id="t1", epc="E1", productId=None)]
+        )
+        mock_db.rfidtag.update_many = AsyncMock(side_effect=Exception("DB down"))
+
+        fill_cart(self.store, "b1", "t1")
+        app.dependency_overrides[get_db] = lambda: mock_db
+
+        with pytest.raises(Exception):
+            client.post("/api/v1/bath/b1/checkout", json={})
+
+        assert "t1" in self.store._carts["b1"]
@@ -138,18 +138,14 @@ class TestCartEndpointsMock:
         tag1 = MockModel(epc="E1", isPaid=False, productDescription="Item 1")
         tag2 = MockModel(epc="E2", isPaid=True)  # Should be ignored/logged warning
 
-        async def mock_find_unique(where):
-            epc = where.get("epc")
-            if epc == "E1":
-                return tag1
-            if epc == "E2":
-                return tag2
-            return None
-
-        mock_db.rfidtag.find_unique = AsyncMock(side_effect=mock_find_unique)
+        mock_db.rfidtag.find_many = AsyncMock(return_value=[tag1, tag2])
 
         response = client.post("/api/v1/cart/sync-bath", json=["E1", "E2", "E3"])
         assert response.status_code == 200
+        # One lookup for the whole scan
+        mock_db.rfidtag.find_many.assert_awaited_once_with(
+            where={"epc": {"in": ["E1", "E2", "E3"]}}
+        )
         data = response.json()
         # Only E1 should be added
         assert data["total_items"] == 1
@@ -2,6 +2,7 @@
 Mock-based tests for reader config endpoints (no DB required).
 """
 
+from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -9,6 +10,8 @@ from fastapi.testclient import TestClient
 
 from app.db.dependencies import get_db
 from app.main import app
+from app.services.bath_cart import bath_reader_cache
+from app.services.reader_tuning import TuningJob, TuningProfile
 from tests.mock_utils import MockModel
 
 client = TestClient(app)
@@ -114,11 +117,15 @@ class TestReaderConfigEndpointsMock:
 
         app.dependency_overrides[get_db] = lambda: mock_db
 
+        # A bath lookup cached before the switch
+        bath_reader_cache._entries["QR-1"] = (reader, float("inf"))
+
         response = client.put("/api/v1/readers/r1/set-gate")
         assert response.status_code == 200
         assert response.json()["message"] == "Reader configured as gate"
 
         mock_db.rfidreader.update.assert_awaited_once()
+        assert "QR-1" not in bath_reader_cache._entries
 
     @patch("app.api.v1.endpoints.reader_config.generate_qr_code")
     def test_get_reader_qr_success(self, mock_gen_qr):
@@ -145,3 +152,89 @@ class TestReaderConfigEndpointsMock:
 
         response = client.get("/api/v1/readers/r1/qr")
         assert response.status_code == 400
+
+    @patch("app.api.v1.endpoints.reader_config.reader_tuning_service")
+    def test_start_tuning(self, mock_service):
+        """Test starting a tuning run from the stored profile."""
+        mock_db = MagicMock()
+        mock_db.rfidreader.find_unique = AsyncMock(
+            return_value=MockModel(id="r1", ipAddress="10.0.0.5:4001")
+        )
+        stored = MockModel(powerDbm=27, qValue=5, session=2, target=0, rssiFilters=[0, 0, 0, 0])
+        mock_db.readertuningprofile.find_unique = AsyncMock(return_value=stored)
+        mock_service.start.return_value = TuningJob(reader_id="r1", total_steps=3)
+
+        app.dependency_overrides[get_db] = lambda: mock_db
+
+        response = client.post(
+            "/api/v1/readers/r1/tune", json={"window_seconds": 1.0, "powers": [25, 30]}
+        )
+        assert response.status_code == 202
+        assert response.json()["status"] == "pending"
+
+        args, kwargs = mock_service.start.call_args
+        assert args == ("r1", "10.0.0.5:4001")
+        assert kwargs["window_seconds"] == 1.0
+        assert kwargs["space"].powers == [25, 30]
+        assert kwargs["start_profile"] == TuningProfile(
+            power_dbm=27, q_value=5, session=2, target=0, rssi_filters=(0, 0, 0, 0)
+        )
+
+    @patch("app.api.v1.endpoints.reader_config.reader_tuning_service")
+    def test_start_tuning_while_running(self, mock_service):
+        """Test that a second tuning run for the same reader is rejected."""
+        mock_db = MagicMock()
+        mock_db.rfidreader.find_unique = AsyncMock(return_value=MockModel(id="r1", ipAddress="x"))
+        mock_db.readertuningprofile.find_unique = AsyncMock(return_value=None)
+        mock_service.start.side_effect = RuntimeError("Reader r1 is already being tuned")
+
+        app.dependency_overrides[get_db] = lambda: mock_db
+
+        response = client.post("/api/v1/readers/r1/tune")
+        assert response.status_code == 409
+
+    def test_get_tuning_profile(self):
+        """Test reading the stored tuning profile."""
+        mock_db = MagicMock()
+        profile = MockModel(
+            readerId="r1",
+            powerDbm=30,
+            qValue=5,
+            session=2,
+            target=0,
+            rssiFilters=[0, 60, 0, 0],
+            uniquePerSecond=120.5,
+            duplicateRatio=0.1,
+            score=118.1,
+            windowSeconds=2.0,
+            tunedAt=datetime(2026, 10, 18, tzinfo=timezone.utc),
+        )
+        mock_db.readertuningprofile.find_unique = AsyncMock(return_value=profile)
+
+        app.dependency_overrides[get_db] = lambda: mock_db
+
+        response = client.get("/api/v1/readers/r1/tuning-profile")
+        assert response.status_code == 200
+        assert response.json()["rssi_filters"] == [0, 60, 0, 0]
+
+        mock_db.readertuningprofile.find_unique = AsyncMock(return_value=None)
+        assert client.get("/api/v1/readers/r1/tuning-profile").status_code == 404
+
+    def test_readers_health(self):
+        """Test that reader health is served from the in-memory monitor."""
+        from app.services.reader_health import reader_health_monitor
+
+        reader_health_monitor.reset()
+        reader_health_monitor.on_connect("10.0.0.1")
+        reader_health_monitor.on_frames("10.0.0.1", 3, tag_reads=3)
+        reader_health_monitor.on_connect("10.0.0.2")
+        reader_health_monitor.on_disconnect("10.0.0.2")
+        try:
+            response = client.get("/api/v1/readers/health")
+        finally:
+            reader_health_monitor.reset()
+
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["online"], data["offline"], data["error"]) == (1, 1, 0)
+        assert data["readers"][0]["tag_reads"] == 3
@@ -153,7 +153,7 @@ async def test_get_tag_stats(client: AsyncClient):
         mock_db.query.return_value.filter.return_value.group_by.return_value.all.return_value = [
             ("Zone A", 5)
         ]
-        mock_db.query.return_value.filter.return_value.scalar.return_value = -55.5
+        mock_db.query.return_value.filter.return_value.one.return_value = (-111, 2)
 
         mock_most_scanned = SimpleNamespace(id=1, epc="MOST1", read_count=500)
         mock_db.query.return_value.order_by.return_value.first.return_value = mock_most_scanned
@@ -59,6 +59,10 @@ async def test_create_tag_full_metadata(client: AsyncClient):
         rssi=-40,
         antenna_port=1,
         location="Warehouse",
+        product_name="Test Product",
+        product_sku="SKU123",
+        price_cents=100,
+        is_paid=True,
         is_active=True,
         created_at=datetime.datetime.now(),
         updated_at=datetime.datetime.now(),
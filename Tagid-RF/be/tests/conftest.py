@@ -28,7 +28,37 @@ mock_settings.API_V1_STR = "/api/v1"
 mock_settings.FCM_PROJECT_ID = "test-project"
 mock_settings.FCM_SERVER_KEY = "test-key"
 mock_settings.GOOGLE_CLIENT_ID = "test-google-id"
+mock_settings.GOOGLE_TOKEN_TIMEOUT = 300
+mock_settings.GOOGLE_CERTS_URL = None
 mock_settings.ACCESS_TOKEN_EXPIRE_MINUTES = 60
+mock_settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS = 30
+mock_settings.CPU_EXECUTOR_WORKERS = 2
+mock_settings.CPU_EXECUTOR_MAX_IN_FLIGHT = 8
+mock_settings.PAYMENT_HTTP_TIMEOUT_SECONDS = 30.0
+mock_settings.PAYMENT_HTTP_CONNECT_TIMEOUT_SECONDS = 5.0
+mock_settings.PAYMENT_HTTP_MAX_CONNECTIONS = 20
+mock_settings.PAYMENT_HTTP_RETRIES = 2
+mock_settings.RFID_READER_ID = "M-200"
+mock_settings.RFID_CAPTURE_PATH = None
+mock_settings.INVENTORY_RECONCILE_SECONDS = 600
+mock_settings.GATE_INSIDE_ANTENNAS = [1]
+mock_settings.GATE_OUTSIDE_ANTENNAS = [2]
+mock_settings.GATE_PASS_TIMEOUT_SECONDS = 2.0
+mock_settings.GATE_MAX_PASS_SECONDS = 30.0
+mock_settings.READER_TUNING_WINDOW_SECONDS = 2.0
+mock_settings.READER_TUNING_SETTLE_SECONDS = 2.0
+mock_settings.READER_TUNING_DUPLICATE_WEIGHT = 0.2
+mock_settings.READER_HEARTBEAT_SECONDS = 10.0
+mock_settings.READER_MAX_MISSED_HEARTBEATS = 3
+mock_settings.READER_HEALTH_FLUSH_SECONDS = 5.0
+mock_settings.READER_LAST_SEEN_WRITE_SECONDS = 60.0
+mock_settings.SCAN_HISTORY_PARTITION_INTERVAL = "day"
+mock_settings.SCAN_HISTORY_RETENTION_DAYS = 30
+mock_settings.SCAN_ROLLUP_RETENTION_DAYS = 365
+mock_settings.SCAN_HISTORY_RAW_QUERY_HOURS = 48
+mock_settings.SCAN_HISTORY_MAINTENANCE_SECONDS = 3600
+mock_settings.EXPORT_BATCH_SIZE = 5000
+mock_settings.EXPORT_MAX_CONNECTIONS = 2
 mock_settings.SECURITY_HEADERS = False
 mock_settings.BACKEND_CORS_ORIGINS = ["*"]
 
@@ -183,6 +213,34 @@ async def db_setup():
     yield prisma_client
 
 
+@pytest.fixture(autouse=True)
+def reset_tag_stats():
+    """Start every test with empty dashboard stats so they reconcile from the mocked DB."""
+    from app.services.tag_stats import tag_stats
+
+    tag_stats.reset()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def reset_inventory_counters():
+    """Start every test with empty inventory counters so they reconcile from the mocked DB."""
+    from app.services.inventory_counters import inventory_counters
+
+    inventory_counters.reset()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def reset_auth_cache():
+    """Don't let a user authenticated in one test leak into the next."""
+    from app.core.auth_cache import principal_cache, token_cache
+
+    principal_cache.clear()
+    token_cache.clear()
+    yield
+
+
 @pytest_asyncio.fixture()
 async def client(async_client):
     """Alias for async_client to support tests using 'client'."""
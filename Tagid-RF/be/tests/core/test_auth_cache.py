@@ -0,0 +1,67 @@
+"""
+Tests for the authentication caches.
+"""
+
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.core.auth_cache import PrincipalCache, TokenCache, invalidate_user, principal_cache
+from app.crud.user import update_user_google_info
+
+
+def test_token_cache_keeps_payload_until_exp():
+    cache = TokenCache()
+    cache.put("token-a", {"user_id": "u1", "exp": time.time() + 60})
+    assert cache.get("token-a")["user_id"] == "u1"
+
+
+def test_token_cache_skips_expired_and_exp_less_tokens():
+    cache = TokenCache()
+    cache.put("expired", {"user_id": "u1", "exp": time.time() - 1})
+    cache.put("no-exp", {"user_id": "u1"})
+    assert cache.get("expired") is None
+    assert cache.get("no-exp") is None
+
+
+def test_principal_cache_ttl_expiry():
+    cache = PrincipalCache(ttl_seconds=10)
+    user = MagicMock(id="u1")
+    with patch("app.core.auth_cache.time.monotonic", return_value=100.0):
+        cache.put("u1", user)
+        assert cache.get("u1") is user
+    with patch("app.core.auth_cache.time.monotonic", return_value=111.0):
+        assert cache.get("u1") is None
+
+
+def test_principal_cache_disabled_with_zero_ttl():
+    cache = PrincipalCache(ttl_seconds=0)
+    cache.put("u1", MagicMock())
+    assert cache.get("u1") is None
+
+
+def test_principal_cache_is_bounded():
+    cache = PrincipalCache(ttl_seconds=60, max_entries=2)
+    for user_id in ("u1", "u2", "u3"):
+        cache.put(user_id, MagicMock())
+    assert len(cache) == 2
+    assert cache.get("u1") is None
+    assert cache.get("u3") is not None
+
+
+def test_invalidate_user():
+    principal_cache.put("u1", MagicMock())
+    invalidate_user("u1")
+    assert principal_cache.get("u1") is None
+
+
+@pytest.mark.asyncio
+async def test_google_link_invalidates_principal():
+    principal_cache.put("u1", MagicMock(subId=None))
+    mock_db = MagicMock()
+    mock_db.user.update = AsyncMock(return_value=MagicMock(subId="g-1"))
+
+    await update_user_google_info(mock_db, "u1", "g-1")
+
+    assert principal_cache.get("u1") is None
@@ -0,0 +1,88 @@
+"""
+Tests for the bounded CPU executor used for password hashing and key derivation.
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import bcrypt
+import pytest
+
+from app.core import cpu_executor
+from app.core.cpu_executor import CPUBoundExecutor
+from app.core.security import get_password_hash_async, verify_password_async
+
+
+@pytest.fixture
+def executor():
+    ex = CPUBoundExecutor(max_workers=2, max_in_flight=4)
+    with patch.object(cpu_executor, "_cpu_executor", ex):
+        yield ex
+    ex.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run_executes_off_the_event_loop_thread(executor):
+    loop_thread = threading.get_ident()
+    worker_thread = await executor.run(threading.get_ident)
+    assert worker_thread != loop_thread
+
+
+@pytest.mark.asyncio
+async def test_in_flight_limit(executor):
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def work():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+
+    await asyncio.gather(*(executor.run(work) for _ in range(20)))
+    assert peak <= executor.max_workers
+
+
+@pytest.mark.asyncio
+async def test_async_password_helpers_roundtrip(executor):
+    hashed = await get_password_hash_async("secret")
+    assert await verify_password_async("secret", hashed) is True
+    assert await verify_password_async("wrong", hashed) is False
+
+
+@pytest.mark.asyncio
+async def test_event_loop_lag_during_100_concurrent_logins(executor):
+    """The loop keeps ticking while 100 bcrypt verifications run."""
+    hashed = bcrypt.hashpw(b"secret", bcrypt.gensalt(rounds=8)).decode()
+    interval = 0.005
+    max_lag = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal max_lag
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            max_lag = max(max_lag, time.perf_counter() - started - interval)
+
+    async def logins():
+        results = await asyncio.gather(
+            *(verify_password_async("secret", hashed) for _ in range(100))
+        )
+        done.set()
+        return results
+
+    tick = asyncio.create_task(ticker())
+    results = await logins()
+    await tick
+
+    assert all(results)
+    # A single inline verification at this cost factor already blocks ~15ms;
+    # 100 inline would stall the loop for over a second.
+    assert max_lag < 0.1
@@ -0,0 +1,110 @@
+"""
+Tests for the logging helpers: queued handlers, rate-limited loggers and
+lazily formatted hex.
+"""
+
+import logging
+import threading
+
+import pytest
+
+from app.core.logging import (
+    LazyHex,
+    RateLimitedLogger,
+    queue_handler,
+    rate_limited_logger,
+    stop_queue_handler,
+)
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((record.getMessage(), threading.current_thread().name))
+
+
+@pytest.fixture
+def logger():
+    logger = logging.getLogger("tests.core.logging")
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    yield logger
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        stop_queue_handler(handler)
+
+
+def test_queue_handler_writes_on_listener_thread(logger):
+    target = RecordingHandler()
+    target.setLevel(logging.INFO)
+    handler = queue_handler(target)
+    logger.addHandler(handler)
+
+    logger.debug("below the handler level")
+    logger.info("tag %s", "E200")
+    stop_queue_handler(handler)
+
+    assert [message for message, _ in target.records] == ["tag E200"]
+    assert target.records[0][1] != threading.current_thread().name
+
+
+def test_rate_limited_logger_counts_and_reports_suppressed(logger, monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("app.core.logging.time.monotonic", lambda: clock[0])
+    target = RecordingHandler()
+    logger.addHandler(target)
+    sampled = RateLimitedLogger(logger, rate=2, per=1.0)
+
+    for i in range(5):
+        sampled.info("tag %d", i)
+    clock[0] += 1.0
+    sampled.info("tag %d", 5)
+
+    assert [message for message, _ in target.records] == [
+        "tag 0",
+        "tag 1",
+        "tag 5 [3 similar messages suppressed]",
+    ]
+    assert sampled.suppressed == 3
+
+
+def test_rate_limited_logger_drops_before_building_records(logger, monkeypatch):
+    sampled = RateLimitedLogger(logger, rate=1)
+    sampled.info("first")
+
+    def make_record(*args, **kwargs):
+        raise AssertionError("record built for a dropped call")
+
+    monkeypatch.setattr(logger, "makeRecord", make_record)
+    sampled.info("dropped")
+    assert sampled.suppressed == 1
+
+
+def test_rate_limited_logger_is_shared_per_name():
+    sampled = rate_limited_logger("tests.core.logging.sampled", rate=5)
+    assert rate_limited_logger("tests.core.logging.sampled") is sampled
+    assert sampled.rate == 5
+    assert sampled.logger is logging.getLogger("tests.core.logging.sampled")
+
+
+def test_lazy_hex_only_formats_emitted_records(logger):
+    class CountingHex(LazyHex):
+        formatted = 0
+
+        def __str__(self):
+            CountingHex.formatted += 1
+            return super().__str__()
+
+    target = RecordingHandler()
+    logger.addHandler(target)
+    logger.setLevel(logging.INFO)
+
+    logger.debug("RX: %s", CountingHex(b"\xcf\x00\x00\x82"))
+    assert CountingHex.formatted == 0
+
+    logger.info("RX: %s", CountingHex(b"\xcf\x00\x00\x82\x10", limit=4))
+    assert CountingHex.formatted == 1
+    assert target.records[0][0] == "RX: CF000082..."
@@ -0,0 +1,165 @@
+"""
+Tests for the shared Prisma connection lifecycle.
+"""
+
+import asyncio
+import importlib.util
+from unittest.mock import AsyncMock, MagicMock, PropertyMock, patch
+
+import pytest
+
+from app.db.prisma import PrismaClient, build_datasource_url
+
+
+@pytest.fixture
+def prisma_module(monkeypatch):
+    """
+    A fresh ``app.db.prisma`` built on the real Prisma class.
+
+    conftest replaces ``prisma.Prisma`` with a mock instance, which turns the
+    imported ``SharedPrisma`` into a mock as well.
+    """
+    from prisma.client import Prisma
+
+    monkeypatch.setattr("prisma.Prisma", Prisma)
+    spec = importlib.util.find_spec("app.db.prisma")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_build_datasource_url_adds_pool_params():
+    url = build_datasource_url("postgresql://u:p@db:5432/app", 8, 15)
+    assert url == "postgresql://u:p@db:5432/app?connection_limit=8&pool_timeout=15"
+
+
+def test_build_datasource_url_keeps_existing_params():
+    url = build_datasource_url("postgresql://u:p@db/app?sslmode=require&connection_limit=3", 8, 15)
+    assert "connection_limit=3" in url
+    assert "sslmode=require" in url
+    assert "pool_timeout=15" in url
+
+
+@pytest.mark.asyncio
+async def test_shared_prisma_context_does_not_disconnect(prisma_module):
+    """Leaving ``async with`` keeps the shared engine connected."""
+    shared_prisma = prisma_module.SharedPrisma
+    with patch.object(
+        prisma_module.prisma_client, "ensure_connected", new_callable=AsyncMock
+    ) as ensure:
+        client = shared_prisma.__new__(shared_prisma)
+        client.disconnect = AsyncMock()
+
+        async with client as db:
+            assert db is client
+
+        ensure.assert_awaited_once()
+        client.disconnect.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_ensure_connected_connects_once_under_concurrency():
+    pc = PrismaClient()
+    mock_client = MagicMock()
+    state = {"connected": False}
+    mock_client.is_connected = MagicMock(side_effect=lambda: state["connected"])
+
+    async def fake_connect():
+        await asyncio.sleep(0.01)
+        state["connected"] = True
+
+    with (
+        patch.object(PrismaClient, "client", new_callable=PropertyMock, return_value=mock_client),
+        patch.object(pc, "connect", new=AsyncMock(side_effect=fake_connect)) as connect,
+    ):
+        pc._connect_lock = None
+        await asyncio.gather(*(pc.ensure_connected() for _ in range(10)))
+
+    connect.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_db_borrows_without_disconnecting():
+    pc = PrismaClient()
+    with (
+        patch.object(pc, "ensure_connected", new_callable=AsyncMock),
+        patch.object(pc, "disconnect", new_callable=AsyncMock) as disconnect,
+    ):
+        async with pc.get_db() as db:
+            assert db is not None
+
+    disconnect.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_health_check_success():
+    pc = PrismaClient()
+    mock_client = MagicMock()
+    mock_client.query_raw = AsyncMock(return_value=[{"?column?": 1}])
+
+    with (
+        patch.object(PrismaClient, "client", new_callable=PropertyMock, return_value=mock_client),
+        patch.object(pc, "ensure_connected", new_callable=AsyncMock),
+    ):
+        result = await pc.health_check()
+
+    assert result["healthy"] is True
+    assert result["latency_ms"] >= 0
+    assert pc.last_health == result
+
+
+@pytest.mark.asyncio
+async def test_health_check_timeout_does_not_tear_down():
+    """A slow ping is reported; the shared client stays up for in-flight queries."""
+    pc = PrismaClient()
+    mock_client = MagicMock()
+    mock_client.is_connected = MagicMock(return_value=True)
+
+    async def slow_query(query):
+        await asyncio.sleep(1)
+
+    mock_client.query_raw = slow_query
+
+    with (
+        patch.object(PrismaClient, "client", new_callable=PropertyMock, return_value=mock_client),
+        patch.object(pc, "connect", new_callable=AsyncMock) as connect,
+        patch.object(pc, "disconnect", new_callable=AsyncMock) as disconnect,
+    ):
+        result = await pc.health_check(timeout=0.01)
+
+    assert result["healthy"] is False
+    disconnect.assert_not_called()
+    connect.assert_not_called()
+    mock_client.disconnect.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_health_check_reconnects_dead_engine_in_place():
+    pc = PrismaClient()
+    mock_client = MagicMock()
+    state = {"connected": True}
+    mock_client.is_connected = MagicMock(side_effect=lambda: state["connected"])
+
+    async def engine_gone(query):
+        state["connected"] = False
+        raise Exception("engine gone")
+
+    async def reconnect():
+        state["connected"] = True
+
+    mock_client.query_raw = engine_gone
+    mock_client.connect = AsyncMock(side_effect=reconnect)
+
+    with (
+        patch.object(PrismaClient, "client", new_callable=PropertyMock, return_value=mock_client),
+        patch.object(pc, "_registered", True),
+        patch("app.db.prisma.register") as register,
+    ):
+        pc._connect_lock = None
+        result = await pc.health_check()
+
+    assert result["healthy"] is False
+    assert "engine gone" in result["error"]
+    mock_client.connect.assert_awaited_once()
+    mock_client.disconnect.assert_not_called()
+    register.assert_not_called()
@@ -0,0 +1,119 @@
+"""
+Tests for the streaming scan and tag exports, against SQLite.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.engine import create_engine  # sqlalchemy.create_engine is mocked in conftest
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.rfid_tag import RFIDScanHistory, RFIDTag
+from app.routers import exports
+from app.services import exports as exports_service
+from app.services.exports import PARQUET_AVAILABLE, get_export_sessionmaker
+
+BASE_TIME = datetime(2026, 1, 6, 12, 0)
+
+
+@pytest.fixture
+def client():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    RFIDTag.__table__.create(bind=engine)
+    RFIDScanHistory.__table__.create(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    with Session() as db:
+        for i in range(6):
+            db.add(
+                RFIDTag(
+                    epc=f"EPC{i}",
+                    store_id=1 if i < 3 else 2,
+                    is_paid=i % 2 == 0,
+                    last_seen=BASE_TIME - timedelta(hours=i),
+                )
+            )
+        for i in range(30):
+            db.add(
+                RFIDScanHistory(
+                    epc=f"EPC{i % 6}",
+                    reader_id="gate" if i % 3 else "floor",
+                    rssi=-40.0 - i,
+                    scanned_at=BASE_TIME + timedelta(minutes=i),
+                )
+            )
+        db.commit()
+
+    app = FastAPI()
+    app.include_router(exports.router, prefix="/api/v1")
+    app.dependency_overrides[get_export_sessionmaker] = lambda: Session
+    yield TestClient(app)
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_scan_export_ndjson_with_filters(client):
+    response = client.get(
+        "/api/v1/exports/scans",
+        params={
+            "reader_id": "gate",
+            "store_id": 1,
+            "since": (BASE_TIME + timedelta(minutes=5)).isoformat(),
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = ndjson(response)
+    assert {row["reader_id"] for row in rows} == {"gate"}
+    assert {row["epc"] for row in rows} <= {"EPC0", "EPC1", "EPC2"}
+    assert all(row["scanned_at"] >= (BASE_TIME + timedelta(minutes=5)).isoformat() for row in rows)
+    assert [row["id"] for row in rows] == [8, 9, 14, 15, 20, 21, 26, 27]
+
+
+def test_scan_export_resumes_after_id(client):
+    first = ndjson(client.get("/api/v1/exports/scans", params={"limit": 12}))
+    rest = ndjson(client.get("/api/v1/exports/scans", params={"after_id": first[-1]["id"]}))
+
+    assert len(first) == 12
+    assert [row["id"] for row in first + rest] == list(range(1, 31))
+
+
+def test_tag_export_csv(client):
+    response = client.get(
+        "/api/v1/exports/tags", params={"format": "csv", "is_paid": "true", "store_id": 1}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="rfid_tags.csv"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["epc"] for row in rows] == ["EPC0", "EPC2"]
+    assert rows[0]["last_seen"] == BASE_TIME.isoformat()
+
+
+def test_empty_csv_export_has_header(client):
+    response = client.get("/api/v1/exports/tags", params={"format": "csv", "epc": "missing"})
+
+    header = response.text.strip().split(",")
+    assert header[:2] == ["id", "epc"]
+    assert len(header) == len(exports_service.TAG_COLUMNS)
+
+
+@pytest.mark.skipif(PARQUET_AVAILABLE, reason="pyarrow is installed")
+def test_parquet_without_pyarrow(client):
+    assert client.get("/api/v1/exports/scans?format=parquet").status_code == 501
+
+
+def test_unknown_format_is_rejected(client):
+    assert client.get("/api/v1/exports/scans?format=xlsx").status_code == 422
@@ -30,6 +30,16 @@ def mock_db():
     return db, mock_query
 
 
+@pytest.fixture
+def prisma_tags():
+    """The Prisma ``rfidtag`` delegate that checkout marks tags paid through."""
+    with patch("app.db.prisma.prisma_client") as mock_prisma:
+        rfidtag = mock_prisma.client.rfidtag
+        rfidtag.create_many = AsyncMock(return_value=0)
+        rfidtag.update_many = AsyncMock(return_value=1)
+        yield rfidtag
+
+
 @pytest.fixture
 async def client(test_app, mock_db):
     test_app.dependency_overrides[get_db] = lambda: mock_db[0]
@@ -132,12 +142,25 @@ async def test_checkout_empty_cart(client: AsyncClient, mock_db):
     assert "Cart is empty" in response.json()["detail"]
 
 
+def _mock_gateway(mock_get_gateway):
+    mock_gateway = MagicMock()
+    mock_get_gateway.return_value = mock_gateway
+    mock_gateway.create_payment = AsyncMock(
+        return_value=MagicMock(success=True, payment_id="pi_test123", status="pending")
+    )
+    mock_gateway.confirm_payment = AsyncMock(
+        return_value=MagicMock(success=True, status="completed", external_id="pi_test123")
+    )
+    return mock_gateway
+
+
 @pytest.mark.asyncio
-async def test_checkout_success(client: AsyncClient, mock_db):
+async def test_checkout_success(client: AsyncClient, mock_db, prisma_tags):
     """Test successful checkout flow."""
     db, mock_query = mock_db
     tag = _create_mock_tag(price_cents=5000)
     mock_query.first.return_value = tag
+    mock_query.all.return_value = [tag]
 
     # Add item to cart first
     await client.post("/add", json={"qr_data": "tagid://product/SKU123"})
@@ -168,6 +191,25 @@ async def test_checkout_success(client: AsyncClient, mock_db):
     data = response.json()
     assert data["status"] == "success"
     assert data["transaction_id"] == "pi_test123"
+    # Paid in Prisma first, then mirrored onto the row
+    assert prisma_tags.update_many.await_args.kwargs["data"]["isPaid"] is True
+    assert tag.is_paid is True
+
+
+@pytest.mark.asyncio
+async def test_checkout_succeeds_when_marking_paid_fails(client: AsyncClient, mock_db, prisma_tags):
+    """A captured payment is reported as such even if the tags cannot be marked paid."""
+    db, mock_query = mock_db
+    mock_query.first.return_value = _create_mock_tag(price_cents=5000)
+    prisma_tags.update_many.side_effect = RuntimeError("Prisma unavailable")
+
+    await client.post("/add", json={"qr_data": "tagid://product/SKU123"})
+    with patch("app.routers.cart.get_gateway") as mock_get_gateway:
+        _mock_gateway(mock_get_gateway)
+        response = await client.post("/checkout", json={"payment_method_id": "pm_test"})
+
+    assert response.status_code == 200
+    assert response.json()["transaction_id"] == "pi_test123"
 
 
 @pytest.mark.asyncio
@@ -2,7 +2,7 @@
 Tests for Exit Scan Router - theft detection and tag status management.
 """
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi import FastAPI
@@ -33,6 +33,16 @@ class TestExitScanRouter:
         mock_query.first.return_value = None
         return db, mock_query
 
+    @pytest.fixture(autouse=True)
+    def prisma_tags(self):
+        """Prisma ``RfidTag`` records the tag repository sees (none by default)."""
+        with patch("app.db.prisma.prisma_client") as mock_prisma:
+            rfidtag = mock_prisma.client.rfidtag
+            rfidtag.find_many = AsyncMock(return_value=[])
+            rfidtag.create_many = AsyncMock(return_value=0)
+            rfidtag.update_many = AsyncMock(return_value=1)
+            yield rfidtag
+
     @pytest.fixture
     def override_get_db(self, mock_db):
         """Override the database dependency."""
@@ -52,8 +62,8 @@ class TestExitScanRouter:
         tag2.epc = "E2"
         tag2.is_paid = True
 
-        # Sequential tag lookups
-        mock_query.first.side_effect = [tag1, tag2]
+        # One lookup for all tags
+        mock_query.all.return_value = [tag1, tag2]
 
         request_data = {"epcs": ["E1", "E2"], "gate_id": "main-exit"}
 
@@ -88,25 +98,19 @@ class TestExitScanRouter:
         user1.store_id = 1
 
         # Configure query chain
-        # 1. tag lookup (first) -> tag1
+        # 1. tag lookup (all) -> [tag1]
         # 2. stakeholders lookup (all) -> [user1]
         # 3. store lookup (first) -> None
         # 4. preference lookup (first) -> None
 
-        mock_query.all.return_value = [user1]
-        mock_query.first.side_effect = [tag1, None, None]
+        mock_query.all.side_effect = [[tag1], [user1]]
+        mock_query.first.side_effect = [None, None]
 
         request_data = {"epcs": ["E_UNPAID"], "gate_id": "main-exit", "store_id": 1}
 
         response = await client.post("/api/v1/exit-scan/check", json=request_data)
 
-        # Diagnostics if it still fails
         data = response.json()
-        if data.get("alert_recipients") == 0:
-            print(
-                f"DEBUG: stakeholders query match failed. Count: {len(mock_query.all.return_value)}"
-            )
-
         assert response.status_code == 200
         assert data["unpaid_count"] == 1
         assert data["alert_sent"] is True
@@ -116,6 +120,23 @@ class TestExitScanRouter:
         assert db.add.called
         assert db.commit.called
 
+    async def test_check_exit_scan_prisma_decides_paid(
+        self, client: AsyncClient, mock_db, override_get_db, prisma_tags
+    ):
+        """A tag paid in Prisma passes even if its rfid_tags row was not updated."""
+        db, mock_query = mock_db
+        stale = MagicMock(spec=RFIDTag)
+        stale.epc = "E1"
+        stale.is_paid = False
+        mock_query.all.return_value = [stale]
+        prisma_tags.find_many.return_value = [MagicMock(epc="E1", isPaid=True)]
+
+        response = await client.post("/api/v1/exit-scan/check", json={"epcs": ["E1"]})
+
+        assert response.status_code == 200
+        assert response.json()["paid_count"] == 1
+        prisma_tags.find_many.assert_awaited_once_with(where={"epc": {"in": ["E1"]}})
+
     async def test_check_exit_scan_unknown_tag(self, client: AsyncClient, mock_db, override_get_db):
         """Test exit scan with unknown EPC."""
         db, mock_query = mock_db
@@ -131,34 +152,42 @@ class TestExitScanRouter:
         assert data["unpaid_count"] == 1
         assert data["unpaid_items"][0]["product_name"] == "מוצר לא מזוהה"
 
-    async def test_mark_tags_as_paid(self, client: AsyncClient, mock_db, override_get_db):
+    async def test_mark_tags_as_paid(
+        self, client: AsyncClient, mock_db, override_get_db, prisma_tags
+    ):
         """Test marking tags as paid."""
         db, mock_query = mock_db
         tag = MagicMock(spec=RFIDTag)
         tag.epc = "E1"
         tag.is_paid = False
 
-        mock_query.first.return_value = tag
+        mock_query.all.return_value = [tag]
 
         response = await client.post("/api/v1/exit-scan/mark-paid", json=["E1"])
 
         assert response.status_code == 200
+        assert response.json()["updated_count"] == 1
+        # Prisma first, then the rfid_tags mirror
+        assert prisma_tags.update_many.await_args.kwargs["data"]["isPaid"] is True
         assert tag.is_paid is True
         assert tag.paid_at is not None
         assert db.commit.called
 
-    async def test_mark_tags_as_unpaid(self, client: AsyncClient, mock_db, override_get_db):
+    async def test_mark_tags_as_unpaid(
+        self, client: AsyncClient, mock_db, override_get_db, prisma_tags
+    ):
         """Test marking tags as unpaid."""
         db, mock_query = mock_db
         tag = MagicMock(spec=RFIDTag)
         tag.epc = "E1"
         tag.is_paid = True
 
-        mock_query.first.return_value = tag
+        mock_query.all.return_value = [tag]
 
         response = await client.post("/api/v1/exit-scan/mark-unpaid", json=["E1"])
 
         assert response.status_code == 200
+        assert prisma_tags.update_many.await_args.kwargs["data"]["isPaid"] is False
         assert tag.is_paid is False
         assert tag.paid_at is None
         assert db.commit.called
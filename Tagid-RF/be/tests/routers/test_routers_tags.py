@@ -240,8 +240,8 @@ def test_get_stats_summary(client, mock_db_session):
 
     # Mock counts
     mock_query.count.return_value = 10
-    # Mock aggregates
-    mock_query.scalar.return_value = -55.5
+    # Mock aggregates (RSSI sum and count)
+    mock_query.one.return_value = (-111, 2)
     # Mock group by
     mock_query.all.return_value = [("Warehouse", 5)]
 
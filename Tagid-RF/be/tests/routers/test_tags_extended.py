@@ -184,8 +184,8 @@ async def test_get_tag_stats(client: AsyncClient, mock_db, override_db):
     most_scanned.read_count = 1000
     mock_query.first.return_value = most_scanned
 
-    # average_rssi (.scalar)
-    mock_query.scalar.return_value = -45.5
+    # average_rssi (sum, count via .one)
+    mock_query.one.return_value = (-91, 2)
 
     # location distribution (.all)
     mock_query.all.return_value = [("Location A", 40), ("Location B", 60)]
@@ -198,6 +198,7 @@ async def test_get_tag_stats(client: AsyncClient, mock_db, override_db):
     assert data["active_tags"] == 90
     assert data["scans_today"] == 500
     assert data["most_scanned_tag"]["epc"] == "MOST"
+    assert data["average_rssi"] == -45.5
     assert data["tags_by_location"]["Location A"] == 40
 
 
@@ -0,0 +1,139 @@
+"""
+Tests for keyset pagination, totals and search on GET /tags/, against SQLite.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.engine import create_engine  # sqlalchemy.create_engine is mocked in conftest
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.rfid_tag import RFIDTag
+from app.routers import tags
+from app.services.database import get_db
+from app.services.tag_stats import tag_stats
+
+BASE_TIME = datetime(2026, 1, 6, 12, 0)
+
+
+@pytest.fixture
+def client():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    RFIDTag.__table__.create(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    with Session() as db:
+        for i in range(25):
+            db.add(
+                RFIDTag(
+                    epc=f"E2806894{i:016X}",
+                    tid=f"TID{i:04d}",
+                    is_active=i % 5 != 0,
+                    # Pairs share a timestamp so the id tie-breaker matters
+                    last_seen=BASE_TIME - timedelta(minutes=i // 2),
+                )
+            )
+        db.commit()
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(tags.router, prefix="/api/v1/tags")
+    app.dependency_overrides[get_db] = override_get_db
+    tag_stats.reset()
+    yield TestClient(app)
+    tag_stats.reset()
+
+
+def test_cursor_pages_cover_every_tag_once(client):
+    seen = []
+    url = "/api/v1/tags/?page_size=10"
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        seen.extend(tag["id"] for tag in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        url = f"/api/v1/tags/?page_size=10&cursor={cursor}" if cursor else None
+
+    assert len(seen) == 25
+    assert len(set(seen)) == 25
+
+
+def test_cursor_order_matches_offset_order(client):
+    offset_ids = [
+        tag["id"]
+        for page in (1, 2, 3)
+        for tag in client.get(f"/api/v1/tags/?page_size=10&page={page}").json()
+    ]
+
+    first = client.get("/api/v1/tags/?page_size=10")
+    second = client.get(f"/api/v1/tags/?page_size=10&cursor={first.headers['X-Next-Cursor']}")
+
+    keyset_ids = [tag["id"] for tag in first.json() + second.json()]
+    assert keyset_ids == offset_ids[:20]
+
+
+def test_last_page_has_no_cursor(client):
+    response = client.get("/api/v1/tags/?page_size=100")
+
+    assert len(response.json()) == 25
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/api/v1/tags/?cursor=not-a-cursor").status_code == 400
+
+
+def test_total_modes(client):
+    exact = client.get("/api/v1/tags/?is_active=true&total=exact")
+    assert exact.headers["X-Total-Count"] == "20"
+    assert "X-Total-Count-Estimated" not in exact.headers
+
+    tag_stats.total_tags, tag_stats.active_tags = 1000, 900
+    tag_stats.reconciled_at = BASE_TIME
+    estimate = client.get("/api/v1/tags/?is_active=false&total=estimate")
+    assert estimate.headers["X-Total-Count"] == "100"
+    assert estimate.headers["X-Total-Count-Estimated"] == "true"
+
+    # Filtered estimates fall back to an exact count outside Postgres
+    searched = client.get("/api/v1/tags/?search=tid000&total=estimate")
+    assert searched.headers["X-Total-Count"] == "10"
+    assert len(searched.json()) == 10
+
+    assert client.get("/api/v1/tags/?total=approx").status_code == 422
+
+
+def test_estimate_keeps_search_out_of_the_sql():
+    """Postgres estimates pass the search as a parameter; quotes and colons are data."""
+    from unittest.mock import MagicMock
+
+    from sqlalchemy.dialects.postgresql.psycopg import PGDialect_psycopg
+    from sqlalchemy.orm import Session
+
+    search = ":cd' OR '1'='1"
+    query = (
+        Session()
+        .query(RFIDTag)
+        .filter((RFIDTag.epc.ilike(f"%{search}%")) | (RFIDTag.tid.ilike(f"%{search}%")))
+    )
+    db = MagicMock()
+    db.get_bind.return_value.dialect = PGDialect_psycopg()
+    execute = db.connection.return_value.exec_driver_sql
+    execute.return_value.scalar.return_value = [{"Plan": {"Plan Rows": 42}}]
+
+    assert tags.estimate_count(db, query, search, None) == 42
+
+    sql, params = execute.call_args.args
+    assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert search not in sql and ":cd" not in sql
+    assert f"%{search}%" in params.values()
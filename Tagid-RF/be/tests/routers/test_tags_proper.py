@@ -185,7 +185,7 @@ async def test_get_tag_stats(ac, mock_db):
     mock_db.query().count.return_value = 10
     mock_db.query().filter().count.return_value = 5
     mock_db.query().order_by().first.return_value = make_mock_tag(epc="BEST", read_count=100)
-    mock_db.query().filter().scalar.return_value = -55.0
+    mock_db.query().filter().one.return_value = (-110, 2)
     mock_db.query().filter().group_by().all.return_value = [("Warehouse", 10)]
 
     response = await ac.get("/api/v1/tags/stats/summary")
@@ -0,0 +1,132 @@
+"""
+Tests for pooled payment provider HTTP clients and off-loop Stripe calls.
+"""
+
+import asyncio
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services import http_clients
+from app.services.http_clients import ProviderHTTPClient, close_http_clients, get_http_client
+
+
+async def _start_stand_in_server():
+    """Minimal keep-alive HTTP/1.1 server that counts TCP connections."""
+    stats = {"connections": 0, "requests": 0}
+
+    async def handle(reader, writer):
+        stats["connections"] += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                if length:
+                    await reader.readexactly(length)
+                stats["requests"] += 1
+                body = b'{"transaction_id": "nexi_1", "status": "completed"}'
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}", stats
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    http_clients._clients.clear()
+    yield
+    http_clients._clients.clear()
+
+
+def test_get_http_client_is_shared_per_provider():
+    assert get_http_client("nexi") is get_http_client("nexi")
+    assert get_http_client("nexi") is not get_http_client("tranzila")
+
+
+@pytest.mark.asyncio
+async def test_requests_reuse_one_connection():
+    server, base_url, stats = await _start_stand_in_server()
+    client = ProviderHTTPClient("stand-in")
+    try:
+        for _ in range(5):
+            response = await client.post(f"{base_url}/payments", json={"amount": 10})
+            assert response.status_code == 200
+    finally:
+        await client.aclose()
+        server.close()
+        await server.wait_closed()
+
+    assert stats["requests"] == 5
+    assert stats["connections"] == 1
+
+
+@pytest.mark.asyncio
+async def test_nexi_provider_uses_pooled_client():
+    from app.services.nexi_provider import NexiProvider
+
+    server, base_url, stats = await _start_stand_in_server()
+    try:
+        with patch("app.services.nexi_provider.settings") as mock_settings:
+            mock_settings.NEXI_TERMINAL_ID = "terminal"
+            mock_settings.NEXI_API_KEY = "key"
+            mock_settings.NEXI_API_ENDPOINT = base_url
+            mock_settings.NEXI_MERCHANT_ID = "merchant"
+            provider = NexiProvider()
+
+        for _ in range(3):
+            result = await provider.create_payment_intent(1000, "ILS")
+            await provider.confirm_payment(result["payment_id"])
+    finally:
+        await close_http_clients()
+        server.close()
+        await server.wait_closed()
+
+    assert stats["requests"] == 6
+    assert stats["connections"] == 1
+
+
+@pytest.mark.asyncio
+async def test_close_http_clients_reopens_on_next_use():
+    client = get_http_client("nexi")
+    first = client.client
+    await close_http_clients()
+    assert get_http_client("nexi").client is not first
+
+
+@pytest.mark.asyncio
+async def test_stripe_calls_run_off_the_event_loop():
+    with (
+        patch("app.services.payment.stripe_gateway.STRIPE_AVAILABLE", True),
+        patch("app.services.payment.stripe_gateway.stripe") as mock_stripe,
+    ):
+        from app.services.payment.base import PaymentRequest
+        from app.services.payment.stripe_gateway import StripeGateway
+
+        threads = []
+
+        def create(**kwargs):
+            threads.append(threading.get_ident())
+            return MagicMock(id="pi_1", client_secret="secret", status="succeeded")
+
+        mock_stripe.PaymentIntent.create.side_effect = create
+        gateway = StripeGateway(api_key="sk_test")
+
+        result = await gateway.create_payment(
+            PaymentRequest(order_id="order-1", amount=1000, currency="ILS")
+        )
+
+    assert result.success is True
+    assert threads and threads[0] != threading.get_ident()
@@ -29,13 +29,11 @@ class TestTranzilaGateway:
         """Test creating a Tranzila payment."""
         from app.services.payment.base import PaymentRequest
 
-        with patch("httpx.AsyncClient") as mock_client:
+        with patch("app.services.payment.tranzila.get_http_client") as mock_client:
             mock_response = MagicMock()
             mock_response.status_code = 200
             mock_response.text = "Response=000"
-            mock_client.return_value.__aenter__.return_value.post = AsyncMock(
-                return_value=mock_response
-            )
+            mock_client.return_value.post = AsyncMock(return_value=mock_response)
 
             request = PaymentRequest(order_id="order-123", amount=1000, currency="ILS")
 
@@ -61,13 +59,11 @@ class TestTranzilaGateway:
     @pytest.mark.asyncio
     async def test_refund_payment(self, gateway):
         """Test refunding a Tranzila payment."""
-        with patch("httpx.AsyncClient") as mock_client:
+        with patch("app.services.payment.tranzila.get_http_client") as mock_client:
             mock_response = MagicMock()
             mock_response.status_code = 200
             mock_response.text = "Response=000"
-            mock_client.return_value.__aenter__.return_value.post = AsyncMock(
-                return_value=mock_response
-            )
+            mock_client.return_value.post = AsyncMock(return_value=mock_response)
 
             result = await gateway.refund_payment("txn_12345", 500)
 
@@ -0,0 +1,147 @@
+"""
+Tests for bath cart helpers (reader cache, materializer, running totals).
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.bath_cart import BathReaderCache, CartTotals, cart_summary, materialize_cart
+from app.services.cart_store import InMemoryCartStore
+from tests.mock_utils import MockModel
+
+
+class TestBathReaderCache:
+
+    async def test_caches_by_id_and_qr(self):
+        db = MagicMock()
+        reader = MockModel(id="b1", qrCode="QR-1", type="BATH")
+        db.rfidreader.find_first = AsyncMock(return_value=reader)
+        cache = BathReaderCache()
+
+        assert await cache.resolve(db, "b1") is reader
+        assert await cache.resolve(db, "QR-1") is reader
+        db.rfidreader.find_first.assert_awaited_once()
+
+    async def test_misses_are_not_cached(self):
+        db = MagicMock()
+        db.rfidreader.find_first = AsyncMock(return_value=None)
+        cache = BathReaderCache()
+
+        assert await cache.resolve(db, "nope") is None
+        assert await cache.resolve(db, "nope") is None
+        assert db.rfidreader.find_first.await_count == 2
+
+    async def test_expiry_and_invalidate(self):
+        db = MagicMock()
+        db.rfidreader.find_first = AsyncMock(return_value=MockModel(id="b1", qrCode=None))
+        cache = BathReaderCache(ttl_seconds=10)
+
+        with patch("app.services.bath_cart.time.monotonic", return_value=100.0):
+            await cache.resolve(db, "b1")
+        with patch("app.services.bath_cart.time.monotonic", return_value=105.0):
+            await cache.resolve(db, "b1")
+        assert db.rfidreader.find_first.await_count == 1
+
+        with patch("app.services.bath_cart.time.monotonic", return_value=111.0):
+            await cache.resolve(db, "b1")
+        assert db.rfidreader.find_first.await_count == 2
+
+        cache.invalidate("b1")
+        await cache.resolve(db, "b1")
+        assert db.rfidreader.find_first.await_count == 3
+
+
+class TestMaterializeCart:
+
+    async def test_empty_cart_skips_queries(self):
+        db = MagicMock()
+        assert await materialize_cart(db, []) == []
+        db.rfidtag.find_many.assert_not_called()
+
+    async def test_batches_tags_and_products(self):
+        db = MagicMock()
+        db.rfidtag.find_many = AsyncMock(
+            return_value=[
+                MockModel(id="t2", epc="E2", productId="p1"),
+                MockModel(id="t1", epc="E1", productId="p1"),
+                MockModel(id="t3", epc="E3", productId="gone", productDescription="Desc"),
+            ]
+        )
+        db.product.find_many = AsyncMock(
+            return_value=[MockModel(id="p1", name="Shirt", price=20.0)]
+        )
+
+        lines = await materialize_cart(db, ["t1", "missing", "t2", "t3"])
+
+        assert [line["tag_id"] for line in lines] == ["t1", "t2", "t3"]
+        assert lines[0]["product_name"] == "Shirt"
+        assert lines[0]["product_price"] == 20.0
+        assert lines[2]["product_name"] == "Desc"
+        assert lines[2]["product_price"] == 0.0
+        db.rfidtag.find_many.assert_awaited_once()
+        db.product.find_many.assert_awaited_once()
+        assert sorted(db.product.find_many.await_args.kwargs["where"]["id"]["in"]) == [
+            "gone",
+            "p1",
+        ]
+
+
+class TestCartTotals:
+
+    def test_untracked_until_seeded(self):
+        totals = CartTotals()
+        totals.add("b1", "t1", 10.0)
+        assert totals.get("b1") is None
+
+    def test_incremental_updates(self):
+        totals = CartTotals()
+        totals.seed("b1", [{"tag_id": "t1", "product_price": 10.0}])
+
+        totals.add("b1", "t2", 5.5)
+        totals.add("b1", "t2", 5.5)  # duplicate ignored
+        totals.add("b1", "t3", None)
+        assert totals.get("b1") == {"total_items": 3, "total_price": 15.5}
+
+        totals.remove("b1", "t1")
+        totals.remove("b1", "unknown")
+        assert totals.get("b1") == {"total_items": 2, "total_price": 5.5}
+
+        totals.reset("b1")
+        assert totals.get("b1") == {"total_items": 0, "total_price": 0.0}
+
+
+class TestCartSummary:
+
+    @staticmethod
+    def _db():
+        db = MagicMock()
+        db.rfidtag.find_many = AsyncMock(
+            return_value=[MockModel(id="t1", epc="E1", productId="p1")]
+        )
+        db.product.find_many = AsyncMock(
+            return_value=[MockModel(id="p1", name="Shirt", price=20.0)]
+        )
+        return db
+
+    async def test_local_store_uses_running_totals(self):
+        db = self._db()
+        store = InMemoryCartStore()
+        await store.add("b1", "t1")
+
+        with patch("app.services.bath_cart.cart_totals", CartTotals()) as totals:
+            assert await cart_summary(db, store, "b1") == {"total_items": 1, "total_price": 20.0}
+            totals.add("b1", "t2", 5.0)
+            assert await cart_summary(db, store, "b1") == {"total_items": 2, "total_price": 25.0}
+        db.rfidtag.find_many.assert_awaited_once()
+
+    async def test_shared_store_is_summed_from_contents(self):
+        """Another worker may have changed the cart, so running totals are not trusted."""
+        db = self._db()
+        store = MagicMock(shared=True)
+        store.items = AsyncMock(return_value={"t1": None})
+
+        with patch("app.services.bath_cart.cart_totals", CartTotals()) as totals:
+            totals.seed("b1", [])
+            assert await cart_summary(db, store, "b1") == {"total_items": 1, "total_price": 20.0}
+            assert await cart_summary(db, store, "b1") == {"total_items": 1, "total_price": 20.0}
+            assert totals.get("b1") == {"total_items": 0, "total_price": 0.0}
+        assert db.rfidtag.find_many.await_count == 2
@@ -0,0 +1,154 @@
+"""
+Tests for live bath cart population (presence tracking and cart feeder).
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services.bath_presence import ENTER, BathCartFeeder, BathPresenceTracker
+from app.services.cart_store import InMemoryCartStore
+from tests.mock_utils import MockModel
+
+
+class TestBathPresenceTracker:
+
+    def test_enter_requires_dwell_and_reads(self):
+        tracker = BathPresenceTracker(enter_dwell_seconds=1.0, enter_min_reads=3)
+
+        assert tracker.on_read("b1", "E1", now=0.0) is None
+        assert tracker.on_read("b1", "E1", now=0.5) is None
+        # Enough reads but not enough dwell
+        assert tracker.on_read("b1", "E1", now=0.9) is None
+        assert tracker.on_read("b1", "E1", now=1.0) == ENTER
+        # Only one enter event per stay
+        assert tracker.on_read("b1", "E1", now=1.5) is None
+        assert tracker.present_count("b1") == 1
+
+    def test_passing_tag_never_enters(self):
+        """A tag carried past the bath goes quiet before settling and is restarted."""
+        tracker = BathPresenceTracker(
+            enter_dwell_seconds=1.0, enter_min_reads=2, leave_after_seconds=2.0
+        )
+
+        assert tracker.on_read("b1", "E1", now=0.0) is None
+        # Comes back much later: dwell window restarts
+        assert tracker.on_read("b1", "E1", now=10.0) is None
+        assert tracker.on_read("b1", "E1", now=10.5) is None
+        assert tracker.on_read("b1", "E1", now=11.0) == ENTER
+
+    def test_sweep_reports_departed_tags(self):
+        tracker = BathPresenceTracker(
+            enter_dwell_seconds=0.0, enter_min_reads=1, leave_after_seconds=5.0
+        )
+        assert tracker.on_read("b1", "E1", now=0.0) == ENTER
+        tracker.set_tag_id("b1", "E1", "t1")
+        tracker.on_read("b1", "E2", now=4.0)
+
+        assert tracker.sweep(now=4.5) == []
+        assert tracker.sweep(now=6.0) == [("b1", "E1", "t1")]
+        assert tracker.present_count("b1") == 1  # E2 still there
+
+    def test_sweep_drops_candidates_silently(self):
+        tracker = BathPresenceTracker(enter_min_reads=5, leave_after_seconds=1.0)
+        tracker.on_read("b1", "E1", now=0.0)
+
+        assert tracker.sweep(now=2.0) == []
+        assert tracker._presence == {}
+
+
+@pytest.fixture
+def feeder_env():
+    """Feeder with an immediate-enter tracker, in-memory store and mocked DB/WebSocket."""
+    store = InMemoryCartStore()
+    mock_db = MagicMock()
+    mock_ctx = MagicMock()
+    mock_ctx.__aenter__ = AsyncMock(return_value=mock_db)
+    mock_ctx.__aexit__ = AsyncMock(return_value=None)
+    mock_db.rfidtag.update = AsyncMock()
+    mock_db.product.find_unique = AsyncMock(
+        return_value=MockModel(id="p1", name="Towel", price=25.0)
+    )
+
+    with (
+        patch("app.services.bath_presence.prisma_client") as mock_prisma,
+        patch("app.services.bath_presence.get_cart_store", return_value=store),
+        patch("app.services.bath_presence.manager") as mock_manager,
+        patch("app.services.bath_presence.cart_totals") as mock_totals,
+    ):
+        mock_prisma.client = mock_ctx
+        mock_manager.broadcast_to_bath = AsyncMock()
+        mock_totals.get.return_value = {"total_items": 1, "total_price": 25.0}
+        feeder = BathCartFeeder(
+            BathPresenceTracker(enter_dwell_seconds=0.0, enter_min_reads=1, leave_after_seconds=5)
+        )
+        yield feeder, store, mock_db, mock_manager
+
+
+class TestBathCartFeeder:
+
+    async def test_enter_adds_to_cart_and_pushes_delta(self, feeder_env):
+        feeder, store, mock_db, mock_manager = feeder_env
+        tag = MockModel(id="t1", epc="E1", isPaid=False, productId="p1")
+
+        await feeder.on_read("b1", "E1", tag)
+
+        assert await store.contains("b1", "t1")
+        mock_db.rfidtag.update.assert_awaited_once_with(
+            where={"id": "t1"}, data={"status": "IN_CART"}
+        )
+        bath_id, message = mock_manager.broadcast_to_bath.await_args.args
+        assert bath_id == "b1"
+        assert message["type"] == "bath_cart_delta"
+        assert message["data"]["action"] == "added"
+        assert message["data"]["item"]["product_name"] == "Towel"
+        assert message["data"]["totals"]["total_price"] == 25.0
+
+    async def test_repeated_reads_do_not_re_add(self, feeder_env):
+        feeder, store, mock_db, mock_manager = feeder_env
+        tag = MockModel(id="t1", epc="E1", isPaid=False, productId=None)
+
+        await feeder.on_read("b1", "E1", tag)
+        await feeder.on_read("b1", "E1", tag)
+
+        assert mock_db.rfidtag.update.await_count == 1
+        assert mock_manager.broadcast_to_bath.await_count == 1
+
+    async def test_paid_or_unknown_tags_are_ignored(self, feeder_env):
+        feeder, store, mock_db, mock_manager = feeder_env
+        mock_db.rfidtag.find_unique = AsyncMock(return_value=None)
+
+        await feeder.on_read("b1", "E1", MockModel(id="t1", epc="E1", isPaid=True))
+        await feeder.on_read("b1", "E2")
+
+        assert await store.items("b1") == {}
+        mock_manager.broadcast_to_bath.assert_not_called()
+        assert feeder.tracker.present_count("b1") == 0
+
+    async def test_sweep_removes_departed_tags(self, feeder_env):
+        feeder, store, mock_db, mock_manager = feeder_env
+        tag = MockModel(id="t1", epc="E1", isPaid=False, productId=None)
+        await feeder.on_read("b1", "E1", tag)
+
+        with patch("app.services.bath_presence.time.monotonic", return_value=1e12):
+            removed = await feeder.sweep()
+
+        assert removed == 1
+        assert not await store.contains("b1", "t1")
+        mock_db.rfidtag.update.assert_awaited_with(
+            where={"id": "t1"}, data={"status": "REGISTERED"}
+        )
+        message = mock_manager.broadcast_to_bath.await_args.args[1]
+        assert message["data"]["action"] == "removed"
+        assert message["data"]["item"] == {"tag_id": "t1", "epc": "E1"}
+
+    async def test_sweep_skips_tags_already_checked_out(self, feeder_env):
+        feeder, store, mock_db, mock_manager = feeder_env
+        await feeder.on_read("b1", "E1", MockModel(id="t1", epc="E1", isPaid=False))
+        await store.drain("b1")
+        mock_manager.broadcast_to_bath.reset_mock()
+
+        with patch("app.services.bath_presence.time.monotonic", return_value=1e12):
+            assert await feeder.sweep() == 0
+
+        mock_manager.broadcast_to_bath.assert_not_called()
@@ -0,0 +1,207 @@
+"""
+Tests for the bath cart stores.
+"""
+
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services import cart_store as cart_store_module
+from app.services.bath_cart import cart_totals
+from app.services.cart_store import (
+    DatabaseCartStore,
+    InMemoryCartStore,
+    expire_abandoned_carts,
+    get_cart_store,
+)
+from tests.mock_utils import MockModel
+
+
+def _mock_db(mock_prisma):
+    mock_db = MagicMock()
+    mock_ctx = MagicMock()
+    mock_ctx.__aenter__ = AsyncMock(return_value=mock_db)
+    mock_ctx.__aexit__ = AsyncMock(return_value=None)
+    mock_prisma.client = mock_ctx
+    return mock_db
+
+
+class TestInMemoryCartStore:
+
+    async def test_add_remove_contains(self):
+        store = InMemoryCartStore()
+
+        assert await store.add("b1", "t1") is True
+        assert await store.add("b1", "t1") is False
+        assert await store.contains("b1", "t1")
+        assert not await store.contains("b2", "t1")
+
+        assert await store.remove("b1", "t1") is True
+        assert await store.remove("b1", "t1") is False
+        assert await store.remove("missing", "t1") is False
+
+    async def test_items_keep_insertion_order(self):
+        store = InMemoryCartStore()
+        for tag_id in ["t3", "t1", "t2"]:
+            await store.add("b1", tag_id)
+
+        items = await store.items("b1")
+
+        assert list(items) == ["t3", "t1", "t2"]
+        assert all(isinstance(added_at, datetime) for added_at in items.values())
+        # Returned mapping is a copy
+        items.clear()
+        assert len(await store.items("b1")) == 3
+
+    async def test_drain_empties_cart(self):
+        store = InMemoryCartStore()
+        await store.add("b1", "t1")
+        await store.add("b1", "t2")
+
+        drained = await store.drain("b1")
+
+        assert list(drained) == ["t1", "t2"]
+        assert await store.items("b1") == {}
+        assert await store.drain("b1") == {}
+
+    async def test_expire_idle_carts(self):
+        store = InMemoryCartStore(ttl_seconds=60)
+        await store.add("old", "t1")
+        await store.add("fresh", "t2")
+
+        with patch("app.services.cart_store.time.monotonic") as mock_time:
+            mock_time.return_value = store._touched["fresh"] + 30
+            store._touched["old"] -= 120
+
+            expired = await store.expire()
+
+        assert expired == {"old": ["t1"]}
+        assert await store.contains("fresh", "t2")
+        assert not await store.contains("old", "t1")
+
+
+class TestDatabaseCartStore:
+
+    @patch("app.services.cart_store.prisma_client")
+    async def test_add_uses_conflict_insert(self, mock_prisma):
+        mock_db = _mock_db(mock_prisma)
+        mock_db.query_raw = AsyncMock(side_effect=[[{"inserted": True}], [{"inserted": False}]])
+        mock_db.execute_raw = AsyncMock()
+        store = DatabaseCartStore()
+
+        assert await store.add("b1", "t1") is True
+        assert await store.add("b1", "t1") is False
+        # One statement per add, touching only the added item's row
+        assert mock_db.query_raw.await_count == 2
+        mock_db.execute_raw.assert_not_called()
+        sql = mock_db.query_raw.await_args_list[0].args[0]
+        assert "ON CONFLICT" in sql and 'DO UPDATE SET "touchedAt"' in sql
+
+    @patch("app.services.cart_store.prisma_client")
+    async def test_remove_and_contains(self, mock_prisma):
+        mock_db = _mock_db(mock_prisma)
+        mock_db.bathcartitem.delete_many = AsyncMock(return_value=1)
+        mock_db.bathcartitem.find_unique = AsyncMock(return_value=None)
+        store = DatabaseCartStore()
+
+        assert await store.remove("b1", "t1") is True
+        assert await store.contains("b1", "t1") is False
+        mock_db.bathcartitem.find_unique.assert_awaited_once_with(
+            where={"bathId_tagId": {"bathId": "b1", "tagId": "t1"}}
+        )
+
+    @patch("app.services.cart_store.prisma_client")
+    async def test_items(self, mock_prisma):
+        mock_db = _mock_db(mock_prisma)
+        added = datetime(2024, 1, 1)
+        mock_db.bathcartitem.find_many = AsyncMock(
+            return_value=[MockModel(tagId="t1", addedAt=added)]
+        )
+
+        items = await DatabaseCartStore().items("b1")
+
+        assert items == {"t1": added}
+
+    @patch("app.services.cart_store.prisma_client")
+    async def test_drain_is_single_delete_returning(self, mock_prisma):
+        mock_db = _mock_db(mock_prisma)
+        mock_db.query_raw = AsyncMock(
+            return_value=[
+                {"tagId": "t2", "addedAt": "2024-01-01T00:00:02"},
+                {"tagId": "t1", "addedAt": "2024-01-01T00:00:01"},
+            ]
+        )
+
+        drained = await DatabaseCartStore().drain("b1")
+
+        assert list(drained) == ["t1", "t2"]
+        sql = mock_db.query_raw.await_args.args[0]
+        assert sql.startswith("DELETE") and "RETURNING" in sql
+
+    @patch("app.services.cart_store.prisma_client")
+    async def test_expire_groups_by_cart(self, mock_prisma):
+        mock_db = _mock_db(mock_prisma)
+        mock_db.query_raw = AsyncMock(
+            return_value=[
+                {"bathId": "b1", "tagId": "t1"},
+                {"bathId": "b1", "tagId": "t2"},
+                {"bathId": "b2", "tagId": "t3"},
+            ]
+        )
+
+        expired = await DatabaseCartStore(ttl_seconds=10).expire()
+
+        assert expired == {"b1": ["t1", "t2"], "b2": ["t3"]}
+        sql, ttl = mock_db.query_raw.await_args.args
+        assert "NOW() - make_interval(secs => $1)" in sql
+        assert ttl == 10
+
+
+@patch("app.services.cart_store.prisma_client")
+async def test_expire_abandoned_carts_releases_tags(mock_prisma):
+    mock_db = _mock_db(mock_prisma)
+    mock_db.rfidtag.update_many = AsyncMock()
+    store = MagicMock()
+    store.expire = AsyncMock(return_value={"b1": ["t1", "t2"]})
+
+    cart_totals.seed("b1", [{"tag_id": "t1", "product_price": 10.0}])
+
+    released = await expire_abandoned_carts(store)
+
+    assert released == 2
+    mock_db.rfidtag.update_many.assert_awaited_once_with(
+        where={"id": {"in": ["t1", "t2"]}, "status": "IN_CART"},
+        data={"status": "REGISTERED"},
+    )
+    assert cart_totals.get("b1") == {"total_items": 0, "total_price": 0.0}
+
+
+@patch("app.services.cart_store.prisma_client")
+async def test_expire_abandoned_carts_noop(mock_prisma):
+    mock_db = _mock_db(mock_prisma)
+    store = MagicMock()
+    store.expire = AsyncMock(return_value={})
+
+    assert await expire_abandoned_carts(store) == 0
+    mock_db.rfidtag.update_many.assert_not_called()
+
+
+def test_get_cart_store_backends():
+    with (
+        patch.object(cart_store_module, "_cart_store", None),
+        patch.object(cart_store_module, "settings") as mock_settings,
+    ):
+        mock_settings.BATH_CART_BACKEND = "database"
+        mock_settings.BATH_CART_TTL_SECONDS = 5
+        store = get_cart_store()
+        assert isinstance(store, DatabaseCartStore)
+        assert store.ttl_seconds == 5
+
+    with (
+        patch.object(cart_store_module, "_cart_store", None),
+        patch.object(cart_store_module, "settings") as mock_settings,
+    ):
+        mock_settings.BATH_CART_BACKEND = "redis"
+        with pytest.raises(ValueError):
+            get_cart_store()
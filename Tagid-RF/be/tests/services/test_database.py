@@ -35,3 +35,45 @@ def test_engine_exists():
     from app.services.database import engine
 
     assert engine is not None
+
+
+def _init_db_statements(extension_error=None):
+    """Run init_db against a mocked PostgreSQL engine; return the SQL it executed."""
+    from app.services import database
+
+    statements = []
+
+    def execute(statement):
+        statements.append(str(statement))
+        if extension_error and "CREATE EXTENSION" in str(statement):
+            raise extension_error
+
+    mock_engine = MagicMock()
+    mock_engine.dialect.name = "postgresql"
+    mock_engine.begin.return_value.__enter__.return_value.execute.side_effect = execute
+
+    with (
+        patch.object(database, "get_engine", return_value=mock_engine),
+        patch.object(database.Base, "metadata") as metadata,
+    ):
+        metadata.sorted_tables = []
+        database.init_db()
+
+    metadata.create_all.assert_called_once()
+    return statements
+
+
+def test_init_db_creates_trigram_indexes_after_extension():
+    """The pg_trgm indexes are created on their own once the extension exists."""
+    statements = _init_db_statements()
+
+    assert "CREATE EXTENSION" in statements[0]
+    assert any("idx_rfid_tags_epc_trgm" in sql for sql in statements[1:])
+    assert any("idx_rfid_tags_tid_trgm" in sql for sql in statements[1:])
+
+
+def test_init_db_skips_trigram_indexes_without_extension():
+    """Without pg_trgm the tables are still created, just not the trigram indexes."""
+    statements = _init_db_statements(extension_error=RuntimeError("permission denied"))
+
+    assert not any("gin_trgm_ops" in sql for sql in statements)
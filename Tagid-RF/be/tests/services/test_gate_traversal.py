@@ -0,0 +1,158 @@
+"""
+Tests for gate traversal detection (pass tracking and per-pass theft checks).
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.services.gate_traversal import (
+    ENTRY,
+    EXIT,
+    UNKNOWN,
+    GateTraversalMonitor,
+    GateTraversalTracker,
+)
+from tests.mock_utils import MockModel
+
+
+def walk(tracker, epc, reads, gate="g1"):
+    """Feed (time, antenna, rssi) reads; return traversals finished on the way."""
+    finished = []
+    for now, antenna, rssi in reads:
+        traversal = tracker.on_read(gate, epc, antenna=antenna, rssi=rssi, now=now)
+        if traversal:
+            finished.append(traversal)
+    return finished
+
+
+class TestGateTraversalTracker:
+
+    def test_inside_then_outside_is_an_exit(self):
+        tracker = GateTraversalTracker(pass_timeout_seconds=2.0)
+        # Approaches the inside antenna, then the outside one takes over
+        walk(
+            tracker,
+            "E1",
+            [(0.0, 1, -70), (0.2, 1, -50), (0.3, 2, -75), (0.5, 1, -65), (0.6, 2, -45)],
+        )
+
+        assert tracker.sweep(now=1.0) == []
+        [traversal] = tracker.sweep(now=3.0)
+
+        assert traversal.direction == EXIT
+        assert traversal.reads == 5
+        assert traversal.dwell_seconds == pytest.approx(0.6)
+        assert traversal.sides == ["inside", "outside"]
+        assert traversal.peak_rssi == -45
+        assert tracker.active_count == 0
+
+    def test_outside_then_inside_is_an_entry(self):
+        tracker = GateTraversalTracker()
+        walk(tracker, "E1", [(0.0, 2, -50), (0.1, 1, -70), (0.3, 1, -40)])
+
+        assert tracker.sweep(now=5.0)[0].direction == ENTRY
+
+    def test_one_sided_pass_has_unknown_direction(self):
+        tracker = GateTraversalTracker(inside_antennas=[1], outside_antennas=[])
+        walk(tracker, "E1", [(0.0, 1, -60), (0.1, 1, -50), (0.2, None, None)])
+
+        [traversal] = tracker.sweep(now=5.0)
+        assert traversal.direction == UNKNOWN
+        assert traversal.reads == 3
+
+    def test_one_traversal_per_pass(self):
+        tracker = GateTraversalTracker(pass_timeout_seconds=2.0)
+        reads = [(t / 10, 1 if t < 10 else 2, -60) for t in range(20)]
+
+        assert walk(tracker, "E1", reads) == []
+        # Coming back later starts a second pass and finishes the first
+        [first] = walk(tracker, "E1", [(10.0, 2, -60)])
+        assert first.reads == 20
+        assert len(tracker.sweep(now=20.0)) == 1
+
+    def test_long_stays_are_split(self):
+        tracker = GateTraversalTracker(pass_timeout_seconds=2.0, max_pass_seconds=5.0)
+        finished = walk(tracker, "E1", [(t, 1, -60) for t in range(13)])
+
+        assert [t.reads for t in finished] == [6, 6]
+
+    def test_sweep_only_evicts_quiet_tags(self):
+        tracker = GateTraversalTracker(pass_timeout_seconds=2.0)
+        tracker.on_read("g1", "E1", antenna=1, now=0.0)
+        tracker.on_read("g1", "E2", antenna=1, now=1.0)
+        tracker.on_read("g2", "E1", antenna=1, now=2.5)
+        tracker.on_read("g1", "E1", antenna=2, now=2.6)
+
+        assert [t.epc for t in tracker.sweep(now=3.5)] == ["E2"]
+        assert tracker.active_count == 2
+
+
+@pytest.fixture
+def monitor():
+    return GateTraversalMonitor(GateTraversalTracker(pass_timeout_seconds=60.0))
+
+
+GATE = MockModel(id="r1", name="Gate 1", type="GATE", location="Exit")
+
+
+def payload(antenna, rssi=-50):
+    return {
+        "epc": "E1",
+        "antenna_port": antenna,
+        "rssi": rssi,
+        "reader_ip": "1.1.1.1",
+        "product_name": "Watch",
+    }
+
+
+@pytest.mark.asyncio
+@patch("app.services.theft_detection.TheftDetectionService")
+@patch("app.services.gate_traversal.manager")
+async def test_unpaid_exit_alerts_once(mock_manager, mock_theft_cls, monitor):
+    mock_manager.broadcast = AsyncMock()
+    check = mock_theft_cls.return_value.check_tag_payment_status = AsyncMock(return_value=False)
+
+    for antenna in (1, 1, 2, 2, 2):
+        await monitor.on_read(GATE, payload(antenna))
+    with patch("app.services.gate_traversal.time.monotonic", return_value=1e9):
+        assert await monitor.sweep() == 1
+
+    check.assert_awaited_once_with("E1", location="Gate 1 (1.1.1.1)")
+    types = [c.args[0]["type"] for c in mock_manager.broadcast.call_args_list]
+    assert types == ["traversal", "theft_alert"]
+    traversal = mock_manager.broadcast.call_args_list[0].args[0]["data"]
+    assert (traversal["direction"], traversal["reads"]) == (EXIT, 5)
+    alert = mock_manager.broadcast.call_args_list[1].args[0]["data"]
+    assert "Watch" in alert["message"]
+
+
+@pytest.mark.asyncio
+@patch("app.services.theft_detection.TheftDetectionService")
+@patch("app.services.gate_traversal.manager")
+async def test_entry_skips_payment_check(mock_manager, mock_theft_cls, monitor):
+    mock_manager.broadcast = AsyncMock()
+    check = mock_theft_cls.return_value.check_tag_payment_status = AsyncMock(return_value=False)
+
+    await monitor.on_read(GATE, payload(2))
+    await monitor.on_read(GATE, payload(1))
+    with patch("app.services.gate_traversal.time.monotonic", return_value=1e9):
+        await monitor.sweep()
+
+    check.assert_not_awaited()
+    assert mock_manager.broadcast.call_args.args[0]["data"]["direction"] == ENTRY
+
+
+@pytest.mark.asyncio
+@patch("app.services.theft_detection.TheftDetectionService")
+@patch("app.services.gate_traversal.manager")
+async def test_paid_exit_has_no_alert(mock_manager, mock_theft_cls, monitor):
+    mock_manager.broadcast = AsyncMock()
+    mock_theft_cls.return_value.check_tag_payment_status = AsyncMock(return_value=True)
+
+    await monitor.on_read(GATE, payload(1))
+    await monitor.on_read(GATE, payload(2))
+    with patch("app.services.gate_traversal.time.monotonic", return_value=1e9):
+        await monitor.sweep()
+
+    assert [c.args[0]["type"] for c in mock_manager.broadcast.call_args_list] == ["traversal"]
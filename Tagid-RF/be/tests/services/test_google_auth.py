@@ -0,0 +1,156 @@
+"""
+Tests for cached Google ID-token verification against a local key-set stand-in.
+"""
+
+import datetime
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt, jwt
+
+from app.services.google_auth import (
+    GOOGLE_CERTS_URLS,
+    GoogleKeyStore,
+    GoogleTokenVerifier,
+    parse_max_age,
+)
+
+CLIENT_ID = "test-client.apps.googleusercontent.com"
+KEY_ID = "stand-in-key"
+
+
+def _make_key_and_cert():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "stand-in")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(1)
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    key_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    return key_pem, cert.public_bytes(serialization.Encoding.PEM).decode()
+
+
+@pytest.fixture(scope="module")
+def signing_material():
+    return _make_key_and_cert()
+
+
+@pytest.fixture
+def key_server(signing_material):
+    """Local stand-in for Google's certificate endpoint."""
+    _, cert_pem = signing_material
+    state = {"requests": 0, "cache_control": "public, max-age=60"}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            state["requests"] += 1
+            body = json.dumps({KEY_ID: cert_pem}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Cache-Control", state["cache_control"])
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state["url"] = f"http://127.0.0.1:{server.server_address[1]}/certs"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def _id_token(key_pem, **overrides):
+    now = int(time.time())
+    payload = {
+        "iss": "https://accounts.google.com",
+        "aud": CLIENT_ID,
+        "sub": "google-123",
+        "email": "user@example.com",
+        "iat": now,
+        "exp": now + 600,
+        **overrides,
+    }
+    signer = crypt.RSASigner.from_string(key_pem, key_id=KEY_ID)
+    return jwt.encode(signer, payload).decode()
+
+
+def test_parse_max_age():
+    assert parse_max_age("public, max-age=19405, must-revalidate", 300) == 19405
+    assert parse_max_age("no-store", 300) == 0
+    assert parse_max_age(None, 300) == 300
+
+
+def test_verifies_locally_after_one_key_fetch(signing_material, key_server):
+    key_pem, _ = signing_material
+    verifier = GoogleTokenVerifier(CLIENT_ID, key_store=GoogleKeyStore(key_server["url"]))
+
+    for _ in range(5):
+        idinfo = verifier.verify(_id_token(key_pem))
+        assert idinfo["email"] == "user@example.com"
+
+    assert key_server["requests"] == 1
+    stats = verifier.stats()
+    assert stats["verifications"] == 5
+    assert stats["key_refreshes"] == 1
+    assert stats["key_cache_hits"] == 4
+    assert stats["p50_ms"] >= 0
+
+
+def test_refetches_when_max_age_is_zero(signing_material, key_server):
+    key_pem, _ = signing_material
+    key_server["cache_control"] = "no-cache"
+    verifier = GoogleTokenVerifier(CLIENT_ID, key_store=GoogleKeyStore(key_server["url"]))
+
+    verifier.verify(_id_token(key_pem))
+    verifier.verify(_id_token(key_pem))
+
+    assert key_server["requests"] == 2
+
+
+def test_rejects_wrong_audience(signing_material, key_server):
+    key_pem, _ = signing_material
+    verifier = GoogleTokenVerifier(CLIENT_ID, key_store=GoogleKeyStore(key_server["url"]))
+
+    with pytest.raises(ValueError):
+        verifier.verify(_id_token(key_pem, aud="someone-else"))
+
+
+def test_key_store_only_redirects_google_cert_urls(key_server):
+    store = GoogleKeyStore(key_server["url"])
+    response = store(GOOGLE_CERTS_URLS[0])
+    assert response.status == 200
+    assert KEY_ID in json.loads(response.data)
+
+
+@pytest.mark.asyncio
+async def test_verify_async(signing_material, key_server):
+    key_pem, _ = signing_material
+    verifier = GoogleTokenVerifier(CLIENT_ID, key_store=GoogleKeyStore(key_server["url"]))
+
+    idinfo = await verifier.verify_async(_id_token(key_pem))
+
+    assert idinfo["sub"] == "google-123"
+    assert verifier.last_latency_ms is not None
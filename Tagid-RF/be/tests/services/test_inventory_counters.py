@@ -0,0 +1,159 @@
+"""
+Tests for the incremental inventory counters and the writers that feed them, against SQLite.
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.engine import create_engine  # sqlalchemy.create_engine is mocked in conftest
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.rfid_tag import RFIDScanHistory, RFIDTag
+from app.routers import exit_scan, inventory, tags
+from app.services.database import get_db
+from app.services.inventory_counters import InventoryCounters, inventory_counters, tag_state
+
+SHIRT = ("SKU-1", "Shirt", 5000)
+SOCKS = ("SKU-2", "Socks", 1000)
+
+
+@pytest.fixture
+def Session():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    RFIDTag.__table__.create(bind=engine)
+    RFIDScanHistory.__table__.create(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    with Session() as db:
+        for i, (product, is_paid) in enumerate(
+            [(SHIRT, False), (SHIRT, False), (SHIRT, True), (SOCKS, False)]
+        ):
+            sku, name, price = product
+            db.add(
+                RFIDTag(
+                    epc=f"EPC{i}",
+                    product_sku=sku,
+                    product_name=name,
+                    price_cents=price,
+                    is_paid=is_paid,
+                )
+            )
+        # Not inventory: no product, or deactivated
+        db.add(RFIDTag(epc="BARE"))
+        db.add(RFIDTag(epc="GONE", product_sku="SKU-1", product_name="Shirt", is_active=False))
+        db.commit()
+    return Session
+
+
+@pytest.fixture
+def prisma():
+    """Payments go to Prisma first; none of these tags are registered there."""
+    with patch("app.db.prisma.prisma_client") as mock_prisma:
+        rfidtag = mock_prisma.client.rfidtag
+        rfidtag.create_many = AsyncMock(return_value=0)
+        rfidtag.update_many = AsyncMock(return_value=0)
+        yield rfidtag
+
+
+@pytest.fixture
+def client(Session, prisma):
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(tags.router, prefix="/api/v1/tags")
+    app.include_router(exit_scan.router, prefix="/api/v1")
+    app.include_router(inventory.router, prefix="/api/v1/inventory")
+    app.dependency_overrides[get_db] = override_get_db
+    inventory_counters.reset()
+    yield TestClient(app)
+    inventory_counters.reset()
+
+
+def products(summary):
+    return {
+        p["product_sku"]: (p["total_items"], p["available_items"], p["sold_items"])
+        for p in summary["products"]
+    }
+
+
+def test_reconcile_counts_active_products(Session):
+    counters = InventoryCounters()
+    with Session() as db:
+        report = counters.reconcile(db)
+
+    summary = counters.snapshot()
+    assert products(summary) == {"SKU-1": (3, 2, 1), "SKU-2": (1, 1, 0)}
+    assert summary["total_value_cents"] == 2 * 5000 + 1000
+    # Nothing to compare against on the first run
+    assert report["drifted_products"] == 0
+
+
+def test_record_change_follows_tag_lifecycle():
+    counters = InventoryCounters()
+    unpaid = (SHIRT, False)
+    paid = (SHIRT, True)
+
+    counters.record_change(None, unpaid)
+    counters.record_change(None, unpaid)
+    counters.record_change(unpaid, paid)
+    assert products(counters.snapshot()) == {"SKU-1": (2, 1, 1)}
+
+    counters.record_change(paid, unpaid)
+    counters.record_change(unpaid, (SOCKS, False))
+    counters.record_change(unpaid, None)
+    assert products(counters.snapshot()) == {"SKU-2": (1, 1, 0)}
+
+
+def test_tag_state():
+    assert tag_state(RFIDTag(product_sku="S", is_active=True, is_paid=True)) == (
+        ("S", None, None),
+        True,
+    )
+    assert tag_state(RFIDTag(is_active=True)) is None
+    assert tag_state(RFIDTag(product_name="N", is_active=False)) is None
+
+
+def test_writers_keep_counters_in_step(client):
+    assert products(client.get("/api/v1/inventory/summary").json())["SKU-1"] == (3, 2, 1)
+
+    client.post("/api/v1/exit-scan/mark-paid", json=["EPC0", "EPC3", "MISSING"])
+    client.post("/api/v1/exit-scan/mark-unpaid", json=["EPC2"])
+    client.post(
+        "/api/v1/tags/",
+        json={"epc": "NEW", "product_sku": "SKU-2", "product_name": "Socks", "price_cents": 1000},
+    )
+    tag_id = client.get("/api/v1/tags/epc/EPC1").json()["id"]
+    client.delete(f"/api/v1/tags/{tag_id}")
+
+    served = client.get("/api/v1/inventory/summary").json()
+    assert products(served) == {"SKU-1": (2, 1, 1), "SKU-2": (2, 1, 1)}
+
+    # The counters agree with the database
+    assert client.get("/api/v1/inventory/summary?refresh=true").json() == served
+    assert client.get("/api/v1/inventory/drift").json()["drifted_products"] == 0
+
+
+def test_drift_report(client, Session):
+    client.get("/api/v1/inventory/summary")
+
+    # A writer that bypasses the counters
+    with Session() as db:
+        db.query(RFIDTag).filter(RFIDTag.epc == "EPC3").update({"is_paid": True})
+        db.commit()
+
+    report = client.get("/api/v1/inventory/drift?refresh=true").json()
+
+    assert report["drifted_products"] == 1
+    assert report["products"][0]["product_sku"] == "SKU-2"
+    assert (report["products"][0]["total_drift"], report["products"][0]["sold_drift"]) == (0, -1)
+    assert products(client.get("/api/v1/inventory/summary").json())["SKU-2"] == (1, 0, 1)
@@ -35,6 +35,7 @@ class TestInventoryServiceMock:
         rfid_tag = MockModel(id="t1", epc="E1")
         mock_db.rfidtag.find_unique = AsyncMock(return_value=rfid_tag)
         mock_db.inventorysnapshotitem.create = AsyncMock()
+        mock_db.execute_raw = AsyncMock(return_value=1)
 
         tags = [{"epc": "E1", "rssi": -50}, {"epc": "E2", "rssi": -60}]
 
@@ -51,6 +52,9 @@ class TestInventoryServiceMock:
         assert result == "snap1"
         mock_db.inventorysnapshot.create.assert_awaited_once()
         assert mock_db.inventorysnapshotitem.create.await_count == 1  # Only E1
+        # Materialized stock row refreshed for the reader
+        args = mock_db.execute_raw.await_args.args
+        assert args[1:4] == ("r1", "snap1", 2)
 
     @patch("app.services.inventory.prisma_client")
     async def test_get_latest_snapshot(self, mock_prisma_wrapper):
@@ -145,7 +149,7 @@ class TestInventoryServiceMock:
         mock_client_instance.__aexit__ = AsyncMock(return_value=None)
         mock_prisma_wrapper.client = mock_client_instance
 
-        mock_db.rfidreader.find_many = AsyncMock(side_effect=Exception("DB Error"))
+        mock_db.query_raw = AsyncMock(side_effect=Exception("DB Error"))
 
         result = await get_current_stock()
         assert result["totalItems"] == 0
@@ -7,48 +7,159 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from app.services.inventory import get_current_stock
+from app.services.inventory import get_current_stock, get_store_stock, rebuild_store_stock
 from tests.mock_utils import MockModel
 
 
+def _mock_db(mock_prisma):
+    mock_db = MagicMock()
+    mock_ctx = MagicMock()
+    mock_ctx.__aenter__ = AsyncMock(return_value=mock_db)
+    mock_ctx.__aexit__ = AsyncMock(return_value=None)
+    mock_prisma.client = mock_ctx
+    return mock_db
+
+
+LATEST_ROWS = [
+    {
+        "readerId": "reader1",
+        "readerName": "R1",
+        "location": "Loc1",
+        "storeId": "s1",
+        "snapshotId": "snap1",
+        "itemCount": 10,
+        "timestamp": datetime(2023, 1, 1),
+    },
+    {
+        "readerId": "reader2",
+        "readerName": "R2",
+        "location": "Loc2",
+        "storeId": "s1",
+        "snapshotId": "snap2",
+        "itemCount": 5,
+        "timestamp": "2023-01-01T00:00:00",
+    },
+    {
+        "readerId": "reader3",
+        "readerName": "R3",
+        "location": None,
+        "storeId": "s2",
+        "snapshotId": None,
+        "itemCount": None,
+        "timestamp": None,
+    },
+]
+
+
 @pytest.mark.asyncio
 async def test_get_current_stock_full_flow():
-    """
-    Test get_current_stock with actual loop execution.
-    We mock prisma_client to return readers and snapshots.
-    """
+    """Latest snapshots come from one raw query; items are not loaded."""
+    with patch("app.services.inventory.prisma_client") as mock_prisma:
+        mock_db = _mock_db(mock_prisma)
+        mock_db.query_raw = AsyncMock(return_value=LATEST_ROWS)
+        mock_db.inventorysnapshotitem.find_many = AsyncMock()
+
+        result = await get_current_stock()
+
+        assert result["totalItems"] == 15
+        assert result["readerCount"] == 3
+        assert len(result["readers"]) == 2
+        assert result["readers"][0]["readerId"] == "reader1"
+        assert result["readers"][0]["lastScan"] == "2023-01-01T00:00:00"
+        assert "items" not in result["readers"][0]
+        assert "groups" not in result
+        mock_db.query_raw.assert_awaited_once()
+        mock_db.inventorysnapshot.find_first.assert_not_called()
+        mock_db.inventorysnapshotitem.find_many.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_current_stock_include_items():
+    """Items for all latest snapshots are fetched in one batched query."""
+    with patch("app.services.inventory.prisma_client") as mock_prisma:
+        mock_db = _mock_db(mock_prisma)
+        mock_db.query_raw = AsyncMock(return_value=LATEST_ROWS)
+        mock_db.inventorysnapshotitem.find_many = AsyncMock(
+            return_value=[
+                MockModel(snapshotId="snap1", epc="E1", tagId="t1"),
+                MockModel(snapshotId="snap1", epc="E2", tagId=None),
+            ]
+        )
+
+        result = await get_current_stock(include_items=True)
+
+        mock_db.inventorysnapshotitem.find_many.assert_awaited_once_with(
+            where={"snapshotId": {"in": ["snap1", "snap2"]}}
+        )
+        assert [i["epc"] for i in result["readers"][0]["items"]] == ["E1", "E2"]
+        assert result["readers"][1]["items"] == []
+
+
+@pytest.mark.asyncio
+async def test_get_current_stock_group_by_store():
+    with patch("app.services.inventory.prisma_client") as mock_prisma:
+        mock_db = _mock_db(mock_prisma)
+        mock_db.query_raw = AsyncMock(return_value=LATEST_ROWS)
+
+        result = await get_current_stock(group_by="store")
+
+        assert result["groups"] == [{"storeId": "s1", "itemCount": 15, "readerCount": 2}]
+
+
+@pytest.mark.asyncio
+async def test_get_current_stock_group_by_product():
     with patch("app.services.inventory.prisma_client") as mock_prisma:
-        mock_db = MagicMock()
-        mock_ctx = MagicMock()
-        mock_ctx.__aenter__ = AsyncMock(return_value=mock_db)
-        mock_ctx.__aexit__ = AsyncMock(return_value=None)
-        mock_prisma.client = mock_ctx
-
-        # Readers setup
-        readers = [
-            MockModel(id="reader1", name="R1", location="Loc1"),
-            MockModel(id="reader2", name="R2", location="Loc2"),
-        ]
-        mock_db.rfidreader.find_many = AsyncMock(return_value=readers)
-
-        # Snapshots setup for get_latest_snapshot
-        # Note: inventory.py calls get_latest_snapshot which does its own DB query.
-        # Since we use the SAME mock_db context, we need to handle the calls.
-
-        # We can mock get_latest_snapshot using patch to simplify logic and ensure isolation?
-        # NO, we want to cover the loop lines in get_current_stock explicitly.
-        # But wait, lines 133-150 contain the loop AND the call to get_latest_snapshot.
-        # If we mock get_latest_snapshot, we still exercise the loop.
-
-        with patch("app.services.inventory.get_latest_snapshot") as mock_get_latest:
-            mock_get_latest.side_effect = [
-                {"itemCount": 10, "timestamp": "2023-01-01"},  # reader1
-                {"itemCount": 5, "timestamp": "2023-01-01"},  # reader2
+        mock_db = _mock_db(mock_prisma)
+        mock_db.query_raw = AsyncMock(
+            side_effect=[
+                LATEST_ROWS,
+                [
+                    {"storeId": "s1", "productId": "p1", "itemCount": 12},
+                    {"storeId": "s1", "productId": None, "itemCount": 3},
+                ],
             ]
+        )
+
+        result = await get_current_stock(store_id="s1", group_by="product")
+
+        assert mock_db.query_raw.await_count == 2
+        assert mock_db.query_raw.await_args.args[1] == "s1"
+        assert result["groups"][0] == {"storeId": "s1", "productId": "p1", "itemCount": 12}
+
+
+@pytest.mark.asyncio
+async def test_get_current_stock_invalid_group():
+    with pytest.raises(ValueError):
+        await get_current_stock(group_by="reader")
+
 
-            result = await get_current_stock()
+@pytest.mark.asyncio
+async def test_get_store_stock_sums_materialized_rows():
+    with patch("app.services.inventory.prisma_client") as mock_prisma:
+        mock_db = _mock_db(mock_prisma)
+        mock_db.storestock.find_many = AsyncMock(
+            return_value=[
+                MockModel(storeId="s1", itemCount=4, snapshotAt=datetime(2023, 1, 1)),
+                MockModel(storeId="s1", itemCount=6, snapshotAt=datetime(2023, 1, 2)),
+                MockModel(storeId="s2", itemCount=1, snapshotAt=datetime(2023, 1, 1)),
+            ]
+        )
+
+        result = await get_store_stock()
+
+        assert result[0] == {
+            "storeId": "s1",
+            "itemCount": 10,
+            "readerCount": 2,
+            "lastScan": "2023-01-02T00:00:00",
+        }
+        assert result[1]["itemCount"] == 1
+
+
+@pytest.mark.asyncio
+async def test_rebuild_store_stock():
+    with patch("app.services.inventory.prisma_client") as mock_prisma:
+        mock_db = _mock_db(mock_prisma)
+        mock_db.execute_raw = AsyncMock(return_value=3)
 
-            assert result["totalItems"] == 15
-            assert result["readerCount"] == 2
-            assert len(result["readers"]) == 2
-            assert result["readers"][0]["readerId"] == "reader1"
+        assert await rebuild_store_stock() == 3
@@ -0,0 +1,209 @@
+"""
+Tests for M-200 wire captures: file format, hex-log import, timed replay,
+and replaying traffic through the tag listener's ingestion path.
+"""
+
+import asyncio
+import socket
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import tag_listener_server
+from app.services.m200_capture import (
+    HOST_TO_READER,
+    READER_TO_HOST,
+    CaptureRecord,
+    CaptureReplayer,
+    CaptureWriter,
+    import_hex_log,
+    read_capture,
+)
+from app.services.m200_emulator import EmulatedReader, TagPopulation
+
+BE_ROOT = Path(__file__).resolve().parents[2]
+
+
+def test_roundtrip_and_append(tmp_path):
+    path = str(tmp_path / "session.m2cap")
+    with CaptureWriter(path) as writer:
+        writer.write(HOST_TO_READER, b"\xcf\xff\x00\x70\x00\x24\x15", timestamp_us=1_000)
+        writer.write(READER_TO_HOST, b"\xcf\x01", timestamp_us=2_000)
+
+    # Reopening appends after the existing records
+    with CaptureWriter(path) as writer:
+        writer.write(READER_TO_HOST, b"\x00\x52", timestamp_us=3_000)
+
+    records = list(read_capture(path))
+    assert [(r.timestamp_us, r.direction, r.data) for r in records] == [
+        (1_000, HOST_TO_READER, b"\xcf\xff\x00\x70\x00\x24\x15"),
+        (2_000, READER_TO_HOST, b"\xcf\x01"),
+        (3_000, READER_TO_HOST, b"\x00\x52"),
+    ]
+
+
+def test_large_chunks_split_and_truncated_tail_ignored(tmp_path):
+    path = tmp_path / "big.m2cap"
+    with CaptureWriter(str(path)) as writer:
+        writer.write(READER_TO_HOST, bytes(70_000), timestamp_us=5)
+    with open(path, "ab") as f:
+        f.write(b"\x00\x00\x00")  # half a record header, as after a crash
+
+    records = list(read_capture(str(path)))
+    assert [len(r.data) for r in records] == [65_535, 4_465]
+
+
+def test_close_while_writing_from_other_threads(tmp_path):
+    path = str(tmp_path / "live.m2cap")
+    writer = CaptureWriter(path)
+    errors = []
+
+    def write():
+        try:
+            for _ in range(2_000):
+                writer.write(READER_TO_HOST, b"\xcf\x01")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    writer.close()
+    for thread in threads:
+        thread.join()
+
+    # Writes after close are dropped, not written to a closed file
+    assert errors == []
+    assert len(list(read_capture(path))) == writer.records
+
+
+def test_rejects_foreign_files(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("not a capture")
+    with pytest.raises(ValueError):
+        list(read_capture(str(path)))
+    with pytest.raises(ValueError):
+        CaptureWriter(str(path))
+
+
+def test_import_real_reader_log(tmp_path):
+    capture = str(tmp_path / "full_log.m2cap")
+    assert import_hex_log(str(BE_ROOT / "rfid_full_log.txt"), capture, start_us=0) == 13
+
+    records = list(read_capture(capture))
+    assert records[0].direction == HOST_TO_READER
+    assert records[0].data.hex().upper() == "CFFF00720017A5"
+
+    buffer, frames = b"", []
+    for record in records:
+        if record.direction == READER_TO_HOST:
+            buffer, parsed = tag_listener_server.process_buffer(buffer + record.data)
+            frames += parsed
+    assert buffer == b""
+    assert [f["cmd"] for f in frames] == [0x0072, 0x0070, 0x0052]
+    assert frames[1]["type"] == "DEVICE_INFO"
+
+
+def test_import_sniffer_and_utf16_logs(tmp_path):
+    log = tmp_path / "sniffer.txt"
+    log.write_text(
+        "✅ Software Connected\n[APP->READER] CFFF00700024 15\n[READER->APP] CF0100520100164D\n",
+        encoding="utf-16",
+    )
+    capture = str(tmp_path / "sniffer.m2cap")
+    assert import_hex_log(str(log), capture, interval=0.5, start_us=0) == 2
+    records = list(read_capture(capture))
+    assert [r.direction for r in records] == [HOST_TO_READER, READER_TO_HOST]
+    assert records[1].timestamp_us - records[0].timestamp_us == 500_000
+
+
+@pytest.mark.parametrize("speed,low,high", [(1.0, 0.19, 0.6), (10.0, 0.015, 0.2), (0, 0, 0.1)])
+async def test_replay_timing(speed, low, high):
+    records = [CaptureRecord(t * 100_000, READER_TO_HOST, b"x") for t in range(3)]
+    received = []
+
+    started = time.perf_counter()
+    stats = await CaptureReplayer(records, speed=speed).replay(received.append)
+    elapsed = time.perf_counter() - started
+
+    assert received == [b"x"] * 3
+    assert stats.records == 3 and stats.bytes == 3
+    assert low <= elapsed <= high
+
+
+async def test_replay_filters_direction_and_awaits_async_sinks():
+    records = [
+        CaptureRecord(0, HOST_TO_READER, b"cmd"),
+        CaptureRecord(1, READER_TO_HOST, b"tag"),
+    ]
+    received = []
+
+    async def sink(data):
+        await asyncio.sleep(0)
+        received.append(data)
+
+    await CaptureReplayer(records, speed=0).replay(sink)
+    assert received == [b"tag"]
+    await CaptureReplayer(records, speed=0, direction=None).replay(sink)
+    assert received == [b"tag", b"cmd", b"tag"]
+
+
+async def test_replay_into_listener_ingestion(tmp_path, monkeypatch):
+    """0x0082 reports replayed in odd-sized chunks parse to the emulated tags."""
+    monkeypatch.setattr(tag_listener_server, "_reader_mode", "ACTIVE")
+    population = TagPopulation(tag_count=25, burst_size=4, antennas=(2,), seed=11)
+    reader = EmulatedReader(population)
+    stream = b"".join(reader.next_report() for _ in range(50))
+
+    path = str(tmp_path / "synthetic.m2cap")
+    with CaptureWriter(path) as writer:
+        for i, start in enumerate(range(0, len(stream), 97)):
+            writer.write(READER_TO_HOST, stream[start : start + 97], timestamp_us=i * 10)
+
+    scanned = []
+    tag_listener_server.set_tag_callback(scanned.append)
+    state = {"buffer": b""}
+
+    def sink(data):
+        state["buffer"], _ = tag_listener_server.ingest_chunk(state["buffer"], data, "replay")
+
+    try:
+        await CaptureReplayer(read_capture(path), speed=0).replay(sink)
+    finally:
+        tag_listener_server.set_tag_callback(None)
+
+    known = {epc.hex().upper() for epc in population.tags}
+    assert len(scanned) == 200
+    assert all(t["epc"] in known and t["antenna"] == 2 for t in scanned)
+
+
+def test_listener_records_live_traffic(tmp_path, monkeypatch):
+    monkeypatch.setattr(tag_listener_server, "_reader_mode", "ACTIVE")
+    path = str(tmp_path / "live.m2cap")
+    reader = EmulatedReader(TagPopulation(tag_count=3, burst_size=3, seed=12))
+    report = reader.next_report()
+
+    server_side, reader_side = socket.socketpair()
+    writer = CaptureWriter(path)
+    tag_listener_server.set_capture_writer(writer)
+    try:
+        thread = threading.Thread(
+            target=tag_listener_server.handle_client, args=(server_side, ("10.0.0.7", 2022))
+        )
+        thread.start()
+        reader_side.sendall(report)
+        time.sleep(0.05)
+        assert tag_listener_server.send_command_to_active_client(0x0028)
+        reader_side.close()
+        thread.join(timeout=5)
+    finally:
+        tag_listener_server.set_capture_writer(None)
+        writer.close()
+
+    records = list(read_capture(path))
+    assert b"".join(r.data for r in records if r.direction == READER_TO_HOST) == report
+    assert [r.data for r in records if r.direction == HOST_TO_READER] == [
+        tag_listener_server.build_command(0x0028)
+    ]
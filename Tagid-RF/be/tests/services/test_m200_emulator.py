@@ -0,0 +1,228 @@
+"""
+Tests for the M-200 emulator: command coverage, tag simulation, and the
+backend's parsers and reader service talking to it over TCP.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services import m200_protocol as proto
+from app.services.m200_emulator import (
+    AnswerModeServer,
+    EmulatedReader,
+    EmulatorFleet,
+    PushClient,
+    TagPopulation,
+    split_frames,
+)
+from app.services.m200_protocol import M200Command, M200Commands, M200ResponseParser
+from app.services.rfid_reader import RFIDReaderService
+from tag_listener_server import process_buffer
+
+
+def _ask(reader: EmulatedReader, command: M200Command):
+    raw = reader.handle_frame(command.serialize())
+    assert raw is not None
+    return M200ResponseParser.parse(raw, strict_crc=True)
+
+
+def test_population_is_reproducible():
+    a = TagPopulation(tag_count=10, burst_size=3, antennas=(2,), seed=7)
+    b = TagPopulation(tag_count=10, burst_size=3, antennas=(2,), seed=7)
+    burst = a.next_burst()
+    assert [r.epc for r in burst] == [r.epc for r in b.next_burst()]
+    assert len(burst) == 3
+    assert all(r.antenna == 2 and -99 <= r.rssi_dbm <= -20 for r in burst)
+    assert len(set(a.tags)) == 10
+    assert all(epc.hex().upper().startswith("E2806894") for epc in a.tags)
+
+
+def test_every_command_gets_a_framed_answer():
+    reader = EmulatedReader(TagPopulation(tag_count=5, seed=1))
+    commands = [
+        proto.build_inventory_command(),
+        proto.build_stop_inventory_command(),
+        proto.build_read_tag_command(1, 2, 6),
+        proto.build_select_tag_command("E2806894"),
+        proto.build_set_select_param_command(),
+        proto.build_get_select_param_command(),
+        proto.build_set_query_param_command(5, 1, 0),
+        proto.build_get_query_param_command(),
+        proto.build_module_init_command(),
+        M200Command(M200Commands.RFM_REBOOT, addr=proto.BROADCAST_ADDR),
+        proto.build_set_power_command(26),
+        proto.build_set_rf_protocol_command(),
+        proto.build_get_rf_protocol_command(),
+        proto.build_set_network_command("10.0.0.5", port=4001),
+        proto.build_get_network_command(),
+        proto.build_set_remote_server_command("10.0.0.9", 2022),
+        proto.build_get_remote_server_command(),
+        proto.build_get_device_info_command(),
+        proto.build_set_all_params_command({"power": 25, "antenna": 0x03}),
+        proto.build_get_all_params_command(),
+        proto.build_set_io_param_command({"trigger_mode": 1}),
+        proto.build_get_io_param_command(),
+        proto.build_set_wifi_command("store", "secret"),
+        proto.build_get_wifi_command(),
+        M200Command(M200Commands.RFM_SET_GET_S_PERMISSION_PARAM, b"\x02"),
+        proto.build_relay1_command(True),
+        proto.build_relay2_command(False),
+        proto.build_set_rssi_filter_command(1, 70),
+        proto.build_get_rssi_filter_command(1),
+        proto.build_set_gpio_param_command(2, 1, 1),
+        proto.build_get_gpio_param_command(2),
+        proto.build_get_gpio_levels_command(),
+        proto.build_get_gate_status_command(),
+        proto.build_set_gate_param_command(),
+        proto.build_get_gate_param_command(),
+        proto.build_set_eas_mask_command(b"\x01\x02"),
+        proto.build_get_eas_mask_command(),
+    ]
+    answered = {c.cmd for c in commands}
+    codes = {v for k, v in vars(M200Commands).items() if k.startswith("RFM_")}
+    assert codes <= answered
+
+    for command in commands:
+        response = _ask(reader, command)
+        assert response.cmd == command.cmd
+        assert response.success, hex(command.cmd)
+
+    assert (
+        proto.parse_network_response(_ask(reader, proto.build_get_network_command()).data)["ip"]
+        == "10.0.0.5"
+    )
+    assert (
+        proto.parse_gpio_levels(_ask(reader, proto.build_get_gpio_levels_command()).data)["gpio2"]
+        == 1
+    )
+    info = proto.parse_device_info(_ask(reader, proto.build_get_device_info_command()).data)
+    assert info["cp_serial_number"] == "EMU000000001"
+    assert reader.state.power_dbm == 25 and reader.state.antenna_mask == 0x03
+
+
+def test_inventory_reports_population_tags():
+    population = TagPopulation(tag_count=8, seed=3)
+    reader = EmulatedReader(population)
+    response = _ask(reader, proto.build_inventory_command())
+    tags = proto.parse_inventory_response(response.data)
+    assert len(tags) == 8
+    assert {t["epc"] for t in tags} == {epc.hex().upper() for epc in population.tags}
+    assert all(t["rssi"] < 0 for t in tags)
+
+
+def test_inventory_respects_reader_settings():
+    reader = EmulatedReader(TagPopulation(tag_count=20, antennas=(1, 2), seed=4))
+    _ask(reader, proto.build_set_all_params_command({"power": 30, "antenna": 0x01}))
+    tags = proto.parse_inventory_response(_ask(reader, proto.build_inventory_command()).data)
+    assert tags and all(t["antenna_port"] == 1 for t in tags)
+
+    _ask(reader, proto.build_set_power_command(0))  # 30 dB weaker: nothing reaches the reader
+    _ask(reader, proto.build_set_rssi_filter_command(1, 60))
+    response = _ask(reader, proto.build_inventory_command())
+    assert response.status == proto.M200Status.INVENTORY_COMPLETE
+
+
+def test_bad_crc_and_unknown_commands_are_ignored():
+    reader = EmulatedReader()
+    frame = bytearray(proto.build_get_gpio_levels_command().serialize())
+    frame[-1] ^= 0xFF
+    assert reader.handle_frame(bytes(frame)) is None
+    assert reader.handle_frame(M200Command(0x002F, b"\x1e").serialize()) is None
+    assert reader.stats["crc_errors"] == 1 and reader.stats["unknown_commands"] == 1
+
+    loud = EmulatedReader(respond_to_unknown=True)
+    response = _ask(loud, M200Command(0x002F, b"\x1e"))
+    assert response.status == proto.M200Status.PARAM_ERROR
+
+
+def test_active_reports_parse_in_the_tag_listener():
+    population = TagPopulation(tag_count=4, burst_size=5, antennas=(3,), seed=5)
+    reader = EmulatedReader(population)
+    stream = reader.next_report() + reader.next_report()
+
+    # Split mid-frame the way TCP may deliver it
+    rest, first = process_buffer(stream[:13])
+    rest, second = process_buffer(rest + stream[13:])
+    frames = first + second
+    assert rest == b""
+    assert len(frames) == 10
+    known = {epc.hex().upper() for epc in population.tags}
+    assert all(f["type"] == "TAG" and f["epc"] in known and f["antenna"] == 3 for f in frames)
+
+
+def test_split_frames_keeps_partial_tail():
+    data = proto.build_get_gpio_levels_command().serialize()
+    frames, rest = split_frames(b"\x00\x01" + data + data[:4])
+    assert frames == [data]
+    assert rest == data[:4]
+
+
+@pytest.mark.asyncio
+async def test_reader_service_against_answer_mode_server():
+    server = await AnswerModeServer(EmulatedReader(TagPopulation(tag_count=3, seed=6))).start()
+    service = RFIDReaderService()
+    service.connection_type = "tcp"
+    service.reader_ip, service.reader_port = server.host, server.port
+    service.socket_timeout = 2
+    try:
+        assert await service.connect() is True
+        assert service._device_info["cp_serial_number"] == "EMU000000001"
+        tags = await service.read_single_tag()
+        assert len(tags) == 3
+        assert await service.set_power(20) is True
+        assert server.reader.state.power_dbm == 20
+    finally:
+        await service.disconnect()
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_push_clients_feed_a_listener():
+    received = []
+    commands_answered = asyncio.Event()
+
+    async def listener(stream_reader, writer):
+        buffer = b""
+        writer.write(proto.build_get_gpio_levels_command().serialize())
+        while True:
+            chunk = await stream_reader.read(4096)
+            if not chunk:
+                break
+            buffer, frames = process_buffer(buffer + chunk)
+            for frame in frames:
+                if frame["type"] == "TAG":
+                    received.append(frame["epc"])
+                elif frame["cmd"] == M200Commands.RFM_GET_G_PIO_LEVEL:
+                    commands_answered.set()
+
+    server = await asyncio.start_server(listener, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    fleet = EmulatorFleet(
+        lambda i: TagPopulation(tag_count=10, read_rate=0, burst_size=10, first_serial=i * 100)
+    )
+    try:
+        await fleet.add_push_readers(3, "127.0.0.1", port, max_reads=200)
+        await asyncio.wait_for(fleet.wait_pushed(), timeout=10)
+        await asyncio.wait_for(commands_answered.wait(), timeout=5)
+        for _ in range(50):
+            if len(received) >= 600:
+                break
+            await asyncio.sleep(0.02)
+    finally:
+        await fleet.stop()
+        server.close()
+        await server.wait_closed()
+
+    assert len(received) == 600
+    assert len(set(received)) == 30
+    assert fleet.stats()["tag_reads"] == 600
+
+
+@pytest.mark.asyncio
+async def test_push_client_honours_stop_inventory():
+    reader = EmulatedReader(TagPopulation(read_rate=1000, seed=8))
+    client = await PushClient(reader, "127.0.0.1", 1, reconnect_delay=0.01).start()
+    reader.handle_frame(proto.build_stop_inventory_command().serialize())
+    assert reader.state.inventory_running is False
+    await client.stop()
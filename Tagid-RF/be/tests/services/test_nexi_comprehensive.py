@@ -38,9 +38,8 @@ async def test_create_payment_success(provider):
     mock_response.status_code = 200
     mock_response.json.return_value = {"transaction_id": "nexi_123"}
 
-    with patch("httpx.AsyncClient") as mock_client_cls:
+    with patch("app.services.nexi_provider.get_http_client") as mock_client_cls:
         mock_client = AsyncMock()
-        mock_client.__aenter__.return_value = mock_client
         mock_client.post.return_value = mock_response
         mock_client_cls.return_value = mock_client
 
@@ -57,9 +56,8 @@ async def test_create_payment_api_error(provider):
     mock_response.status_code = 400
     mock_response.text = "Bad request"
 
-    with patch("httpx.AsyncClient") as mock_client_cls:
+    with patch("app.services.nexi_provider.get_http_client") as mock_client_cls:
         mock_client = AsyncMock()
-        mock_client.__aenter__.return_value = mock_client
         mock_client.post.return_value = mock_response
         mock_client_cls.return_value = mock_client
 
@@ -88,9 +86,8 @@ async def test_confirm_payment_success(provider):
     mock_response.status_code = 200
     mock_response.json.return_value = {"status": "completed"}
 
-    with patch("httpx.AsyncClient") as mock_client_cls:
+    with patch("app.services.nexi_provider.get_http_client") as mock_client_cls:
         mock_client = AsyncMock()
-        mock_client.__aenter__.return_value = mock_client
         mock_client.post.return_value = mock_response
         mock_client_cls.return_value = mock_client
 
@@ -140,9 +137,8 @@ async def test_refund_payment_success(provider):
     mock_response.status_code = 200
     mock_response.json.return_value = {"refund_id": "refund_123"}
 
-    with patch("httpx.AsyncClient") as mock_client_cls:
+    with patch("app.services.nexi_provider.get_http_client") as mock_client_cls:
         mock_client = AsyncMock()
-        mock_client.__aenter__.return_value = mock_client
         mock_client.post.return_value = mock_response
         mock_client_cls.return_value = mock_client
 
@@ -184,9 +180,8 @@ async def test_cancel_payment_success(provider):
     mock_response.status_code = 200
     mock_response.json.return_value = {}
 
-    with patch("httpx.AsyncClient") as mock_client_cls:
+    with patch("app.services.nexi_provider.get_http_client") as mock_client_cls:
         mock_client = AsyncMock()
-        mock_client.__aenter__.return_value = mock_client
         mock_client.post.return_value = mock_response
         mock_client_cls.return_value = mock_client
 
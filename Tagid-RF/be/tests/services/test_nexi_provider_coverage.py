@@ -22,22 +22,22 @@ class TestNexiProviderCoverage:
             "created_at": "2023-01-01T00:00:00",
         }
 
-    @patch("app.services.nexi_provider.httpx.AsyncClient")
+    @patch("app.services.nexi_provider.get_http_client")
     async def test_create_payment_intent_network_error(self, mock_client):
         """Test expected network/exception error handling."""
         mock_client_ctx = AsyncMock()
-        mock_client.return_value.__aenter__.return_value = mock_client_ctx
+        mock_client.return_value = mock_client_ctx
         mock_client_ctx.post.side_effect = Exception("Network Error")
 
         with pytest.raises(ValueError) as exc:
             await self.provider.create_payment_intent(1000, "ILS")
         assert "Failed to create" in str(exc.value)
 
-    @patch("app.services.nexi_provider.httpx.AsyncClient")
+    @patch("app.services.nexi_provider.get_http_client")
     async def test_create_payment_intent_api_error(self, mock_client):
         """Test API returning non-200 status."""
         mock_client_ctx = AsyncMock()
-        mock_client.return_value.__aenter__.return_value = mock_client_ctx
+        mock_client.return_value = mock_client_ctx
 
         response = MagicMock()
         response.status_code = 400
@@ -54,22 +54,22 @@ class TestNexiProviderCoverage:
             await self.provider.confirm_payment("unknown")
         assert "not found" in str(exc.value)
 
-    @patch("app.services.nexi_provider.httpx.AsyncClient")
+    @patch("app.services.nexi_provider.get_http_client")
     async def test_confirm_payment_network_error(self, mock_client):
         """Test confirm payment network error."""
         mock_client_ctx = AsyncMock()
-        mock_client.return_value.__aenter__.return_value = mock_client_ctx
+        mock_client.return_value = mock_client_ctx
         mock_client_ctx.post.side_effect = Exception("Network Error")
 
         with pytest.raises(ValueError) as exc:
             await self.provider.confirm_payment("tx1")
         assert "Failed to confirm" in str(exc.value)
 
-    @patch("app.services.nexi_provider.httpx.AsyncClient")
+    @patch("app.services.nexi_provider.get_http_client")
     async def test_confirm_payment_api_failure(self, mock_client):
         """Test confirm payment API failure."""
         mock_client_ctx = AsyncMock()
-        mock_client.return_value.__aenter__.return_value = mock_client_ctx
+        mock_client.return_value = mock_client_ctx
 
         response = MagicMock()
         response.status_code = 500
@@ -85,22 +85,22 @@ class TestNexiProviderCoverage:
             await self.provider.refund_payment("unknown")
         assert "not found" in str(exc.value)
 
-    @patch("app.services.nexi_provider.httpx.AsyncClient")
+    @patch("app.services.nexi_provider.get_http_client")
     async def test_refund_payment_network_error(self, mock_client):
         """Test refund network error."""
         mock_client_ctx = AsyncMock()
-        mock_client.return_value.__aenter__.return_value = mock_client_ctx
+        mock_client.return_value = mock_client_ctx
         mock_client_ctx.post.side_effect = Exception("Network Error")
 
         with pytest.raises(ValueError) as exc:
             await self.provider.refund_payment("tx1")
         assert "Failed to create refund" in str(exc.value)
 
-    @patch("app.services.nexi_provider.httpx.AsyncClient")
+    @patch("app.services.nexi_provider.get_http_client")
     async def test_refund_payment_api_failure(self, mock_client):
         """Test refund API failure."""
         mock_client_ctx = AsyncMock()
-        mock_client.return_value.__aenter__.return_value = mock_client_ctx
+        mock_client.return_value = mock_client_ctx
 
         response = MagicMock()
         response.status_code = 400
@@ -129,22 +129,22 @@ class TestNexiProviderCoverage:
             await self.provider.cancel_payment("tx_done")
         assert "Cannot cancel" in str(exc.value)
 
-    @patch("app.services.nexi_provider.httpx.AsyncClient")
+    @patch("app.services.nexi_provider.get_http_client")
     async def test_cancel_payment_network_error(self, mock_client):
         """Test cancel network error."""
         mock_client_ctx = AsyncMock()
-        mock_client.return_value.__aenter__.return_value = mock_client_ctx
+        mock_client.return_value = mock_client_ctx
         mock_client_ctx.post.side_effect = Exception("Network Error")
 
         with pytest.raises(ValueError) as exc:
             await self.provider.cancel_payment("tx1")
         assert "Failed to cancel" in str(exc.value)
 
-    @patch("app.services.nexi_provider.httpx.AsyncClient")
+    @patch("app.services.nexi_provider.get_http_client")
     async def test_cancel_payment_api_failure(self, mock_client):
         """Test cancel API failure."""
         mock_client_ctx = AsyncMock()
-        mock_client.return_value.__aenter__.return_value = mock_client_ctx
+        mock_client.return_value = mock_client_ctx
 
         response = MagicMock()
         response.status_code = 500
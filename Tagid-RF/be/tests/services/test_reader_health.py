@@ -0,0 +1,212 @@
+"""
+Tests for reader health telemetry: heartbeats, batched status flushes, and
+the listener and answer-mode hooks that feed it.
+"""
+
+import socket
+import threading
+import time
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+import tag_listener_server
+from app.services.m200_emulator import (
+    AnswerModeServer,
+    EmulatedReader,
+    TagPopulation,
+    split_frames,
+)
+from app.services.reader_health import (
+    ERROR,
+    LISTENER,
+    OFFLINE,
+    ONLINE,
+    POLLER,
+    ReaderHealthMonitor,
+    reader_health_monitor,
+)
+from app.services.rfid_reader import RFIDReaderService
+
+
+@pytest.fixture
+def monitor(monkeypatch):
+    """The shared monitor, emptied and with a short heartbeat."""
+    reader_health_monitor.reset()
+    monkeypatch.setattr(reader_health_monitor, "heartbeat_seconds", 0.05)
+    yield reader_health_monitor
+    reader_health_monitor.reset()
+
+
+class FakeBatchDb:
+    """Records the updates sent through ``db.batch_()``."""
+
+    def __init__(self):
+        self.batches = []
+
+    @asynccontextmanager
+    async def batch_(self):
+        batcher = MagicMock()
+        yield batcher
+        self.batches.append(
+            [
+                (call.kwargs["where"]["ipAddress"], call.kwargs["data"])
+                for call in batcher.rfidreader.update_many.call_args_list
+            ]
+        )
+
+
+def test_heartbeats_and_rates():
+    monitor = ReaderHealthMonitor(heartbeat_seconds=1.0, max_missed_heartbeats=3)
+    monitor.on_connect("10.0.0.1", LISTENER)
+    connected_at = monitor._readers["10.0.0.1"].heard_at
+
+    monitor.on_frames("10.0.0.1", 20, tag_reads=18, crc_errors=2)
+    reader = monitor._readers["10.0.0.1"]
+    reader.heard_at = connected_at
+    assert monitor.check(now=connected_at + 2.0) == []
+    assert reader.frames_per_second == 10.0
+    assert (reader.status, reader.missed_heartbeats) == (ONLINE, 2)
+
+    # Silent for three heartbeats
+    assert monitor.check(now=connected_at + 3.5) == ["10.0.0.1"]
+    assert reader.status == ERROR
+    assert monitor.check(now=connected_at + 4.5) == []
+
+    # Heard from again
+    monitor.on_frames("10.0.0.1", 1)
+    assert reader.status == ONLINE
+
+    monitor.on_disconnect("10.0.0.1", "Connection reset by reader")
+    monitor.on_connect("10.0.0.1", LISTENER)
+    monitor.on_disconnect("10.0.0.1")
+    health = monitor.snapshot()[0]
+    assert health["status"] == OFFLINE
+    assert health["reconnects"] == 1
+    assert (health["frames"], health["tag_reads"], health["crc_errors"]) == (21, 18, 2)
+    assert health["last_error"] == "Connection reset by reader"
+
+
+@pytest.mark.asyncio
+async def test_flush_batches_and_rate_limits_last_seen():
+    monitor = ReaderHealthMonitor(last_seen_write_seconds=60.0)
+    db = FakeBatchDb()
+    monitor.on_connect("10.0.0.1")
+    monitor.on_connect("10.0.0.2")
+    monitor.on_frames("10.0.0.1", 5)
+
+    assert await monitor.flush(db) == 2
+    first = dict(db.batches[0])
+    assert first["10.0.0.1"]["status"] == ONLINE and "lastSeen" in first["10.0.0.1"]
+    assert first["10.0.0.2"] == {"status": ONLINE}
+
+    # More reads and no status change: nothing to write yet
+    monitor.on_frames("10.0.0.1", 5)
+    assert await monitor.flush(db) == 0
+
+    # A status change is written at once, lastSeen only once it is stale
+    monitor.on_disconnect("10.0.0.2")
+    reader = monitor._readers["10.0.0.1"]
+    reader.last_seen = reader.flushed_last_seen + timedelta(seconds=61)
+    assert await monitor.flush(db) == 2
+    assert dict(db.batches[1]) == {
+        "10.0.0.1": {"lastSeen": reader.last_seen},
+        "10.0.0.2": {"status": OFFLINE},
+    }
+    assert len(db.batches) == 2
+
+
+def test_listener_polls_idle_reader_and_counts_frames(monitor, monkeypatch):
+    monkeypatch.setattr(tag_listener_server, "_reader_mode", "ACTIVE")
+    reader = EmulatedReader(TagPopulation(tag_count=2, burst_size=2, seed=4))
+    report = reader.next_report()
+    frames = len(split_frames(report)[0])
+    # Damages the CRC of the last frame only
+    corrupted = report[:-1] + bytes([report[-1] ^ 0xFF])
+
+    server_side, reader_side = socket.socketpair()
+    thread = threading.Thread(
+        target=tag_listener_server.handle_client, args=(server_side, ("10.0.0.9", 2022))
+    )
+    thread.start()
+    try:
+        # Idle: the listener asks for device info
+        reader_side.settimeout(2)
+        poll = reader_side.recv(64)
+        assert poll == tag_listener_server.build_command(0x0070)
+        assert monitor.snapshot()[0]["status"] == ONLINE
+
+        reader_side.sendall(report + corrupted)
+        time.sleep(0.05)
+    finally:
+        reader_side.close()
+        thread.join(timeout=5)
+
+    health = monitor.snapshot()[0]
+    assert health["address"] == "10.0.0.9"
+    assert (health["frames"], health["crc_errors"]) == (2 * frames, 1)
+    assert health["status"] == OFFLINE
+
+
+def test_heartbeat_replies_are_not_ingested_as_tags(monitor, monkeypatch):
+    """An idle gate that answers heartbeats must not produce tag reads."""
+    monkeypatch.setattr(tag_listener_server, "_reader_mode", "ACTIVE")
+    callback = MagicMock()
+    monkeypatch.setattr(tag_listener_server, "_tag_callback", callback)
+    reader = EmulatedReader(TagPopulation(tag_count=0, seed=1))
+    # Detecting, someone just walked out
+    reader.state.gate_direction = 2
+
+    # A Get Gate Status reply would be read as tag "02" (0x0082 is also the
+    # active report code); that is why the listener does not poll with it
+    gate_status = reader.handle_frame(tag_listener_server.build_command(0x0082))
+    assert tag_listener_server.parse_frame(gate_status)["epc"] == "02"
+
+    server_side, reader_side = socket.socketpair()
+    thread = threading.Thread(
+        target=tag_listener_server.handle_client, args=(server_side, ("10.0.0.9", 2022))
+    )
+    thread.start()
+    try:
+        reader_side.settimeout(2)
+        for _ in range(2):
+            responses, _ = reader.handle_bytes(reader_side.recv(64))
+            assert responses
+            reader_side.sendall(b"".join(responses))
+        time.sleep(0.05)
+    finally:
+        reader_side.close()
+        thread.join(timeout=5)
+
+    callback.assert_not_called()
+    assert monitor.snapshot()[0]["frames"] == 2
+    assert tag_listener_server._reader_mode == "ACTIVE"
+
+
+@pytest.mark.asyncio
+async def test_answer_mode_service_registers_a_poller(monitor):
+    server = await AnswerModeServer(EmulatedReader(TagPopulation(tag_count=3, seed=6))).start()
+    service = RFIDReaderService()
+    service.connection_type = "tcp"
+    service.reader_ip, service.reader_port = server.host, server.port
+    service.socket_timeout = 2
+    try:
+        assert await service.connect() is True
+        health = monitor.snapshot()[0]
+        assert (health["address"], health["source"], health["status"]) == (
+            server.host,
+            POLLER,
+            ONLINE,
+        )
+        frames = health["frames"]
+
+        time.sleep(0.06)
+        await monitor.poll_idle()
+        assert monitor.snapshot()[0]["frames"] == frames + 1
+    finally:
+        await service.disconnect()
+        await server.stop()
+
+    assert monitor.snapshot()[0]["status"] == OFFLINE
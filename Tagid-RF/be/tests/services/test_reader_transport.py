@@ -0,0 +1,170 @@
+"""
+Tests for the reader transports, using a pty loopback and a TCP stand-in
+that answer M-200 commands with properly framed responses.
+"""
+
+import os
+import socket
+import struct
+import threading
+
+import pytest
+
+from app.services.m200_protocol import (
+    HEAD,
+    M200Commands,
+    M200ResponseParser,
+    build_get_gpio_levels_command,
+    build_response_frame,
+)
+from app.services.reader_transport import SERIAL, SerialTransport, open_tcp_transport
+from app.services.rfid_reader import RFIDReaderService
+
+DEVICE_INFO = b"CP-HW".ljust(32, b"\x00") + b"CP-FW".ljust(32, b"\x00") + b"SN0000000001"
+DEVICE_INFO += b"RFID-HW".ljust(32, b"\x00") + b"M-200".ljust(32, b"\x00") + b"SN0000000002"
+
+
+def _read_exact(read, size):
+    data = b""
+    while len(data) < size:
+        chunk = read(size - len(data))
+        if not chunk:
+            raise EOFError
+        data += chunk
+    return data
+
+
+def _serve_m200(read, write, unsolicited_first=False):
+    """Answer framed commands until the peer goes away."""
+    try:
+        while True:
+            header = _read_exact(read, 5)
+            assert header[0] == HEAD
+            cmd = struct.unpack(">H", header[2:4])[0]
+            _read_exact(read, header[4] + 2)  # data + CRC
+            if unsolicited_first:
+                write(build_response_frame(M200Commands.RFM_GET_GATE_STATUS, b"\x01"))
+                unsolicited_first = False
+            if cmd == M200Commands.RFM_GET_DEVICE_INFO:
+                write(build_response_frame(cmd, DEVICE_INFO))
+            else:
+                write(build_response_frame(cmd, b"\x01\x00"))
+    except (EOFError, OSError):
+        pass
+
+
+@pytest.fixture
+def pty_reader():
+    """A pty pair: the slave is the 'serial device', the master runs the stand-in."""
+    master, slave = os.openpty()
+    device = os.ttyname(slave)
+    options = {"unsolicited_first": False}
+
+    def run():
+        _serve_m200(
+            lambda n: os.read(master, n),
+            lambda data: os.write(master, data),
+            options["unsolicited_first"],
+        )
+
+    yield device, options, run
+    os.close(master)
+    os.close(slave)
+
+
+@pytest.fixture
+def tcp_reader():
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+
+    def run():
+        conn, _ = server.accept()
+        with conn:
+            _serve_m200(conn.recv, conn.sendall)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    yield server.getsockname()
+    server.close()
+
+
+def _start(run):
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_serial_transport_roundtrip(pty_reader):
+    device, _, run = pty_reader
+    _start(run)
+    transport = SerialTransport.open(device, timeout=2)
+    try:
+        transport.sendall(build_get_gpio_levels_command().serialize())
+        frame = b""
+        while len(frame) < 10:
+            frame += transport.recv(64)
+        response = M200ResponseParser.parse(frame, strict_crc=True)
+        assert response.cmd == M200Commands.RFM_GET_G_PIO_LEVEL
+        assert response.data == b"\x01\x00"
+    finally:
+        transport.close()
+
+
+def test_serial_transport_timeouts(pty_reader):
+    device, _, _ = pty_reader
+    transport = SerialTransport.open(device, timeout=0.1)
+    try:
+        with pytest.raises(socket.timeout):
+            transport.recv(1)
+        transport.setblocking(False)
+        with pytest.raises(BlockingIOError):
+            transport.recv(1)
+    finally:
+        transport.close()
+
+
+@pytest.mark.asyncio
+async def test_reader_service_over_serial(pty_reader):
+    device, options, run = pty_reader
+    options["unsolicited_first"] = True
+    _start(run)
+
+    service = RFIDReaderService()
+    service.connection_type = SERIAL
+    service.serial_device = device
+    service.socket_timeout = 2
+    try:
+        assert await service.connect() is True
+        assert service.get_status()["connection_type"] == SERIAL
+        assert service._device_info["connected"] is True
+
+        # Framing and unsolicited-message skipping are shared with TCP
+        raw = service.send_command(build_get_gpio_levels_command())
+        assert M200ResponseParser.parse(raw).cmd == M200Commands.RFM_GET_G_PIO_LEVEL
+    finally:
+        await service.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_reader_service_over_tcp(tcp_reader):
+    host, port = tcp_reader
+    service = RFIDReaderService()
+    service.connection_type = "tcp"
+    service.reader_ip, service.reader_port = host, port
+    service.socket_timeout = 2
+    try:
+        assert await service.connect() is True
+        raw = service.send_command(build_get_gpio_levels_command())
+        assert M200ResponseParser.parse(raw).cmd == M200Commands.RFM_GET_G_PIO_LEVEL
+    finally:
+        await service.disconnect()
+
+
+def test_open_tcp_transport(tcp_reader):
+    sock = open_tcp_transport(*tcp_reader, timeout=2)
+    try:
+        sock.sendall(build_get_gpio_levels_command().serialize())
+        assert sock.recv(1)[0] == HEAD
+    finally:
+        sock.close()
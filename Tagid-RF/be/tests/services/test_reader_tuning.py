@@ -0,0 +1,129 @@
+"""
+Tests for reader auto-tuning, run against the M-200 emulator.
+"""
+
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.services.m200_emulator import AnswerModeServer, EmulatedReader, TagPopulation
+from app.services.reader_tuning import (
+    COMPLETED,
+    ReaderTuner,
+    ReaderTuningService,
+    TuningJob,
+    TuningProfile,
+    TuningSpace,
+    score_window,
+)
+from app.services.rfid_reader import RFIDReaderService
+
+TAGS = 24
+
+
+def emulated_reader() -> EmulatedReader:
+    # Weak enough that 10 dB less power or any RSSI filter loses every tag
+    population = TagPopulation(
+        tag_count=TAGS, rssi_mean_dbm=-92, rssi_stddev_dbm=0, antennas=(1,), seed=3
+    )
+    reader = EmulatedReader(population, anticollision=True)
+    reader.session_persistence = {0: 0.0, 1: 0.05, 2: 0.2, 3: 0.2}
+    return reader
+
+
+async def connected_service(server: AnswerModeServer) -> RFIDReaderService:
+    service = RFIDReaderService()
+    service.connection_type = "tcp"
+    service.reader_ip, service.reader_port = server.host, server.port
+    service.socket_timeout = 2
+    assert await service.connect() is True
+    return service
+
+
+def test_score_window():
+    score = score_window(reads=40, unique_epcs=10, window_seconds=2.0, duplicate_weight=0.2)
+    assert score.unique_per_second == 5.0
+    assert score.duplicate_ratio == 0.75
+    assert score.score == pytest.approx(5.0 * (1 - 0.2 * 0.75))
+
+    assert score_window(0, 0, 1.0, 0.2).score == 0.0
+
+
+def test_emulator_anticollision():
+    reader = emulated_reader()
+    reads = reader.visible_reads(reader.population.sample(TAGS))
+
+    # Two slots for 24 tags: nearly everything collides
+    reader.state.query = bytes([1, 0, 0])
+    assert len(reader.singulate(list(reads), now=0.0)) <= 2
+    reader.state.query = bytes([8, 0, 0])
+    assert len(reader.singulate(list(reads), now=0.0)) > TAGS // 2
+
+    # Session 2, target A: read tags sit in B until persistence runs out
+    reader.state.query = bytes([8, 2, 0])
+    first = {r.epc for r in reader.singulate(list(reads), now=10.0)}
+    second = {r.epc for r in reader.singulate(list(reads), now=10.1)}
+    assert first and not first & second
+    assert first & {r.epc for r in reader.singulate(list(reads), now=11.0)}
+
+
+@pytest.mark.asyncio
+async def test_tuner_finds_better_settings():
+    server = await AnswerModeServer(emulated_reader()).start()
+    service = await connected_service(server)
+    space = TuningSpace(
+        powers=(20, 30),
+        q_values=(1, 5, 9),
+        sessions=(0, 2),
+        targets=(0, 1),
+        rssi_thresholds=(0, 60),
+        antennas=(1,),
+    )
+    job = TuningJob(reader_id="r1", total_steps=space.steps())
+    tuner = ReaderTuner(service, space, window_seconds=0.15, settle_seconds=0.25, max_sweeps=3)
+    try:
+        best = await tuner.tune(job, TuningProfile(power_dbm=20))
+    finally:
+        await service.disconnect()
+        await server.stop()
+
+    assert best.power_dbm == 30
+    # Two slots collide, 512 slots waste air time (24 tags)
+    assert best.q_value in (4, 5)
+    assert (best.session, best.target) == (2, 0)
+    assert best.rssi_filters == (0, 0, 0, 0)
+    assert job.best == best
+    # The first sweep moved the best profile, so there was a second one
+    assert job.completed_steps == job.total_steps >= 2 * space.steps()
+    # Repeated candidates come from the cache
+    profiles = [json.dumps(r["profile"], sort_keys=True) for r in job.results]
+    assert len(profiles) == len(set(profiles))
+
+    # The reader is left on the best profile
+    state = server.reader.state
+    assert state.power_dbm == 30
+    assert state.query == bytes([best.q_value, 2, 0])
+    assert state.rssi_filters.get(1, 0) == 0
+
+
+@pytest.mark.asyncio
+async def test_service_runs_job_and_saves_profile():
+    server = await AnswerModeServer(emulated_reader()).start()
+    service = ReaderTuningService()
+    space = TuningSpace(powers=(30,), q_values=(5,), sessions=(2,), targets=(0,), antennas=(1,))
+    try:
+        with patch("app.services.reader_tuning.save_profile", new_callable=AsyncMock) as save:
+            job = service.start(
+                "r1", f"{server.host}:{server.port}", space, window_seconds=0.1, settle_seconds=0
+            )
+            with pytest.raises(RuntimeError):
+                service.start("r1", f"{server.host}:{server.port}", space)
+            await service._tasks["r1"]
+    finally:
+        await server.stop()
+
+    assert job.status == COMPLETED, job.error
+    assert service.get_job("r1").completed_steps == job.total_steps
+    save.assert_awaited_once_with("r1", job.best, job.best_score)
+    assert job.finished_at is not None
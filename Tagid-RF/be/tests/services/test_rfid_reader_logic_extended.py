@@ -98,7 +98,7 @@ async def test_process_tag_new_tag_flow(reader):
 
         # 2. Prisma Mock - No mapping
         mock_prisma_client = AsyncMock()
-        mock_prisma_client.tagmapping.find_unique.return_value = None
+        mock_prisma_client.rfidtag.find_unique.return_value = None
         mock_prisma.client = mock_prisma_client
 
         # Run method
@@ -107,7 +107,7 @@ async def test_process_tag_new_tag_flow(reader):
         # Verifications
         # DB: Should add new tag and history
         assert mock_db.add.call_count == 2  # NewTag + History
-        assert mock_db.commit.call_count == 2
+        assert mock_db.commit.call_count == 1  # One transaction for both
 
         # WebSocket: Should broadcast
         mock_broadcast.assert_called_once()
@@ -166,7 +166,7 @@ async def test_process_tag_with_mapping(reader):
         mock_mapping = MagicMock()
         mock_mapping.encryptedQr = "ENCRYPTED_PAYLOAD"
         mock_client = AsyncMock()
-        mock_client.tagmapping.find_unique.return_value = mock_mapping
+        mock_client.rfidtag.find_unique.return_value = mock_mapping
         mock_prisma.client = mock_client
 
         await reader._process_tag(tag_data)
@@ -0,0 +1,193 @@
+"""
+Tests for scan history rollups, retention and activity queries, against SQLite.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.engine import create_engine  # sqlalchemy.create_engine is mocked in conftest
+from sqlalchemy.pool import StaticPool
+
+from app.models.rfid_tag import RFIDScanHistory, RFIDScanRollup
+from app.services.scan_history import (
+    ScanHistoryMaintainer,
+    parse_bounds,
+    partition_name,
+    period_start,
+    scan_activity,
+)
+
+NOW = datetime(2026, 1, 20, 12, 30, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    RFIDScanHistory.__table__.create(bind=engine)
+    RFIDScanRollup.__table__.create(bind=engine)
+    return engine
+
+
+def add_scans(engine, *scans):
+    """Insert (scanned_at, epc, reader_id, rssi) rows."""
+    with engine.begin() as conn:
+        conn.execute(
+            RFIDScanHistory.__table__.insert(),
+            [
+                {"scanned_at": at, "epc": epc, "reader_id": reader, "rssi": rssi}
+                for at, epc, reader, rssi in scans
+            ],
+        )
+
+
+def count(engine, model):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(model)).scalar()
+
+
+def test_rollup_aggregates_completed_hours(engine):
+    hour = datetime(2026, 1, 20, 9, tzinfo=timezone.utc)
+    add_scans(
+        engine,
+        (hour + timedelta(minutes=1), "E1", "gate", -50.0),
+        (hour + timedelta(minutes=2), "E1", "gate", -40.0),
+        (hour + timedelta(minutes=3), "E1", "gate", None),
+        (hour + timedelta(minutes=4), "E2", "gate", -60.0),
+        (hour + timedelta(hours=2, minutes=5), "E1", "floor", -45.0),
+        # Current hour: not complete, not rolled up
+        (NOW - timedelta(minutes=10), "E1", "gate", -30.0),
+    )
+    maintainer = ScanHistoryMaintainer(engine)
+
+    assert maintainer.rollup(NOW) == 2
+    # Nothing new to do on the next run
+    assert maintainer.rollup(NOW) == 0
+
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(RFIDScanRollup).order_by(RFIDScanRollup.bucket_start, RFIDScanRollup.epc)
+        ).all()
+        assert maintainer.rolled_up_until(conn) == hour + timedelta(hours=3)
+
+    e1 = rows[0]
+    assert (e1.epc, e1.reader_id, e1.scan_count) == ("E1", "gate", 3)
+    assert (e1.rssi_min, e1.rssi_max, e1.rssi_sum, e1.rssi_count) == (-50.0, -40.0, -90.0, 2)
+    assert [(r.epc, r.scan_count) for r in rows[1:]] == [("E2", 1), ("E1", 1)]
+
+
+def test_rollup_rebuilds_recent_hours_with_late_scans(engine):
+    recent = datetime(2026, 1, 20, 11, tzinfo=timezone.utc)
+    old = datetime(2026, 1, 20, 8, tzinfo=timezone.utc)
+    add_scans(engine, (old, "E1", "gate", -50.0), (recent, "E1", "gate", -50.0))
+    maintainer = ScanHistoryMaintainer(engine, late_scan_window=timedelta(hours=2))
+    assert maintainer.rollup(NOW) == 2
+
+    # Stored after their hours were rolled up
+    add_scans(
+        engine,
+        (recent + timedelta(minutes=30), "E2", "gate", -60.0),
+        (old + timedelta(minutes=30), "E2", "gate", -60.0),
+    )
+
+    assert maintainer.rollup(NOW) == 1
+    assert maintainer.rollup(NOW) == 0
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(RFIDScanRollup.bucket_start, func.sum(RFIDScanRollup.scan_count)).group_by(
+                RFIDScanRollup.bucket_start
+            )
+        ).all()
+    # Only the hour inside the late-scan window is rebuilt
+    assert {bucket.hour: scans for bucket, scans in rows} == {8: 1, 11: 2}
+
+
+def test_rollup_is_limited_per_run(engine):
+    start = datetime(2026, 1, 19, 0, tzinfo=timezone.utc)
+    add_scans(engine, *[(start + timedelta(hours=h), "E1", "gate", -50.0) for h in range(5)])
+    maintainer = ScanHistoryMaintainer(engine, max_hours_per_run=3)
+
+    assert maintainer.rollup(NOW) == 3
+    assert maintainer.rollup(NOW) == 2
+    assert count(engine, RFIDScanRollup) == 5
+
+
+def test_retention_keeps_scans_that_are_not_rolled_up(engine):
+    old = NOW - timedelta(days=40)
+    add_scans(
+        engine,
+        (old, "E1", "gate", -50.0),
+        (old + timedelta(hours=1), "E1", "gate", -50.0),
+        (NOW - timedelta(days=1), "E2", "gate", -50.0),
+    )
+    maintainer = ScanHistoryMaintainer(engine, retention_days=30, max_hours_per_run=1)
+
+    # Nothing rolled up yet: nothing may be deleted
+    assert maintainer.apply_retention(NOW)["deleted_scans"] == 0
+
+    # Only the first old hour is rolled up
+    maintainer.rollup(NOW)
+    assert maintainer.apply_retention(NOW)["deleted_scans"] == 1
+
+    result = maintainer.run_once(NOW)
+    assert result["deleted_scans"] == 1
+    assert count(engine, RFIDScanHistory) == 1
+    assert count(engine, RFIDScanRollup) == 2
+
+
+def test_retention_drops_expired_rollups(engine):
+    add_scans(engine, (NOW - timedelta(days=400), "E1", "gate", -50.0))
+    maintainer = ScanHistoryMaintainer(engine, rollup_retention_days=365)
+    maintainer.rollup(NOW)
+
+    result = maintainer.apply_retention(NOW)
+
+    assert result["deleted_rollups"] == 1
+    assert count(engine, RFIDScanRollup) == 0
+
+
+def test_activity_is_the_same_from_raw_and_rollups(engine):
+    add_scans(
+        engine,
+        *[
+            (NOW - timedelta(hours=h, minutes=m), epc, "gate", -40.0 - m)
+            for h in range(1, 72, 5)
+            for m in (5, 20)
+            for epc in ("E1", "E2")
+        ],
+        (NOW - timedelta(minutes=5), "E1", "floor", -35.0),
+    )
+    since = NOW - timedelta(hours=72)
+
+    with engine.connect() as conn:
+        raw = scan_activity(conn, since, NOW, raw_query_hours=100)
+    ScanHistoryMaintainer(engine).rollup(NOW)
+    with engine.connect() as conn:
+        mixed = scan_activity(conn, since, NOW, raw_query_hours=48)
+        for_tag = scan_activity(conn, since, NOW, epc="E1", raw_query_hours=48)
+
+    assert raw["source"] == "raw"
+    assert mixed["source"] == "mixed"
+    assert mixed["total_scans"] == raw["total_scans"] == 15 * 4 + 1
+    assert mixed["buckets"] == raw["buckets"]
+    assert for_tag["total_scans"] == 15 * 2 + 1
+    assert raw["buckets"][0]["rssi_avg"] == -52.5
+
+
+def test_partition_naming_and_bounds():
+    moment = datetime(2026, 1, 22, 15, 4, tzinfo=timezone.utc)  # Thursday
+
+    assert period_start(moment, "day") == datetime(2026, 1, 22, tzinfo=timezone.utc)
+    assert period_start(moment, "week") == datetime(2026, 1, 19, tzinfo=timezone.utc)
+    assert partition_name(period_start(moment, "week")) == "rfid_scan_history_p20260119"
+
+    assert parse_bounds(
+        "FOR VALUES FROM ('2026-01-19 00:00:00+00') TO ('2026-01-20 00:00:00+00')"
+    ) == (datetime(2026, 1, 19, tzinfo=timezone.utc), datetime(2026, 1, 20, tzinfo=timezone.utc))
+    assert parse_bounds("FOR VALUES FROM (MINVALUE) TO ('2026-01-20 00:00:00+00')")[0] is None
+    assert parse_bounds("DEFAULT") is None
+
+    with pytest.raises(ValueError):
+        ScanHistoryMaintainer(None, interval="month")
@@ -103,73 +103,62 @@ class TestTagListenerServiceMock:
             assert call_args["data"]["is_encrypted"] is True
             assert call_args["data"]["decrypted_qr"] == "DECRYPTED"
 
-    @patch("app.services.theft_detection.TheftDetectionService")
+    @patch("app.services.gate_traversal.gate_traversal_monitor")
     @patch("app.services.tag_listener_service.manager")
     @patch("app.db.prisma.prisma_client")
-    async def test_broadcast_theft_alert(self, mock_prisma_wrapper, mock_manager, mock_theft_cls):
-        """Test theft alert triggering at gate."""
+    async def test_broadcast_feeds_gate_traversal(
+        self, mock_prisma_wrapper, mock_manager, mock_monitor
+    ):
+        """Reads from a GATE reader go to the traversal monitor, not straight to theft checks."""
         mock_db = MagicMock()
         mock_client_instance = MagicMock()
         mock_client_instance.__aenter__ = AsyncMock(return_value=mock_db)
         mock_client_instance.__aexit__ = AsyncMock(return_value=None)
         mock_prisma_wrapper.client = mock_client_instance
 
-        # Reader is GATE
         reader = MockModel(id="r1", name="Gate 1", type="GATE", location="Exit")
         mock_db.rfidreader.find_unique = AsyncMock(return_value=reader)
-
         tag = MockModel(id="t1", epc="E1", isPaid=False, productDescription="Stolen Item")
         mock_db.rfidtag.find_unique = AsyncMock(return_value=tag)
-
-        # Mock Theft Service to report unpaid
-        mock_theft_instance = mock_theft_cls.return_value
-        mock_theft_instance.check_tag_payment_status = AsyncMock(return_value=False)
-
-        # Ensure broadcast is an AsyncMock
         mock_manager.broadcast = AsyncMock()
+        mock_monitor.on_read = AsyncMock()
 
-        data = {"epc": "E1", "reader_ip": "1.1.1.1"}
-
-        await self.service._broadcast_tag(data)
-
-        # Should broadcast twice: scan and alert
-        assert mock_manager.broadcast.call_count == 2
-
-        # Check second call for alert
-        alert_call = mock_manager.broadcast.call_args_list[1][0][0]
-        assert alert_call["type"] == "theft_alert"
-        assert "Unpaid item detected" in alert_call["data"]["message"]
+        await self.service._broadcast_tag({"epc": "E1", "reader_ip": "1.1.1.1", "antenna": 2})
 
-    @patch("app.services.theft_detection.TheftDetectionService")
+        # Scan broadcast only; the alert waits for the traversal
+        assert mock_manager.broadcast.call_count == 1
+        mock_monitor.on_read.assert_awaited_once()
+        fed_reader, payload = mock_monitor.on_read.call_args[0]
+        assert fed_reader is reader
+        assert payload["epc"] == "E1"
+        assert payload["antenna_port"] == 2
+        assert payload["product_name"] == "Stolen Item"
+
+    @patch("app.services.bath_presence.bath_cart_feeder")
+    @patch("app.services.tag_listener_service.settings")
     @patch("app.services.tag_listener_service.manager")
     @patch("app.db.prisma.prisma_client")
-    async def test_broadcast_gate_paid(self, mock_prisma_wrapper, mock_manager, mock_theft_cls):
-        """Test paid item at gate (no alert)."""
+    async def test_broadcast_feeds_bath_cart(
+        self, mock_prisma_wrapper, mock_manager, mock_settings, mock_feeder
+    ):
+        """Reads from a BATH reader are fed to the live bath cart when enabled."""
         mock_db = MagicMock()
         mock_client_instance = MagicMock()
         mock_client_instance.__aenter__ = AsyncMock(return_value=mock_db)
         mock_client_instance.__aexit__ = AsyncMock(return_value=None)
         mock_prisma_wrapper.client = mock_client_instance
 
-        reader = MockModel(id="r1", type="GATE")
+        reader = MockModel(id="b1", name="Bath", type="BATH")
         mock_db.rfidreader.find_unique = AsyncMock(return_value=reader)
-
-        tag = MockModel(id="t1", epc="E1", isPaid=True)
+        tag = MockModel(id="t1", epc="E1", isPaid=False)
         mock_db.rfidtag.find_unique = AsyncMock(return_value=tag)
-
-        mock_theft_instance = mock_theft_cls.return_value
-        mock_theft_instance.check_tag_payment_status = AsyncMock(return_value=True)
-
-        # Ensure broadcast is an AsyncMock
         mock_manager.broadcast = AsyncMock()
+        mock_settings.BATH_AUTO_CART = True
+        mock_feeder.on_read = AsyncMock()
 
-        data = {"epc": "E1", "reader_ip": "1.1.1.1"}
-
-        await self.service._broadcast_tag(data)
+        await self.service._broadcast_tag({"epc": "E1", "reader_ip": "10.0.0.5"})
 
-        # Scan broadcast only
-        assert mock_manager.broadcast.call_count == 1
-        assert mock_manager.broadcast.call_args[0][0]["type"] == "tag_scanned"
+        mock_feeder.on_read.assert_awaited_once_with("b1", "E1", tag)
 
     def test_get_stats(self):
         """Test stats retrieval."""
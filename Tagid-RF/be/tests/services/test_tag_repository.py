@@ -0,0 +1,245 @@
+"""
+Tests for the tag repository: Prisma decides the paid state, rfid_tags
+mirrors it, and the hot path resolves a tag in one Prisma query.
+"""
+
+import threading
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.engine import create_engine  # sqlalchemy.create_engine is mocked in conftest
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.rfid_tag import RFIDScanHistory, RFIDTag
+from app.services.inventory_counters import inventory_counters
+from app.services.rfid_reader import RFIDReaderService
+from app.services.tag_repository import TagRepository, tag_repository
+
+
+class FakeRfidTags:
+    """The ``rfidtag`` delegate of a Prisma client, over a dict, counting queries."""
+
+    def __init__(self, *tags):
+        self.tags = {tag.epc: tag for tag in tags}
+        self.queries = 0
+
+    @staticmethod
+    def tag(epc, **fields):
+        values = {"productId": None, "productDescription": None, "encryptedQr": None}
+        values.update({"isPaid": False, "paidAt": None}, **fields)
+        return SimpleNamespace(epc=epc, **values)
+
+    def _matching(self, where):
+        epcs = where["epc"]["in"] if isinstance(where["epc"], dict) else [where["epc"]]
+        return [self.tags[epc] for epc in epcs if epc in self.tags]
+
+    async def find_unique(self, where, include=None):
+        self.queries += 1
+        return self.tags.get(where["epc"])
+
+    async def find_many(self, where):
+        self.queries += 1
+        return self._matching(where)
+
+    async def create_many(self, data, skip_duplicates=False):
+        self.queries += 1
+        new = [fields for fields in data if fields["epc"] not in self.tags]
+        for fields in new:
+            fields = dict(fields)
+            epc = fields.pop("epc")
+            self.tags[epc] = self.tag(epc, **fields)
+        return len(new)
+
+    async def update_many(self, where, data):
+        self.queries += 1
+        matching = self._matching(where)
+        for tag in matching:
+            vars(tag).update(data)
+        return len(matching)
+
+    async def update(self, where, data):
+        return await self.update_many(where, data)
+
+
+@pytest.fixture
+def Session():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    RFIDTag.__table__.create(bind=engine)
+    RFIDScanHistory.__table__.create(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with patch("app.services.tag_repository.SessionLocal", Session):
+        inventory_counters.reset()
+        yield Session
+        inventory_counters.reset()
+
+
+@pytest.fixture
+def prisma():
+    rfidtag = FakeRfidTags()
+    with patch("app.db.prisma.prisma_client") as mock_prisma:
+        mock_prisma.client = SimpleNamespace(rfidtag=rfidtag)
+        yield rfidtag
+
+
+def add_rows(Session, *rows):
+    with Session() as db:
+        db.add_all(rows)
+        db.commit()
+
+
+def row(Session, epc):
+    with Session() as db:
+        return db.query(RFIDTag).filter(RFIDTag.epc == epc).one()
+
+
+def test_paid_state_prefers_prisma():
+    paid_row = RFIDTag(epc="E1", is_paid=True)
+    assert TagRepository.paid_state(FakeRfidTags.tag("E1", isPaid=False), paid_row) is False
+    assert TagRepository.paid_state(FakeRfidTags.tag("E1", isPaid=True), None) is True
+    # Not migrated yet: the row is all there is
+    assert TagRepository.paid_state(None, paid_row) is True
+    assert TagRepository.paid_state(None, None) is False
+
+
+@pytest.mark.asyncio
+async def test_get_many_is_one_query(prisma):
+    prisma.tags = {epc: FakeRfidTags.tag(epc) for epc in ("E1", "E2")}
+
+    tags = await tag_repository.get_many(["E1", "E2", "E1", "E9"])
+
+    assert sorted(tags) == ["E1", "E2"]
+    assert prisma.queries == 1
+    assert await tag_repository.get_many([]) == {}
+    assert prisma.queries == 1
+
+
+@pytest.mark.asyncio
+async def test_set_paid_adopts_legacy_rows_and_mirrors(Session, prisma):
+    prisma.tags["E1"] = FakeRfidTags.tag("E1", productId="SKU-1")
+    add_rows(
+        Session,
+        RFIDTag(epc="E1", product_sku="SKU-1", product_name="Shirt"),
+        RFIDTag(epc="E2", product_sku="SKU-2", product_name="Socks"),
+    )
+
+    updated = await tag_repository.set_paid(["E1", "E2", "MISSING"], True, data={"status": "SOLD"})
+
+    assert updated == 2
+    # E2 only existed in rfid_tags; it is now known to Prisma as well
+    assert prisma.tags["E2"].productId == "SKU-2"
+    assert prisma.tags["E2"].productDescription == "Socks"
+    for epc in ("E1", "E2"):
+        assert prisma.tags[epc].isPaid is True
+        assert prisma.tags[epc].status == "SOLD"
+        assert row(Session, epc).is_paid is True
+        assert row(Session, epc).paid_at is not None
+
+    assert await tag_repository.set_paid(["E2"], False) == 1
+    assert prisma.tags["E2"].isPaid is False
+    assert (row(Session, "E2").is_paid, row(Session, "E2").paid_at) == (False, None)
+
+
+@pytest.mark.asyncio
+async def test_mirror_failure_does_not_fail_the_caller():
+    session = MagicMock()
+    session.query.side_effect = RuntimeError("rfid_tags unavailable")
+
+    assert await tag_repository.mirror_paid(["E1"], True, session=session) == 0
+
+
+@pytest.mark.asyncio
+async def test_session_work_runs_off_the_event_loop(Session, prisma):
+    add_rows(Session, RFIDTag(epc="E1", product_sku="SKU-1"))
+    loop_thread = threading.get_ident()
+    threads = []
+
+    def recording(method):
+        def call(*args, **kwargs):
+            threads.append(threading.get_ident())
+            return method(*args, **kwargs)
+
+        return call
+
+    def session_factory(**kwargs):
+        session = Session(**kwargs)
+        for name in ("query", "commit", "close"):
+            setattr(session, name, recording(getattr(session, name)))
+        return session
+
+    with patch("app.services.tag_repository.SessionLocal", session_factory):
+        await tag_repository.set_paid(["E1"], True)
+        await tag_repository.mirror_paid(["E1"], False)
+        await tag_repository.sync_stores()
+
+    assert threads and loop_thread not in threads
+
+
+@pytest.mark.asyncio
+async def test_sync_stores(Session, prisma):
+    paid_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    prisma.tags["PAID"] = FakeRfidTags.tag("PAID", isPaid=True, paidAt=paid_at)
+    prisma.tags["UNPAID"] = FakeRfidTags.tag("UNPAID")
+    add_rows(
+        Session,
+        RFIDTag(epc="PAID", product_sku="SKU-1"),
+        RFIDTag(epc="UNPAID", product_sku="SKU-1", is_paid=True, paid_at=paid_at),
+        RFIDTag(epc="LEGACY", product_sku="SKU-2", is_paid=True, paid_at=paid_at),
+        RFIDTag(epc="BARE"),
+    )
+
+    # Dry run: counted, nothing written
+    report = await tag_repository.sync_stores(batch_size=2, dry_run=True)
+    assert report == {"rows": 4, "adopted": 0, "promoted": 0, "mirrored": 2}
+    assert row(Session, "PAID").is_paid is False
+
+    # Migration: the legacy sale reaches Prisma, and the row's word wins once
+    report = await tag_repository.sync_stores(batch_size=2, adopt_legacy=True)
+    assert report == {"rows": 4, "adopted": 1, "promoted": 1, "mirrored": 1}
+    assert prisma.tags["LEGACY"].isPaid is True
+    assert prisma.tags["UNPAID"].isPaid is True
+    assert "BARE" not in prisma.tags
+    assert row(Session, "PAID").is_paid is True
+
+    # From then on Prisma wins
+    prisma.tags["UNPAID"].isPaid = False
+    report = await tag_repository.sync_stores()
+    assert report["mirrored"] == 1
+    assert row(Session, "UNPAID").is_paid is False
+    assert row(Session, "UNPAID").paid_at is None
+
+
+@pytest.mark.asyncio
+async def test_reader_hot_path_is_one_query_and_one_commit(Session, prisma):
+    prisma.tags["E1"] = FakeRfidTags.tag("E1", isPaid=True, encryptedQr="QR")
+    add_rows(Session, RFIDTag(epc="E1", product_sku="SKU-1", read_count=1))
+    reader = RFIDReaderService()
+
+    commits = []
+
+    def session_factory(**kwargs):
+        session = Session(**kwargs)
+        commit = session.commit
+        session.commit = lambda: (commits.append(1), commit())
+        return session
+
+    with (
+        patch("app.services.rfid_reader.SessionLocal", side_effect=session_factory),
+        patch("app.services.rfid_reader.manager.broadcast", new_callable=AsyncMock) as broadcast,
+    ):
+        await reader._process_tag({"epc": "E1", "rssi": -50})
+        await reader._process_tag({"epc": "NEW", "rssi": -60})
+
+    assert prisma.queries == 2
+    assert len(commits) == 2
+    first, second = [call.args[0]["data"] for call in broadcast.await_args_list]
+    assert (first["is_mapped"], first["target_qr"], first["is_paid"]) == (True, "QR", True)
+    assert (second["is_mapped"], second["is_paid"]) == (False, False)
+
+    scanned = row(Session, "E1")
+    assert (scanned.read_count, scanned.is_paid) == (2, True)
+    assert row(Session, "NEW").id == second["tag_id"]
@@ -0,0 +1,128 @@
+"""
+Tests for the incremental dashboard stats collector.
+"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+from app.services.tag_stats import TagStatsCollector
+from tests.mock_utils import MockModel
+
+NOON = datetime(2026, 1, 6, 12, 0, tzinfo=timezone.utc)
+
+
+def _mock_session(counts, most_scanned=None, rssi=(None, 0), locations=()):
+    db = MagicMock()
+    query = MagicMock()
+    db.query.return_value = query
+    query.filter.return_value = query
+    query.order_by.return_value = query
+    query.group_by.return_value = query
+    query.count.side_effect = counts
+    query.first.return_value = most_scanned
+    query.one.return_value = rssi
+    query.all.return_value = list(locations)
+    return db
+
+
+class TestTagStatsCollector:
+
+    def test_record_scan_updates_counters(self):
+        stats = TagStatsCollector()
+
+        stats.record_scan(1, "E1", 1, True, rssi=-50, location="A", scanned_at=NOON)
+        stats.record_scan(2, "E2", 1, True, rssi=-60, scanned_at=NOON)
+        stats.record_scan(
+            1,
+            "E1",
+            2,
+            False,
+            rssi=-40,
+            previous_rssi=-50,
+            location="B",
+            previous_location="A",
+            scanned_at=NOON + timedelta(minutes=1),
+        )
+
+        snap = stats.snapshot(now=NOON + timedelta(minutes=2))
+        assert snap["total_tags"] == 2
+        assert snap["active_tags"] == 2
+        assert snap["scans_today"] == 3
+        assert snap["scans_last_hour"] == 3
+        assert snap["average_rssi"] == -50.0
+        assert snap["tags_by_location"] == {"B": 1}
+        assert snap["most_scanned_tag"] == {"id": 1, "epc": "E1", "read_count": 2}
+
+    def test_rolling_windows(self):
+        stats = TagStatsCollector()
+        stats.record_scan(1, "E1", 1, True, scanned_at=NOON - timedelta(hours=3))
+        stats.record_scan(1, "E1", 2, False, scanned_at=NOON - timedelta(minutes=30))
+
+        snap = stats.snapshot(now=NOON)
+        assert snap["scans_today"] == 2
+        assert snap["scans_last_hour"] == 1
+
+        snap = stats.snapshot(now=NOON + timedelta(minutes=45))
+        assert snap["scans_last_hour"] == 0
+        assert snap["scans_today"] == 2
+
+        # New UTC day resets the daily window
+        snap = stats.snapshot(now=NOON + timedelta(hours=12, minutes=1))
+        assert snap["scans_today"] == 0
+
+    def test_reconcile_loads_db_figures(self):
+        stats = TagStatsCollector()
+        assert not stats.is_reconciled
+
+        db = _mock_session(
+            counts=[100, 90, 500, 50],
+            most_scanned=MockModel(id=7, epc="MOST", read_count=1000),
+            rssi=(-91, 2),
+            locations=[("Location A", 40), (None, 3)],
+        )
+        stats.reconcile(db)
+
+        snap = stats.snapshot()
+        assert stats.is_reconciled
+        assert snap["total_tags"] == 100
+        assert snap["active_tags"] == 90
+        assert snap["scans_today"] == 500
+        assert snap["scans_last_hour"] == 50
+        assert snap["average_rssi"] == -45.5
+        assert snap["most_scanned_tag"]["epc"] == "MOST"
+        assert snap["tags_by_location"] == {"Location A": 40}
+
+    def test_reconcile_then_incremental(self):
+        """Scans recorded after reconciliation add on top of the DB figures."""
+        stats = TagStatsCollector()
+        stats.record_scan(1, "E1", 1, True)  # already in the DB when reconciling
+        stats.reconcile(_mock_session(counts=[10, 10, 20, 5]))
+
+        stats.record_scan(2, "E2", 1, True, rssi=-70)
+
+        snap = stats.snapshot()
+        assert snap["total_tags"] == 11
+        assert snap["scans_today"] == 21
+        assert snap["scans_last_hour"] == 6
+        assert snap["average_rssi"] == -70.0
+        assert snap["most_scanned_tag"]["epc"] == "E2"
+
+    def test_reconciled_hour_drift_ages_out(self):
+        """Scans only the DB knew about leave the last-hour window minute by minute."""
+        stats = TagStatsCollector()
+        stats.reconcile(_mock_session(counts=[0, 0, 120, 120]))
+        now = stats.reconciled_at
+
+        assert stats.snapshot(now=now)["scans_last_hour"] == 120
+        assert stats.snapshot(now=now + timedelta(minutes=30))["scans_last_hour"] == 60
+        assert stats.snapshot(now=now + timedelta(minutes=61))["scans_last_hour"] == 0
+
+    def test_reset(self):
+        stats = TagStatsCollector()
+        stats.record_scan(1, "E1", 1, True)
+        stats.reconcile(_mock_session(counts=[1, 1, 1, 1]))
+
+        stats.reset()
+
+        assert not stats.is_reconciled
+        assert stats.snapshot()["total_tags"] == 0
@@ -0,0 +1,107 @@
+"""
+Cold-start guard: import the app in a fresh interpreter with ``-X importtime``
+and fail when startup imports regress past a budget, or when SDKs that are
+only needed by some requests (web push, Google sign-in, QR codes, Stripe,
+Firebase) are pulled in at import time again.
+
+Override the budget with STARTUP_IMPORT_BUDGET_MS on slow CI machines.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+
+import pytest
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+STARTUP_IMPORT_BUDGET_MS = float(os.environ.get("STARTUP_IMPORT_BUDGET_MS", "3000"))
+
+# Loaded on first use by the code that needs them
+LAZY_MODULES = ("pywebpush", "google.oauth2", "google.auth", "qrcode", "stripe", "firebase_admin")
+
+
+class ImportTiming(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(stderr: str) -> List[ImportTiming]:
+    """Parse ``-X importtime`` lines: ``import time: self [us] | cumulative | name``."""
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # The header line
+        timings.append(ImportTiming(fields[2].strip(), int(fields[0]), int(fields[1])))
+    return timings
+
+
+def profile_import(module: str) -> Dict[str, ImportTiming]:
+    """Import ``module`` in a fresh interpreter and return timings by module name."""
+    # Run twice so the measured run does not pay for writing .pyc files
+    for _ in range(2):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=BACKEND_ROOT,
+            env=os.environ.copy(),
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+    if result.returncode != 0:
+        if "prisma" in result.stderr:
+            pytest.skip("Prisma client is not generated")
+        pytest.fail(f"import {module} failed:\n{result.stderr[-2000:]}")
+    return {timing.module: timing for timing in parse_importtime(result.stderr)}
+
+
+def report(timings: Dict[str, ImportTiming], top: int = 15) -> str:
+    slowest = sorted(timings.values(), key=lambda t: t.self_us, reverse=True)[:top]
+    return "\n".join(
+        f"{t.self_us / 1000:9.1f} ms self {t.cumulative_us / 1000:9.1f} ms total  {t.module}"
+        for t in slowest
+    )
+
+
+def test_parse_importtime():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   _io\n"
+        "import time:      1031 |     147995 | app.services.push_service\n"
+        "some warning printed by an import\n"
+    )
+    assert parse_importtime(stderr) == [
+        ImportTiming("_io", 120, 120),
+        ImportTiming("app.services.push_service", 1031, 147995),
+    ]
+
+
+@pytest.mark.slow
+def test_app_startup_import_within_budget():
+    timings = profile_import("app.main")
+    total_ms = timings["app.main"].cumulative_us / 1000
+    assert total_ms <= STARTUP_IMPORT_BUDGET_MS, (
+        f"Importing app.main took {total_ms:.0f} ms "
+        f"(budget {STARTUP_IMPORT_BUDGET_MS:.0f} ms). Slowest imports:\n{report(timings)}"
+    )
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize(
+    "module",
+    [
+        "app.main",
+        "app.services.push_service",
+        "app.api.v1.endpoints.auth",
+        "app.routers.products",
+    ],
+)
+def test_optional_sdks_load_lazily(module):
+    timings = profile_import(module)
+    eager = [name for name in LAZY_MODULES if name in timings]
+    assert not eager, f"import {module} loads {eager} at startup"
@@ -2,8 +2,10 @@ import json
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
 
-from app.routers.websocket import manager, websocket_endpoint
+from app.routers.websocket import manager, router, websocket_endpoint
 
 
 @pytest.mark.asyncio
@@ -74,3 +76,39 @@ async def test_manager_broadcast_error():
 
     # Should have removed the failed connection
     assert mock_ws not in manager.active_connections
+
+
+def test_websocket_subscribe_bath_command():
+    """Kiosks can subscribe to one bath's cart deltas."""
+    app = FastAPI()
+    app.include_router(router, prefix="/ws")
+    manager.bath_subscriptions.clear()
+
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws/rfid") as websocket:
+            assert websocket.receive_json()["type"] == "welcome"
+            websocket.send_text(json.dumps({"command": "subscribe", "bath_id": "b1"}))
+            reply = websocket.receive_json()
+
+            # The reply is sent after subscribing; the socket is still open
+            assert reply == {"type": "subscribed", "message": "Subscribed to bath b1 cart updates"}
+            assert len(manager.bath_subscriptions["b1"]) == 1
+
+            client.portal.call(manager.broadcast_to_bath, "b1", {"type": "bath_cart_delta"})
+            assert websocket.receive_json() == {"type": "bath_cart_delta"}
+
+    # Closing the socket drops the subscription
+    assert not manager.bath_subscriptions["b1"]
+
+
+@pytest.mark.asyncio
+async def test_broadcast_to_bath_drops_failed_subscribers():
+    mock_ws = AsyncMock()
+    manager.subscribe_bath(mock_ws, "b1")
+
+    await manager.broadcast_to_bath("b1", {"type": "bath_cart_delta"})
+    mock_ws.send_json.assert_awaited_with({"type": "bath_cart_delta"})
+
+    mock_ws.send_json.side_effect = Exception("closed")
+    await manager.broadcast_to_bath("b1", {"type": "bath_cart_delta"})
+    assert mock_ws not in manager.bath_subscriptions["b1"]
@@ -19,7 +19,7 @@ class MockUser:
 @pytest.mark.asyncio
 async def test_auth_google_login_success(client, db_session):
     """Test successful Google login."""
-    with patch("app.api.v1.endpoints.auth.id_token.verify_oauth2_token") as mock_verify:
+    with patch("app.services.google_auth.id_token.verify_oauth2_token") as mock_verify:
         mock_verify.return_value = {
             "email": "test@example.com",
             "sub": "google-123",
@@ -41,7 +41,7 @@ async def test_auth_google_login_success(client, db_session):
 @pytest.mark.asyncio
 async def test_auth_google_login_update_sub(client, db_session):
     """Test Google login updates google_sub_id if changed."""
-    with patch("app.api.v1.endpoints.auth.id_token.verify_oauth2_token") as mock_verify:
+    with patch("app.services.google_auth.id_token.verify_oauth2_token") as mock_verify:
         mock_verify.return_value = {
             "email": "test@example.com",
             "sub": "google-new-123",
@@ -64,7 +64,7 @@ async def test_auth_google_login_update_sub(client, db_session):
 @pytest.mark.asyncio
 async def test_auth_google_login_user_not_found(client, db_session):
     """Test Google login failure when user doesn't exist."""
-    with patch("app.api.v1.endpoints.auth.id_token.verify_oauth2_token") as mock_verify:
+    with patch("app.services.google_auth.id_token.verify_oauth2_token") as mock_verify:
         mock_verify.return_value = {"email": "unknown@example.com", "sub": "google-123"}
 
         db_session.client.user.find_unique.return_value = None
@@ -78,7 +78,7 @@ async def test_auth_google_login_user_not_found(client, db_session):
 @pytest.mark.asyncio
 async def test_auth_google_login_invalid_token(client, db_session):
     """Test Google login with invalid token."""
-    with patch("app.api.v1.endpoints.auth.id_token.verify_oauth2_token") as mock_verify:
+    with patch("app.services.google_auth.id_token.verify_oauth2_token") as mock_verify:
         mock_verify.side_effect = ValueError("Invalid token")
 
         response = await client.post("/api/v1/auth/google", json={"token": "invalid-token"})
@@ -90,7 +90,7 @@ async def test_auth_google_login_invalid_token(client, db_session):
 @pytest.mark.asyncio
 async def test_auth_google_missing_email(client, db_session):
     """Test Google login when token is missing email."""
-    with patch("app.api.v1.endpoints.auth.id_token.verify_oauth2_token") as mock_verify:
+    with patch("app.services.google_auth.id_token.verify_oauth2_token") as mock_verify:
         mock_verify.return_value = {
             "sub": "google-123"
             # No email